@@ -35,7 +35,7 @@ async def send_message(message: str, message_id: str = ''):
     c = next(
         (
             x
-            for x in await ListConversations()
+            for x in (await ListConversations())[0]
             if x.conversation_id == state.conversation_id
         ),
         None,
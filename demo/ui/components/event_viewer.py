@@ -27,7 +27,7 @@ def event_list():
         'Id': [],
         'Content': [],
     }
-    events = asyncio.run(GetEvents())
+    events, _ = asyncio.run(GetEvents())
     for e in events:
         event = convert_event_to_state(e)
         df_data['Conversation ID'].append(event.conversation_id)
@@ -1,7 +1,7 @@
 import mesop as me
 import mesop.labs as mel
 
-from state.host_agent_service import UpdateAppState
+from state.host_agent_service import ApplyUpdates, UpdateAppState
 from state.state import AppState
 from styles.styles import (
     MAIN_COLUMN_STYLE,
@@ -13,6 +13,7 @@ from styles.styles import (
 
 from .async_poller import AsyncAction, async_poller
 from .side_nav import sidenav
+from .update_listener import update_listener
 
 
 async def refresh_app_state(e: mel.WebEvent):  # pylint: disable=unused-argument
@@ -23,18 +24,30 @@ async def refresh_app_state(e: mel.WebEvent):  # pylint: disable=unused-argument
     yield
 
 
+async def apply_updates(e: mel.WebEvent):
+    """Apply pushed state updates event handler"""
+    app_state = me.state(AppState)
+    await ApplyUpdates(app_state, e.value['updates'])
+    yield
+
+
 @me.content_component
 def page_scaffold():
     """Page scaffold component"""
     app_state = me.state(AppState)
-    action = (
-        AsyncAction(
-            value=app_state, duration_seconds=app_state.polling_interval
+    if app_state.live_updates:
+        update_listener(
+            updates_event=apply_updates, since=app_state.update_seq
+        )
+    else:
+        action = (
+            AsyncAction(
+                value=app_state, duration_seconds=app_state.polling_interval
+            )
+            if app_state
+            else None
         )
-        if app_state
-        else None
-    )
-    async_poller(action=action, trigger_event=refresh_app_state)
+        async_poller(action=action, trigger_event=refresh_app_state)
 
     sidenav('')
 
@@ -0,0 +1,53 @@
+import {
+  LitElement,
+  html,
+} from 'https://cdn.jsdelivr.net/gh/lit/dist@3/core/lit-core.min.js';
+
+class UpdateListener extends LitElement {
+  static properties = {
+    updatesEvent: {type: String},
+    url: {type: String},
+    since: {type: Number},
+    batch_ms: {type: Number},
+  };
+
+  render() {
+    return html`<div></div>`;
+  }
+
+  firstUpdated() {
+    this.pending = [];
+    this.timer = null;
+    const url = this.since > 0 ? `${this.url}?since=${this.since}` : this.url;
+    // EventSource reconnects by itself and resumes with Last-Event-ID.
+    this.source = new EventSource(url);
+    this.source.onmessage = (event) => {
+      this.pending.push(JSON.parse(event.data));
+      // Batch bursts of updates into one round trip to the Mesop server.
+      if (!this.timer) {
+        this.timer = setTimeout(() => this.flush(), this.batch_ms);
+      }
+    };
+  }
+
+  disconnectedCallback() {
+    super.disconnectedCallback();
+    if (this.source) {
+      this.source.close();
+    }
+    clearTimeout(this.timer);
+  }
+
+  flush() {
+    this.timer = null;
+    const updates = this.pending;
+    this.pending = [];
+    this.dispatchEvent(
+      new MesopEvent(this.updatesEvent, {
+        updates: updates,
+      }),
+    );
+  }
+}
+
+customElements.define('update-listener-component', UpdateListener);
@@ -0,0 +1,37 @@
+from collections.abc import Callable
+from typing import Any
+
+import mesop.labs as mel
+
+
+@mel.web_component(path='./update_listener.js')
+def update_listener(
+    *,
+    updates_event: Callable[[mel.WebEvent], Any],
+    since: int = 0,
+    url: str = '/updates/stream',
+    batch_ms: int = 100,
+    key: str | None = None,
+):
+    """Creates an invisible component that listens for server state updates.
+
+    The component subscribes to the conversation server's update stream and
+    forwards the updates it receives to updates_event, batched so that a burst
+    of updates costs one event. The event value is a dict with an 'updates'
+    list, as sent by the server.
+
+    Returns:
+      The web component that was created.
+    """
+    return mel.insert_web_component(
+        name='update-listener-component',
+        key=key,
+        events={
+            'updatesEvent': updates_event,
+        },
+        properties={
+            'url': url,
+            'since': since,
+            'batch_ms': batch_ms,
+        },
+    )
@@ -3,10 +3,16 @@ run:
   uv main.py
 """
 
+import asyncio
+import logging
 import os
 
+from contextlib import asynccontextmanager
+
 import mesop as me
 
+from common.utils.log_pipeline import configure_logging
+from common.utils.telemetry import configure_tracing
 from components.api_key_dialog import api_key_dialog
 from components.page_scaffold import page_scaffold
 from dotenv import load_dotenv
@@ -24,6 +30,12 @@ from state.state import AppState
 
 
 load_dotenv()
+# The host manager logs the messages and task updates it handles.
+configure_logging(
+    logging.WARNING, levels={'service.server.adk_host_manager': logging.INFO}
+)
+# Spans are exported if A2A_TRACE_EXPORTER is set.
+configure_tracing()
 
 
 def on_load(e: me.LoadEvent):  # pylint: disable=unused-argument
@@ -134,8 +146,15 @@ def task_page():
     task_list_page(me.state(AppState))
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Let in-flight messages finish before the process exits.
+    await asyncio.to_thread(agent_server.shutdown)
+
+
 # Setup the server global objects
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 router = APIRouter()
 agent_server = ConversationServer(router)
 app.include_router(router)
@@ -9,6 +9,7 @@ from service.types import (
     AgentClientJSONError,
     CreateConversationRequest,
     CreateConversationResponse,
+    GetArchivedEventRequest,
     GetEventRequest,
     GetEventResponse,
     JSONRPCRequest,
@@ -67,6 +68,11 @@ class ConversationClient:
     async def get_events(self, payload: GetEventRequest) -> GetEventResponse:
         return GetEventResponse(**await self._send_request(payload))
 
+    async def get_archived_events(
+        self, payload: GetArchivedEventRequest
+    ) -> GetEventResponse:
+        return GetEventResponse(**await self._send_request(payload))
+
     async def list_messages(
         self, payload: ListMessageRequest
     ) -> ListMessageResponse:
@@ -3,10 +3,13 @@ import datetime
 import json
 import logging
 import os
+import textwrap
 import uuid
 
+from common.server.artifact_stream import ArtifactAssembler
 from common.types import (
     AgentCard,
+    Artifact,
     DataPart,
     FileContent,
     FilePart,
@@ -31,11 +34,19 @@ from hosts.multiagent.remote_agent_connection import (
     TaskCallbackArg,
 )
 from service.server.application_manager import ApplicationManager
+from service.server.history_archive import HistoryArchive
+from service.server.state_store import Page, StateStore
+from service.server.update_stream import UpdateStream
 from service.types import Conversation, Event
 from utils.agent_card import get_agent_card
 
 
 logger = logging.getLogger(__name__)
+# Conversation messages and remote task updates, echoed to the terminal. Task
+# updates arrive for every streamed chunk, which makes them the logger to
+# sample (A2A_LOG_SAMPLE) or quiet when traffic is high.
+terminal_logger = logging.getLogger(f'{__name__}.terminal')
+task_update_logger = logging.getLogger(f'{__name__}.task_updates')
 
 
 class ADKHostManager(ApplicationManager):
@@ -46,22 +57,14 @@ class ADKHostManager(ApplicationManager):
     uses to send messages to the agent and provide information for the frontend.
     """
 
-    _conversations: list[Conversation]
-    _messages: list[Message]
-    _tasks: list[Task]
-    _events: dict[str, Event]
-    _pending_message_ids: list[str]
+    _store: StateStore
     _agents: list[AgentCard]
-    _task_map: dict[str, str]
 
     def __init__(self, api_key: str = '', uses_vertex_ai: bool = False):
-        self._conversations = []
-        self._messages = []
-        self._tasks = []
-        self._events = {}
-        self._pending_message_ids = []
+        self._store = StateStore.from_env()
         self._agents = []
-        self._artifact_chunks = {}
+        # Artifacts streamed in chunks, until their last chunk arrives
+        self._artifact_chunks = ArtifactAssembler.from_env()
         self._session_service = InMemorySessionService()
         self._artifact_service = InMemoryArtifactService()
         self._memory_service = InMemoryMemoryService()
@@ -99,8 +102,6 @@ class ADKHostManager(ApplicationManager):
 
         self._initialize_host()
 
-        # Map of message id to task id
-        self._task_map = {}
         # Map to manage 'lost' message ids until protocol level id is introduced
         self._next_id = {}  # dict[str, str]: previous message to next message
 
@@ -131,7 +132,7 @@ class ADKHostManager(ApplicationManager):
         )
         conversation_id = session.id
         c = Conversation(conversation_id=conversation_id, is_active=True)
-        self._conversations.append(c)
+        self._store.add_conversation(c)
         return c
 
     def sanitize_message(self, message: Message) -> Message:
@@ -154,22 +155,22 @@ class ADKHostManager(ApplicationManager):
         return message
 
     async def process_message(self, message: Message):
-        self._messages.append(message)
         message_id = get_message_id(message)
+        self._store.add_message(message_id, message)
         if message_id:
-            self._pending_message_ids.append(message_id)
+            self._store.add_pending(message_id)
         conversation_id = (
             message.metadata['conversation_id']
             if 'conversation_id' in message.metadata
             else None
         )
         
-        self._print_message_to_terminal("👤 user:", message)
+        self._log_message('👤 user:', message)
         
         # Now check the conversation and attach the message id.
         conversation = self.get_conversation(conversation_id)
         if conversation:
-            conversation.messages.append(message)
+            self._store.add_conversation_message(conversation, message)
         self.add_event(
             Event(
                 id=str(uuid.uuid4()),
@@ -199,20 +200,10 @@ class ADKHostManager(ApplicationManager):
             'session_id': conversation_id,
         }
         last_message_id = get_last_message_id(message)
-        if (
-            last_message_id
-            and last_message_id in self._task_map
-            and task_still_open(
-                next(
-                    filter(
-                        lambda x: x.id == self._task_map[last_message_id],
-                        self._tasks,
-                    ),
-                    None,
-                )
+        if task_still_open(self._store.task_for_message(last_message_id)):
+            state_update['task_id'] = self._store.task_id_for_message(
+                last_message_id
             )
-        ):
-            state_update['task_id'] = self._task_map[last_message_id]
         # Need to upsert session state now, only way is to append an event.
         await self._session_service.append_event(
             session,
@@ -257,64 +248,33 @@ class ADKHostManager(ApplicationManager):
                 'last_message_id': last_message_id,
                 'message_id': new_message_id,
             }
-            self._messages.append(response)
+            self._store.add_message(new_message_id, response)
             
             # 打印Host Agent响应到终端
-            self._print_message_to_terminal("🤖 Host Agent", response)
+            self._log_message('🤖 Host Agent', response)
 
         if conversation:
-            conversation.messages.append(response)
-        self._pending_message_ids.remove(message_id)
+            self._store.add_conversation_message(conversation, response)
+        self._store.remove_pending(message_id)
 
-    def _print_message_to_terminal(self, sender: str, message: Message):
-        """Print message to terminal"""
-        if not message:
+    def _log_message(self, sender: str, message: Message | None):
+        """Logs a conversation message for the terminal."""
+        if not message or not terminal_logger.isEnabledFor(logging.INFO):
             return
-            
-        print(f"\n{'='*60}")
-        print(f"{sender} - {datetime.datetime.now().strftime('%H:%M:%S')}")
-        print(f"{'='*60}")
-        
-        if message.parts:
-            for part in message.parts:
-                if hasattr(part, 'text') and part.text:
-                    # Handle long text, limit line length
-                    text = part.text.strip()
-                    if len(text) > 80:
-                        # Split by lines and reformat
-                        words = text.split()
-                        lines = []
-                        current_line = ""
-                        for word in words:
-                            if len(current_line + word) + 1 <= 80:
-                                current_line += (word + " ")
-                            else:
-                                if current_line:
-                                    lines.append(current_line.strip())
-                                current_line = word + " "
-                        if current_line:
-                            lines.append(current_line.strip())
-                        for line in lines:
-                            print(line)
-                    else:
-                        print(text)
-                elif hasattr(part, 'content') and part.content:
-                    print(part.content)
-        
-        # Print task info if available
-        if message.metadata and 'task_id' in message.metadata:
-            print(f"📋 Task ID: {message.metadata['task_id']}")
-        
-        print(f"{'='*60}\n")
+        task_id = (message.metadata or {}).get('task_id')
+        terminal_logger.info(
+            '%s%s%s',
+            sender,
+            _TerminalText(message.parts),
+            f'\n📋 Task ID: {task_id}' if task_id else '',
+            extra={'message_id': get_message_id(message)},
+        )
 
     def add_task(self, task: Task):
-        self._tasks.append(task)
+        self._store.add_task(task)
 
     def update_task(self, task: Task):
-        for i, t in enumerate(self._tasks):
-            if t.id == task.id:
-                self._tasks[i] = task
-                return
+        self._store.update_task(task)
 
     def task_callback(self, task: TaskCallbackArg, agent_card: AgentCard):
         # Check if task is None
@@ -322,8 +282,7 @@ class ADKHostManager(ApplicationManager):
             logger.warning("task_callback called with None task")
             return None
             
-        # Print task status update to terminal
-        self._print_task_update_to_terminal(task, agent_card)
+        self._log_task_update(task, agent_card)
             
         self.emit_event(task, agent_card)
         if isinstance(task, TaskStatusUpdateEvent):
@@ -334,6 +293,11 @@ class ADKHostManager(ApplicationManager):
                     self.attach_message_to_task(task.status.message, current_task.id)
                     self.insert_message_history(current_task, task.status.message)
                     self.insert_id_trace(task.status.message)
+            if task.final:
+                # Keep what arrived of artifacts the agent never finished.
+                self.add_artifacts(
+                    current_task, self._artifact_chunks.flush(task.id)
+                )
             self.update_task(current_task)
             return current_task
         if isinstance(task, TaskArtifactUpdateEvent):
@@ -342,7 +306,7 @@ class ADKHostManager(ApplicationManager):
             self.update_task(current_task)
             return current_task
         # Otherwise this is a Task, either new or updated
-        if not any(filter(lambda x: x.id == task.id, self._tasks)):
+        if self._store.get_task(task.id) is None:
             if task.status and task.status.message:
                 self.attach_message_to_task(task.status.message, task.id)
                 self.insert_id_trace(task.status.message)
@@ -354,35 +318,42 @@ class ADKHostManager(ApplicationManager):
         self.update_task(task)
         return task
 
-    def _print_task_update_to_terminal(self, task: TaskCallbackArg, agent_card: AgentCard):
-        """Print task update to terminal"""
-        if not task:
+    def _log_task_update(self, task: TaskCallbackArg, agent_card: AgentCard):
+        """Logs a remote agent's task update for the terminal."""
+        if not task or not task_update_logger.isEnabledFor(logging.INFO):
             return
-            
-        agent_name = agent_card.name if agent_card else "Unknown Agent"
-        timestamp = datetime.datetime.now().strftime('%H:%M:%S')
-        
+        agent_name = agent_card.name if agent_card else 'Unknown Agent'
         if isinstance(task, TaskStatusUpdateEvent):
             if task.status:
-                state = task.status.state if task.status.state else "UNKNOWN"
-                print(f"\n🔄 [{timestamp}] {agent_name} - Task Status: {state}")
-                if task.status.message and task.status.message.parts:
-                    for part in task.status.message.parts:
-                        if hasattr(part, 'text') and part.text:
-                            print(f"   Message: {part.text}")
+                task_update_logger.info(
+                    '🔄 %s - Task Status: %s%s',
+                    agent_name,
+                    task.status.state or 'UNKNOWN',
+                    _TerminalText(
+                        task.status.message and task.status.message.parts,
+                        '   Message: ',
+                    ),
+                    extra={'task_id': task.id},
+                )
         elif isinstance(task, TaskArtifactUpdateEvent):
-            print(f"\n📁 [{timestamp}] {agent_name} - Task Result Update")
-            if task.artifact and task.artifact.parts:
-                for part in task.artifact.parts:
-                    if hasattr(part, 'text') and part.text:
-                        print(f"   Result: {part.text}")
-        elif hasattr(task, 'status') and task.status:
-            state = task.status.state if task.status.state else "UNKNOWN"
-            print(f"\n📋 [{timestamp}] {agent_name} - Task: {task.id}, Status: {state}")
-            if task.status.message and task.status.message.parts:
-                for part in task.status.message.parts:
-                    if hasattr(part, 'text') and part.text:
-                        print(f"   Message: {part.text}")
+            task_update_logger.info(
+                '📁 %s - Task Result Update%s',
+                agent_name,
+                _TerminalText(task.artifact and task.artifact.parts, '   Result: '),
+                extra={'task_id': task.id},
+            )
+        elif task.status:
+            task_update_logger.info(
+                '📋 %s - Task: %s, Status: %s%s',
+                agent_name,
+                task.id,
+                task.status.state or 'UNKNOWN',
+                _TerminalText(
+                    task.status.message and task.status.message.parts,
+                    '   Message: ',
+                ),
+                extra={'task_id': task.id},
+            )
 
     def emit_event(self, task: TaskCallbackArg, agent_card: AgentCard):
         content = None
@@ -450,7 +421,7 @@ class ADKHostManager(ApplicationManager):
 
     def attach_message_to_task(self, message: Message | None, task_id: str):
         if message and message.metadata and 'message_id' in message.metadata:
-            self._task_map[message.metadata['message_id']] = task_id
+            self._store.map_message_to_task(message.metadata['message_id'], task_id)
 
     def insert_id_trace(self, message: Message | None):
         if not message:
@@ -463,26 +434,14 @@ class ADKHostManager(ApplicationManager):
     def insert_message_history(self, task: Task, message: Message | None):
         if not message:
             return
-        if task.history is None:
-            task.history = []
         message_id = get_message_id(message)
         if not message_id:
             return
-        if get_message_id(task.status.message) not in [
-            get_message_id(x) for x in task.history
-        ]:
-            task.history.append(task.status.message)
-        else:
-            print(
-                'Message id already in history',
-                get_message_id(task.status.message),
-                task.history,
-            )
+        if not self._store.add_task_message(task, message):
+            logger.debug('Message id %s already in history', message_id)
 
     def add_or_get_task(self, task: TaskCallbackArg):
-        current_task = next(
-            filter(lambda x: x.id == task.id, self._tasks), None
-        )
+        current_task = self._store.get_task(task.id)
         if not current_task:
             conversation_id = None
             if task.metadata and 'conversation_id' in task.metadata:
@@ -504,75 +463,39 @@ class ADKHostManager(ApplicationManager):
     def process_artifact_event(
         self, current_task: Task, task_update_event: TaskArtifactUpdateEvent
     ):
-        artifact = task_update_event.artifact
-        if not artifact.append:
-            # received the first chunk or entire payload for an artifact
-            if artifact.lastChunk is None or artifact.lastChunk:
-                # lastChunk bit is missing or is set to true, so this is the entire payload
-                # add this to artifacts
-                if not current_task.artifacts:
-                    current_task.artifacts = []
-                current_task.artifacts.append(artifact)
-            else:
-                # this is a chunk of an artifact, stash it in temp store for assembling
-                if task_update_event.id not in self._artifact_chunks:
-                    self._artifact_chunks[task_update_event.id] = {}
-                self._artifact_chunks[task_update_event.id][artifact.index] = (
-                    artifact
-                )
-        else:
-            # we received an append chunk, add to the existing temp artifact
-            current_temp_artifact = self._artifact_chunks[task_update_event.id][
-                artifact.index
-            ]
-            # TODO handle if current_temp_artifact is missing
-            current_temp_artifact.parts.extend(artifact.parts)
-            if artifact.lastChunk:
-                current_task.artifacts.append(current_temp_artifact)
-                del self._artifact_chunks[task_update_event.id][artifact.index]
+        completed = self._artifact_chunks.add(
+            task_update_event.id, task_update_event.artifact
+        )
+        for task_id, artifact in completed:
+            # Unfinished artifacts pushed out of the buffer may belong to
+            # another task.
+            task = (
+                current_task
+                if task_id == current_task.id
+                else self._store.get_task(task_id)
+            )
+            if task:
+                self.add_artifacts(task, [artifact])
+                if task is not current_task:
+                    self.update_task(task)
+
+    def add_artifacts(self, task: Task, artifacts: list[Artifact]):
+        if not artifacts:
+            return
+        if not task.artifacts:
+            task.artifacts = []
+        task.artifacts.extend(artifacts)
 
     def add_event(self, event: Event):
-        self._events[event.id] = event
+        self._store.add_event(event)
 
     def get_conversation(
         self, conversation_id: str | None
     ) -> Conversation | None:
-        if not conversation_id:
-            return None
-        return next(
-            filter(
-                lambda c: c.conversation_id == conversation_id,
-                self._conversations,
-            ),
-            None,
-        )
+        return self._store.get_conversation(conversation_id)
 
     def get_pending_messages(self) -> list[tuple[str, str]]:
-        rval = []
-        for message_id in self._pending_message_ids:
-            if message_id in self._task_map:
-                task_id = self._task_map[message_id]
-                task = next(
-                    filter(lambda x: x.id == task_id, self._tasks), None
-                )
-                if not task:
-                    rval.append((message_id, ''))
-                elif task.history and task.history[-1].parts:
-                    if len(task.history) == 1:
-                        rval.append((message_id, 'Working...'))
-                    else:
-                        part = task.history[-1].parts[0]
-                        rval.append(
-                            (
-                                message_id,
-                                part.text
-                                if part.type == 'text'
-                                else 'Working...',
-                            )
-                        )
-            else:
-                rval.append((message_id, ''))
-        return rval
+        return self._store.pending_messages()
 
     def register_agent(self, url):
         agent_data = get_agent_card(url)
@@ -589,15 +512,40 @@ class ADKHostManager(ApplicationManager):
 
     @property
     def conversations(self) -> list[Conversation]:
-        return self._conversations
+        return self._store.conversations
 
     @property
     def tasks(self) -> list[Task]:
-        return self._tasks
+        return self._store.tasks
 
     @property
     def events(self) -> list[Event]:
-        return sorted(self._events.values(), key=lambda x: x.timestamp)
+        return self._store.events
+
+    @property
+    def updates(self) -> UpdateStream:
+        return self._store.updates
+
+    @property
+    def archive(self) -> HistoryArchive:
+        return self._store.archive
+
+    def conversations_since(self, seq: int, limit: int | None) -> Page:
+        return self._store.conversations_since(seq, limit)
+
+    def messages_since(
+        self, conversation_id: str, seq: int, limit: int | None
+    ) -> Page:
+        return self._store.messages_since(conversation_id, seq, limit)
+
+    def tasks_since(self, seq: int, limit: int | None) -> Page:
+        return self._store.tasks_since(seq, limit)
+
+    def events_since(self, seq: int, limit: int | None) -> Page:
+        return self._store.events_since(seq, limit)
+
+    def archived_events(self, since: int, limit: int | None) -> Page:
+        return self._store.archived_events(since, limit)
 
     def adk_content_from_message(self, message: Message) -> types.Content:
         parts: list[types.Part] = []
@@ -739,8 +687,9 @@ class ADKHostManager(ApplicationManager):
                 else:
                     parts.append(TextPart(text=json.dumps(p)))
         except Exception as e:
-            print(f"Error converting function response to messages: {e}")
-            print(f"Function response data: {part.function_response.model_dump()}")
+            logger.warning(
+                'Error converting function response to messages: %s', e
+            )
             # Fallback: convert entire response to data part
             parts.append(DataPart(data=part.function_response.model_dump()))
         return parts
@@ -781,3 +730,29 @@ def task_still_open(task: Task | None) -> bool:
         TaskState.WORKING,
         TaskState.INPUT_REQUIRED,
     ]
+
+
+class _TerminalText:
+    """The text parts of a message, wrapped to 80 columns when logged.
+
+    Wrapping happens when the log record is formatted, on the logging
+    thread.
+    """
+
+    def __init__(self, parts: list[Part] | None, prefix: str = ''):
+        self.parts = parts or []
+        self.prefix = prefix
+
+    def __str__(self) -> str:
+        lines = []
+        for part in self.parts:
+            if part.type == 'text' and part.text.strip():
+                lines.extend(
+                    textwrap.wrap(
+                        part.text.strip(),
+                        80,
+                        initial_indent=self.prefix,
+                        subsequent_indent=' ' * len(self.prefix),
+                    )
+                )
+        return ''.join(f'\n{line}' for line in lines)
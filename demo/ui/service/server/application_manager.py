@@ -1,6 +1,9 @@
 from abc import ABC, abstractmethod
 
 from common.types import AgentCard, Message, Task
+from service.server.history_archive import HistoryArchive
+from service.server.state_store import Page
+from service.server.update_stream import UpdateStream
 from service.types import Conversation, Event
 
 
@@ -44,3 +47,35 @@ class ApplicationManager(ABC):
     @abstractmethod
     def events(self) -> list[Event]:
         pass
+
+    @property
+    @abstractmethod
+    def updates(self) -> UpdateStream:
+        pass
+
+    @property
+    @abstractmethod
+    def archive(self) -> HistoryArchive:
+        pass
+
+    @abstractmethod
+    def conversations_since(self, seq: int, limit: int | None) -> Page:
+        pass
+
+    @abstractmethod
+    def messages_since(
+        self, conversation_id: str, seq: int, limit: int | None
+    ) -> Page:
+        pass
+
+    @abstractmethod
+    def tasks_since(self, seq: int, limit: int | None) -> Page:
+        pass
+
+    @abstractmethod
+    def events_since(self, seq: int, limit: int | None) -> Page:
+        pass
+
+    @abstractmethod
+    def archived_events(self, since: int, limit: int | None) -> Page:
+        pass
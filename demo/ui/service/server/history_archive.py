@@ -0,0 +1,258 @@
+import bisect
+import dataclasses
+import os
+import shutil
+import tempfile
+import threading
+import zlib
+
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+
+@dataclasses.dataclass
+class Segment:
+    """A compressed batch of archived entries in the archive file."""
+
+    first_key: int
+    last_key: int
+    offset: int
+    length: int
+
+
+class HistoryArchive:
+    """Compressed on-disk archive of entries dropped from bounded histories.
+
+    Entries are models serialized as JSON, appended to named streams, such
+    as the messages of one conversation, a batch at a time. Each batch is
+    written as one zlib-compressed segment of JSON lines at the end of a
+    single archive file, and an in-memory index of each stream's segments lets
+    a page be read back by decompressing only the segments it spans. Recently read segments are
+    cached, since pages are usually read in sequence.
+
+    The archive file is created on the first append, so a store that never
+    fills its histories never touches the disk.
+
+    Args:
+        directory: Directory for the archive file. A temporary directory,
+          removed by close(), is used if not set.
+        cache_segments: Number of decompressed segments kept in memory.
+    """
+
+    def __init__(self, directory: str | None = None, cache_segments: int = 16):
+        self._directory = directory
+        self._owns_directory = directory is None
+        self.cache_segments = cache_segments
+        self._lock = threading.Lock()
+        self._file = None
+        self._size = 0
+        # stream -> segments, in key order
+        self._segments: dict[str, list[Segment]] = {}
+        # (stream, offset) -> entries, least recently used first
+        self._cache: OrderedDict[tuple[str, int], list[tuple[int, str]]] = (
+            OrderedDict()
+        )
+
+    @classmethod
+    def from_env(cls) -> 'HistoryArchive':
+        return cls(directory=os.environ.get('A2A_UI_ARCHIVE_DIR') or None)
+
+    def append(self, stream: str, entries: list[tuple[int, str]]):
+        """Archives entries as one segment.
+
+        Args:
+            stream: Name of the stream the entries belong to.
+            entries: (key, JSON) pairs, the JSON on a single line. Keys must
+              be increasing, and greater than those already in the stream.
+        """
+        if not entries:
+            return
+        data = zlib.compress(
+            '\n'.join(f'{key} {value}' for key, value in entries).encode()
+        )
+        with self._lock:
+            if self._file is None:
+                self._open()
+            self._file.seek(0, os.SEEK_END)
+            self._file.write(data)
+            self._file.flush()
+            self._segments.setdefault(stream, []).append(
+                Segment(entries[0][0], entries[-1][0], self._size, len(data))
+            )
+            self._size += len(data)
+
+    def read(
+        self, stream: str, after: int = 0, limit: int | None = None
+    ) -> list[tuple[int, str]]:
+        """Returns the entries of stream with keys greater than after."""
+        entries = []
+        with self._lock:
+            segments = self._segments.get(stream, [])
+            start = bisect.bisect_right(
+                segments, after, key=lambda s: s.last_key
+            )
+            for segment in segments[start:]:
+                for key, value in self._load(stream, segment):
+                    if key <= after:
+                        continue
+                    if limit is not None and len(entries) >= limit:
+                        return entries
+                    entries.append((key, value))
+        return entries
+
+    def get(self, stream: str, key: int) -> str | None:
+        """Returns the JSON archived under key, or None."""
+        with self._lock:
+            segments = self._segments.get(stream, [])
+            index = bisect.bisect_left(segments, key, key=lambda s: s.last_key)
+            if index == len(segments) or segments[index].first_key > key:
+                return None
+            for entry_key, value in self._load(stream, segments[index]):
+                if entry_key == key:
+                    return value
+        return None
+
+    def last_key(self, stream: str) -> int | None:
+        """Key of the newest entry archived in stream."""
+        with self._lock:
+            segments = self._segments.get(stream)
+            return segments[-1].last_key if segments else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'streams': len(self._segments),
+                'segments': sum(len(s) for s in self._segments.values()),
+                'bytes': self._size,
+            }
+
+    def close(self):
+        """Closes the archive file, removing it if the archive created it."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if self._owns_directory and self._directory:
+                shutil.rmtree(self._directory, ignore_errors=True)
+                self._directory = None
+            self._segments.clear()
+            self._cache.clear()
+
+    def _open(self):
+        if self._directory is None:
+            self._directory = tempfile.mkdtemp(prefix='a2a-ui-archive-')
+        else:
+            os.makedirs(self._directory, exist_ok=True)
+        # Segments are only addressed through the in-memory index, so an
+        # archive left by an earlier run is not reused.
+        self._file = open(
+            os.path.join(self._directory, f'history-{os.getpid()}.z'), 'w+b'
+        )
+
+    def _load(self, stream: str, segment: Segment) -> list[tuple[int, str]]:
+        cache_key = (stream, segment.offset)
+        entries = self._cache.get(cache_key)
+        if entries is not None:
+            self._cache.move_to_end(cache_key)
+            return entries
+        self._file.seek(segment.offset)
+        entries = []
+        lines = zlib.decompress(self._file.read(segment.length)).decode()
+        for line in lines.split('\n'):
+            key, value = line.split(' ', 1)
+            entries.append((int(key), value))
+        self._cache[cache_key] = entries
+        while len(self._cache) > self.cache_segments:
+            self._cache.popitem(last=False)
+        return entries
+
+
+class BoundedHistory:
+    """Keeps a list to its latest items, archiving older ones.
+
+    The list is trimmed in place, so it can be a model field such as
+    Task.history. Once it holds a quarter more than capacity items, the
+    oldest ones are archived as one segment, so each item is compressed and
+    moved once and appending stays O(1) amortized.
+
+    Every item has a key, increasing along the list, under which it is
+    archived; by default its position since the first item. An id -> key
+    index over the items in memory makes membership checks O(1).
+
+    Args:
+        items: The list to keep bounded.
+        capacity: Number of latest items kept in memory.
+        archive: Archive for the older items.
+        stream: Name of the archive stream.
+        id_of: Returns an item's id, or None if it has none.
+        pinned: Number of leading items that are never archived, such as the
+          request that started a task.
+    """
+
+    def __init__(
+        self,
+        items: list,
+        capacity: int,
+        archive: HistoryArchive,
+        stream: str,
+        id_of: Callable[[Any], str | None],
+        pinned: int = 0,
+    ):
+        self.items = items
+        self.capacity = capacity
+        self.archive = archive
+        self.stream = stream
+        self.id_of = id_of
+        self.pinned = min(pinned, len(items))
+        # Key of each item after the pinned ones
+        self.keys: list[int] = list(range(1, len(items) - self.pinned + 1))
+        self._next_key = len(self.keys) + 1
+        self._ids: dict[str, int] = {}
+        for key, item in zip(self.keys, items[self.pinned :]):
+            self._index(item, key)
+        for item in items[: self.pinned]:
+            self._index(item, 0)
+        self._trim()
+
+    def __contains__(self, item_id: str | None) -> bool:
+        return item_id is not None and item_id in self._ids
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def append(self, item: Any, key: int | None = None):
+        """Appends item; key defaults to one more than the last key."""
+        if key is None:
+            key = self._next_key
+        self._next_key = key + 1
+        self.items.append(item)
+        self.keys.append(key)
+        self._index(item, key)
+        self._trim()
+
+    def _index(self, item: Any, key: int):
+        item_id = self.id_of(item)
+        if item_id is not None:
+            self._ids[item_id] = key
+
+    def _trim(self):
+        if len(self.keys) <= self.capacity + max(self.capacity // 4, 1):
+            return
+        count = len(self.keys) - self.capacity
+        start = self.pinned
+        archived = self.items[start : start + count]
+        self.archive.append(
+            self.stream,
+            [
+                (key, item.model_dump_json() if item else 'null')
+                for key, item in zip(self.keys[:count], archived)
+            ],
+        )
+        for key, item in zip(self.keys[:count], archived):
+            item_id = self.id_of(item)
+            # A later item with the same id stays indexed.
+            if item_id is not None and self._ids.get(item_id) == key:
+                del self._ids[item_id]
+        del self.items[start : start + count]
+        del self.keys[:count]
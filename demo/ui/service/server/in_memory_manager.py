@@ -14,6 +14,9 @@ from common.types import (
 )
 from service.server import test_image
 from service.server.application_manager import ApplicationManager
+from service.server.history_archive import HistoryArchive
+from service.server.state_store import Page, StateStore
+from service.server.update_stream import UpdateStream
 from service.types import Conversation, Event
 from utils.agent_card import get_agent_card
 
@@ -26,28 +29,19 @@ class InMemoryFakeAgentManager(ApplicationManager):
     uses to send messages to the agent and provide information for the frontend.
     """
 
-    _conversations: list[Conversation]
-    _messages: list[Message]
-    _tasks: list[Task]
-    _events: list[Event]
-    _pending_message_ids: list[str]
+    _store: StateStore
     _next_message_idx: int
     _agents: list[AgentCard]
 
     def __init__(self):
-        self._conversations = []
-        self._messages = []
-        self._tasks = []
-        self._events = []
-        self._pending_message_ids = []
+        self._store = StateStore.from_env()
         self._next_message_idx = 0
         self._agents = []
-        self._task_map = {}
 
     async def create_conversation(self) -> Conversation:
         conversation_id = str(uuid.uuid4())
         c = Conversation(conversation_id=conversation_id, is_active=True)
-        self._conversations.append(c)
+        self._store.add_conversation(c)
         return c
 
     def sanitize_message(self, message: Message) -> Message:
@@ -57,9 +51,9 @@ class InMemoryFakeAgentManager(ApplicationManager):
         return message
 
     async def process_message(self, message: Message):
-        self._messages.append(message)
         message_id = message.metadata['message_id']
-        self._pending_message_ids.append(message_id)
+        self._store.add_message(message_id, message)
+        self._store.add_pending(message_id)
         conversation_id = (
             message.metadata['conversation_id']
             if 'conversation_id' in message.metadata
@@ -68,8 +62,8 @@ class InMemoryFakeAgentManager(ApplicationManager):
         # Now check the conversation and attach the message id.
         conversation = self.get_conversation(conversation_id)
         if conversation:
-            conversation.messages.append(message)
-        self._events.append(
+            self._store.add_conversation_message(conversation, message)
+        self.add_event(
             Event(
                 id=str(uuid.uuid4()),
                 actor='host',
@@ -91,7 +85,7 @@ class InMemoryFakeAgentManager(ApplicationManager):
             history=[message],
         )
         if self._next_message_idx != 0:
-            self._task_map[message_id] = task_id
+            self._store.map_message_to_task(message_id, task_id)
             self.add_task(task)
         await asyncio.sleep(self._next_message_idx)
         response = self.next_message()
@@ -100,8 +94,8 @@ class InMemoryFakeAgentManager(ApplicationManager):
             'message_id': str(uuid.uuid4()),
         }
         if conversation:
-            conversation.messages.append(response)
-        self._events.append(
+            self._store.add_conversation_message(conversation, response)
+        self.add_event(
             Event(
                 id=str(uuid.uuid4()),
                 actor='host',
@@ -109,25 +103,22 @@ class InMemoryFakeAgentManager(ApplicationManager):
                 timestamp=datetime.datetime.now(datetime.UTC).timestamp(),
             )
         )
-        self._pending_message_ids.remove(message.metadata['message_id'])
+        self._store.remove_pending(message_id)
         # Now clean up the task
         if task:
             task.status.state = TaskState.COMPLETED
             task.artifacts = [Artifact(name='response', parts=response.parts)]
-            task.history.append(response)
+            self._store.add_task_message(task, response)
             self.update_task(task)
 
     def add_task(self, task: Task):
-        self._tasks.append(task)
+        self._store.add_task(task)
 
     def update_task(self, task: Task):
-        for i, t in enumerate(self._tasks):
-            if t.id == task.id:
-                self._tasks[i] = task
-                return
+        self._store.update_task(task)
 
     def add_event(self, event: Event):
-        self._events.append(event)
+        self._store.add_event(event)
 
     def next_message(self) -> Message:
         message = _message_queue[self._next_message_idx]
@@ -139,43 +130,10 @@ class InMemoryFakeAgentManager(ApplicationManager):
     def get_conversation(
         self, conversation_id: str | None
     ) -> Conversation | None:
-        if not conversation_id:
-            return None
-        return next(
-            filter(
-                lambda c: c.conversation_id == conversation_id,
-                self._conversations,
-            ),
-            None,
-        )
+        return self._store.get_conversation(conversation_id)
 
     def get_pending_messages(self) -> list[tuple[str, str]]:
-        rval = []
-        for message_id in self._pending_message_ids:
-            if message_id in self._task_map:
-                task_id = self._task_map[message_id]
-                task = next(
-                    filter(lambda x: x.id == task_id, self._tasks), None
-                )
-                if not task:
-                    rval.append((message_id, ''))
-                elif task.history and task.history[-1].parts:
-                    if len(task.history) == 1:
-                        rval.append((message_id, 'Working...'))
-                    else:
-                        part = task.history[-1].parts[0]
-                        rval.append(
-                            (
-                                message_id,
-                                part.text
-                                if part.type == 'text'
-                                else 'Working...',
-                            )
-                        )
-            else:
-                rval.append((message_id, ''))
-            return rval
-        return self._pending_message_ids
+        return self._store.pending_messages()
 
     def register_agent(self, url):
         agent_data = get_agent_card(url)
@@ -189,15 +147,40 @@ class InMemoryFakeAgentManager(ApplicationManager):
 
     @property
     def conversations(self) -> list[Conversation]:
-        return self._conversations
+        return self._store.conversations
 
     @property
     def tasks(self) -> list[Task]:
-        return self._tasks
+        return self._store.tasks
 
     @property
     def events(self) -> list[Event]:
-        return self._events
+        return self._store.events
+
+    @property
+    def updates(self) -> UpdateStream:
+        return self._store.updates
+
+    @property
+    def archive(self) -> HistoryArchive:
+        return self._store.archive
+
+    def conversations_since(self, seq: int, limit: int | None) -> Page:
+        return self._store.conversations_since(seq, limit)
+
+    def messages_since(
+        self, conversation_id: str, seq: int, limit: int | None
+    ) -> Page:
+        return self._store.messages_since(conversation_id, seq, limit)
+
+    def tasks_since(self, seq: int, limit: int | None) -> Page:
+        return self._store.tasks_since(seq, limit)
+
+    def events_since(self, seq: int, limit: int | None) -> Page:
+        return self._store.events_since(seq, limit)
+
+    def archived_events(self, since: int, limit: int | None) -> Page:
+        return self._store.archived_events(since, limit)
 
 
 # This represents the pre-canned responses that will be returned in order.
@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import os
+import threading
+
+from collections import deque
+from collections.abc import Awaitable, Callable
+
+from common.types import Message
+
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerBusy(Exception):
+    """Raised when the worker's queue is full or it is shutting down."""
+
+    def __init__(self, reason: str):
+        self.reason = reason
+        super().__init__(f'Message worker rejected message: {reason}')
+
+
+class MessageWorker:
+    """Runs the host agent on one long-lived event loop.
+
+    Messages are processed on a dedicated thread that owns a single asyncio
+    loop, so the ADK runner, its session service and the remote agent
+    connections are only ever touched from that loop. Messages in the same
+    conversation are processed in order; different conversations run
+    concurrently, up to max_concurrency at a time.
+
+    Args:
+        process: Coroutine function that handles one message.
+        max_concurrency: Maximum number of messages processed at once.
+        max_pending: Maximum number of accepted messages, queued or in
+          progress. Further submissions raise WorkerBusy.
+    """
+
+    def __init__(
+        self,
+        process: Callable[[Message], Awaitable[None]],
+        max_concurrency: int = 8,
+        max_pending: int = 100,
+    ):
+        self.process = process
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        # conversation id -> messages waiting behind the one in progress
+        self._queues: dict[str, deque[Message]] = {}
+        self._pending = 0
+        self._accepting = True
+        self._tasks: set[asyncio.Task] = set()
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+
+        self._loop = asyncio.new_event_loop()
+        self._slots: asyncio.Semaphore | None = None
+        ready = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, args=(ready,), name='message-worker', daemon=True
+        )
+        self._thread.start()
+        ready.wait()
+
+    @classmethod
+    def from_env(
+        cls, process: Callable[[Message], Awaitable[None]]
+    ) -> 'MessageWorker':
+        return cls(
+            process,
+            max_concurrency=int(
+                os.environ.get('A2A_UI_MAX_CONCURRENT_MESSAGES', '8')
+            ),
+            max_pending=int(os.environ.get('A2A_UI_MAX_PENDING_MESSAGES', '100')),
+        )
+
+    def submit(self, message: Message):
+        """Queues a message for processing.
+
+        Raises:
+            WorkerBusy: Too many messages are pending, or the worker is
+              shutting down.
+        """
+        conversation_id = (message.metadata or {}).get('conversation_id', '')
+        with self._lock:
+            if not self._accepting:
+                self.rejected += 1
+                raise WorkerBusy('shutting_down')
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise WorkerBusy('queue_full')
+            self._pending += 1
+            queue = self._queues.get(conversation_id)
+            if queue is not None:
+                # The conversation's runner picks it up after the current one.
+                queue.append(message)
+                return
+            self._queues[conversation_id] = deque([message])
+        self._loop.call_soon_threadsafe(self._start_runner, conversation_id)
+
+    def shutdown(self, timeout: float = 30.0) -> bool:
+        """Stops accepting messages and waits for accepted ones to finish.
+
+        Messages still running after timeout are cancelled.
+
+        Returns:
+            Whether every accepted message finished.
+        """
+        with self._lock:
+            self._accepting = False
+        if not self._thread.is_alive():
+            return True
+        drained = asyncio.run_coroutine_threadsafe(
+            self._drain(timeout), self._loop
+        ).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+        return drained
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'pending': self._pending,
+                'conversations': len(self._queues),
+                'processed': self.processed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'accepting': self._accepting,
+            }
+
+    def _run(self, ready: threading.Event):
+        asyncio.set_event_loop(self._loop)
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        ready.set()
+        self._loop.run_forever()
+        self._loop.close()
+
+    def _start_runner(self, conversation_id: str):
+        task = self._loop.create_task(self._run_conversation(conversation_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_conversation(self, conversation_id: str):
+        """Processes a conversation's messages one at a time until it is empty."""
+        while True:
+            with self._lock:
+                queue = self._queues[conversation_id]
+                if not queue:
+                    del self._queues[conversation_id]
+                    return
+                message = queue[0]
+            try:
+                async with self._slots:
+                    await self.process(message)
+                self.processed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                logger.error(f'Error processing message: {e}')
+            finally:
+                with self._lock:
+                    queue.popleft()
+                    self._pending -= 1
+
+    async def _drain(self, timeout: float) -> bool:
+        tasks = set(self._tasks)
+        if not tasks:
+            return True
+        _, still_running = await asyncio.wait(tasks, timeout=timeout)
+        for task in still_running:
+            task.cancel()
+        if still_running:
+            logger.warning(
+                f'Cancelled {len(still_running)} conversation(s) on shutdown'
+            )
+            await asyncio.wait(still_running)
+        return not still_running
@@ -1,17 +1,19 @@
-import asyncio
-import base64
+import json
 import os
-import threading
-import uuid
 
-from common.types import FileContent, FilePart, Message
-from fastapi import APIRouter, Request, Response
+from common.server.utils import new_blob_response
+from common.types import FileContent, FilePart, Message, ServerBusyError
+from common.utils.blob_store import BlobStore
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
 from service.types import (
     CreateConversationResponse,
     GetEventResponse,
     ListAgentResponse,
     ListConversationResponse,
+    ListMessageParams,
     ListMessageResponse,
+    ListParams,
     ListTaskResponse,
     MessageInfo,
     PendingMessageResponse,
@@ -22,6 +24,7 @@ from service.types import (
 from .adk_host_manager import ADKHostManager, get_message_id
 from .application_manager import ApplicationManager
 from .in_memory_manager import InMemoryFakeAgentManager
+from .message_worker import MessageWorker, WorkerBusy
 
 
 class ConversationServer:
@@ -47,8 +50,12 @@ class ConversationServer:
             )
         else:
             self.manager = InMemoryFakeAgentManager()
-        self._file_cache = {}  # dict[str, FilePart] maps file id to message data
-        self._message_to_cache = {}  # dict[str, str] maps message id to cache id
+        # Messages are processed on one long-lived event loop rather than a
+        # new thread and loop per message.
+        self.worker = MessageWorker.from_env(self.manager.process_message)
+        # File parts are served from content addressed blobs.
+        self._blobs = BlobStore.from_env()
+        self._message_to_blob = {}  # dict[str, str] maps message part to digest
 
         router.add_api_route(
             '/conversation/create', self._create_conversation, methods=['POST']
@@ -60,6 +67,9 @@ class ConversationServer:
             '/message/send', self._send_message, methods=['POST']
         )
         router.add_api_route('/events/get', self._get_events, methods=['POST'])
+        router.add_api_route(
+            '/events/archive', self._get_archived_events, methods=['POST']
+        )
         router.add_api_route(
             '/message/list', self._list_messages, methods=['POST']
         )
@@ -77,6 +87,16 @@ class ConversationServer:
         router.add_api_route(
             '/api_key/update', self._update_api_key, methods=['POST']
         )
+        router.add_api_route(
+            '/updates/stream', self._stream_updates, methods=['GET']
+        )
+
+    def shutdown(self, timeout: float = 30.0):
+        """Waits for accepted messages to finish, then stops the worker."""
+        self.worker.shutdown(timeout)
+        self.manager.updates.close()
+        self.manager.archive.close()
+        self._blobs.close()
 
     # Update API key in manager
     def update_api_key(self, api_key: str):
@@ -91,10 +111,12 @@ class ConversationServer:
         message_data = await request.json()
         message = Message(**message_data['params'])
         message = self.manager.sanitize_message(message)
-        t = threading.Thread(
-            target=lambda: asyncio.run(self.manager.process_message(message))
-        )
-        t.start()
+        try:
+            self.worker.submit(message)
+        except WorkerBusy as e:
+            return SendMessageResponse(
+                error=ServerBusyError(data={'reason': e.reason})
+            )
         return SendMessageResponse(
             result=MessageInfo(
                 message_id=message.metadata['message_id'],
@@ -106,13 +128,20 @@ class ConversationServer:
 
     async def _list_messages(self, request: Request):
         message_data = await request.json()
-        conversation_id = message_data['params']
-        conversation = self.manager.get_conversation(conversation_id)
-        if conversation:
-            return ListMessageResponse(
-                result=self.cache_content(conversation.messages)
-            )
-        return ListMessageResponse(result=[])
+        params = message_data['params']
+        if isinstance(params, str):
+            params = ListMessageParams(conversation_id=params)
+        else:
+            params = ListMessageParams(**params)
+        page = self.manager.messages_since(
+            params.conversation_id, params.since, params.limit
+        )
+        # Only the messages being returned need their files cached.
+        return ListMessageResponse(
+            result=self.cache_content(page.items),
+            cursor=page.cursor,
+            has_more=page.has_more,
+        )
 
     def cache_content(self, messages: list[Message]):
         rval = []
@@ -126,23 +155,27 @@ class ConversationServer:
                 if part.type != 'file':
                     new_parts.append(part)
                     continue
+                if not part.file.bytes:
+                    # Already a url reference
+                    new_parts.append(part)
+                    continue
                 message_part_id = f'{message_id}:{i}'
-                if message_part_id in self._message_to_cache:
-                    cache_id = self._message_to_cache[message_part_id]
-                else:
-                    cache_id = str(uuid.uuid4())
-                    self._message_to_cache[message_part_id] = cache_id
+                digest = self._message_to_blob.get(message_part_id)
+                if digest is None:
+                    digest = self._blobs.put_base64(
+                        part.file.bytes, part.file.mimeType
+                    )
+                    self._message_to_blob[message_part_id] = digest
                 # Replace the part data with a url reference
                 new_parts.append(
                     FilePart(
                         file=FileContent(
+                            name=part.file.name,
                             mimeType=part.file.mimeType,
-                            uri=f'/message/file/{cache_id}',
+                            uri=f'/message/file/{digest}',
                         )
                     )
                 )
-                if cache_id not in self._file_cache:
-                    self._file_cache[cache_id] = part
             m.parts = new_parts
             rval.append(m)
         return rval
@@ -152,14 +185,39 @@ class ConversationServer:
             result=self.manager.get_pending_messages()
         )
 
-    def _list_conversation(self):
-        return ListConversationResponse(result=self.manager.conversations)
+    async def _list_conversation(self, request: Request):
+        params = await self._list_params(request)
+        page = self.manager.conversations_since(params.since, params.limit)
+        return ListConversationResponse(
+            result=page.items, cursor=page.cursor, has_more=page.has_more
+        )
 
-    def _get_events(self):
-        return GetEventResponse(result=self.manager.events)
+    async def _get_events(self, request: Request):
+        params = await self._list_params(request)
+        page = self.manager.events_since(params.since, params.limit)
+        return GetEventResponse(
+            result=page.items, cursor=page.cursor, has_more=page.has_more
+        )
 
-    def _list_tasks(self):
-        return ListTaskResponse(result=self.manager.tasks)
+    async def _get_archived_events(self, request: Request):
+        params = await self._list_params(request)
+        page = self.manager.archived_events(params.since, params.limit)
+        return GetEventResponse(
+            result=page.items, cursor=page.cursor, has_more=page.has_more
+        )
+
+    async def _list_tasks(self, request: Request):
+        params = await self._list_params(request)
+        page = self.manager.tasks_since(params.since, params.limit)
+        return ListTaskResponse(
+            result=page.items, cursor=page.cursor, has_more=page.has_more
+        )
+
+    async def _list_params(self, request: Request) -> ListParams:
+        """Reads the paging parameters of a list request, if it has any."""
+        body = await request.body()
+        params = json.loads(body).get('params') if body else None
+        return ListParams(**(params or {}))
 
     async def _register_agent(self, request: Request):
         message_data = await request.json()
@@ -170,16 +228,41 @@ class ConversationServer:
     async def _list_agents(self):
         return ListAgentResponse(result=self.manager.agents)
 
-    def _files(self, file_id):
-        if file_id not in self._file_cache:
-            raise Exception('file not found')
-        part = self._file_cache[file_id]
-        if 'image' in part.file.mimeType:
-            return Response(
-                content=base64.b64decode(part.file.bytes),
-                media_type=part.file.mimeType,
-            )
-        return Response(content=part.file.bytes, media_type=part.file.mimeType)
+    def _files(self, file_id: str, request: Request):
+        return new_blob_response(self._blobs, file_id, request)
+
+    async def _stream_updates(
+        self, request: Request, since: int | None = None
+    ):
+        """Streams state updates to the UI as server-sent events.
+
+        Resumes after since, or after the Last-Event-ID a reconnecting
+        EventSource sends. Without either, the stream starts with a 'reset'.
+        """
+        last_event_id = request.headers.get('last-event-id')
+        if since is None and last_event_id:
+            since = int(last_event_id)
+        return StreamingResponse(
+            self._update_events(since),
+            media_type='text/event-stream',
+            headers={'Cache-Control': 'no-cache'},
+        )
+
+    async def _update_events(self, since: int | None):
+        async for update in self.manager.updates.subscribe(since):
+            if update['type'] == 'message':
+                # Serve file parts by reference, as message/list does.
+                message = self.cache_content(
+                    [Message(**update['data']['message'])]
+                )[0]
+                update = {
+                    **update,
+                    'data': {
+                        **update['data'],
+                        'message': message.model_dump(mode='json'),
+                    },
+                }
+            yield f'id: {update["seq"]}\ndata: {json.dumps(update)}\n\n'
 
     async def _update_api_key(self, request: Request):
         """Update the API key"""
@@ -0,0 +1,546 @@
+import bisect
+import dataclasses
+import itertools
+import os
+import threading
+import uuid
+
+from typing import Any
+
+from common.types import Message, Task
+from service.server.history_archive import BoundedHistory, HistoryArchive
+from service.server.update_stream import UpdateStream
+from service.types import Conversation, Event
+
+
+@dataclasses.dataclass
+class Page:
+    """A page of entities changed after a sequence number.
+
+    Attributes:
+        items: The entities, in the order of their latest change.
+        cursor: Sequence number to list from next time to get only later
+          changes, or the rest of this listing when has_more is set.
+        has_more: Whether the listing was cut off by its limit.
+    """
+
+    items: list[Any]
+    cursor: int
+    has_more: bool = False
+
+
+class ChangeLog:
+    """Keys ordered by the sequence number of their latest change.
+
+    Recording a change appends to the log, so the log stays sorted and a
+    listing from any sequence number is a bisect plus the size of the page.
+    Entries superseded by a later change of the same key are skipped when
+    reading, and dropped once they make up most of the log.
+    """
+
+    def __init__(self):
+        self._log: list[tuple[int, str]] = []
+        self._latest: dict[str, int] = {}
+
+    def record(self, key: str, seq: int):
+        self._latest[key] = seq
+        self._log.append((seq, key))
+        if len(self._log) > 2 * len(self._latest) + 64:
+            self._log = [
+                e for e in self._log if self._latest.get(e[1]) == e[0]
+            ]
+
+    def discard(self, key: str):
+        """Forgets key, e.g. once its entity has been archived."""
+        self._latest.pop(key, None)
+
+    def since(
+        self, seq: int, limit: int | None = None
+    ) -> tuple[list[str], int | None]:
+        """Returns keys changed after seq, and the sequence of the last one.
+
+        The sequence is None unless the listing was cut off by limit.
+        """
+        keys = []
+        last_seq = seq
+        start = bisect.bisect_right(self._log, seq, key=lambda e: e[0])
+        for entry_seq, key in itertools.islice(self._log, start, None):
+            if self._latest.get(key) != entry_seq:
+                continue
+            if limit is not None and len(keys) >= limit:
+                return keys, last_seq
+            keys.append(key)
+            last_seq = entry_seq
+        return keys, None
+
+
+class StateStore:
+    """Indexed in-memory state for the application managers.
+
+    Conversations, tasks and messages are kept in dicts keyed by id, so the
+    lookups done for every streamed task update are O(1) regardless of how
+    much history has accumulated. Dicts preserve insertion order, which gives
+    the ordered views used for listing. Events are additionally kept in a list
+    sorted by timestamp, so listing them does not re-sort the whole history.
+
+    Messages are processed on the message worker's thread while the HTTP
+    handlers read from the server's thread, so all access goes through a lock.
+
+    Changes the UI shows (conversations, their messages, tasks and the progress
+    of pending messages) are also published on updates, so the UI can apply
+    them as they happen instead of polling for the full state.
+
+    Every change is also given a store-wide sequence number, which the
+    *_since methods use to list only what changed after a client's last
+    listing, a page at a time.
+
+    History is bounded: beyond the given limits, the oldest events, messages,
+    conversation messages and task history entries are moved to a compressed
+    archive on disk, in batches. Conversation messages are paged back in from
+    the archive by messages_since, archived events by archived_events, and
+    archived messages by get_message.
+
+    Args:
+        updates: Stream the changes are published on.
+        archive: Archive for history beyond the limits.
+        max_events: Number of latest events kept in memory.
+        max_messages: Number of latest sent messages kept in memory.
+        max_conversation_messages: Number of latest messages of each
+          conversation kept in memory.
+        max_task_history: Number of latest history entries of each task kept
+          in memory, besides the request that started it.
+    """
+
+    def __init__(
+        self,
+        updates: UpdateStream | None = None,
+        archive: HistoryArchive | None = None,
+        max_events: int = 10000,
+        max_messages: int = 10000,
+        max_conversation_messages: int = 1000,
+        max_task_history: int = 200,
+    ):
+        self._lock = threading.RLock()
+        self.updates = updates or UpdateStream.from_env()
+        self.archive = archive or HistoryArchive.from_env()
+        self.max_events = max_events
+        self.max_messages = max_messages
+        self.max_conversation_messages = max_conversation_messages
+        self.max_task_history = max_task_history
+        self._conversations: dict[str, Conversation] = {}
+        self._tasks: dict[str, Task] = {}
+        self._messages: dict[str, Message] = {}
+        self._events: dict[str, Event] = {}
+        # (timestamp, sequence, event id), sorted
+        self._event_order: list[tuple[float, int, str]] = []
+        self._event_keys: dict[str, tuple[float, int, str]] = {}
+        self._seq = itertools.count(1)
+        self._version = 0
+        self._conversation_changes = ChangeLog()
+        self._task_changes = ChangeLog()
+        self._event_changes = ChangeLog()
+        # Keys of the last archived event and message
+        self._archived_events = 0
+        self._archived_messages = 0
+        # Archive key of each archived message id
+        self._archived_message_keys: dict[str, int] = {}
+        # conversation id -> its messages, keyed by sequence number
+        self._conversation_histories: dict[str, BoundedHistory] = {}
+        # task id -> its history, keyed by position
+        self._task_histories: dict[str, BoundedHistory] = {}
+        self._streams = itertools.count(1)
+        # Used as an ordered set of message ids
+        self._pending_message_ids: dict[str, None] = {}
+        # Map of message id to task id
+        self._task_map: dict[str, str] = {}
+
+    @classmethod
+    def from_env(cls, updates: UpdateStream | None = None) -> 'StateStore':
+        return cls(
+            updates=updates,
+            max_events=int(os.environ.get('A2A_UI_MAX_EVENTS', '10000')),
+            max_messages=int(os.environ.get('A2A_UI_MAX_MESSAGES', '10000')),
+            max_conversation_messages=int(
+                os.environ.get('A2A_UI_MAX_CONVERSATION_MESSAGES', '1000')
+            ),
+            max_task_history=int(
+                os.environ.get('A2A_UI_MAX_TASK_HISTORY', '200')
+            ),
+        )
+
+    def close(self):
+        """Removes the archive, if the store created it."""
+        self.archive.close()
+
+    # Conversations
+
+    def add_conversation(self, conversation: Conversation):
+        with self._lock:
+            self._conversations[conversation.conversation_id] = conversation
+            self._conversation_changes.record(
+                conversation.conversation_id, self._next_seq()
+            )
+            self.updates.publish(
+                'conversation',
+                conversation.model_dump(mode='json', exclude={'messages'}),
+            )
+
+    def add_conversation_message(
+        self, conversation: Conversation, message: Message | None
+    ):
+        """Appends a message to a conversation's history."""
+        with self._lock:
+            seq = self._next_seq()
+            self._conversation_history(conversation).append(message, seq)
+            self._conversation_changes.record(conversation.conversation_id, seq)
+            if message:
+                self.updates.publish(
+                    'message',
+                    {
+                        'conversation_id': conversation.conversation_id,
+                        'message': message.model_dump(mode='json'),
+                    },
+                )
+
+    def get_conversation(
+        self, conversation_id: str | None
+    ) -> Conversation | None:
+        if not conversation_id:
+            return None
+        with self._lock:
+            return self._conversations.get(conversation_id)
+
+    @property
+    def conversations(self) -> list[Conversation]:
+        with self._lock:
+            return list(self._conversations.values())
+
+    def conversations_since(self, seq: int = 0, limit: int | None = None) -> Page:
+        """Conversations created, or given messages, after seq."""
+        with self._lock:
+            return self._page(
+                self._conversation_changes, self._conversations, seq, limit
+            )
+
+    def messages_since(
+        self, conversation_id: str, seq: int = 0, limit: int | None = None
+    ) -> Page:
+        """Messages added to a conversation after seq, oldest first.
+
+        Messages no longer in memory are read back from the archive.
+        """
+        with self._lock:
+            conversation = self._conversations.get(conversation_id)
+            if not conversation:
+                return Page([], max(seq, self._version))
+            history = self._conversation_history(conversation)
+            items = []
+            last_archived = self.archive.last_key(history.stream)
+            if last_archived is not None and seq < last_archived:
+                archived = self.archive.read(history.stream, seq, limit)
+                items = [
+                    Message.model_validate_json(m) if m != 'null' else None
+                    for _, m in archived
+                ]
+                seq = archived[-1][0]
+                if limit is not None:
+                    limit -= len(items)
+                    if not limit:
+                        return Page(items, seq, True)
+            # Messages are only appended, so their sequence numbers are sorted.
+            seqs = history.keys
+            start = bisect.bisect_right(seqs, seq)
+            end = len(seqs) if limit is None else min(len(seqs), start + limit)
+            if end < len(seqs):
+                return Page(
+                    items + history.items[start:end], seqs[end - 1], True
+                )
+            return Page(
+                items + history.items[start:], max(seq, self._version)
+            )
+
+    def _conversation_history(
+        self, conversation: Conversation
+    ) -> BoundedHistory:
+        history = self._conversation_histories.get(conversation.conversation_id)
+        if history is None or history.items is not conversation.messages:
+            history = BoundedHistory(
+                conversation.messages,
+                self.max_conversation_messages,
+                self.archive,
+                f'conversation/{next(self._streams)}',
+                _message_id,
+            )
+            self._conversation_histories[conversation.conversation_id] = history
+        return history
+
+    # Tasks
+
+    def add_task(self, task: Task):
+        with self._lock:
+            self._tasks[task.id] = task
+            self._task_changed(task)
+
+    def update_task(self, task: Task):
+        """Replaces a known task; unknown tasks are ignored."""
+        with self._lock:
+            if task.id in self._tasks:
+                self._tasks[task.id] = task
+                self._task_changed(task)
+
+    def add_task_message(self, task: Task, message: Message) -> bool:
+        """Appends a message to a task's history unless it is already there.
+
+        Returns:
+            Whether the message was added.
+        """
+        with self._lock:
+            history = self._task_history(task)
+            if _message_id(message) in history:
+                return False
+            history.append(message)
+            return True
+
+    def _task_history(self, task: Task) -> BoundedHistory:
+        if task.history is None:
+            task.history = []
+        history = self._task_histories.get(task.id)
+        # Tasks are replaced by the versions agents send, which bring their
+        # own history.
+        if history is None or history.items is not task.history:
+            history = BoundedHistory(
+                task.history,
+                self.max_task_history,
+                self.archive,
+                f'task/{next(self._streams)}',
+                _message_id,
+                # The UI shows the request that started the task.
+                pinned=1,
+            )
+            self._task_histories[task.id] = history
+        return history
+
+    def _task_changed(self, task: Task):
+        self._task_history(task)
+        self._task_changes.record(task.id, self._next_seq())
+        self.updates.publish('task', task.model_dump(mode='json'))
+        if self._pending_message_ids:
+            # The task may carry the progress text of a pending message.
+            self._publish_pending()
+
+    def get_task(self, task_id: str | None) -> Task | None:
+        if not task_id:
+            return None
+        with self._lock:
+            return self._tasks.get(task_id)
+
+    def map_message_to_task(self, message_id: str, task_id: str):
+        with self._lock:
+            self._task_map[message_id] = task_id
+            if message_id in self._pending_message_ids:
+                self._publish_pending()
+
+    def task_id_for_message(self, message_id: str | None) -> str | None:
+        if not message_id:
+            return None
+        with self._lock:
+            return self._task_map.get(message_id)
+
+    def task_for_message(self, message_id: str | None) -> Task | None:
+        return self.get_task(self.task_id_for_message(message_id))
+
+    @property
+    def tasks(self) -> list[Task]:
+        with self._lock:
+            return list(self._tasks.values())
+
+    def tasks_since(self, seq: int = 0, limit: int | None = None) -> Page:
+        """Tasks created or updated after seq."""
+        with self._lock:
+            return self._page(self._task_changes, self._tasks, seq, limit)
+
+    # Messages
+
+    def add_message(self, message_id: str | None, message: Message):
+        with self._lock:
+            self._messages[message_id or str(uuid.uuid4())] = message
+            if len(self._messages) > _with_slack(self.max_messages):
+                oldest = list(
+                    itertools.islice(
+                        self._messages, len(self._messages) - self.max_messages
+                    )
+                )
+                entries = []
+                for old_id in oldest:
+                    self._archived_messages += 1
+                    self._archived_message_keys[old_id] = self._archived_messages
+                    entries.append(
+                        (
+                            self._archived_messages,
+                            self._messages.pop(old_id).model_dump_json(),
+                        )
+                    )
+                self.archive.append('messages', entries)
+
+    def get_message(self, message_id: str) -> Message | None:
+        with self._lock:
+            message = self._messages.get(message_id)
+            if message is not None:
+                return message
+            key = self._archived_message_keys.get(message_id)
+            if key is None:
+                return None
+            archived = self.archive.get('messages', key)
+            return Message.model_validate_json(archived) if archived else None
+
+    def add_pending(self, message_id: str):
+        with self._lock:
+            self._pending_message_ids[message_id] = None
+            self._publish_pending()
+
+    def remove_pending(self, message_id: str | None):
+        with self._lock:
+            if message_id in self._pending_message_ids:
+                del self._pending_message_ids[message_id]
+                self._publish_pending()
+
+    @property
+    def pending_message_ids(self) -> list[str]:
+        with self._lock:
+            return list(self._pending_message_ids)
+
+    def pending_messages(self) -> list[tuple[str, str]]:
+        """Returns (message id, progress text) for each pending message."""
+        rval = []
+        for message_id in self.pending_message_ids:
+            task = self.task_for_message(message_id)
+            if not task:
+                rval.append((message_id, ''))
+            elif task.history and task.history[-1].parts:
+                if len(task.history) == 1:
+                    rval.append((message_id, 'Working...'))
+                else:
+                    part = task.history[-1].parts[0]
+                    rval.append(
+                        (
+                            message_id,
+                            part.text if part.type == 'text' else 'Working...',
+                        )
+                    )
+        return rval
+
+    def _publish_pending(self):
+        # Pending messages are few, so the whole list is sent each time.
+        self.updates.publish('pending', self.pending_messages())
+
+    # Events
+
+    def add_event(self, event: Event):
+        """Adds an event, replacing any earlier event with the same id."""
+        with self._lock:
+            old_key = self._event_keys.pop(event.id, None)
+            if old_key is not None:
+                index = bisect.bisect_left(self._event_order, old_key)
+                del self._event_order[index]
+            seq = self._next_seq()
+            key = (event.timestamp, seq, event.id)
+            if not self._event_order or key > self._event_order[-1]:
+                # Events almost always arrive in timestamp order.
+                self._event_order.append(key)
+            else:
+                bisect.insort(self._event_order, key)
+            self._event_keys[event.id] = key
+            self._events[event.id] = event
+            self._event_changes.record(event.id, seq)
+            if len(self._events) > _with_slack(self.max_events):
+                self._archive_events(len(self._events) - self.max_events)
+
+    def _archive_events(self, count: int):
+        """Moves the oldest events to the archive."""
+        entries = []
+        for _, _, event_id in self._event_order[:count]:
+            del self._event_keys[event_id]
+            self._event_changes.discard(event_id)
+            self._archived_events += 1
+            entries.append(
+                (
+                    self._archived_events,
+                    self._events.pop(event_id).model_dump_json(),
+                )
+            )
+        del self._event_order[:count]
+        self.archive.append('events', entries)
+
+    def get_event(self, event_id: str) -> Event | None:
+        with self._lock:
+            return self._events.get(event_id)
+
+    @property
+    def events(self) -> list[Event]:
+        """Events ordered by timestamp, then by arrival."""
+        with self._lock:
+            return [self._events[key[2]] for key in self._event_order]
+
+    def events_since(self, seq: int = 0, limit: int | None = None) -> Page:
+        """Events added or replaced after seq, in the order they arrived.
+
+        Only events in memory are listed; see archived_events.
+        """
+        with self._lock:
+            return self._page(self._event_changes, self._events, seq, limit)
+
+    def archived_events(self, since: int = 0, limit: int | None = None) -> Page:
+        """Archived events, oldest first.
+
+        Args:
+            since: Number of archived events already read; the cursor of the
+              previous page.
+            limit: Maximum number of events to return.
+        """
+        entries = self.archive.read('events', since, limit)
+        cursor = entries[-1][0] if entries else since
+        with self._lock:
+            has_more = cursor < self._archived_events
+        return Page(
+            [Event.model_validate_json(e) for _, e in entries],
+            cursor,
+            has_more,
+        )
+
+    # Sequence numbers
+
+    @property
+    def version(self) -> int:
+        """Sequence number of the latest change."""
+        with self._lock:
+            return self._version
+
+    def _next_seq(self) -> int:
+        self._version = next(self._seq)
+        return self._version
+
+    def _page(
+        self,
+        changes: ChangeLog,
+        entities: dict[str, Any],
+        seq: int,
+        limit: int | None,
+    ) -> Page:
+        keys, last_seq = changes.since(seq, limit)
+        items = [entities[key] for key in keys]
+        if last_seq is not None:
+            return Page(items, last_seq, True)
+        # Nothing after this listing has changed yet.
+        return Page(items, max(seq, self._version))
+
+
+def _message_id(message: Message | None) -> str | None:
+    if not message or not message.metadata:
+        return None
+    return message.metadata.get('message_id')
+
+
+def _with_slack(limit: int) -> int:
+    # History is archived a quarter of the limit at a time, not one entry at
+    # a time.
+    return limit + max(limit // 4, 1)
@@ -0,0 +1,118 @@
+import asyncio
+import itertools
+import os
+import threading
+
+from collections import deque
+from collections.abc import AsyncIterator
+from typing import Any
+
+
+class UpdateStream:
+    """Broadcasts incremental state changes to the UI.
+
+    Every change published here gets a sequence number and is kept in a
+    bounded backlog, so a subscriber that reconnects can resume from the last
+    update it saw instead of reloading the whole state. A subscriber that fell
+    further behind than the backlog reaches gets a single 'reset' update and
+    should reload the full state.
+
+    Updates are published from the message worker's thread and from the HTTP
+    handlers, while subscribers wait on the server's event loop, so waiters are
+    woken through their loop with call_soon_threadsafe.
+
+    Args:
+        backlog: Maximum number of recent updates kept for resuming.
+    """
+
+    def __init__(self, backlog: int = 1000):
+        self._lock = threading.Lock()
+        self._backlog: deque[dict[str, Any]] = deque(maxlen=backlog)
+        self._seq = itertools.count(1)
+        self._last_seq = 0
+        self._waiters: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = (
+            set()
+        )
+        self._closed = False
+
+    @classmethod
+    def from_env(cls) -> 'UpdateStream':
+        return cls(backlog=int(os.environ.get('A2A_UI_UPDATE_BACKLOG', '1000')))
+
+    @property
+    def last_seq(self) -> int:
+        with self._lock:
+            return self._last_seq
+
+    def publish(self, kind: str, data: Any):
+        """Records an update and wakes subscribers.
+
+        Args:
+            kind: One of 'conversation', 'message', 'task' or 'pending'.
+            data: JSON serializable payload of the update.
+        """
+        with self._lock:
+            self._last_seq = next(self._seq)
+            self._backlog.append(
+                {'seq': self._last_seq, 'type': kind, 'data': data}
+            )
+            waiters = list(self._waiters)
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+
+    def since(self, seq: int) -> list[dict[str, Any]]:
+        """Returns the updates after seq, or a 'reset' if some were dropped."""
+        with self._lock:
+            if seq == self._last_seq:
+                return []
+            # Either the backlog no longer reaches back to seq, or seq came
+            # from before a server restart.
+            if seq > self._last_seq or self._backlog[0]['seq'] > seq + 1:
+                return [{'seq': self._last_seq, 'type': 'reset', 'data': None}]
+            # The backlog is contiguous, so the first update needed is at a
+            # known offset from the oldest one kept.
+            start = seq + 1 - self._backlog[0]['seq']
+            return list(itertools.islice(self._backlog, start, None))
+
+    async def subscribe(
+        self, since: int | None = None
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yields updates after since as they are published, until close().
+
+        Without since, the subscriber has no state yet: it gets a 'reset'
+        telling it to load the full state, followed by new updates.
+        """
+        event = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), event)
+        with self._lock:
+            self._waiters.add(waiter)
+            if since is None:
+                since = self._last_seq
+                reset = {'seq': since, 'type': 'reset', 'data': None}
+            else:
+                reset = None
+        try:
+            if reset:
+                yield reset
+            while True:
+                # Clear before reading, so a publish in between is not missed.
+                event.clear()
+                updates = self.since(since)
+                for update in updates:
+                    since = update['seq']
+                    yield update
+                if self._closed:
+                    return
+                if not updates:
+                    await event.wait()
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+    def close(self):
+        """Ends all subscriptions once they have sent what is published."""
+        with self._lock:
+            self._closed = True
+            waiters = list(self._waiters)
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
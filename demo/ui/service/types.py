@@ -26,6 +26,25 @@ class Event(BaseModel):
     timestamp: float
 
 
+class ListParams(BaseModel):
+    # Only list entities created or changed after this sequence number, the
+    # cursor of an earlier response. 0 lists everything.
+    since: int = 0
+    # Maximum number of entities to return. The response sets has_more when
+    # there are more, to be fetched with its cursor as since.
+    limit: int | None = Field(default=None, gt=0)
+
+
+class ListMessageParams(ListParams):
+    conversation_id: str
+
+
+class ListResponse(JSONRPCResponse):
+    # Pass as since to the next request to get only later changes.
+    cursor: int | None = None
+    has_more: bool = False
+
+
 class SendMessageRequest(JSONRPCRequest):
     method: Literal['message/send'] = 'message/send'
     params: Message
@@ -33,11 +52,11 @@ class SendMessageRequest(JSONRPCRequest):
 
 class ListMessageRequest(JSONRPCRequest):
     method: Literal['message/list'] = 'message/list'
-    # This is the conversation id
-    params: str
+    # The conversation id, or the conversation id with paging parameters
+    params: str | ListMessageParams
 
 
-class ListMessageResponse(JSONRPCResponse):
+class ListMessageResponse(ListResponse):
     result: list[Message] | None = None
 
 
@@ -52,17 +71,25 @@ class SendMessageResponse(JSONRPCResponse):
 
 class GetEventRequest(JSONRPCRequest):
     method: Literal['events/get'] = 'events/get'
+    params: ListParams | None = None
 
 
-class GetEventResponse(JSONRPCResponse):
+class GetEventResponse(ListResponse):
     result: list[Event] | None = None
 
 
+class GetArchivedEventRequest(JSONRPCRequest):
+    method: Literal['events/archive'] = 'events/archive'
+    # since is the number of archived events already read.
+    params: ListParams | None = None
+
+
 class ListConversationRequest(JSONRPCRequest):
     method: Literal['conversation/list'] = 'conversation/list'
+    params: ListParams | None = None
 
 
-class ListConversationResponse(JSONRPCResponse):
+class ListConversationResponse(ListResponse):
     result: list[Conversation] | None = None
 
 
@@ -84,9 +111,10 @@ class CreateConversationResponse(JSONRPCResponse):
 
 class ListTaskRequest(JSONRPCRequest):
     method: Literal['task/list'] = 'task/list'
+    params: ListParams | None = None
 
 
-class ListTaskResponse(JSONRPCResponse):
+class ListTaskResponse(ListResponse):
     result: list[Task] | None = None
 
 
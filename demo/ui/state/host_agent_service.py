@@ -3,6 +3,7 @@ import os
 import sys
 import traceback
 
+from collections.abc import Awaitable, Callable
 from typing import Any
 
 from common.types import Message, Part, Task
@@ -14,7 +15,10 @@ from service.types import (
     GetEventRequest,
     ListAgentRequest,
     ListConversationRequest,
+    ListMessageParams,
     ListMessageRequest,
+    ListParams,
+    ListResponse,
     ListTaskRequest,
     PendingMessageRequest,
     RegisterAgentRequest,
@@ -33,20 +37,48 @@ from .state import (
 
 server_url = 'http://localhost:12000'
 
+# Entities fetched per list request; the rest are fetched with the cursor.
+LIST_PAGE_SIZE = 200
 
-async def ListConversations() -> list[Conversation]:
+
+async def ListAll(
+    list_page: Callable[[ListParams], Awaitable[ListResponse]],
+    params: ListParams,
+) -> tuple[list[Any], int]:
+    """Fetch every page of a listing.
+
+    Returns the entities changed after params.since and the cursor to pass as
+    since next time.
+    """
+    items = []
+    while True:
+        response = await list_page(params)
+        items.extend(response.result or [])
+        if not response.has_more:
+            return items, response.cursor or params.since
+        params = params.model_copy(update={'since': response.cursor})
+
+
+async def ListConversations(since: int = 0) -> tuple[list[Conversation], int]:
     client = ConversationClient(server_url)
     try:
-        response = await client.list_conversation(ListConversationRequest())
-        return response.result
+        return await ListAll(
+            lambda params: client.list_conversation(
+                ListConversationRequest(params=params)
+            ),
+            ListParams(since=since, limit=LIST_PAGE_SIZE),
+        )
     except Exception as e:
         print('Failed to list conversations: ', e)
+        return [], since
 
 
 async def SendMessage(message: Message) -> str | None:
     client = ConversationClient(server_url)
     try:
         response = await client.send_message(SendMessageRequest(params=message))
+        if response.error:
+            print('Message was not accepted: ', response.error.message)
         return response.result
     except Exception as e:
         print('Failed to send message: ', e)
@@ -78,13 +110,16 @@ async def AddRemoteAgent(path: str):
         print('Failed to register the agent', e)
 
 
-async def GetEvents() -> list[Event]:
+async def GetEvents(since: int = 0) -> tuple[list[Event], int]:
     client = ConversationClient(server_url)
     try:
-        response = await client.get_events(GetEventRequest())
-        return response.result
+        return await ListAll(
+            lambda params: client.get_events(GetEventRequest(params=params)),
+            ListParams(since=since, limit=LIST_PAGE_SIZE),
+        )
     except Exception as e:
         print('Failed to get events', e)
+        return [], since
 
 
 async def GetProcessingMessages():
@@ -100,52 +135,76 @@ def GetMessageAliases():
     return {}
 
 
-async def GetTasks():
+async def GetTasks(since: int = 0) -> tuple[list[Task], int]:
     client = ConversationClient(server_url)
     try:
-        response = await client.list_tasks(ListTaskRequest())
-        return response.result
+        return await ListAll(
+            lambda params: client.list_tasks(ListTaskRequest(params=params)),
+            ListParams(since=since, limit=LIST_PAGE_SIZE),
+        )
     except Exception as e:
         print('Failed to list tasks ', e)
+        return [], since
 
 
-async def ListMessages(conversation_id: str) -> list[Message]:
+async def ListMessages(
+    conversation_id: str, since: int = 0
+) -> tuple[list[Message], int]:
     client = ConversationClient(server_url)
     try:
-        response = await client.list_messages(
-            ListMessageRequest(params=conversation_id)
+        return await ListAll(
+            lambda params: client.list_messages(
+                ListMessageRequest(params=params)
+            ),
+            ListMessageParams(
+                conversation_id=conversation_id,
+                since=since,
+                limit=LIST_PAGE_SIZE,
+            ),
         )
-        return response.result
     except Exception as e:
         print('Failed to list messages ', e)
+        return [], since
 
 
 async def UpdateAppState(state: AppState, conversation_id: str):
-    """Update the app state."""
+    """Update the app state with what changed since the last update.
+
+    Each listing resumes from the cursor of the previous one, so only new or
+    changed entities are fetched and merged. Clear state.list_cursors to load
+    everything again.
+    """
     try:
+        cursors = dict(state.list_cursors)
         if conversation_id:
             state.current_conversation_id = conversation_id
-            messages = await ListMessages(conversation_id)
-            if not messages:
+            key = f'messages:{conversation_id}'
+            since = cursors.get(key, 0)
+            if not since:
+                # A different conversation than the messages are from.
                 state.messages = []
-            else:
-                state.messages = [convert_message_to_state(x) for x in messages]
-        conversations = await ListConversations()
-        if not conversations:
+            messages, cursor = await ListMessages(conversation_id, since)
+            for message in messages:
+                merge_message(state, convert_message_to_state(message))
+            cursors = {
+                k: v for k, v in cursors.items() if not k.startswith('messages:')
+            }
+            cursors[key] = cursor
+
+        since = cursors.get('conversations', 0)
+        if not since:
             state.conversations = []
-        else:
-            state.conversations = [
-                convert_conversation_to_state(x) for x in conversations
-            ]
-
-        state.task_list = []
-        for task in await GetTasks():
-            state.task_list.append(
-                SessionTask(
-                    session_id=extract_conversation_id(task),
-                    task=convert_task_to_state(task),
-                )
-            )
+        conversations, cursors['conversations'] = await ListConversations(since)
+        for conversation in conversations:
+            merge_conversation(state, convert_conversation_to_state(conversation))
+
+        since = cursors.get('tasks', 0)
+        if not since:
+            state.task_list = []
+        tasks, cursors['tasks'] = await GetTasks(since)
+        for task in tasks:
+            merge_task(state, task)
+        state.list_cursors = cursors
         state.background_tasks = await GetProcessingMessages()
         state.message_aliases = GetMessageAliases()
     except Exception as e:
@@ -153,6 +212,86 @@ async def UpdateAppState(state: AppState, conversation_id: str):
         traceback.print_exc(file=sys.stdout)
 
 
+async def ApplyUpdates(state: AppState, updates: list[dict[str, Any]]):
+    """Apply updates pushed by the server's update stream to the app state.
+
+    A 'reset' means the updates before it are unknown, so the full state is
+    reloaded and only the updates after it are applied.
+    """
+    if not updates:
+        return
+    pending = updates
+    resets = [i for i, u in enumerate(updates) if u['type'] == 'reset']
+    if resets:
+        state.list_cursors = {}
+        await UpdateAppState(state, state.current_conversation_id)
+        pending = updates[resets[-1] + 1 :]
+    try:
+        for update in pending:
+            apply_update(state, update['type'], update['data'])
+    except Exception as e:
+        print('Failed to apply updates: ', e)
+        traceback.print_exc(file=sys.stdout)
+    state.update_seq = updates[-1]['seq']
+
+
+def apply_update(state: AppState, kind: str, data: Any):
+    if kind == 'conversation':
+        # Updates carry the conversation without its messages, so keep the
+        # message ids already known.
+        conversation = convert_conversation_to_state(Conversation(**data))
+        for existing in state.conversations:
+            if existing.conversation_id == conversation.conversation_id:
+                existing.conversation_name = conversation.conversation_name
+                existing.is_active = conversation.is_active
+                return
+        state.conversations.append(conversation)
+    elif kind == 'message':
+        message = convert_message_to_state(Message(**data['message']))
+        for conversation in state.conversations:
+            if (
+                conversation.conversation_id == data['conversation_id']
+                and message.message_id not in conversation.message_ids
+            ):
+                conversation.message_ids.append(message.message_id)
+        if data['conversation_id'] == state.current_conversation_id:
+            merge_message(state, message)
+    elif kind == 'task':
+        merge_task(state, Task(**data))
+    elif kind == 'pending':
+        state.background_tasks = dict(data)
+
+
+def merge_conversation(state: AppState, conversation: StateConversation):
+    for i, existing in enumerate(state.conversations):
+        if existing.conversation_id == conversation.conversation_id:
+            state.conversations[i] = conversation
+            return
+    state.conversations.append(conversation)
+
+
+def merge_message(state: AppState, message: StateMessage):
+    # Messages without an id are never listed twice, so always add them.
+    if message.message_id:
+        for i, existing in enumerate(state.messages):
+            if existing.message_id == message.message_id:
+                state.messages[i] = message
+                return
+    state.messages.append(message)
+
+
+def merge_task(state: AppState, task: Task):
+    session_task = SessionTask(
+        session_id=extract_conversation_id(task),
+        task=convert_task_to_state(task),
+    )
+    for i, existing in enumerate(state.task_list):
+        if existing.task.task_id == task.id:
+            state.task_list[i] = session_task
+            return
+    state.task_list.append(session_task)
+
+
 async def UpdateApiKey(api_key: str):
     """Update the API key"""
     import httpx
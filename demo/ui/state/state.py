@@ -87,6 +87,12 @@ class AppState:
     # This is used to track the message sent to agent with form data
     form_responses: dict[str, str] = dataclasses.field(default_factory=dict)
     polling_interval: int = 1
+    # Apply updates pushed by the server instead of polling
+    live_updates: bool = True
+    # Sequence number of the last server update applied
+    update_seq: int = 0
+    # Cursors of the last list requests, so the next ones fetch only changes
+    list_cursors: dict[str, int] = dataclasses.field(default_factory=dict)
 
     # Added for API key management
     api_key: str = ''
@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import unittest
+
+from common.types import Message, TextPart
+from service.server.message_worker import MessageWorker, WorkerBusy
+
+
+def make_message(conversation_id: str, text: str) -> Message:
+    return Message(
+        role='user',
+        parts=[TextPart(text=text)],
+        metadata={'conversation_id': conversation_id},
+    )
+
+
+class MessageWorkerTest(unittest.TestCase):
+    """Tests for the long-lived message processing worker."""
+
+    def setUp(self) -> None:
+        self.log = []
+        self.release = threading.Event()
+
+    async def process(self, message: Message):
+        conversation_id = message.metadata['conversation_id']
+        text = message.parts[0].text
+        self.log.append(('start', conversation_id, text))
+        while not self.release.is_set():
+            await asyncio.sleep(0.005)
+        self.log.append(('end', conversation_id, text))
+
+    def test_orders_within_conversation_and_overlaps_across(self) -> None:
+        worker = MessageWorker(self.process, max_concurrency=4)
+        self.addCleanup(worker.shutdown, 1)
+        for text in ['1', '2']:
+            worker.submit(make_message('a', text))
+        worker.submit(make_message('b', '1'))
+        self._wait_for(lambda: len(self.log) == 2)
+        # The second message in 'a' waits for the first; 'b' runs alongside.
+        self.assertCountEqual(
+            self.log, [('start', 'a', '1'), ('start', 'b', '1')]
+        )
+
+        self.release.set()
+        self.assertTrue(worker.shutdown(5))
+        a_events = [entry for entry in self.log if entry[1] == 'a']
+        self.assertEqual(
+            a_events,
+            [('start', 'a', '1'), ('end', 'a', '1'),
+             ('start', 'a', '2'), ('end', 'a', '2')],
+        )
+        self.assertEqual(worker.stats()['processed'], 3)
+
+    def test_rejects_when_full_and_after_shutdown(self) -> None:
+        worker = MessageWorker(self.process, max_concurrency=1, max_pending=2)
+        worker.submit(make_message('a', '1'))
+        worker.submit(make_message('b', '1'))
+        with self.assertRaisesRegex(WorkerBusy, 'queue_full'):
+            worker.submit(make_message('c', '1'))
+
+        self.release.set()
+        self.assertTrue(worker.shutdown(5))
+        with self.assertRaisesRegex(WorkerBusy, 'shutting_down'):
+            worker.submit(make_message('a', '2'))
+        self.assertEqual(worker.stats()['rejected'], 2)
+
+    def test_shutdown_cancels_after_timeout(self) -> None:
+        worker = MessageWorker(self.process)
+        worker.submit(make_message('a', '1'))
+        self._wait_for(lambda: self.log)
+        self.assertFalse(worker.shutdown(0.05))
+        self.assertEqual(self.log, [('start', 'a', '1')])
+
+    def _wait_for(self, condition, timeout: float = 5) -> None:
+        event = threading.Event()
+        for _ in range(int(timeout / 0.01)):
+            if condition():
+                return
+            event.wait(0.01)
+        self.fail('condition not met')
+
+
+if __name__ == '__main__':
+    unittest.main()
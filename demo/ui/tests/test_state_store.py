@@ -0,0 +1,217 @@
+import unittest
+
+from common.types import Message, Task, TaskState, TaskStatus, TextPart
+from service.server.state_store import StateStore
+from service.types import Conversation, Event
+
+
+def make_task(task_id: str, *texts: str) -> Task:
+    return Task(
+        id=task_id,
+        status=TaskStatus(state=TaskState.WORKING),
+        history=[Message(role='agent', parts=[TextPart(text=t)]) for t in texts],
+    )
+
+
+def make_event(event_id: str, timestamp: float) -> Event:
+    return Event(
+        id=event_id,
+        content=Message(role='agent', parts=[TextPart(text=event_id)]),
+        timestamp=timestamp,
+    )
+
+
+class StateStoreTest(unittest.TestCase):
+    """Tests for the indexed application manager state."""
+
+    def setUp(self) -> None:
+        self.store = StateStore()
+
+    def test_lookups_and_ordered_views(self) -> None:
+        for conversation_id in ['c2', 'c1']:
+            self.store.add_conversation(
+                Conversation(conversation_id=conversation_id, is_active=True)
+            )
+        self.store.add_task(make_task('t1'))
+        self.store.add_task(make_task('t2'))
+
+        self.assertEqual(
+            self.store.get_conversation('c1').conversation_id, 'c1'
+        )
+        self.assertIsNone(self.store.get_conversation(None))
+        self.assertEqual(
+            [c.conversation_id for c in self.store.conversations], ['c2', 'c1']
+        )
+
+        updated = make_task('t1', 'hi')
+        self.store.update_task(updated)
+        self.store.update_task(make_task('unknown'))
+        self.assertIs(self.store.get_task('t1'), updated)
+        self.assertEqual([t.id for t in self.store.tasks], ['t1', 't2'])
+
+    def test_events_are_ordered_by_timestamp(self) -> None:
+        self.store.add_event(make_event('b', 2))
+        self.store.add_event(make_event('c', 3))
+        self.store.add_event(make_event('a', 1))
+        self.store.add_event(make_event('d', 2))
+        # Re-adding an event replaces it.
+        self.store.add_event(make_event('c', 0))
+        self.assertEqual(
+            [e.id for e in self.store.events], ['c', 'a', 'b', 'd']
+        )
+
+    def test_pending_messages(self) -> None:
+        self.store.add_task(make_task('t1', 'request'))
+        self.store.add_task(make_task('t2', 'request', 'halfway'))
+        for message_id in ['m0', 'm1', 'm2']:
+            self.store.add_pending(message_id)
+        self.store.map_message_to_task('m1', 't1')
+        self.store.map_message_to_task('m2', 't2')
+
+        self.assertEqual(
+            self.store.pending_messages(),
+            [('m0', ''), ('m1', 'Working...'), ('m2', 'halfway')],
+        )
+        self.store.remove_pending('m1')
+        self.store.remove_pending('missing')
+        self.assertEqual(self.store.pending_message_ids, ['m0', 'm2'])
+
+    def test_listing_changes_since_a_cursor(self) -> None:
+        for task_id in ['t1', 't2', 't3']:
+            self.store.add_task(make_task(task_id))
+        first = self.store.tasks_since(0, limit=2)
+        self.assertEqual([t.id for t in first.items], ['t1', 't2'])
+        self.assertTrue(first.has_more)
+        rest = self.store.tasks_since(first.cursor)
+        self.assertEqual([t.id for t in rest.items], ['t3'])
+        self.assertFalse(rest.has_more)
+        self.assertEqual(self.store.tasks_since(rest.cursor).items, [])
+
+        # A changed task is listed again, once, after the cursor.
+        self.store.update_task(make_task('t1', 'hi'))
+        self.store.add_event(make_event('e1', 1))
+        changed = self.store.tasks_since(rest.cursor)
+        self.assertEqual([t.id for t in changed.items], ['t1'])
+        self.assertEqual(changed.cursor, self.store.version)
+        self.assertEqual(
+            [t.id for t in self.store.tasks_since(0).items], ['t2', 't3', 't1']
+        )
+        self.assertEqual(
+            [e.id for e in self.store.events_since(rest.cursor).items], ['e1']
+        )
+
+    def test_listing_messages_since_a_cursor(self) -> None:
+        conversation = Conversation(conversation_id='c1', is_active=True)
+        self.store.add_conversation(conversation)
+        since = self.store.version
+        for text in ['a', 'b', 'c']:
+            self.store.add_conversation_message(
+                conversation,
+                Message(role='user', parts=[TextPart(text=text)]),
+            )
+
+        page = self.store.messages_since('c1', since, limit=2)
+        self.assertEqual([m.parts[0].text for m in page.items], ['a', 'b'])
+        self.assertTrue(page.has_more)
+        page = self.store.messages_since('c1', page.cursor, limit=2)
+        self.assertEqual([m.parts[0].text for m in page.items], ['c'])
+        self.assertFalse(page.has_more)
+        self.assertEqual(self.store.messages_since('missing').items, [])
+        # Adding messages changes the conversation.
+        self.assertEqual(
+            [c.conversation_id for c in self.store.conversations_since(since).items],
+            ['c1'],
+        )
+
+
+
+def message(text: str, message_id: str | None = None) -> Message:
+    return Message(
+        role='agent',
+        parts=[TextPart(text=text)],
+        metadata={'message_id': message_id or text},
+    )
+
+
+class BoundedHistoryTest(unittest.TestCase):
+    """Tests for archiving history beyond the store's limits."""
+
+    def setUp(self) -> None:
+        self.store = StateStore(
+            max_events=4,
+            max_messages=4,
+            max_conversation_messages=4,
+            max_task_history=4,
+        )
+        self.addCleanup(self.store.close)
+
+    def test_task_history_is_deduplicated_and_bounded(self) -> None:
+        task = make_task('t1')
+        task.history = [message('request')]
+        self.store.add_task(task)
+        for i in range(20):
+            self.assertTrue(self.store.add_task_message(task, message(f'm{i}')))
+        self.assertFalse(self.store.add_task_message(task, message('m19')))
+        self.assertLessEqual(len(task.history), 6)
+        # The request stays; the latest messages are kept.
+        self.assertEqual(get_ids(task.history)[0], 'request')
+        self.assertEqual(get_ids(task.history)[-1], 'm19')
+
+        # A task replaced by an agent's version is indexed again.
+        replaced = make_task('t1')
+        replaced.history = [message('request'), message('m19')]
+        self.store.update_task(replaced)
+        self.assertFalse(self.store.add_task_message(replaced, message('m19')))
+        self.assertTrue(self.store.add_task_message(replaced, message('m20')))
+
+    def test_conversation_messages_are_paged_back_from_the_archive(self) -> None:
+        conversation = Conversation(conversation_id='c1', is_active=True)
+        self.store.add_conversation(conversation)
+        for i in range(12):
+            self.store.add_conversation_message(conversation, message(f'm{i}'))
+        self.assertLessEqual(len(conversation.messages), 5)
+        self.assertGreater(self.store.archive.stats()['segments'], 0)
+
+        ids = []
+        cursor = 0
+        while True:
+            page = self.store.messages_since('c1', cursor, limit=3)
+            ids.extend(get_ids(page.items))
+            cursor = page.cursor
+            if not page.has_more:
+                break
+        self.assertEqual(ids, [f'm{i}' for i in range(12)])
+        self.assertEqual(
+            get_ids(self.store.messages_since('c1').items),
+            [f'm{i}' for i in range(12)],
+        )
+
+    def test_events_and_messages_are_archived(self) -> None:
+        for i in range(12):
+            self.store.add_event(make_event(f'e{i}', i))
+            self.store.add_message(f'm{i}', message(f'm{i}'))
+        live = [e.id for e in self.store.events]
+        self.assertEqual(live, [e.id for e in self.store.events_since(0).items])
+        self.assertEqual(live[-1], 'e11')
+
+        archived = self.store.archived_events(0, limit=2)
+        self.assertEqual([e.id for e in archived.items], ['e0', 'e1'])
+        self.assertTrue(archived.has_more)
+        rest = self.store.archived_events(archived.cursor)
+        self.assertFalse(rest.has_more)
+        self.assertEqual(
+            [e.id for e in archived.items + rest.items] + live,
+            [f'e{i}' for i in range(12)],
+        )
+
+        self.assertEqual(self.store.get_message('m0').parts[0].text, 'm0')
+        self.assertEqual(self.store.get_message('m11').parts[0].text, 'm11')
+        self.assertIsNone(self.store.get_message('missing'))
+
+
+def get_ids(messages: list[Message]) -> list[str]:
+    return [m.metadata['message_id'] for m in messages]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import unittest
+
+from common.types import Message, Task, TaskState, TaskStatus, TextPart
+from service.server.state_store import StateStore
+from service.server.update_stream import UpdateStream
+from service.types import Conversation
+
+
+class UpdateStreamTest(unittest.TestCase):
+    """Tests for the UI state update broadcaster."""
+
+    def test_since_resumes_within_backlog(self) -> None:
+        stream = UpdateStream(backlog=3)
+        for i in range(5):
+            stream.publish('task', i)
+
+        self.assertEqual([u['data'] for u in stream.since(2)], [2, 3, 4])
+        self.assertEqual(stream.since(5), [])
+        # Updates 1 and 2 were dropped from the backlog.
+        self.assertEqual(
+            stream.since(1), [{'seq': 5, 'type': 'reset', 'data': None}]
+        )
+        # A sequence number from before a restart.
+        self.assertEqual(stream.since(9)[0]['type'], 'reset')
+
+    def test_subscribe_receives_updates_from_other_threads(self) -> None:
+        stream = UpdateStream()
+        stream.publish('task', 'old')
+
+        async def collect():
+            received = []
+            async for update in stream.subscribe():
+                received.append(update)
+                if len(received) == 1:
+                    threading.Thread(target=publish_and_close).start()
+            return received
+
+        def publish_and_close():
+            stream.publish('task', 'a')
+            stream.publish('pending', [])
+            stream.close()
+
+        received = asyncio.run(asyncio.wait_for(collect(), 5))
+        self.assertEqual(
+            [(u['seq'], u['type']) for u in received],
+            [(1, 'reset'), (2, 'task'), (3, 'pending')],
+        )
+
+    def test_state_store_publishes_changes(self) -> None:
+        store = StateStore(UpdateStream())
+        conversation = Conversation(conversation_id='c1', is_active=True)
+        store.add_conversation(conversation)
+        message = Message(
+            role='user',
+            parts=[TextPart(text='hi')],
+            metadata={'message_id': 'm1'},
+        )
+        store.add_conversation_message(conversation, message)
+        store.add_pending('m1')
+        task = Task(
+            id='t1',
+            status=TaskStatus(state=TaskState.WORKING),
+            history=[message],
+        )
+        store.add_task(task)
+        store.map_message_to_task('m1', 't1')
+        store.remove_pending('m1')
+        store.remove_pending('m1')
+
+        updates = store.updates.since(0)
+        self.assertEqual(
+            [u['type'] for u in updates],
+            [
+                'conversation',
+                'message',
+                'pending',
+                'task',
+                'pending',
+                'pending',
+                'pending',
+            ],
+        )
+        self.assertNotIn('messages', updates[0]['data'])
+        self.assertEqual(updates[1]['data']['conversation_id'], 'c1')
+        self.assertEqual(updates[1]['data']['message']['parts'][0]['text'], 'hi')
+        self.assertEqual(updates[3]['data']['id'], 't1')
+        self.assertEqual(updates[5]['data'], [('m1', 'Working...')])
+        self.assertEqual(updates[-1]['data'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,37 +2,65 @@ import logging
 import os
 
 import click
-from common.sui_config import SUIConfig
 
-from agents.food_ordering_services.agent import FoodOrderingAgent
 from common.server import A2AServer
+from common.server.artifact_stream import ArtifactStreamer
 from common.types import (
     AgentCapabilities,
     AgentCard,
     AgentSkill,
     MissingAPIKeyError,
 )
+from common.utils.log_pipeline import configure_logging
+from common.utils.telemetry import configure_tracing
 from dotenv import load_dotenv
-from agents.food_ordering_services.task_manager import AgentTaskManager
 
 
 load_dotenv()
 
-# Configure logging to reduce verbosity
-logging.basicConfig(level=logging.WARNING)
+# Log from a background thread; A2A_LOG_LEVELS overrides these levels.
+configure_logging(
+    logging.WARNING,
+    levels={
+        # Reduce Google ADK and related library logs
+        'google.adk.models.google_llm': logging.ERROR,
+        'google_genai.models': logging.ERROR,
+        'google_genai.types': logging.ERROR,
+        'httpx': logging.ERROR,
+        'uvicorn.access': logging.ERROR,
+        # Keep important logs
+        '__main__': logging.INFO,
+        'task_manager': logging.INFO,
+        'common.server.task_manager': logging.INFO,
+    },
+)
+# Spans are exported if A2A_TRACE_EXPORTER is set.
+configure_tracing()
 logger = logging.getLogger(__name__)
 
-# Reduce Google ADK and related library logs
-logging.getLogger('google.adk.models.google_llm').setLevel(logging.ERROR)
-logging.getLogger('google_genai.models').setLevel(logging.ERROR)
-logging.getLogger('google_genai.types').setLevel(logging.ERROR)
-logging.getLogger('httpx').setLevel(logging.ERROR)
-logging.getLogger('uvicorn.access').setLevel(logging.ERROR)
 
-# Keep important logs
-logging.getLogger('__main__').setLevel(logging.INFO)
-logging.getLogger('task_manager').setLevel(logging.INFO)
-logging.getLogger('common.server.task_manager').setLevel(logging.INFO)
+# Same as the agent's SUPPORTED_CONTENT_TYPES, repeated here so the agent card
+# can be served before the agent module (and Google ADK) is imported.
+SUPPORTED_CONTENT_TYPES = ['text', 'text/plain']
+
+
+def _resolve_sui_address(sui_address):
+    """Derives the agent's SUI address from SERVICE_AGENT_PRIVATE_KEY if not given."""
+    if sui_address:
+        return sui_address
+    service_private_key = os.environ.get('SERVICE_AGENT_PRIVATE_KEY')
+    if not service_private_key:
+        logger.warning("SERVICE_AGENT_PRIVATE_KEY not set, using default sui_address")
+        return '0x0000000000000000000000000000000000000000000000000000000000000001'  # Default address
+    try:
+        from common.sui_config import SUIConfig
+
+        sui_address = SUIConfig(private_key=service_private_key).address
+        logger.info(f"Generated sui_address from SERVICE_AGENT_PRIVATE_KEY: {sui_address}")
+        return sui_address
+    except Exception as e:
+        logger.error(f"Error generating SUI address from private key: {e}")
+        return '0x0000000000000000000000000000000000000000000000000000000000000001'  # Default address
 
 
 @click.command()
@@ -49,22 +77,7 @@ def main(host, port, verify_signatures, sui_address):
                     'GOOGLE_API_KEY environment variable not set and GOOGLE_GENAI_USE_VERTEXAI is not TRUE.'
                 )
 
-        # If sui_address is not provided, try to get it from SERVICE_AGENT_PRIVATE_KEY environment variable
-        if not sui_address:
-            service_private_key = os.environ.get('SERVICE_AGENT_PRIVATE_KEY')
-            if service_private_key:
-                try:
-                    sui_config = SUIConfig(private_key=service_private_key)
-                    sui_address = sui_config.address
-                    logger.info(f"Generated sui_address from SERVICE_AGENT_PRIVATE_KEY: {sui_address}")
-                except Exception as e:
-                    logger.error(f"Error generating SUI address from private key: {e}")
-                    sui_address = '0x0000000000000000000000000000000000000000000000000000000000000001'  # Default address
-            else:
-                logger.warning("SERVICE_AGENT_PRIVATE_KEY not set, using default sui_address")
-                sui_address = '0x0000000000000000000000000000000000000000000000000000000000000001'  # Default address
-
-        capabilities = AgentCapabilities(streaming=False)
+        capabilities = AgentCapabilities(streaming=True)
         
         # Define agent skills
         restaurant_skill = AgentSkill(
@@ -103,39 +116,53 @@ def main(host, port, verify_signatures, sui_address):
             ],
         )
         
-        # Add sui_address to AgentCard metadata
         agent_card = AgentCard(
             name='Food Ordering Agent',
             description='This agent helps Bay Area users find restaurants, order food delivery, or make restaurant reservations.',
             url=f'http://localhost:{port}/',
             version='1.0.0',
-            defaultInputModes=FoodOrderingAgent.SUPPORTED_CONTENT_TYPES,
-            defaultOutputModes=FoodOrderingAgent.SUPPORTED_CONTENT_TYPES,
+            defaultInputModes=SUPPORTED_CONTENT_TYPES,
+            defaultOutputModes=SUPPORTED_CONTENT_TYPES,
             capabilities=capabilities,
             skills=[restaurant_skill, delivery_skill, reservation_skill],
-            metadata={"sui_address": sui_address}  # Add SUI address
-        )
-        
-        # Initialize the task manager with signature verification and save sui_address
-        logger.info(f"Initializing AgentTaskManager with signature verification: {verify_signatures}")
-        agent = FoodOrderingAgent()
-        task_manager = AgentTaskManager(
-            agent=FoodOrderingAgent(),
-            verify_signatures=verify_signatures
+            metadata={},  # sui_address is added by setup_agent
         )
-        # Set agent sui address
-        task_manager.agent_address = sui_address
-        logger.info(f"Agent sui address set to: {sui_address}")
-        
-        # Also set it as environment variable for easier access
-        os.environ['AGENT_SUI_ADDRESS'] = sui_address
         
         server = A2AServer(
             agent_card=agent_card,
-            task_manager=task_manager,
             host=host,
             port=port,
         )
+
+        def setup_agent():
+            # Google ADK and the chain SDKs take most of the startup time, so
+            # they are imported here, after the server is already answering
+            # liveness checks. /health/ready turns green once this returns.
+            from agents.food_ordering_services.agent import FoodOrderingAgent
+            from agents.food_ordering_services.task_manager import AgentTaskManager
+
+            address = _resolve_sui_address(sui_address)
+            agent_card.metadata['sui_address'] = address
+
+            # Initialize the task manager with signature verification and save sui_address
+            logger.info(f"Initializing AgentTaskManager with signature verification: {verify_signatures}")
+            task_manager = AgentTaskManager(
+                agent=FoodOrderingAgent(),
+                verify_signatures=verify_signatures
+            )
+            # Set agent sui address
+            task_manager.agent_address = address
+            logger.info(f"Agent sui address set to: {address}")
+
+            # Also set it as environment variable for easier access
+            os.environ['AGENT_SUI_ADDRESS'] = address
+            # Large artifact files are sent by URI and served by the server.
+            task_manager.artifact_streamer = ArtifactStreamer.from_env(
+                blobs=server.blobs, base_url=agent_card.url
+            )
+            server.task_manager = task_manager
+
+        server.add_startup_task('agent', setup_agent)
         server.start()
     except MissingAPIKeyError as e:
         logger.error(f'Error: {e}')
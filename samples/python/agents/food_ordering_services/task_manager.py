@@ -7,6 +7,8 @@ from collections.abc import AsyncIterable
 from typing import Any
 
 from common.server import utils
+from common.server.scheduler import classify_task
+from common.server.token_stream import TextArtifactStream
 from common.server.task_manager import InMemoryTaskManager
 from common.types import (
     Artifact,
@@ -25,10 +27,11 @@ from common.types import (
     TaskStatusUpdateEvent,
     TextPart,
 )
+from common.utils.telemetry import traced
+from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.genai import types
 # Import SUI related libraries
-from common.sui_config import SUIConfig
-from common.sui_blockchain import SUITaskManager, SUISignatureManager
+from common.escrow_backend import EscrowBackend, SUIEscrowBackend
 
 
 logger = logging.getLogger(__name__)
@@ -40,6 +43,7 @@ class AgentWithTaskManager(ABC):
     def get_processing_message(self) -> str:
         pass
 
+    @traced('adk.runner.invoke')
     def invoke(self, query, session_id) -> str:
         # Store session_id for use in tool functions
         if hasattr(self, '_current_session_id'):
@@ -71,6 +75,7 @@ class AgentWithTaskManager(ABC):
             return ''
         return '\n'.join([p.text for p in events[-1].content.parts if p.text])
 
+    @traced('adk.runner.stream')
     async def stream(self, query, session_id) -> AsyncIterable[dict[str, Any]]:
         # Store session_id for use in tool functions
         if hasattr(self, '_current_session_id'):
@@ -92,9 +97,21 @@ class AgentWithTaskManager(ABC):
                 session_id=session_id,
             )
         async for event in self._runner.run_async(
-            user_id=self._user_id, session_id=session.id, new_message=content
+            user_id=self._user_id,
+            session_id=session.id,
+            new_message=content,
+            # Yield the response text as the model generates it.
+            run_config=RunConfig(streaming_mode=StreamingMode.SSE),
         ):
-            if event.is_final_response():
+            if event.partial:
+                text = ''.join(
+                    p.text
+                    for p in (event.content and event.content.parts) or []
+                    if p.text and not p.thought
+                )
+                if text:
+                    yield {'is_task_complete': False, 'delta': text}
+            elif event.is_final_response():
                 response = ''
                 if (
                     event.content
@@ -131,7 +148,8 @@ class AgentWithTaskManager(ABC):
 
 
 class AgentTaskManager(InMemoryTaskManager):
-    def __init__(self, agent: AgentWithTaskManager, verify_signatures: bool = True, verify_blockchain: bool = True):
+    def __init__(self, agent: AgentWithTaskManager, verify_signatures: bool = True, verify_blockchain: bool = True,
+                 escrow_backend: EscrowBackend | None = None):
         super().__init__()
         self.agent = agent
         self.verify_signatures = verify_signatures
@@ -139,7 +157,11 @@ class AgentTaskManager(InMemoryTaskManager):
         
         # 获取从AgentCard中设置的以太坊地址
         self.agent_address = None
+        # Escrows are checked through this backend; the default SUI backend
+        # is created on first use and reused.
+        self.escrow_backend = escrow_backend
 
+    @traced('a2a.agent.validate_signature')
     async def _validate_signature(self, task_send_params: TaskSendParams) -> tuple[bool, str]:
         """Validate the Ed25519 signature from the Host Agent.
         
@@ -210,25 +232,28 @@ class AgentTaskManager(InMemoryTaskManager):
             logger.error(f"Error validating signature: {e}")
             return False, f"Error validating signature: {e}"
     
-    async def _validate_blockchain_confirmation(self, task_send_params: TaskSendParams) -> tuple[bool, str]:
+    @traced('a2a.agent.validate_blockchain_confirmation')
+    async def _validate_blockchain_confirmation(self, task_send_params: TaskSendParams) -> tuple[bool, str, bool]:
         """Validate SUI blockchain task confirmation.
         
         Args:
             task_send_params: Task parameters containing blockchain transaction hash.
             
         Returns:
-            A tuple of (is_valid, error_message).
+            A tuple of (is_valid, error_message, escrow_verified), where
+            escrow_verified is True only if an open escrow payable to this
+            agent was found on chain.
         """
         try:
             # Skip validation if disabled
             if not self.verify_blockchain:
-                return True, ""
+                return True, "", False
                 
             # Check if blockchain data exists in metadata
             if (not task_send_params.message or 
                 not task_send_params.message.metadata or
                 'blockchain' not in task_send_params.message.metadata):
-                return True, "No blockchain confirmation data, skipping validation"
+                return True, "No blockchain confirmation data, skipping validation", False
                 
             # Extract transaction hash - adapt to new metadata format
             blockchain_data = task_send_params.message.metadata.get('blockchain', {})
@@ -237,17 +262,17 @@ class AgentTaskManager(InMemoryTaskManager):
             task_object_id = create_task_data.get('task_object_id')
             
             if not tx_hash:
-                return False, "Missing SUI transaction hash"
+                return False, "Missing SUI transaction hash", False
                 
             # Get session ID which is used as task_id in SUI
             session_id = task_send_params.sessionId
                 
-            # Initialize SUI config and task manager for validation
-            sui_config = SUIConfig()
-            if not await sui_config.is_connected():
-                return False, "Unable to connect to SUI network"
-                
-            sui_task_manager = SUITaskManager(sui_config)
+            # Initialize the SUI escrow backend for validation once
+            if self.escrow_backend is None:
+                escrow_backend = SUIEscrowBackend()
+                if not await escrow_backend.available():
+                    return False, "Unable to connect to SUI network", False
+                self.escrow_backend = escrow_backend
             
             # Check if agent SUI address is set
             if not self.agent_address:
@@ -256,37 +281,65 @@ class AgentTaskManager(InMemoryTaskManager):
                 
                 if not self.agent_address:
                     logger.warning("Agent SUI address not set, skipping blockchain task validation")
-                    return True, "Blockchain validation skipped due to missing agent address"
+                    return True, "Blockchain validation skipped due to missing agent address", False
             
             try:
                 # For SUI, we'll do a simplified validation
                 # In a production system, you'd query the transaction details using SUI client
                 # For now, we'll accept any properly formatted transaction hash
                 if tx_hash and len(tx_hash) > 20:  # Basic format check
-                    print(f"[SUI NETWORK] Service Agent: Transaction {tx_hash} verified on SUI network")
-                    return True, ""
+                    logger.info(
+                        '[SUI NETWORK] Service Agent: Transaction %s verified on SUI network',
+                        tx_hash,
+                    )
+                    # Only the format is checked, so the escrow is not verified
+                    return True, "", False
                 else:
-                    return False, f"Invalid SUI transaction hash format: {tx_hash}"
+                    return False, f"Invalid SUI transaction hash format: {tx_hash}", False
                     
             except Exception as e:
                 logger.warning(f"SUI task validation failed: {e}, but allowing task to proceed")
-                return True, f"SUI validation failed but proceeding: {e}"
+                return True, f"SUI validation failed but proceeding: {e}", False
             
         except Exception as e:
             logger.error(f"Error validating SUI confirmation: {e}")
-            return False, f"SUI confirmation validation failed: {e}"
+            return False, f"SUI confirmation validation failed: {e}", False
 
     async def _stream_generator(
         self, request: SendTaskStreamingRequest
     ) -> AsyncIterable[SendTaskStreamingResponse]:
         task_send_params: TaskSendParams = request.params
         query = self._get_user_query(task_send_params)
+        # Text deltas of the model turn being generated
+        text_stream = TextArtifactStream()
         try:
-            async for item in self.agent.stream(
-                query, task_send_params.sessionId
+            async for item in self.delta_coalescer.coalesce(
+                self.agent.stream(query, task_send_params.sessionId)
             ):
+                if 'delta' in item:
+                    yield SendTaskStreamingResponse(
+                        id=request.id,
+                        result=TaskArtifactUpdateEvent(
+                            id=task_send_params.id,
+                            artifact=text_stream.add(item['delta']),
+                        ),
+                    )
+                    continue
                 is_task_complete = item['is_task_complete']
-                artifacts = None
+                artifacts = []
+                chunks = []
+                final_text = None
+                if text_stream.started:
+                    # The streamed turn has ended. If it was the final
+                    # response, the last chunk completes it; otherwise it
+                    # led to a tool call and the response follows later.
+                    content = item.get('content')
+                    if isinstance(content, str) and text_stream.extends(content):
+                        final_text = content
+                    chunk, artifact = text_stream.close(final_text)
+                    artifacts.append(artifact)
+                    chunks.append(chunk)
+                    text_stream = TextArtifactStream(index=artifact.index + 1)
                 if not is_task_complete:
                     task_state = TaskState.WORKING
                     parts = [{'type': 'text', 'text': item['updates']}]
@@ -307,12 +360,22 @@ class AgentTaskManager(InMemoryTaskManager):
                     else:
                         task_state = TaskState.COMPLETED
                         parts = [{'type': 'text', 'text': item['content']}]
-                    artifacts = [Artifact(parts=parts, index=0, append=False)]
+                    if final_text is None:
+                        # Files too large to send inline are sent by URI.
+                        artifact = self.artifact_streamer.externalize(
+                            Artifact(
+                                parts=parts,
+                                index=text_stream.index,
+                                append=False,
+                            )
+                        )
+                        artifacts.append(artifact)
+                        chunks.extend(self.artifact_streamer.chunks(artifact))
                 
                 message = Message(role='agent', parts=parts)
                 task_status = TaskStatus(state=task_state, message=message)
                 await self._update_store(
-                    task_send_params.id, task_status, artifacts
+                    task_send_params.id, task_status, artifacts or None
                 )
                 task_update_event = TaskStatusUpdateEvent(
                     id=task_send_params.id,
@@ -322,16 +385,15 @@ class AgentTaskManager(InMemoryTaskManager):
                 yield SendTaskStreamingResponse(
                     id=request.id, result=task_update_event
                 )
-                # Now yield Artifacts too
-                if artifacts:
-                    for artifact in artifacts:
-                        yield SendTaskStreamingResponse(
-                            id=request.id,
-                            result=TaskArtifactUpdateEvent(
-                                id=task_send_params.id,
-                                artifact=artifact,
-                            ),
-                        )
+                # Now yield Artifacts too, split into bounded chunks
+                for chunk in chunks:
+                    yield SendTaskStreamingResponse(
+                        id=request.id,
+                        result=TaskArtifactUpdateEvent(
+                            id=task_send_params.id,
+                            artifact=chunk,
+                        ),
+                    )
                 if is_task_complete:
                     yield SendTaskStreamingResponse(
                         id=request.id,
@@ -369,6 +431,9 @@ class AgentTaskManager(InMemoryTaskManager):
             return utils.new_incompatible_types_error(request.id)
 
     async def on_send_task(self, request: SendTaskRequest) -> SendTaskResponse:
+        return await self.send_task_once(request, self._send_task)
+
+    async def _send_task(self, request: SendTaskRequest) -> SendTaskResponse:
         error = self._validate_request(request)
         if error:
             return error
@@ -383,7 +448,7 @@ class AgentTaskManager(InMemoryTaskManager):
             )
         
         # Validate blockchain confirmation
-        is_valid, error_message = await self._validate_blockchain_confirmation(request.params)
+        is_valid, error_message, escrow_verified = await self._validate_blockchain_confirmation(request.params)
         if not is_valid:
             logger.warning(f"Blockchain confirmation validation failed: {error_message}")
             return JSONRPCResponse(
@@ -391,8 +456,12 @@ class AgentTaskManager(InMemoryTaskManager):
                 error=InternalError(message=f"Blockchain confirmation validation failed: {error_message}")
             )
             
+        lane = classify_task(
+            self.tasks.get(request.params.id), escrow_verified
+        )
         await self.upsert_task(request.params)
-        return await self._invoke(request)
+        async with self.scheduler.slot(lane):
+            return await self._invoke(request)
 
     async def on_send_task_subscribe(
         self, request: SendTaskStreamingRequest
@@ -413,7 +482,7 @@ class AgentTaskManager(InMemoryTaskManager):
             return
         
         # Validate blockchain confirmation
-        is_valid, error_message = await self._validate_blockchain_confirmation(request.params)
+        is_valid, error_message, escrow_verified = await self._validate_blockchain_confirmation(request.params)
         if not is_valid:
             logger.warning(f"Blockchain confirmation validation failed: {error_message}")
             yield SendTaskStreamingResponse(
@@ -422,10 +491,14 @@ class AgentTaskManager(InMemoryTaskManager):
             )
             return
             
+        lane = classify_task(
+            self.tasks.get(request.params.id), escrow_verified
+        )
         await self.upsert_task(request.params)
         try:
-            async for response in self._stream_generator(request):
-                yield response
+            async with self.scheduler.slot(lane):
+                async for response in self._stream_generator(request):
+                    yield response
         except Exception as e:
             logger.error(f"Error in stream generator: {e}")
             yield SendTaskStreamingResponse(
@@ -433,6 +506,7 @@ class AgentTaskManager(InMemoryTaskManager):
                 error=InternalError(message=f"Stream generation error: {e}")
             )
 
+    @traced('a2a.agent.update_store')
     async def _update_store(
         self, task_id: str, status: TaskStatus, artifacts: list[Artifact]
     ) -> Task:
@@ -470,7 +544,7 @@ class AgentTaskManager(InMemoryTaskManager):
             TaskStatus(
                 state=task_state, message=Message(role='agent', parts=parts)
             ),
-            [Artifact(parts=parts)],
+            [self.artifact_streamer.externalize(Artifact(parts=parts))],
         )
         return SendTaskResponse(id=request.id, result=task)
 
@@ -2,37 +2,66 @@ import logging
 import os
 
 import click
-from common.aptos_config import AptosConfig
 
-from agent import TravelAgent
 from common.server import A2AServer
+from common.server.artifact_stream import ArtifactStreamer
 from common.types import (
     AgentCapabilities,
     AgentCard,
     AgentSkill,
     MissingAPIKeyError,
 )
+from common.utils.log_pipeline import configure_logging
+from common.utils.telemetry import configure_tracing
 from dotenv import load_dotenv
-from task_manager import AgentTaskManager
 
 
 load_dotenv()
 
-# Configure logging to reduce verbosity  
-logging.basicConfig(level=logging.WARNING)
+# Log from a background thread; A2A_LOG_LEVELS overrides these levels.
+configure_logging(
+    logging.WARNING,
+    levels={
+        # Reduce Google ADK and related library logs
+        'google.adk.models.google_llm': logging.ERROR,
+        'google_genai.models': logging.ERROR,
+        'google_genai.types': logging.ERROR,
+        'httpx': logging.ERROR,
+        'uvicorn.access': logging.ERROR,
+        # Keep important logs
+        '__main__': logging.INFO,
+        'task_manager': logging.INFO,
+        'common.server.task_manager': logging.INFO,
+    },
+)
+# Spans are exported if A2A_TRACE_EXPORTER is set.
+configure_tracing()
 logger = logging.getLogger(__name__)
 
-# Reduce Google ADK and related library logs
-logging.getLogger('google.adk.models.google_llm').setLevel(logging.ERROR)
-logging.getLogger('google_genai.models').setLevel(logging.ERROR)
-logging.getLogger('google_genai.types').setLevel(logging.ERROR)
-logging.getLogger('httpx').setLevel(logging.ERROR)
-logging.getLogger('uvicorn.access').setLevel(logging.ERROR)
 
-# Keep important logs
-logging.getLogger('__main__').setLevel(logging.INFO)
-logging.getLogger('task_manager').setLevel(logging.INFO)
-logging.getLogger('common.server.task_manager').setLevel(logging.INFO)
+# Same as the agent's SUPPORTED_CONTENT_TYPES, repeated here so the agent card
+# can be served before the agent module (and Google ADK) is imported.
+SUPPORTED_CONTENT_TYPES = ['text', 'text/plain']
+
+
+def _resolve_aptos_address(aptos_address):
+    """Derives the agent's Aptos address from APTOS_PRIVATE_KEY if not given."""
+    if aptos_address:
+        return aptos_address
+    aptos_private_key = os.environ.get('APTOS_PRIVATE_KEY')
+    if not aptos_private_key:
+        logger.warning("APTOS_PRIVATE_KEY not set, using default aptos_address")
+        return '0x123456789abcdef0123456789abcdef012345678'  # Default address
+    try:
+        # Importing aptos_sdk is slow, so it only happens during deferred setup
+        from common.aptos_config import AptosConfig
+
+        aptos_address = str(AptosConfig(private_key=aptos_private_key).address)
+        logger.info(f"Generated aptos_address from APTOS_PRIVATE_KEY: {aptos_address}")
+        return aptos_address
+    except Exception as e:
+        logger.error(f"Error generating Aptos address from private key: {e}")
+        return '0x123456789abcdef0123456789abcdef012345678'  # Default address
 
 
 @click.command()
@@ -49,22 +78,7 @@ def main(host, port, verify_signatures, aptos_address):
                     'GOOGLE_API_KEY environment variable not set and GOOGLE_GENAI_USE_VERTEXAI is not TRUE.'
                 )
 
-        # If aptos_address is not provided, try to get it from APTOS_PRIVATE_KEY environment variable
-        if not aptos_address:
-            aptos_private_key = os.environ.get('APTOS_PRIVATE_KEY')
-            if aptos_private_key:
-                try:
-                    aptos_config = AptosConfig(private_key=aptos_private_key)
-                    aptos_address = str(aptos_config.address)
-                    logger.info(f"Generated aptos_address from APTOS_PRIVATE_KEY: {aptos_address}")
-                except Exception as e:
-                    logger.error(f"Error generating Aptos address from private key: {e}")
-                    aptos_address = '0x123456789abcdef0123456789abcdef012345678'  # Default address
-            else:
-                logger.warning("APTOS_PRIVATE_KEY not set, using default aptos_address")
-                aptos_address = '0x123456789abcdef0123456789abcdef012345678'  # Default address
-
-        capabilities = AgentCapabilities(streaming=False)
+        capabilities = AgentCapabilities(streaming=True)
         
         # Define agent skills
         planning_skill = AgentSkill(
@@ -103,39 +117,53 @@ def main(host, port, verify_signatures, aptos_address):
             ],
         )
         
-        # Add aptos_address to AgentCard metadata
         agent_card = AgentCard(
             name='Travel Services Agent',
             description='This agent helps users plan trips, book hotels and flights, find destinations, and create comprehensive travel itineraries.',
             url=f'http://localhost:{port}/',
             version='1.0.0',
-            defaultInputModes=TravelAgent.SUPPORTED_CONTENT_TYPES,
-            defaultOutputModes=TravelAgent.SUPPORTED_CONTENT_TYPES,
+            defaultInputModes=SUPPORTED_CONTENT_TYPES,
+            defaultOutputModes=SUPPORTED_CONTENT_TYPES,
             capabilities=capabilities,
             skills=[planning_skill, hotel_skill, flight_skill],
-            metadata={"aptos_address": aptos_address}  # Add aptos address
-        )
-        
-        # Initialize the task manager with signature verification and save aptos_address
-        logger.info(f"Initializing AgentTaskManager with signature verification: {verify_signatures}")
-        agent = TravelAgent()
-        task_manager = AgentTaskManager(
-            agent=agent,
-            verify_signatures=verify_signatures
+            metadata={},  # aptos_address is added by setup_agent
         )
-        # Set agent aptos address
-        task_manager.agent_address = aptos_address
-        logger.info(f"Agent aptos address set to: {aptos_address}")
-        
-        # Also set it as environment variable for easier access
-        os.environ['AGENT_APTOS_ADDRESS'] = aptos_address
         
         server = A2AServer(
             agent_card=agent_card,
-            task_manager=task_manager,
             host=host,
             port=port,
         )
+
+        def setup_agent():
+            # Google ADK and the chain SDKs take most of the startup time, so
+            # they are imported here, after the server is already answering
+            # liveness checks. /health/ready turns green once this returns.
+            from agent import TravelAgent
+            from task_manager import AgentTaskManager
+
+            address = _resolve_aptos_address(aptos_address)
+            agent_card.metadata['aptos_address'] = address
+
+            # Initialize the task manager with signature verification and save aptos_address
+            logger.info(f"Initializing AgentTaskManager with signature verification: {verify_signatures}")
+            task_manager = AgentTaskManager(
+                agent=TravelAgent(),
+                verify_signatures=verify_signatures
+            )
+            # Set agent aptos address
+            task_manager.agent_address = address
+            logger.info(f"Agent aptos address set to: {address}")
+
+            # Also set it as environment variable for easier access
+            os.environ['AGENT_APTOS_ADDRESS'] = address
+            # Large artifact files are sent by URI and served by the server.
+            task_manager.artifact_streamer = ArtifactStreamer.from_env(
+                blobs=server.blobs, base_url=agent_card.url
+            )
+            server.task_manager = task_manager
+
+        server.add_startup_task('agent', setup_agent)
         server.start()
     except MissingAPIKeyError as e:
         logger.error(f'Error: {e}')
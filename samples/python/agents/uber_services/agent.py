@@ -13,9 +13,6 @@ from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
 from google.adk.tools.tool_context import ToolContext
 from task_manager import AgentWithTaskManager
-# Import Aptos related libraries
-from common.aptos_config import AptosConfig
-from common.aptos_blockchain import AptosTaskManager
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 
@@ -855,6 +852,10 @@ async def async_complete_task_on_blockchain(session_id: str, host_agent_address:
                 'note': 'Task completed successfully, blockchain recording skipped due to invalid host agent address'
             }
         
+        # aptos_sdk is imported on first use to keep agent startup fast
+        from common.aptos_blockchain import AptosTaskManager
+        from common.aptos_config import AptosConfig
+
         aptos_config = AptosConfig()
         aptos_task_manager = AptosTaskManager(aptos_config)
         
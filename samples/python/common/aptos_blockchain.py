@@ -9,12 +9,20 @@ from typing import Optional, Dict, Any, Tuple
 from aptos_sdk.transactions import EntryFunction, TransactionArgument, TransactionPayload
 from aptos_sdk.bcs import Serializer
 from aptos_sdk.account_address import AccountAddress
+from aptos_sdk.async_client import ApiError
 
 from .aptos_config import AptosConfig
+from .chain_cache import chain_cache
+from .aptos_sequence import get_sequence_manager
+from .utils.telemetry import traced
 
 
 logger = logging.getLogger(__name__)
 
+# 可变任务视图的缓存时间（秒）
+TASK_VIEW_TTL = 5.0
+TASK_STATS_TTL = 10.0
+
 
 class AptosTaskManager:
     """Aptos任务管理器区块链交互类"""
@@ -23,7 +31,10 @@ class AptosTaskManager:
         self.config = config
         self.client = config.client
         self.account = config.account
+        # 同一账户的所有实例共享序列号分配，并发交易无需逐笔等待确认
+        self.sequence = get_sequence_manager(self.account) if self.account else None
         
+    @traced('aptos.task_manager.create_task')
     async def create_task(self, task_id: str, service_agent: str, amount_apt: int, 
                    deadline_seconds: int, description: str) -> Dict[str, Any]:
         """创建任务并托管APT
@@ -56,38 +67,18 @@ class AptosTaskManager:
                 ],
             )
             
-            # 构建并签名交易
-            signed_transaction = await self.client.create_bcs_signed_transaction(
-                self.account, 
-                TransactionPayload(entry_function)
+            # 使用本地分配的序列号签名并提交，确认结果中已包含交易详情
+            tx_hash = await self.sequence.submit(
+                self.client, TransactionPayload(entry_function)
             )
-            
-            # 提交交易
-            tx_hash = await self.client.submit_bcs_transaction(signed_transaction)
-            
-            # 等待确认
-            await self.client.wait_for_transaction(tx_hash)
-            
-            # 获取交易详情，增强错误处理
-            try:
-                tx_info = await self.client.transaction_by_hash(tx_hash)
-                gas_used = 0
-                vm_status = 'Unknown'
-                
-                if tx_info:
-                    # 处理不同的响应格式
-                    if isinstance(tx_info, dict):
-                        gas_used = tx_info.get('gas_used', 0)
-                        vm_status = tx_info.get('vm_status', 'Success')
-                    elif hasattr(tx_info, 'gas_used'):
-                        gas_used = getattr(tx_info, 'gas_used', 0)
-                        vm_status = getattr(tx_info, 'vm_status', 'Success')
-            except Exception as info_error:
-                logger.warning(f"[APTOS] Could not fetch transaction details: {info_error}")
-                gas_used = 0
-                vm_status = 'Unknown'
+            tx_info = await self.sequence.wait(self.client, tx_hash)
+            gas_used = tx_info.get('gas_used', 0)
+            vm_status = tx_info.get('vm_status', 'Success')
 
-            print(f"[APTOS] Task created successfully: {task_id}, you can check the task on https://explorer.aptoslabs.com/txn/{tx_hash}?network=devnet.")
+            logger.info(
+                "[APTOS] Task created successfully: %s, you can check the task on https://explorer.aptoslabs.com/txn/%s?network=devnet.",
+                task_id, tx_hash,
+            )
             
             return {
                 'success': True,
@@ -100,6 +91,7 @@ class AptosTaskManager:
             logger.error(f"Error creating task on Aptos: {e}")
             return {'success': False, 'error': str(e)}
     
+    @traced('aptos.task_manager.complete_task')
     async def complete_task(self, task_agent_address: str, task_id: str) -> Dict[str, Any]:
         """完成任务
         
@@ -124,15 +116,13 @@ class AptosTaskManager:
                 ],
             )
             
-            signed_transaction = await self.client.create_bcs_signed_transaction(
-                self.account, 
-                TransactionPayload(entry_function)
+            tx_hash = await self.sequence.submit(
+                self.client, TransactionPayload(entry_function)
             )
-            
-            tx_hash = await self.client.submit_bcs_transaction(signed_transaction)
-            await self.client.wait_for_transaction(tx_hash)
+            await self.sequence.wait(self.client, tx_hash)
             
             logger.info(f"[APTOS] Task completed ! check transaction on https://explorer.aptoslabs.com/txn/{tx_hash}?network=devnet.")
+            self._invalidate_task_views(task_agent_address, task_id)
             
             return {'success': True, 'tx_hash': tx_hash}
             
@@ -140,6 +130,7 @@ class AptosTaskManager:
             logger.error(f"Error completing task on Aptos: {e}")
             return {'success': False, 'error': str(e)}
     
+    @traced('aptos.task_manager.cancel_task')
     async def cancel_task(self, task_id: str) -> Dict[str, Any]:
         """取消任务
         
@@ -162,15 +153,13 @@ class AptosTaskManager:
                 ],
             )
             
-            signed_transaction = await self.client.create_bcs_signed_transaction(
-                self.account, 
-                TransactionPayload(entry_function)
+            tx_hash = await self.sequence.submit(
+                self.client, TransactionPayload(entry_function)
             )
-            
-            tx_hash = await self.client.submit_bcs_transaction(signed_transaction)
-            await self.client.wait_for_transaction(tx_hash)
+            await self.sequence.wait(self.client, tx_hash)
             
             logger.info(f"[APTOS] Task cancelled successfully: {task_id}, tx: {tx_hash}")
+            self._invalidate_task_views(str(self.account.address()), task_id)
             
             return {'success': True, 'tx_hash': tx_hash}
             
@@ -178,6 +167,43 @@ class AptosTaskManager:
             logger.error(f"Error cancelling task on Aptos: {e}")
             return {'success': False, 'error': str(e)}
     
+    @traced('aptos.task_manager.get_transaction')
+    async def get_transaction(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        """查询交易回执（经共享缓存）
+
+        已上链的交易是最终确认的，其回执会被永久缓存；仍在内存池中的交易不缓存，
+        查询不到的交易只做短时负缓存。
+
+        Args:
+            tx_hash: 交易哈希
+
+        Returns:
+            链上交易详情，交易不存在时返回None
+        """
+        return await chain_cache.get_receipt(
+            ('aptos', self.config.node_url, 'tx', tx_hash),
+            lambda: self._fetch_transaction(tx_hash),
+            is_final=lambda txn: txn.get('type') != 'pending_transaction',
+        )
+
+    async def _fetch_transaction(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        try:
+            return await self.client.transaction_by_hash(tx_hash)
+        except ApiError as e:
+            if e.status_code == 404:
+                return None
+            raise
+
+    def _view_key(self, function: str, *args: str) -> tuple:
+        return ('aptos', self.config.node_url, self.config.module_address, function, *args)
+
+    def _invalidate_task_views(self, task_agent_address: str, task_id: str):
+        """本进程修改任务状态后，丢弃缓存中的旧视图"""
+        chain_cache.invalidate(self._view_key('get_task_info', task_agent_address, task_id))
+        chain_cache.invalidate(self._view_key('is_task_expired', task_agent_address, task_id))
+        chain_cache.invalidate(self._view_key('get_task_stats', task_agent_address))
+
+    @traced('aptos.task_manager.get_task_info')
     async def get_task_info(self, task_agent_address: str, task_id: str) -> Dict[str, Any]:
         """查询任务信息
         
@@ -192,14 +218,19 @@ class AptosTaskManager:
             # 将 task_id 字符串转换为字节数组
             task_id_bytes = task_id.encode('utf-8')
 
-            # 调用视图函数
-            result = await self.client.view(
-                function=self.config.get_module_function_name("get_task_info"),
-                type_arguments=[],
-                arguments=[
-                    task_agent_address,
-                    "0x" + task_id_bytes.hex()  # 转换为十六进制字符串
-                ]
+            # 调用视图函数；已完成或已取消的任务不会再变化，永久缓存
+            result = await chain_cache.get_view(
+                self._view_key('get_task_info', task_agent_address, task_id),
+                lambda: self.client.view(
+                    function=self.config.get_module_function_name("get_task_info"),
+                    type_arguments=[],
+                    arguments=[
+                        task_agent_address,
+                        "0x" + task_id_bytes.hex()  # 转换为十六进制字符串
+                    ]
+                ),
+                ttl=TASK_VIEW_TTL,
+                is_final=lambda r: bool(r[5] or r[6]),
             )
             
             # 解析返回结果 (tuple)
@@ -218,6 +249,7 @@ class AptosTaskManager:
             logger.error(f"Error querying task info: {e}")
             return {'error': str(e)}
     
+    @traced('aptos.task_manager.get_task_stats')
     async def get_task_stats(self, task_agent_address: str) -> Dict[str, Any]:
         """获取任务统计信息
         
@@ -228,10 +260,14 @@ class AptosTaskManager:
             包含统计信息的字典
         """
         try:
-            result = await self.client.view(
-                function=self.config.get_module_function_name("get_task_stats"),
-                type_arguments=[],
-                arguments=[task_agent_address]
+            result = await chain_cache.get_view(
+                self._view_key('get_task_stats', task_agent_address),
+                lambda: self.client.view(
+                    function=self.config.get_module_function_name("get_task_stats"),
+                    type_arguments=[],
+                    arguments=[task_agent_address]
+                ),
+                ttl=TASK_STATS_TTL,
             )
             
             return {
@@ -244,6 +280,7 @@ class AptosTaskManager:
             logger.error(f"Error querying task stats: {e}")
             return {'error': str(e)}
     
+    @traced('aptos.task_manager.is_task_expired')
     async def is_task_expired(self, task_agent_address: str, task_id: str) -> bool:
         """检查任务是否已过期
         
@@ -258,13 +295,19 @@ class AptosTaskManager:
             # 将 task_id 字符串转换为字节数组
             task_id_bytes = task_id.encode('utf-8')
 
-            result = await self.client.view(
-                function=self.config.get_module_function_name("is_task_expired"),
-                type_arguments=[],
-                arguments=[
-                    task_agent_address,
-                    "0x" + task_id_bytes.hex()  # 转换为十六进制字符串
-                ]
+            # 过期后不会恢复，过期结果永久缓存
+            result = await chain_cache.get_view(
+                self._view_key('is_task_expired', task_agent_address, task_id),
+                lambda: self.client.view(
+                    function=self.config.get_module_function_name("is_task_expired"),
+                    type_arguments=[],
+                    arguments=[
+                        task_agent_address,
+                        "0x" + task_id_bytes.hex()  # 转换为十六进制字符串
+                    ]
+                ),
+                ttl=TASK_VIEW_TTL,
+                is_final=lambda r: bool(r and r[0]),
             )
             
             return result[0] if result else False
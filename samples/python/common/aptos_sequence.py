@@ -0,0 +1,232 @@
+"""Aptos序列号管理模块
+
+create_bcs_signed_transaction默认每次都从节点读取账户序列号，并且调用方在
+提交后会一直等待确认，同一账户的并发交易因此会使用相同的序列号而冲突，或者
+被串行化。本模块在进程内为每个账户分配序列号：
+
+- 序列号在本地递增分配，交易提交后立即返回，多笔交易可同时在途；
+- 等待确认的调用方共享轮询，每轮用一次transactions_by_account请求确认所有
+  在途交易；
+- 提交失败、交易丢失或过期后，等在途交易结束再从链上重新同步序列号。
+
+服务代理会在不同线程的事件循环中完成任务，因此分配状态用线程锁保护，网络请求
+始终使用调用方自己的RestClient。
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional, Union
+
+from aptos_sdk.account import Account
+from aptos_sdk.async_client import RestClient
+from aptos_sdk.transactions import TransactionPayload
+
+
+logger = logging.getLogger(__name__)
+
+# 每个账户只能有一个分配器，否则不同实例会分配出相同的序列号
+_managers: Dict[str, 'AptosSequenceManager'] = {}
+_managers_lock = threading.Lock()
+
+# 没有调用方等待的确认结果最多保留的条数
+MAX_UNCLAIMED_RESULTS = 1000
+
+
+def get_sequence_manager(account: Account) -> 'AptosSequenceManager':
+    """返回账户在进程内共享的序列号分配器"""
+    address = str(account.address())
+    with _managers_lock:
+        manager = _managers.get(address)
+        if manager is None:
+            manager = AptosSequenceManager(account)
+            _managers[address] = manager
+        return manager
+
+
+class TransactionFailed(Exception):
+    """交易已上链但执行失败，或未能在过期前上链"""
+
+    def __init__(self, tx_hash: str, reason: str, txn: Optional[dict] = None):
+        self.tx_hash = tx_hash
+        self.txn = txn
+        super().__init__(f"{reason} - {tx_hash}")
+
+
+class AptosSequenceManager:
+    """单个账户的本地序列号分配与批量确认
+
+    Args:
+        account: 发送交易的账户
+        poll_interval: 批量确认的轮询间隔（秒）
+        batch_size: 每次确认请求最多读取的交易数
+    """
+
+    def __init__(self, account: Account, poll_interval: float = 0.5,
+                 batch_size: int = 100):
+        self.account = account
+        self.address = account.address()
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._next_sequence: Optional[int] = None
+        self._needs_resync = False
+        self._syncing = False
+        self._submitting = 0
+        # sequence_number -> (tx_hash, 过期时间)
+        self._pending: Dict[int, tuple] = {}
+        # tx_hash -> 链上交易详情或TransactionFailed
+        self._results: Dict[str, Union[dict, TransactionFailed]] = {}
+        self._polling = False
+        self._last_poll = 0.0
+        self.submitted = 0
+        self.resyncs = 0
+        self.polls = 0
+
+    @property
+    def in_flight(self) -> int:
+        with self._lock:
+            return self._submitting + len(self._pending)
+
+    async def submit(self, client: RestClient, payload: TransactionPayload) -> str:
+        """分配序列号、签名并提交交易，不等待确认
+
+        Returns:
+            交易哈希，可传给wait()等待确认
+        """
+        sequence_number = await self._reserve(client)
+        try:
+            signed_transaction = await client.create_bcs_signed_transaction(
+                self.account, payload, sequence_number=sequence_number
+            )
+            tx_hash = await client.submit_bcs_transaction(signed_transaction)
+        except Exception:
+            with self._lock:
+                self._submitting -= 1
+                # 之后分配的序列号会留下空洞，需要重新同步
+                self._needs_resync = True
+            raise
+
+        expires_at = time.time() + client.client_config.expiration_ttl
+        with self._lock:
+            self._submitting -= 1
+            self._pending[sequence_number] = (tx_hash, expires_at)
+            self.submitted += 1
+        return tx_hash
+
+    async def wait(self, client: RestClient, tx_hash: str) -> Dict[str, Any]:
+        """等待交易上链并返回链上交易详情
+
+        Raises:
+            TransactionFailed: 交易执行失败或过期
+        """
+        while True:
+            with self._lock:
+                outcome = self._results.pop(tx_hash, None)
+                pending = any(h == tx_hash for h, _ in self._pending.values())
+            if isinstance(outcome, TransactionFailed):
+                raise outcome
+            if outcome is not None:
+                return outcome
+            if not pending:
+                # 不是本分配器提交的交易，退回到逐笔查询
+                await client.wait_for_transaction(tx_hash)
+                return await client.transaction_by_hash(tx_hash)
+            await self._poll(client)
+
+    async def submit_and_wait(self, client: RestClient,
+                              payload: TransactionPayload) -> Dict[str, Any]:
+        return await self.wait(client, await self.submit(client, payload))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'next_sequence': self._next_sequence,
+                'in_flight': self._submitting + len(self._pending),
+                'submitted': self.submitted,
+                'resyncs': self.resyncs,
+                'polls': self.polls,
+            }
+
+    async def _reserve(self, client: RestClient) -> int:
+        while True:
+            with self._lock:
+                if not self._needs_resync and self._next_sequence is not None:
+                    sequence_number = self._next_sequence
+                    self._next_sequence += 1
+                    self._submitting += 1
+                    return sequence_number
+                # 旧序列号之后的在途交易可能已经作废，等它们结束后再同步
+                sync = (not self._syncing and not self._submitting
+                        and not self._pending)
+                if sync:
+                    self._syncing = True
+            if not sync:
+                # 在途交易需要有人确认才能结束
+                await self._poll(client)
+                continue
+            try:
+                sequence_number = await client.account_sequence_number(self.address)
+                with self._lock:
+                    self._next_sequence = sequence_number
+                    if self._needs_resync:
+                        self.resyncs += 1
+                        self._needs_resync = False
+            finally:
+                with self._lock:
+                    self._syncing = False
+
+    async def _poll(self, client: RestClient):
+        """在轮询间隔内只有一个调用方实际请求节点，其余调用方等待结果"""
+        with self._lock:
+            due = time.monotonic() - self._last_poll >= self.poll_interval
+            start = min(self._pending) if self._pending else None
+            leader = due and not self._polling and start is not None
+            if leader:
+                self._polling = True
+        if not leader:
+            await asyncio.sleep(self.poll_interval / 2)
+            return
+        try:
+            txns = await client.transactions_by_account(
+                self.address, limit=self.batch_size, start=start
+            )
+            self._apply(txns, start + self.batch_size)
+        except Exception as e:
+            logger.warning(f"[APTOS] Confirmation poll failed: {e}")
+        finally:
+            with self._lock:
+                self._polling = False
+                self._last_poll = time.monotonic()
+                self.polls += 1
+
+    def _apply(self, txns: list, window_end: int):
+        now = time.time()
+        committed = {int(t['sequence_number']): t for t in txns}
+        with self._lock:
+            for sequence_number in sorted(self._pending):
+                tx_hash, expires_at = self._pending[sequence_number]
+                txn = committed.get(sequence_number)
+                if txn is None:
+                    if now <= expires_at or sequence_number >= window_end:
+                        continue
+                    outcome = TransactionFailed(tx_hash, "transaction expired")
+                    self._needs_resync = True
+                elif txn.get('hash') != tx_hash:
+                    # 该序列号被其他交易占用，本交易不会再上链
+                    outcome = TransactionFailed(
+                        tx_hash, "sequence number used by another transaction", txn
+                    )
+                    self._needs_resync = True
+                elif not txn.get('success'):
+                    # 执行失败的交易仍然消耗了序列号，不需要重新同步
+                    outcome = TransactionFailed(
+                        tx_hash, txn.get('vm_status', 'transaction failed'), txn
+                    )
+                else:
+                    outcome = txn
+                del self._pending[sequence_number]
+                self._results[tx_hash] = outcome
+            while len(self._results) > MAX_UNCLAIMED_RESULTS:
+                del self._results[next(iter(self._results))]
@@ -0,0 +1,167 @@
+"""区块链读缓存模块
+
+SUI和Aptos后端共享的读穿透缓存：
+
+- 已最终确认的交易回执不会再变化，永久缓存；
+- 任务视图等可变数据按较短的TTL缓存；
+- 查询不到的结果（例如交易尚未被节点索引）按更短的TTL做负缓存；
+- 对同一个键的并发查询只向节点发出一次请求。
+
+服务代理会在不同线程的事件循环中访问链，缓存条目用线程锁保护；并发查询的
+合并只在同一事件循环内进行。
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+FOREVER = float('inf')
+
+
+class ChainReadCache:
+    """带单飞合并的区块链读穿透缓存
+
+    Args:
+        max_entries: 最多缓存的条目数，超出时淘汰最久未使用的条目
+        negative_ttl: 查询结果为None时的缓存时间（秒）
+    """
+
+    def __init__(self, max_entries: int = 10000, negative_ttl: float = 2.0):
+        self.max_entries = max_entries
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        # key -> (过期时间, 值)
+        self._entries: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+        # key -> 正在进行的查询
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.joined = 0
+
+    async def get(self, key: Hashable, fetch: Callable[[], Awaitable[Any]],
+                  ttl: Callable[[Any], float]) -> Any:
+        """读取key，未命中时调用fetch并按ttl(value)缓存结果
+
+        Args:
+            key: 缓存键，应包含网络和查询类型
+            fetch: 向节点查询的协程函数
+            ttl: 根据查询结果返回缓存时间；返回FOREVER表示永久缓存，返回0表示
+              不缓存。结果为None时使用negative_ttl。
+
+        fetch抛出的异常不会被缓存。发起查询的调用被取消时，等待同一查询的调用
+        不会随之取消，而是由其中之一重新发起查询。
+        """
+        while True:
+            join, value, future = self._lookup(key)
+            if future is None:
+                return value
+            if not join:
+                return await self._fetch(key, future, fetch, ttl)
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # 发起查询的调用被取消时，由等待者之一重新发起查询
+                if (future.cancelled()
+                        and not asyncio.current_task().cancelling()):
+                    continue
+                raise
+
+    def _lookup(self, key: Hashable
+                ) -> Tuple[bool, Any, Optional[asyncio.Future]]:
+        """返回(是否加入进行中的查询, 缓存值, future)
+
+        命中缓存时future为None；未命中时登记并返回一个新的future，由调用者发起查询。
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return False, entry[1], None
+                del self._entries[key]
+            future = self._in_flight.get(key)
+            if future is not None and future.get_loop() is loop:
+                self.joined += 1
+                return True, None, future
+            future = loop.create_future()
+            self._in_flight[key] = future
+            self.misses += 1
+            return False, None, future
+
+    async def _fetch(self, key: Hashable, future: asyncio.Future,
+                     fetch: Callable[[], Awaitable[Any]],
+                     ttl: Callable[[Any], float]) -> Any:
+        try:
+            value = await fetch()
+        except asyncio.CancelledError:
+            self._finish(key, future)
+            future.cancel()
+            raise
+        except BaseException as e:
+            self._finish(key, future)
+            future.set_exception(e)
+            future.exception()
+            raise
+        seconds = self.negative_ttl if value is None else ttl(value)
+        self._finish(key, future, value, seconds)
+        future.set_result(value)
+        return value
+
+    async def get_receipt(self, key: Hashable,
+                          fetch: Callable[[], Awaitable[Optional[dict]]],
+                          is_final: Callable[[dict], bool]) -> Optional[dict]:
+        """读取交易回执：最终确认的回执永久缓存，未确认的不缓存"""
+        return await self.get(
+            key, fetch, lambda receipt: FOREVER if is_final(receipt) else 0
+        )
+
+    async def get_view(self, key: Hashable, fetch: Callable[[], Awaitable[Any]],
+                       ttl: float,
+                       is_final: Optional[Callable[[Any], bool]] = None) -> Any:
+        """读取视图数据：按ttl缓存，is_final为真的结果（例如已完成的任务）永久缓存"""
+        return await self.get(
+            key,
+            fetch,
+            lambda value: FOREVER if is_final and is_final(value) else ttl,
+        )
+
+    def invalidate(self, key: Hashable):
+        """在本进程修改了链上状态后使对应的视图失效"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'joined': self.joined,
+            }
+
+    def _finish(self, key: Hashable, future: asyncio.Future,
+                value: Any = None, seconds: float = 0):
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+            if seconds > 0:
+                self._entries[key] = (time.monotonic() + seconds, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+
+# 进程内共享的缓存实例
+chain_cache = ChainReadCache()
@@ -0,0 +1,420 @@
+"""链上任务事件索引模块
+
+后台跟踪task_manager模块的TaskCreatedEvent、TaskCompletedEvent和
+TaskCancelledEvent事件，写入本地SQLite索引，按任务ID、服务代理地址和任务创建者
+地址查询。托管校验、get_task_stats和is_task_expired因此可以在本地完成，不再需要
+每次请求都访问节点。
+
+事件来源可以是SUI节点（SUIEventSource），也可以是录制好的事件文件
+（ReplayEventSource），后者用于离线测试和复现问题。
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from .sui_node import sui_call
+
+
+logger = logging.getLogger(__name__)
+
+# 事件类型名 -> 任务状态变化
+TASK_EVENTS = {
+    'TaskCreatedEvent': 'created',
+    'TaskCompletedEvent': 'completed',
+    'TaskCancelledEvent': 'cancelled',
+}
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    task_id TEXT,
+    task_object_id TEXT,
+    task_agent TEXT,
+    service_agent TEXT,
+    pay_amount INTEGER,
+    created_at INTEGER,
+    deadline INTEGER,
+    description TEXT,
+    status TEXT NOT NULL,
+    created_tx TEXT,
+    closed_tx TEXT,
+    closed_at INTEGER
+);
+CREATE INDEX IF NOT EXISTS tasks_by_task_id ON tasks (task_id, task_agent);
+CREATE INDEX IF NOT EXISTS tasks_by_object ON tasks (task_object_id);
+CREATE INDEX IF NOT EXISTS tasks_by_service_agent ON tasks (service_agent, status);
+CREATE INDEX IF NOT EXISTS tasks_by_task_agent ON tasks (task_agent, status, deadline);
+CREATE INDEX IF NOT EXISTS tasks_by_created_tx ON tasks (created_tx);
+CREATE TABLE IF NOT EXISTS cursors (
+    source TEXT PRIMARY KEY,
+    cursor TEXT
+);
+'''
+
+TASK_COLUMNS = (
+    'task_id', 'task_object_id', 'task_agent', 'service_agent', 'pay_amount',
+    'created_at', 'deadline', 'description', 'status', 'created_tx',
+    'closed_tx', 'closed_at',
+)
+
+
+def _seconds(value: Any) -> Optional[int]:
+    """链上时间戳可能是秒或毫秒，统一为秒"""
+    if value is None or value == '':
+        return None
+    value = int(value)
+    return value // 1000 if value > 10**11 else value
+
+
+def normalize_event(event: Dict[str, Any],
+                    tx_hash: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """把SUI或Aptos的原始事件转换为统一格式，非任务事件返回None
+
+    SUI事件的字段在parsedJson中，交易摘要在id.txDigest中；Aptos事件的字段在
+    data中。
+    """
+    kind = TASK_EVENTS.get(event.get('type', '').rsplit('::', 1)[-1])
+    if kind is None:
+        return None
+    data = event.get('parsedJson') or event.get('data') or {}
+    event_id = event.get('id') if isinstance(event.get('id'), dict) else {}
+    pay_amount = data.get('pay_amount', data.get('amount'))
+    return {
+        'kind': kind,
+        'task_id': data.get('task_id'),
+        'task_object_id': data.get('task_object_id'),
+        'task_agent': data.get('task_agent') or data.get('creator'),
+        'service_agent': data.get('service_agent'),
+        'pay_amount': int(pay_amount) if pay_amount is not None else None,
+        'deadline': _seconds(data.get('deadline')),
+        'description': data.get('description'),
+        'tx_hash': tx_hash or event_id.get('txDigest') or event.get('transaction_hash'),
+        'timestamp': _seconds(
+            event.get('timestampMs') or data.get('created_at')
+            or data.get('timestamp')
+        ),
+    }
+
+
+class TaskEventIndex:
+    """任务托管状态的本地SQLite索引
+
+    写入是幂等的：同一事件重放多次，或完成事件先于创建事件到达，索引的最终
+    状态都相同。
+
+    Args:
+        path: SQLite数据库路径，默认使用内存数据库
+    """
+
+    def __init__(self, path: str = ':memory:'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def apply(self, events: Iterable[Dict[str, Any]],
+              source: Optional[str] = None, cursor: Any = None) -> int:
+        """写入一批原始事件，并在同一事务中保存source的读取位置
+
+        Returns:
+            写入的任务事件数
+        """
+        count = 0
+        with self._lock, self._conn:
+            for event in events:
+                normalized = normalize_event(event)
+                if normalized is not None:
+                    self._apply(normalized)
+                    count += 1
+            if source is not None:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO cursors (source, cursor) VALUES (?, ?)',
+                    (source, json.dumps(cursor)),
+                )
+        return count
+
+    def record_transaction(self, tx_hash: str,
+                           events: Iterable[Dict[str, Any]]) -> int:
+        """写入一笔交易回执中的事件（回执中的事件不带交易摘要）"""
+        count = 0
+        with self._lock, self._conn:
+            for event in events:
+                normalized = normalize_event(event, tx_hash)
+                if normalized is not None:
+                    self._apply(normalized)
+                    count += 1
+        return count
+
+    def get_cursor(self, source: str) -> Any:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT cursor FROM cursors WHERE source = ?', (source,)
+            ).fetchone()
+        return json.loads(row['cursor']) if row else None
+
+    def get_task(self, task_id: str,
+                 task_agent: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """按任务ID（和创建者地址）查询任务，有多个同名任务时返回最新创建的"""
+        query = 'SELECT * FROM tasks WHERE task_id = ?'
+        args: Tuple = (task_id,)
+        if task_agent:
+            query += ' AND task_agent = ?'
+            args += (task_agent,)
+        return self._fetch_one(query + ' ORDER BY id DESC LIMIT 1', args)
+
+    def get_task_by_tx(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        """按创建交易摘要查询任务"""
+        return self._fetch_one(
+            'SELECT * FROM tasks WHERE created_tx = ? LIMIT 1', (tx_hash,)
+        )
+
+    def get_task_by_object(self, task_object_id: str) -> Optional[Dict[str, Any]]:
+        """按任务对象ID查询任务"""
+        return self._fetch_one(
+            'SELECT * FROM tasks WHERE task_object_id = ? LIMIT 1', (task_object_id,)
+        )
+
+    def tasks_for_service_agent(self, service_agent: str,
+                                status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """查询支付给某个服务代理的任务"""
+        query = 'SELECT * FROM tasks WHERE service_agent = ?'
+        args: Tuple = (service_agent,)
+        if status:
+            query += ' AND status = ?'
+            args += (status,)
+        with self._lock:
+            rows = self._conn.execute(query + ' ORDER BY id', args).fetchall()
+        return [dict(row) for row in rows]
+
+    def open_tasks(self, task_agent: str) -> List[Dict[str, Any]]:
+        """查询某个创建者尚未完成或取消的任务，按截止时间排序"""
+        with self._lock:
+            rows = self._conn.execute(
+                '''SELECT * FROM tasks WHERE task_agent = ? AND status = 'open'
+                   ORDER BY deadline''',
+                (task_agent,),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_task_stats(self, task_agent: str) -> Dict[str, int]:
+        with self._lock:
+            row = self._conn.execute(
+                '''SELECT COUNT(*) AS total_tasks,
+                          COALESCE(SUM(status = 'completed'), 0) AS completed_tasks,
+                          COALESCE(SUM(status = 'cancelled'), 0) AS cancelled_tasks
+                   FROM tasks WHERE task_agent = ?''',
+                (task_agent,),
+            ).fetchone()
+        return dict(row)
+
+    def is_task_expired(self, task_id: str, task_agent: Optional[str] = None,
+                        now: Optional[float] = None) -> bool:
+        """未完成且已过截止时间的任务视为过期；未知任务返回False"""
+        task = self.get_task(task_id, task_agent)
+        return task is not None and self.is_expired(task, now)
+
+    @staticmethod
+    def is_expired(task: Dict[str, Any], now: Optional[float] = None) -> bool:
+        if task['status'] != 'open' or task['deadline'] is None:
+            return False
+        return (now if now is not None else time.time()) > task['deadline']
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _fetch_one(self, query: str, args: Tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(query, args).fetchone()
+        return dict(row) if row else None
+
+    def _find(self, event: Dict[str, Any]) -> Optional[sqlite3.Row]:
+        if event['task_object_id']:
+            row = self._conn.execute(
+                'SELECT * FROM tasks WHERE task_object_id = ?',
+                (event['task_object_id'],),
+            ).fetchone()
+            if row:
+                return row
+        if event['task_id'] and event['task_agent']:
+            return self._conn.execute(
+                '''SELECT * FROM tasks WHERE task_id = ? AND task_agent = ?
+                   ORDER BY id DESC LIMIT 1''',
+                (event['task_id'], event['task_agent']),
+            ).fetchone()
+        return None
+
+    def _apply(self, event: Dict[str, Any]):
+        row = self._find(event)
+        task = dict(row) if row else dict.fromkeys(TASK_COLUMNS)
+        for column in ('task_id', 'task_object_id', 'task_agent',
+                       'service_agent', 'pay_amount', 'deadline',
+                       'description'):
+            if event[column] is not None:
+                task[column] = event[column]
+
+        if event['kind'] == 'created':
+            task['created_tx'] = event['tx_hash']
+            task['created_at'] = event['timestamp']
+            # 关闭事件可能先于创建事件被读取
+            task['status'] = task['status'] or 'open'
+        else:
+            task['status'] = event['kind']
+            task['closed_tx'] = event['tx_hash']
+            task['closed_at'] = event['timestamp']
+
+        values = [task[column] for column in TASK_COLUMNS]
+        if row is None:
+            self._conn.execute(
+                f'INSERT INTO tasks ({", ".join(TASK_COLUMNS)}) '
+                f'VALUES ({", ".join("?" * len(TASK_COLUMNS))})',
+                values,
+            )
+        else:
+            self._conn.execute(
+                f'UPDATE tasks SET {", ".join(c + " = ?" for c in TASK_COLUMNS)} '
+                'WHERE id = ?',
+                values + [row['id']],
+            )
+
+
+class SUIEventSource:
+    """从SUI节点按页读取task_manager模块的事件"""
+
+    def __init__(self, config):
+        self.config = config
+        self.name = f'sui:{config.network}:{config.task_manager_package_id}'
+
+    async def fetch(self, cursor: Any, limit: int) -> Tuple[List[dict], Any, bool]:
+        """读取cursor之后的一页事件
+
+        Returns:
+            (事件列表, 下一页的cursor, 是否还有更多事件)
+        """
+        page = await sui_call('queryEvents', {
+            'network': self.config.network,
+            'packageId': self.config.task_manager_package_id,
+            'module': 'task_manager',
+            'cursor': cursor,
+            'limit': int(limit),
+        })
+        next_cursor = page.get('nextCursor') or cursor
+        return page.get('data', []), next_cursor, bool(page.get('hasNextPage'))
+
+
+class ReplayEventSource:
+    """从录制的事件文件中按页读取事件
+
+    Args:
+        events: 事件列表，或JSON数组/JSON Lines文件路径。文件中的事件与节点
+          返回的原始事件格式相同。
+    """
+
+    def __init__(self, events: Union[str, List[dict]]):
+        if isinstance(events, str):
+            self.name = f'replay:{os.path.abspath(events)}'
+            self.events = self._load(events)
+        else:
+            self.name = 'replay'
+            self.events = list(events)
+
+    async def fetch(self, cursor: Any, limit: int) -> Tuple[List[dict], Any, bool]:
+        start = cursor or 0
+        end = min(start + limit, len(self.events))
+        return self.events[start:end], end, end < len(self.events)
+
+    @staticmethod
+    def _load(path: str) -> List[dict]:
+        with open(path, encoding='utf-8') as f:
+            text = f.read()
+        if text.lstrip().startswith('['):
+            return json.loads(text)
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+class ChainEventIndexer:
+    """在后台把事件来源同步到TaskEventIndex
+
+    读取位置与事件在同一事务中保存，重启后从上次的位置继续。
+
+    Args:
+        index: 写入的本地索引
+        source: SUIEventSource或ReplayEventSource
+        poll_interval: 追上最新事件后的轮询间隔（秒）
+        page_size: 每次请求读取的事件数
+    """
+
+    def __init__(self, index: TaskEventIndex, source, poll_interval: float = 2.0,
+                 page_size: int = 50):
+        self.index = index
+        self.source = source
+        self.poll_interval = poll_interval
+        self.page_size = page_size
+        self.indexed = 0
+        self.last_sync: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls, config) -> 'ChainEventIndexer':
+        """根据环境变量创建索引器
+
+        SUI_EVENT_INDEX为SQLite文件路径（默认使用内存数据库）；设置了
+        SUI_EVENT_REPLAY时从该事件文件重放，而不是连接节点。
+        """
+        index = TaskEventIndex(os.getenv('SUI_EVENT_INDEX', ':memory:'))
+        replay = os.getenv('SUI_EVENT_REPLAY')
+        source = ReplayEventSource(replay) if replay else SUIEventSource(config)
+        return cls(
+            index,
+            source,
+            poll_interval=float(os.getenv('SUI_EVENT_POLL_INTERVAL', '2.0')),
+        )
+
+    async def sync(self) -> int:
+        """读取到最新事件为止
+
+        Returns:
+            本次写入的任务事件数
+        """
+        count = 0
+        cursor = self.index.get_cursor(self.source.name)
+        while True:
+            events, cursor, has_more = await self.source.fetch(cursor, self.page_size)
+            count += self.index.apply(events, self.source.name, cursor)
+            if not has_more:
+                break
+        self.indexed += count
+        self.last_sync = time.time()
+        return count
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            'source': self.source.name,
+            'indexed': self.indexed,
+            'last_sync': self.last_sync,
+        }
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.warning(f"[SUI] Event index sync failed: {e}")
+            await asyncio.sleep(self.poll_interval)
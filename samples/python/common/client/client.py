@@ -6,7 +6,7 @@ from typing import Any
 import httpx
 
 from httpx._types import TimeoutTypes
-from httpx_sse import connect_sse
+from httpx_sse import aconnect_sse
 
 from common.types import (
     A2AClientHTTPError,
@@ -26,6 +26,7 @@ from common.types import (
     SetTaskPushNotificationRequest,
     SetTaskPushNotificationResponse,
 )
+from common.utils import telemetry
 
 
 class A2AClient:
@@ -34,6 +35,7 @@ class A2AClient:
         agent_card: AgentCard = None,
         url: str = None,
         timeout: TimeoutTypes = 60.0,
+        transport: httpx.AsyncBaseTransport | None = None,
     ):
         if agent_card:
             self.url = agent_card.url
@@ -42,29 +44,51 @@ class A2AClient:
         else:
             raise ValueError('Must provide either agent_card or url')
         self.timeout = timeout
+        # Set to reach an in-process agent, e.g. with httpx.ASGITransport.
+        self.transport = transport
 
     async def send_task(self, payload: dict[str, Any]) -> SendTaskResponse:
         request = SendTaskRequest(params=payload)
         return SendTaskResponse(**await self._send_request(request))
 
+    @telemetry.traced('a2a.client.stream')
     async def send_task_streaming(
         self, payload: dict[str, Any]
     ) -> AsyncIterable[SendTaskStreamingResponse]:
         request = SendTaskStreamingRequest(params=payload)
-        with httpx.Client(timeout=None) as client:
-            with connect_sse(
+        self._inject_trace(request)
+        # An async client keeps the event loop free while the stream is open,
+        # so several remote agents can be streamed from concurrently.
+        async with httpx.AsyncClient(
+            timeout=None, transport=self.transport
+        ) as client:
+            async with aconnect_sse(
                 client, 'POST', self.url, json=request.model_dump()
             ) as event_source:
                 try:
-                    for sse in event_source.iter_sse():
+                    async for sse in event_source.aiter_sse():
                         yield SendTaskStreamingResponse(**json.loads(sse.data))
                 except json.JSONDecodeError as e:
                     raise A2AClientJSONError(str(e)) from e
                 except httpx.RequestError as e:
                     raise A2AClientHTTPError(400, str(e)) from e
 
+    def _inject_trace(self, request: JSONRPCRequest):
+        # The agent continues the trace of the span sending the message.
+        message = getattr(request.params, 'message', None)
+        if message is not None:
+            message.metadata = telemetry.inject_trace(message.metadata)
+
     async def _send_request(self, request: JSONRPCRequest) -> dict[str, Any]:
-        async with httpx.AsyncClient() as client:
+        with telemetry.span(
+            'a2a.client.request',
+            **{'rpc.method': request.method, 'server.address': self.url},
+        ):
+            self._inject_trace(request)
+            return await self._post(request)
+
+    async def _post(self, request: JSONRPCRequest) -> dict[str, Any]:
+        async with httpx.AsyncClient(transport=self.transport) as client:
             try:
                 # Image generation could take time, adding timeout
                 response = await client.post(
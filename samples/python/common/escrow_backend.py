@@ -0,0 +1,249 @@
+"""任务托管后端接口
+
+HostAgent和服务代理只依赖EscrowBackend协议，不直接依赖某条链：
+
+- SUIEscrowBackend：基于SUITaskManager和SUISignatureManager；
+- AptosEscrowBackend：基于AptosTaskManager和AptosSignatureManager；
+- common.fake_chain.FakeChainBackend：进程内的模拟链，用于离线测试和压测。
+
+create()返回的task_ref是后续complete()/cancel()定位托管所需的引用：SUI为任务
+对象ID，Aptos为任务ID。
+
+调用方先用available()判断后端能否使用，不可用时（未配置私钥、无法连接节点）
+退回到不带托管的流程。
+"""
+
+import time
+from typing import Any, Dict, Optional, Protocol, runtime_checkable
+
+from .chain_indexer import ChainEventIndexer, TaskEventIndex
+from .escrow_reaper import EscrowReaper
+from .sui_blockchain import SUISignatureManager, SUITaskManager
+from .sui_config import SUIConfig
+from .sui_gas_pool import SUIGasPool
+
+
+@runtime_checkable
+class EscrowBackend(Protocol):
+    """任务托管后端协议"""
+
+    # 链名称，例如'sui'、'aptos'、'fake'
+    chain: str
+    # 本后端签名和创建托管使用的地址，未配置私钥时为None
+    address: Optional[str]
+
+    async def available(self) -> bool:
+        """能否签名和创建托管"""
+        ...
+
+    async def create(self, task_id: str, service_agent: str, amount: int,
+                     deadline_seconds: int, description: str) -> Dict[str, Any]:
+        """创建托管，返回包含success、tx_hash和task_ref的字典"""
+        ...
+
+    async def complete(self, task_agent: str, task_ref: str) -> Dict[str, Any]:
+        """服务代理完成任务并领取托管资金"""
+        ...
+
+    async def cancel(self, task_ref: str) -> Dict[str, Any]:
+        """任务创建者取消任务并取回托管资金"""
+        ...
+
+    async def get_info(self, task_agent: str, task_id: str) -> Dict[str, Any]:
+        """查询任务信息，字段与AptosTaskManager.get_task_info相同"""
+        ...
+
+    async def get_transaction(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        """查询交易回执，包含success字段；交易不存在时返回None"""
+        ...
+
+    async def get_task_by_tx(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        """按创建交易查询托管，字段与TaskEventIndex中的任务记录相同"""
+        ...
+
+    def sign(self, message: str) -> Optional[str]:
+        ...
+
+    def verify(self, message: str, signature: str, public_key: str) -> bool:
+        ...
+
+
+class SUIEscrowBackend:
+    """SUI托管后端
+
+    未传入的SUIConfig、SUITaskManager和SUISignatureManager在第一次使用时才
+    创建，因此没有私钥时也可以构造本后端，此时available()返回False。自行创建
+    SUITaskManager时，同时创建事件索引器和到期回收器：create()成功后启动它们，
+    并把新托管交给回收器。
+
+    Args:
+        task_manager: 可选的SUITaskManager
+        signature_manager: 可选的SUISignatureManager
+        private_key: 私钥，默认读取TASK_AGENT_PRIVATE_KEY
+    """
+
+    chain = 'sui'
+
+    def __init__(self, task_manager: Optional[SUITaskManager] = None,
+                 signature_manager: Optional[SUISignatureManager] = None,
+                 private_key: Optional[str] = None):
+        self._task_manager = task_manager
+        self._signature_manager = signature_manager
+        self._private_key = private_key
+        self._config = task_manager.config if task_manager else None
+        self._config_error: Optional[Exception] = None
+        self.indexer: Optional[ChainEventIndexer] = None
+        self.reaper: Optional[EscrowReaper] = None
+
+    @property
+    def config(self) -> SUIConfig:
+        if self._config is None:
+            self._config = SUIConfig(self._private_key)
+        return self._config
+
+    @property
+    def address(self) -> Optional[str]:
+        if self._config is None and self._config_error is None:
+            try:
+                self._config = SUIConfig(self._private_key)
+            except ValueError as e:
+                # 未配置私钥，记住结果以免每次都重新读取
+                self._config_error = e
+        return self._config.address if self._config else None
+
+    @property
+    def task_manager(self) -> SUITaskManager:
+        if self._task_manager is None:
+            config = self.config
+            self.indexer = ChainEventIndexer.from_env(config)
+            # 设置SUI_GAS_POOL_SIZE时每笔托管使用各自的gas币，并发创建不冲突
+            self._task_manager = SUITaskManager(
+                config,
+                gas_pool=SUIGasPool.from_env(config),
+                index=self.indexer.index,
+            )
+            # 截止时间后仍未完成的托管被取消，资金退回而不是一直锁定
+            self.reaper = EscrowReaper.from_env(
+                self._task_manager, owner=config.address, index=self.indexer.index
+            )
+        return self._task_manager
+
+    @property
+    def signature_manager(self) -> SUISignatureManager:
+        if self._signature_manager is None:
+            self._signature_manager = SUISignatureManager(self.config)
+        return self._signature_manager
+
+    async def available(self) -> bool:
+        if self.address is None:
+            return False
+        return await self.config.is_connected()
+
+    async def create(self, task_id: str, service_agent: str, amount: int,
+                     deadline_seconds: int, description: str) -> Dict[str, Any]:
+        result = await self.task_manager.create_task(
+            task_id=task_id,
+            service_agent=service_agent,
+            amount_sui=amount,
+            deadline_seconds=deadline_seconds,
+            description=description,
+        )
+        if result.get('success') and self.reaper is not None:
+            await self.indexer.start()
+            await self.reaper.start()
+            self.reaper.track(
+                result.get('task_object_id'),
+                time.time() + deadline_seconds,
+                amount,
+                task_id,
+            )
+        return {
+            **result,
+            'task_ref': result.get('task_object_id'),
+            'package_id': self.config.task_manager_package_id,
+        }
+
+    async def complete(self, task_agent: str, task_ref: str) -> Dict[str, Any]:
+        return await self.task_manager.complete_task(task_ref)
+
+    async def cancel(self, task_ref: str) -> Dict[str, Any]:
+        return await self.task_manager.cancel_task(task_ref)
+
+    async def get_info(self, task_agent: str, task_id: str) -> Dict[str, Any]:
+        return await self.task_manager.get_task_info(task_agent, task_id)
+
+    async def get_transaction(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        return await self.task_manager.get_transaction(tx_hash)
+
+    async def get_task_by_tx(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        task_manager = self.task_manager
+        if self.indexer is not None:
+            # 后台跟踪事件，之后的托管校验多数只需查本地索引
+            await self.indexer.start()
+        return await task_manager.get_task_by_tx(tx_hash)
+
+    def sign(self, message: str) -> Optional[str]:
+        if self.address is None:
+            return None
+        return self.signature_manager.sign_message(message)
+
+    def verify(self, message: str, signature: str, public_key: str) -> bool:
+        return self.signature_manager.verify_signature(message, signature, public_key)
+
+
+class AptosEscrowBackend:
+    """Aptos托管后端"""
+
+    chain = 'aptos'
+
+    def __init__(self, task_manager, signature_manager):
+        self.task_manager = task_manager
+        self.signature_manager = signature_manager
+        account = task_manager.account
+        self.address = str(account.address()) if account else None
+        # Aptos没有后台事件索引，只记录查询过的交易回执中的事件
+        self._tx_index = TaskEventIndex()
+
+    async def available(self) -> bool:
+        if self.address is None:
+            return False
+        return await self.task_manager.config.is_connected()
+
+    async def create(self, task_id: str, service_agent: str, amount: int,
+                     deadline_seconds: int, description: str) -> Dict[str, Any]:
+        result = await self.task_manager.create_task(
+            task_id=task_id,
+            service_agent=service_agent,
+            amount_apt=amount,
+            deadline_seconds=deadline_seconds,
+            description=description,
+        )
+        return {**result, 'task_ref': task_id}
+
+    async def complete(self, task_agent: str, task_ref: str) -> Dict[str, Any]:
+        return await self.task_manager.complete_task(task_agent, task_ref)
+
+    async def cancel(self, task_ref: str) -> Dict[str, Any]:
+        return await self.task_manager.cancel_task(task_ref)
+
+    async def get_info(self, task_agent: str, task_id: str) -> Dict[str, Any]:
+        return await self.task_manager.get_task_info(task_agent, task_id)
+
+    async def get_transaction(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        return await self.task_manager.get_transaction(tx_hash)
+
+    async def get_task_by_tx(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        task = self._tx_index.get_task_by_tx(tx_hash)
+        if task is not None:
+            return task
+        receipt = await self.get_transaction(tx_hash)
+        if not receipt or not receipt.get('success'):
+            return None
+        self._tx_index.record_transaction(tx_hash, receipt.get('events', []))
+        return self._tx_index.get_task_by_tx(tx_hash)
+
+    def sign(self, message: str) -> Optional[str]:
+        return self.signature_manager.sign_message(message)
+
+    def verify(self, message: str, signature: str, public_key: str) -> bool:
+        return self.signature_manager.verify_signature(message, signature, public_key)
@@ -0,0 +1,254 @@
+"""托管到期回收模块
+
+超过截止时间仍未完成的任务会一直锁定托管资金。本模块按截止时间维护一个未结束
+托管的小顶堆，定期把已过期的托管批量放进一笔可编程交易中取消，退回资金。
+
+托管来源有两个：HostAgent在confirm_task创建托管后调用track()，以及事件索引中
+本地址创建的、尚未结束的任务。
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+from .chain_indexer import TaskEventIndex
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Escrow:
+    """等待完成或回收的托管"""
+
+    task_object_id: str
+    deadline: float
+    amount: int = 0
+    task_id: Optional[str] = None
+    attempts: int = 0
+
+
+@dataclass
+class ReapReport:
+    """一轮回收的结果"""
+
+    cancelled: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+    reclaimed: int = 0
+    transactions: List[str] = field(default_factory=list)
+    duration: float = 0.0
+
+
+class EscrowReaper:
+    """批量取消过期托管的后台任务
+
+    Args:
+        task_manager: 提供cancel_tasks()的SUITaskManager
+        owner: 托管创建者地址，用于从事件索引加载托管
+        index: 可选的事件索引，用于加载托管并跳过已在链上结束的托管
+        interval: 检查间隔（秒）
+        batch_size: 每笔交易最多取消的托管数
+        grace: 截止时间之后再等待的秒数，避免与节点时钟偏差冲突
+        max_attempts: 单个托管取消失败的最大重试次数
+        retry_delay: 取消失败后重新排队的延迟（秒）
+    """
+
+    def __init__(self, task_manager, owner: Optional[str] = None,
+                 index: Optional[TaskEventIndex] = None,
+                 interval: float = 60.0, batch_size: int = 20,
+                 grace: float = 30.0, max_attempts: int = 3,
+                 retry_delay: float = 300.0):
+        self.task_manager = task_manager
+        self.owner = owner
+        self.index = index
+        self.interval = interval
+        self.batch_size = batch_size
+        self.grace = grace
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        # (到期时间, 序号, task_object_id)；堆中的过时条目在弹出时丢弃
+        self._heap: List[tuple] = []
+        self._escrows: Dict[str, Escrow] = {}
+        self._due: Dict[str, float] = {}
+        # 多次取消失败后放弃的托管，不再从事件索引重新加载
+        self._abandoned: Set[str] = set()
+        self._counter = itertools.count()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.cancelled = 0
+        self.reclaimed = 0
+        self.failed = 0
+        self.last_report: Optional[ReapReport] = None
+
+    @classmethod
+    def from_env(cls, task_manager, owner: Optional[str] = None,
+                 index: Optional[TaskEventIndex] = None) -> Optional['EscrowReaper']:
+        """根据ESCROW_REAPER_*环境变量创建回收器，间隔为0时返回None"""
+        interval = float(os.getenv('ESCROW_REAPER_INTERVAL', '60'))
+        if interval <= 0:
+            return None
+        return cls(
+            task_manager,
+            owner=owner,
+            index=index,
+            interval=interval,
+            batch_size=int(os.getenv('ESCROW_REAPER_BATCH_SIZE', '20')),
+            grace=float(os.getenv('ESCROW_REAPER_GRACE', '30')),
+        )
+
+    def __len__(self) -> int:
+        return len(self._escrows)
+
+    def track(self, task_object_id: str, deadline: float, amount: int = 0,
+              task_id: Optional[str] = None):
+        """登记一个新托管，deadline为Unix时间戳（秒）"""
+        if not task_object_id or task_object_id in self._abandoned:
+            return
+        escrow = self._escrows.get(task_object_id)
+        if escrow is not None:
+            return
+        escrow = Escrow(task_object_id, deadline, amount, task_id)
+        self._escrows[task_object_id] = escrow
+        self._schedule(escrow, deadline + self.grace)
+
+    def forget(self, task_object_id: str):
+        """托管已完成或已取消，不再需要回收"""
+        self._escrows.pop(task_object_id, None)
+        self._due.pop(task_object_id, None)
+
+    def load_from_index(self) -> int:
+        """从事件索引加载本地址创建的未结束托管"""
+        if self.index is None or not self.owner:
+            return 0
+        count = 0
+        for task in self.index.open_tasks(self.owner):
+            if task['task_object_id'] and task['deadline'] is not None:
+                self.track(
+                    task['task_object_id'], task['deadline'],
+                    task['pay_amount'] or 0, task['task_id'],
+                )
+                count += 1
+        return count
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def reap(self, now: Optional[float] = None) -> ReapReport:
+        """取消所有已到期的托管
+
+        Returns:
+            本轮回收结果
+        """
+        async with self._lock:
+            started = time.monotonic()
+            report = ReapReport()
+            now = now if now is not None else time.time()
+            while True:
+                batch = self._pop_due(now)
+                if not batch:
+                    break
+                await self._cancel(batch, report, now)
+            report.duration = time.monotonic() - started
+
+            self.cancelled += len(report.cancelled)
+            self.reclaimed += report.reclaimed
+            self.failed += len(report.failed)
+            self.last_report = report
+            if report.cancelled or report.failed:
+                logger.info(
+                    f"[SUI] Escrow reaper cancelled {len(report.cancelled)} task(s) "
+                    f"in {len(report.transactions)} tx, reclaimed {report.reclaimed} MIST, "
+                    f"{len(report.failed)} failed, took {report.duration:.2f}s"
+                )
+            return report
+
+    def stats(self) -> dict:
+        next_due = min(self._due.values()) if self._due else None
+        return {
+            'tracked': len(self._escrows),
+            'next_due': next_due,
+            'cancelled': self.cancelled,
+            'reclaimed': self.reclaimed,
+            'failed': self.failed,
+            'last_duration': self.last_report.duration if self.last_report else None,
+        }
+
+    def _schedule(self, escrow: Escrow, due: float):
+        self._due[escrow.task_object_id] = due
+        heapq.heappush(self._heap, (due, next(self._counter), escrow.task_object_id))
+
+    def _pop_due(self, now: float) -> List[Escrow]:
+        batch = []
+        while self._heap and len(batch) < self.batch_size:
+            due, _, task_object_id = self._heap[0]
+            if due > now:
+                break
+            heapq.heappop(self._heap)
+            if self._due.get(task_object_id) != due:
+                continue  # 已被forget或重新排期
+            del self._due[task_object_id]
+            escrow = self._escrows[task_object_id]
+            if self._closed_on_chain(escrow):
+                del self._escrows[task_object_id]
+                continue
+            batch.append(escrow)
+        return batch
+
+    def _closed_on_chain(self, escrow: Escrow) -> bool:
+        if self.index is None:
+            return False
+        task = self.index.get_task_by_object(escrow.task_object_id)
+        return task is not None and task['status'] != 'open'
+
+    async def _cancel(self, batch: List[Escrow], report: ReapReport, now: float):
+        result = await self.task_manager.cancel_tasks(
+            [e.task_object_id for e in batch]
+        )
+        if result.get('success'):
+            report.transactions.append(result.get('tx_hash'))
+            report.reclaimed += result.get('refunded') or sum(e.amount for e in batch)
+            for escrow in batch:
+                report.cancelled.append(escrow.task_object_id)
+                self._escrows.pop(escrow.task_object_id, None)
+            return
+
+        if len(batch) > 1:
+            # 一个托管失败会使整笔交易失败，拆成两半找出失败的托管
+            middle = len(batch) // 2
+            await self._cancel(batch[:middle], report, now)
+            await self._cancel(batch[middle:], report, now)
+            return
+
+        (escrow,) = batch
+        escrow.attempts += 1
+        if escrow.attempts >= self.max_attempts:
+            logger.error(
+                f"[SUI] Giving up cancelling task {escrow.task_object_id}: "
+                f"{result.get('error')}"
+            )
+            report.failed.append(escrow.task_object_id)
+            self._escrows.pop(escrow.task_object_id, None)
+            self._abandoned.add(escrow.task_object_id)
+        else:
+            self._schedule(escrow, now + self.retry_delay)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                # 事件索引可能同步到了其他进程或上次运行创建的托管
+                self.load_from_index()
+                await self.reap()
+            except Exception as e:
+                logger.warning(f"[SUI] Escrow reaper failed: {e}")
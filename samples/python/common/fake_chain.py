@@ -0,0 +1,264 @@
+"""进程内模拟链
+
+FakeChain在内存中实现task_manager合约的托管语义（创建、完成、取消），用于
+离线测试和压测。交易的最终确认延迟和失败率可配置，随机数由seed决定，同样的
+调用顺序总是得到同样的结果。
+
+链上事件使用与SUI节点相同的格式，可以直接交给TaskEventIndex或
+ChainEventIndexer（通过event_source()）。
+"""
+
+import asyncio
+import hashlib
+import hmac
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .chain_indexer import ChainEventIndexer, TaskEventIndex
+
+
+@dataclass
+class FakeTask:
+    task_id: str
+    task_object_id: str
+    task_agent: str
+    service_agent: str
+    pay_amount: int
+    created_at: float
+    deadline: float
+    description: str
+    status: str = 'open'
+
+
+class FakeChain:
+    """内存中的托管链
+
+    Args:
+        finality_latency: 交易从提交到最终确认的平均延迟（秒）
+        latency_jitter: 延迟的随机浮动范围（秒），实际延迟在
+          finality_latency ± latency_jitter之间均匀分布
+        failure_rate: 交易被随机拒绝的概率（模拟节点错误、gas不足等）
+        seed: 随机数种子
+        clock: 返回当前Unix时间的函数
+    """
+
+    def __init__(self, finality_latency: float = 0.0, latency_jitter: float = 0.0,
+                 failure_rate: float = 0.0, seed: int = 0,
+                 clock: Callable[[], float] = time.time):
+        self.finality_latency = finality_latency
+        self.latency_jitter = latency_jitter
+        self.failure_rate = failure_rate
+        self.seed = seed
+        self.clock = clock
+        self._random = random.Random(seed)
+        self._sequence = 0
+        self.balances: Dict[str, int] = {}
+        self.tasks: Dict[str, FakeTask] = {}
+        self.events: List[Dict[str, Any]] = []
+        self.transactions: Dict[str, Dict[str, Any]] = {}
+
+    def fund(self, address: str, amount: int):
+        self.balances[address] = self.balances.get(address, 0) + amount
+
+    def backend(self, address: str) -> 'FakeChainBackend':
+        return FakeChainBackend(self, address)
+
+    def event_source(self) -> 'FakeEventSource':
+        return FakeEventSource(self)
+
+    async def get_transaction(self, digest: str) -> Optional[Dict[str, Any]]:
+        """与SUITaskManager.get_transaction返回相同格式的交易回执"""
+        return self.transactions.get(digest)
+
+    async def execute(self, sender: str, kind: str,
+                      **args: Any) -> Dict[str, Any]:
+        """提交一笔交易并等待最终确认
+
+        失败与否和确认延迟在提交时决定，状态变更在确认时应用。
+        """
+        self._sequence += 1
+        digest = hashlib.sha256(f'{self.seed}:{self._sequence}'.encode()).hexdigest()
+        latency = max(
+            0.0,
+            self.finality_latency
+            + self._random.uniform(-self.latency_jitter, self.latency_jitter),
+        )
+        rejected = self._random.random() < self.failure_rate
+        if latency:
+            await asyncio.sleep(latency)
+
+        if rejected:
+            error, events = 'Simulated transaction failure', []
+        else:
+            error, events = getattr(self, f'_{kind}')(sender, digest, **args)
+        self.transactions[digest] = {
+            'digest': digest,
+            'success': error is None,
+            'error': error,
+            'checkpoint': self._sequence,
+            'events': events,
+        }
+        timestamp_ms = str(int(self.clock() * 1000))
+        for seq, event in enumerate(events):
+            self.events.append({
+                **event,
+                'id': {'txDigest': digest, 'eventSeq': str(seq)},
+                'timestampMs': timestamp_ms,
+            })
+        return {
+            'success': error is None,
+            'error': error,
+            'tx_hash': digest,
+            'events': events,
+        }
+
+    def _create_task(self, sender: str, digest: str, task_id: str,
+                     service_agent: str, amount: int, deadline_seconds: int,
+                     description: str) -> Tuple[Optional[str], List[dict]]:
+        if self.balances.get(sender, 0) < amount:
+            return 'InsufficientCoinBalance', []
+        self.balances[sender] -= amount
+        now = self.clock()
+        task = FakeTask(
+            task_id=task_id,
+            task_object_id=f'0x{digest[:40]}',
+            task_agent=sender,
+            service_agent=service_agent,
+            pay_amount=amount,
+            created_at=now,
+            deadline=now + deadline_seconds,
+            description=description,
+        )
+        self.tasks[task.task_object_id] = task
+        return None, [self._event('TaskCreatedEvent', task)]
+
+    def _complete_task(self, sender: str, digest: str,
+                       task_object_id: str) -> Tuple[Optional[str], List[dict]]:
+        task = self.tasks.get(task_object_id)
+        if task is None or task.status != 'open':
+            return 'MoveAbort: task is not open', []
+        if sender != task.service_agent:
+            return 'MoveAbort: sender is not the service agent', []
+        task.status = 'completed'
+        self.fund(sender, task.pay_amount)
+        return None, [self._event('TaskCompletedEvent', task)]
+
+    def _cancel_task(self, sender: str, digest: str,
+                     task_object_id: str) -> Tuple[Optional[str], List[dict]]:
+        task = self.tasks.get(task_object_id)
+        if task is None or task.status != 'open':
+            return 'MoveAbort: task is not open', []
+        if sender != task.task_agent:
+            return 'MoveAbort: sender is not the task agent', []
+        task.status = 'cancelled'
+        self.fund(sender, task.pay_amount)
+        return None, [self._event('TaskCancelledEvent', task)]
+
+    @staticmethod
+    def _event(name: str, task: FakeTask) -> Dict[str, Any]:
+        return {
+            'type': f'0xfake::task_manager::{name}',
+            'parsedJson': {
+                'task_id': task.task_id,
+                'task_object_id': task.task_object_id,
+                'task_agent': task.task_agent,
+                'service_agent': task.service_agent,
+                'pay_amount': str(task.pay_amount),
+                'deadline': str(int(task.deadline * 1000)),
+                'description': task.description,
+            },
+        }
+
+
+class FakeChainBackend:
+    """FakeChain上某个地址的EscrowBackend实现"""
+
+    chain = 'fake'
+
+    def __init__(self, chain: FakeChain, address: str):
+        self.fake_chain = chain
+        self.address = address
+        # 第一次按交易查询托管时创建
+        self._indexer: Optional[ChainEventIndexer] = None
+
+    async def available(self) -> bool:
+        return True
+
+    async def create(self, task_id: str, service_agent: str, amount: int,
+                     deadline_seconds: int, description: str) -> Dict[str, Any]:
+        result = await self.fake_chain.execute(
+            self.address, 'create_task', task_id=task_id,
+            service_agent=service_agent, amount=amount,
+            deadline_seconds=deadline_seconds, description=description,
+        )
+        task_object_id = None
+        if result['success']:
+            task_object_id = result['events'][0]['parsedJson']['task_object_id']
+        return {**result, 'task_object_id': task_object_id, 'task_ref': task_object_id}
+
+    async def complete(self, task_agent: str, task_ref: str) -> Dict[str, Any]:
+        return await self.fake_chain.execute(
+            self.address, 'complete_task', task_object_id=task_ref
+        )
+
+    async def cancel(self, task_ref: str) -> Dict[str, Any]:
+        return await self.fake_chain.execute(
+            self.address, 'cancel_task', task_object_id=task_ref
+        )
+
+    async def get_info(self, task_agent: str, task_id: str) -> Dict[str, Any]:
+        for task in reversed(list(self.fake_chain.tasks.values())):
+            if task.task_id == task_id and task.task_agent == task_agent:
+                return {
+                    'task_agent': task.task_agent,
+                    'service_agent': task.service_agent,
+                    'pay_amount': task.pay_amount,
+                    'created_at': int(task.created_at),
+                    'deadline': int(task.deadline),
+                    'is_completed': task.status == 'completed',
+                    'is_cancelled': task.status == 'cancelled',
+                    'description': task.description,
+                    'task_object_id': task.task_object_id,
+                }
+        return {'error': f'Task {task_id} not found'}
+
+    async def get_transaction(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        return await self.fake_chain.get_transaction(tx_hash)
+
+    async def get_task_by_tx(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        if self._indexer is None:
+            self._indexer = ChainEventIndexer(
+                TaskEventIndex(), self.fake_chain.event_source()
+            )
+        # 每次只读取上次之后的新事件
+        await self._indexer.sync()
+        return self._indexer.index.get_task_by_tx(tx_hash)
+
+    def sign(self, message: str) -> Optional[str]:
+        # 模拟链上以地址作为密钥和公钥
+        return hmac.new(
+            self.address.encode(), message.encode(), hashlib.sha256
+        ).hexdigest()
+
+    def verify(self, message: str, signature: str, public_key: str) -> bool:
+        expected = hmac.new(
+            public_key.encode(), message.encode(), hashlib.sha256
+        ).hexdigest()
+        return hmac.compare_digest(expected, signature or '')
+
+
+class FakeEventSource:
+    """按页读取FakeChain上的事件，供ChainEventIndexer使用"""
+
+    name = 'fake'
+
+    def __init__(self, chain: FakeChain):
+        self.fake_chain = chain
+
+    async def fetch(self, cursor: Any, limit: int) -> Tuple[List[dict], Any, bool]:
+        events = self.fake_chain.events
+        start = cursor or 0
+        end = min(start + limit, len(events))
+        return events[start:end], end, end < len(events)
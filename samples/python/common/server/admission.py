@@ -0,0 +1,235 @@
+"""Admission control for A2A servers.
+
+Requests that start agent work (`tasks/send` and `tasks/sendSubscribe`) pass
+through an AdmissionController before they reach the task manager. The
+controller sheds load early and cheaply instead of letting a burst queue
+an unbounded number of LLM runs:
+
+- a global token bucket caps the overall request rate,
+- a per-caller token bucket stops one caller from using the whole budget,
+- a concurrency limit bounds in-flight work, with a bounded wait queue for
+  requests that arrive while every slot is busy.
+
+Rejected requests raise AdmissionRejected with a retry-after hint.
+"""
+
+import asyncio
+import os
+import time
+
+from collections import Counter, OrderedDict
+from collections.abc import Callable
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed.
+
+    Attributes:
+        reason: Which limit rejected the request: 'global_rate',
+          'caller_rate', 'queue_full' or 'queue_timeout'; the server also
+          uses 'not_ready' while its startup tasks are running.
+        retry_after: Suggested number of seconds to wait before retrying.
+    """
+
+    def __init__(self, reason: str, retry_after: float):
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(
+            f'Request rejected ({reason}), retry after {retry_after:.2f}s'
+        )
+
+
+class TokenBucket:
+    """A token bucket refilled continuously at `rate` tokens per second."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def try_acquire(self, now: float | None = None) -> float:
+        """Takes one token.
+
+        Returns:
+            0 if a token was taken, otherwise the number of seconds until one
+            will be available.
+        """
+        now = time.monotonic() if now is None else now
+        if now > self.updated:
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def refund(self):
+        self.tokens = min(self.burst, self.tokens + 1)
+
+
+class AdmissionController:
+    """Rate and concurrency limits for incoming task requests.
+
+    A rate or limit of 0 or less disables that check.
+    """
+
+    def __init__(
+        self,
+        global_rate: float = 50.0,
+        global_burst: float = 100.0,
+        caller_rate: float = 5.0,
+        caller_burst: float = 10.0,
+        max_concurrency: int = 16,
+        max_queue: int = 64,
+        queue_timeout: float = 30.0,
+        max_callers: int = 10000,
+    ):
+        self.global_bucket = (
+            TokenBucket(global_rate, global_burst) if global_rate > 0 else None
+        )
+        self.caller_rate = caller_rate
+        self.caller_burst = caller_burst
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_callers = max_callers
+        self._caller_buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+        self._semaphore = (
+            asyncio.Semaphore(max_concurrency) if max_concurrency > 0 else None
+        )
+        self.in_flight = 0
+        self.queued = 0
+        self.peak_in_flight = 0
+        self.peak_queued = 0
+        self.admitted = 0
+        self.rejected: Counter[str] = Counter()
+        # Moving average of how long an admitted request holds its slot,
+        # used to estimate retry-after when the queue is full.
+        self._avg_hold = 1.0
+
+    @classmethod
+    def from_env(cls) -> 'AdmissionController':
+        """Builds a controller from A2A_ADMISSION_* environment variables."""
+
+        def env(name: str, default: float) -> float:
+            return float(os.environ.get(f'A2A_ADMISSION_{name}', default))
+
+        return cls(
+            global_rate=env('GLOBAL_RATE', 50.0),
+            global_burst=env('GLOBAL_BURST', 100.0),
+            caller_rate=env('CALLER_RATE', 5.0),
+            caller_burst=env('CALLER_BURST', 10.0),
+            max_concurrency=int(env('MAX_CONCURRENCY', 16)),
+            max_queue=int(env('MAX_QUEUE', 64)),
+            queue_timeout=env('QUEUE_TIMEOUT', 30.0),
+        )
+
+    async def acquire(self, caller: str) -> Callable[[], None]:
+        """Admits a request from caller, waiting for a slot if needed.
+
+        Returns:
+            A function that releases the slot. It must be called exactly once
+            when the request's work, including any stream, has finished.
+
+        Raises:
+            AdmissionRejected: If a rate limit is exceeded or no slot became
+              available in time.
+        """
+        now = time.monotonic()
+        caller_bucket = self._caller_bucket(caller)
+        if caller_bucket is not None:
+            wait = caller_bucket.try_acquire(now)
+            if wait:
+                self._reject('caller_rate', wait)
+        if self.global_bucket is not None:
+            wait = self.global_bucket.try_acquire(now)
+            if wait:
+                if caller_bucket is not None:
+                    caller_bucket.refund()
+                self._reject('global_rate', wait)
+
+        if self._semaphore is not None:
+            if self._semaphore.locked():
+                if self.queued >= self.max_queue:
+                    self._refund(caller_bucket)
+                    self._reject('queue_full', self._estimated_wait())
+                self.queued += 1
+                self.peak_queued = max(self.peak_queued, self.queued)
+                try:
+                    await asyncio.wait_for(
+                        self._semaphore.acquire(), self.queue_timeout
+                    )
+                except asyncio.TimeoutError:
+                    self._refund(caller_bucket)
+                    self._reject('queue_timeout', self._estimated_wait())
+                finally:
+                    self.queued -= 1
+            else:
+                await self._semaphore.acquire()
+
+        self.admitted += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        started = time.monotonic()
+        released = False
+
+        def release():
+            nonlocal released
+            if released:
+                return
+            released = True
+            self.in_flight -= 1
+            held = time.monotonic() - started
+            self._avg_hold = 0.9 * self._avg_hold + 0.1 * held
+            if self._semaphore is not None:
+                self._semaphore.release()
+
+        return release
+
+    def _refund(self, caller_bucket: TokenBucket | None):
+        # A request shed for lack of a slot did no work, so it keeps neither
+        # its caller nor its global rate token.
+        if caller_bucket is not None:
+            caller_bucket.refund()
+        if self.global_bucket is not None:
+            self.global_bucket.refund()
+
+    def stats(self) -> dict:
+        """Returns admission counters, including load shed per reason."""
+        return {
+            'admitted': self.admitted,
+            'rejected': dict(self.rejected),
+            'rejected_total': sum(self.rejected.values()),
+            'in_flight': self.in_flight,
+            'queued': self.queued,
+            'peak_in_flight': self.peak_in_flight,
+            'peak_queued': self.peak_queued,
+            'tracked_callers': len(self._caller_buckets),
+            'avg_hold_seconds': round(self._avg_hold, 3),
+        }
+
+    def _caller_bucket(self, caller: str) -> TokenBucket | None:
+        if self.caller_rate <= 0:
+            return None
+        bucket = self._caller_buckets.get(caller)
+        if bucket is None:
+            bucket = TokenBucket(self.caller_rate, self.caller_burst)
+            self._caller_buckets[caller] = bucket
+            if len(self._caller_buckets) > self.max_callers:
+                # Least recently seen callers first; a returning caller
+                # simply starts with a full bucket again.
+                self._caller_buckets.popitem(last=False)
+        else:
+            self._caller_buckets.move_to_end(caller)
+        return bucket
+
+    def _estimated_wait(self) -> float:
+        slots = max(self.max_concurrency, 1)
+        return self._avg_hold * (self.queued + 1) / slots
+
+    def _reject(self, reason: str, retry_after: float):
+        self.rejected[reason] += 1
+        raise AdmissionRejected(reason, retry_after)
@@ -0,0 +1,333 @@
+"""Chunked artifact streaming.
+
+Agents stream a large artifact as a sequence of TaskArtifactUpdateEvents that
+share the artifact's index: the first chunk has append=False, the following
+ones append=True, and the last one lastChunk=True. A part that is split across
+chunks carries CONTINUATION_KEY in the metadata of every piece after the
+first, so the receiver joins it back into one part instead of adding a part.
+"""
+
+import json
+import logging
+import os
+
+from collections import OrderedDict
+from collections.abc import Iterator
+
+from common.types import Artifact, FileContent, FilePart, Part
+from common.utils.blob_store import BlobStore
+
+
+logger = logging.getLogger(__name__)
+
+CONTINUATION_KEY = 'continuation'
+
+
+class ArtifactStreamer:
+    """Splits artifacts into bounded chunks for streaming.
+
+    Files larger than uri_threshold are not sent inline at all: they are
+    stored in blobs and sent as a URI under base_url, which the A2A server
+    serves at /artifacts/{digest}.
+
+    Args:
+        chunk_size: Maximum size in bytes of the parts in one chunk. A data
+          part is never split, so a chunk holding one may be larger.
+        uri_threshold: Size in bytes above which files are sent by URI.
+        blobs: Store for files sent by URI. Without it, and a base_url, all
+          files are sent inline.
+        base_url: URL of the agent's A2A server.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 16 * 1024,
+        uri_threshold: int = 1024 * 1024,
+        blobs: BlobStore | None = None,
+        base_url: str | None = None,
+    ):
+        self.chunk_size = chunk_size
+        self.uri_threshold = uri_threshold
+        self.blobs = blobs
+        self.base_url = base_url
+
+    @classmethod
+    def from_env(
+        cls, blobs: BlobStore | None = None, base_url: str | None = None
+    ) -> 'ArtifactStreamer':
+        return cls(
+            chunk_size=int(
+                os.environ.get('A2A_ARTIFACT_CHUNK_BYTES', str(16 * 1024))
+            ),
+            uri_threshold=int(
+                os.environ.get('A2A_ARTIFACT_URI_THRESHOLD', str(1024 * 1024))
+            ),
+            blobs=blobs,
+            base_url=base_url,
+        )
+
+    def externalize(self, artifact: Artifact) -> Artifact:
+        """Replaces files larger than uri_threshold with URI references."""
+        if self.blobs is None or not self.base_url:
+            return artifact
+        parts = []
+        for part in artifact.parts:
+            if (
+                part.type == 'file'
+                and part.file.bytes
+                # Decoded size of the base64 content
+                and len(part.file.bytes) * 3 // 4 > self.uri_threshold
+            ):
+                digest = self.blobs.put_base64(
+                    part.file.bytes, part.file.mimeType
+                )
+                part = FilePart(
+                    file=FileContent(
+                        name=part.file.name,
+                        mimeType=part.file.mimeType,
+                        uri=f'{self.base_url.rstrip("/")}/artifacts/{digest}',
+                    ),
+                    metadata=part.metadata,
+                )
+            parts.append(part)
+        return artifact.model_copy(update={'parts': parts})
+
+    def chunks(self, artifact: Artifact) -> Iterator[Artifact]:
+        """Yields the artifact as chunks of at most chunk_size bytes.
+
+        An artifact that fits in one chunk is yielded unchanged.
+        """
+        groups: list[list[Part]] = [[]]
+        group_size = 0
+        for part in artifact.parts:
+            for piece, size in self._split(part):
+                if groups[-1] and group_size + size > self.chunk_size:
+                    groups.append([])
+                    group_size = 0
+                groups[-1].append(piece)
+                group_size += size
+        if len(groups) == 1:
+            yield artifact
+            return
+        for i, parts in enumerate(groups):
+            yield Artifact(
+                name=artifact.name,
+                description=artifact.description,
+                parts=parts,
+                metadata=artifact.metadata if i == 0 else None,
+                index=artifact.index,
+                append=i > 0,
+                lastChunk=i == len(groups) - 1,
+            )
+
+    def _split(self, part: Part) -> Iterator[tuple[Part, int]]:
+        if part.type == 'text':
+            pieces = split_text(part.text, self.chunk_size)
+        elif part.type == 'file' and part.file.bytes:
+            # Cut at a multiple of 4 base64 characters, so each piece decodes
+            # on its own and the pieces concatenate to the original.
+            size = max(self.chunk_size - self.chunk_size % 4, 4)
+            content = part.file.bytes
+            pieces = [
+                content[i : i + size] for i in range(0, len(content), size)
+            ]
+        else:
+            if part.type == 'data':
+                yield part, len(json.dumps(part.data))
+            else:
+                yield part, len(part.file.uri)
+            return
+        for i, piece in enumerate(pieces):
+            if part.type == 'text':
+                update = {'text': piece}
+            else:
+                update = {'file': part.file.model_copy(update={'bytes': piece})}
+            if i > 0:
+                update['metadata'] = {CONTINUATION_KEY: True}
+            yield part.model_copy(update=update), len(piece)
+
+
+def split_text(text: str, size: int) -> list[str]:
+    """Splits text into pieces of at most size UTF-8 bytes."""
+    data = text.encode()
+    if len(data) <= size:
+        return [text]
+    pieces = []
+    start = 0
+    while start < len(data):
+        end = min(start + size, len(data))
+        # Do not cut a multi-byte character in half.
+        while end < len(data) and end > start + 1 and data[end] & 0xC0 == 0x80:
+            end -= 1
+        pieces.append(data[start:end].decode())
+        start = end
+    return pieces
+
+
+class _PendingArtifact:
+    """An artifact whose chunks are still arriving."""
+
+    def __init__(self, first: Artifact, incomplete: bool = False):
+        self.header = first.model_copy(update={'parts': []})
+        # Each entry is a part and the pieces of its text or file content,
+        # joined once the artifact is complete.
+        self.parts: list[tuple[Part, list[str]]] = []
+        self.size = 0
+        self.incomplete = incomplete
+        self.truncated = False
+
+    def extend(self, parts: list[Part], max_bytes: int):
+        for part in parts:
+            content = _content(part)
+            if self.size + len(content) > max_bytes:
+                self.truncated = True
+                return
+            self.size += len(content)
+            continuation = (part.metadata or {}).get(CONTINUATION_KEY)
+            if (
+                continuation
+                and self.parts
+                and self.parts[-1][0].type == part.type
+            ):
+                self.parts[-1][1].append(content)
+            else:
+                self.parts.append((part, [content]))
+
+    def build(self) -> Artifact:
+        parts = []
+        for part, pieces in self.parts:
+            if part.type == 'text':
+                part = part.model_copy(update={'text': ''.join(pieces)})
+            elif part.type == 'file' and part.file.bytes:
+                part = part.model_copy(
+                    update={
+                        'file': part.file.model_copy(
+                            update={'bytes': ''.join(pieces)}
+                        )
+                    }
+                )
+            parts.append(part)
+        metadata = dict(self.header.metadata or {})
+        if self.incomplete:
+            metadata['incomplete'] = True
+        if self.truncated:
+            metadata['truncated'] = True
+        return self.header.model_copy(
+            update={
+                'parts': parts,
+                'metadata': metadata or None,
+                'append': None,
+                'lastChunk': None,
+            }
+        )
+
+
+def _content(part: Part) -> str:
+    if part.type == 'text':
+        return part.text
+    if part.type == 'file':
+        return part.file.bytes or ''
+    return ''
+
+
+class ArtifactAssembler:
+    """Reassembles artifacts streamed as chunks.
+
+    Partially received artifacts are buffered per task and artifact index.
+    The buffer is bounded: beyond max_open artifacts the least recently
+    updated one is completed as it is, and content beyond max_bytes in one
+    artifact is dropped. Artifacts completed without all their chunks are
+    marked 'incomplete' or 'truncated' in their metadata rather than lost.
+
+    Args:
+        max_open: Maximum number of partially received artifacts.
+        max_bytes: Maximum content size of one artifact.
+    """
+
+    def __init__(self, max_open: int = 256, max_bytes: int = 32 * 1024 * 1024):
+        self.max_open = max_open
+        self.max_bytes = max_bytes
+        self._open: OrderedDict[tuple[str, int], _PendingArtifact] = (
+            OrderedDict()
+        )
+
+    @classmethod
+    def from_env(cls) -> 'ArtifactAssembler':
+        return cls(
+            max_open=int(os.environ.get('A2A_ARTIFACT_MAX_OPEN', '256')),
+            max_bytes=int(
+                os.environ.get('A2A_ARTIFACT_MAX_BYTES', str(32 * 1024 * 1024))
+            ),
+        )
+
+    def __len__(self) -> int:
+        return len(self._open)
+
+    def add(
+        self, task_id: str, artifact: Artifact
+    ) -> list[tuple[str, Artifact]]:
+        """Adds a chunk.
+
+        Returns:
+            (task id, artifact) for every artifact completed by this chunk,
+            including unfinished ones pushed out of the buffer.
+        """
+        key = (task_id, artifact.index)
+        completed = []
+        if not artifact.append:
+            previous = self._open.pop(key, None)
+            if previous:
+                logger.warning(
+                    f'Artifact {artifact.index} of task {task_id} restarted '
+                    'before its last chunk'
+                )
+                previous.incomplete = True
+                completed.append((task_id, previous.build()))
+            if artifact.lastChunk is None or artifact.lastChunk:
+                # The entire artifact in one chunk
+                completed.append((task_id, artifact))
+                return completed
+            pending = _PendingArtifact(artifact)
+            completed.extend(self._open_pending(key, pending))
+        else:
+            pending = self._open.get(key)
+            if pending is None:
+                # The first chunk was lost or pushed out of the buffer; keep
+                # what arrives from here on.
+                logger.warning(
+                    f'Artifact {artifact.index} of task {task_id} is missing '
+                    'its first chunk'
+                )
+                pending = _PendingArtifact(artifact, incomplete=True)
+                completed.extend(self._open_pending(key, pending))
+            else:
+                self._open.move_to_end(key)
+        pending.extend(artifact.parts, self.max_bytes)
+        if artifact.lastChunk:
+            del self._open[key]
+            completed.append((task_id, pending.build()))
+        return completed
+
+    def flush(self, task_id: str) -> list[Artifact]:
+        """Completes the task's unfinished artifacts, e.g. when it ends."""
+        artifacts = []
+        for key in [k for k in self._open if k[0] == task_id]:
+            pending = self._open.pop(key)
+            pending.incomplete = True
+            artifacts.append(pending.build())
+        return artifacts
+
+    def _open_pending(
+        self, key: tuple[str, int], pending: _PendingArtifact
+    ) -> list[tuple[str, Artifact]]:
+        evicted = []
+        while len(self._open) >= self.max_open:
+            (task_id, index), oldest = self._open.popitem(last=False)
+            logger.warning(
+                f'Too many partial artifacts; completing artifact {index} of '
+                f'task {task_id} without its remaining chunks'
+            )
+            oldest.incomplete = True
+            evicted.append((task_id, oldest.build()))
+        self._open[key] = pending
+        return evicted
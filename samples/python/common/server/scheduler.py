@@ -0,0 +1,211 @@
+"""Priority scheduling of agent work.
+
+Agent runs are admitted through a PriorityScheduler that holds a fixed
+number of run slots. Waiting runs are queued in lanes, and free slots are
+handed out by weighted fair queuing, so a lane with weight 4 gets about four
+times the slots of a lane with weight 1 while both are backlogged, and an
+idle lane costs nothing. A run that has waited longer than `max_wait` is
+dispatched next regardless of its lane, so low priority work is never
+starved.
+
+The default lanes are:
+
+- 'follow_up': answers to a task that is waiting in INPUT_REQUIRED; a user
+  is waiting on the conversation.
+- 'paid': tasks whose escrow, referenced in
+  `metadata.blockchain.createTask`, the agent verified on chain. A tx_hash
+  alone does not count: it costs nothing to make one up.
+- 'free': everything else, e.g. informational lookups.
+"""
+
+import asyncio
+import os
+import time
+
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+
+from common.types import Task, TaskState
+
+
+LANE_WEIGHTS = {'follow_up': 4, 'paid': 4, 'free': 1}
+
+
+def classify_task(
+    existing_task: Task | None = None, escrow_verified: bool = False
+) -> str:
+    """Returns the default lane for a task that passed validation.
+
+    Args:
+        existing_task: The task the message is for, if it exists.
+        escrow_verified: Whether the agent found the task's escrow on chain.
+    """
+    if (
+        existing_task is not None
+        and existing_task.status.state == TaskState.INPUT_REQUIRED
+    ):
+        return 'follow_up'
+    if escrow_verified:
+        return 'paid'
+    return 'free'
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+@dataclass
+class LaneMetrics:
+    """Counters and recent latency samples, in seconds, for one lane."""
+
+    submitted: int = 0
+    started: int = 0
+    completed: int = 0
+    aged: int = 0
+    wait: deque = field(default_factory=lambda: deque(maxlen=1024))
+    service: deque = field(default_factory=lambda: deque(maxlen=1024))
+
+    def snapshot(self) -> dict:
+        wait = list(self.wait)
+        service = list(self.service)
+        return {
+            'submitted': self.submitted,
+            'started': self.started,
+            'completed': self.completed,
+            'aged': self.aged,
+            'wait_p50': _percentile(wait, 0.5),
+            'wait_p95': _percentile(wait, 0.95),
+            'wait_max': max(wait, default=0.0),
+            'service_p50': _percentile(service, 0.5),
+            'service_p95': _percentile(service, 0.95),
+        }
+
+
+@dataclass
+class _Waiter:
+    lane: str
+    tag: float
+    enqueued_at: float
+    future: asyncio.Future
+
+
+class PriorityScheduler:
+    """Hands out a fixed number of run slots across weighted lanes."""
+
+    def __init__(
+        self,
+        weights: dict[str, float] | None = None,
+        max_concurrency: int = 4,
+        max_wait: float = 30.0,
+    ):
+        self.weights = dict(weights or LANE_WEIGHTS)
+        self.max_concurrency = max_concurrency
+        self.max_wait = max_wait
+        self.running = 0
+        self.metrics = {lane: LaneMetrics() for lane in self.weights}
+        self._queues: dict[str, deque[_Waiter]] = {
+            lane: deque() for lane in self.weights
+        }
+        self._last_tag = dict.fromkeys(self.weights, 0.0)
+        self._virtual_time = 0.0
+
+    @classmethod
+    def from_env(cls) -> 'PriorityScheduler':
+        return cls(
+            max_concurrency=int(
+                os.environ.get('AGENT_MAX_CONCURRENT_TASKS', '4')
+            ),
+            max_wait=float(os.environ.get('AGENT_MAX_QUEUE_WAIT', '30')),
+        )
+
+    @property
+    def queued(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    @asynccontextmanager
+    async def slot(self, lane: str) -> AsyncIterator[None]:
+        """Waits for a run slot in lane and holds it for the block."""
+        if lane not in self.weights:
+            raise ValueError(f'Unknown scheduling lane {lane}')
+        metrics = self.metrics[lane]
+        metrics.submitted += 1
+        # Virtual finish tag: a lane's runs are spaced 1 / weight apart in
+        # virtual time, and an idle lane restarts at the current virtual time
+        # instead of claiming credit for the time it was idle.
+        tag = max(self._virtual_time, self._last_tag[lane])
+        tag += 1 / self.weights[lane]
+        self._last_tag[lane] = tag
+        waiter = _Waiter(
+            lane,
+            tag,
+            time.monotonic(),
+            asyncio.get_running_loop().create_future(),
+        )
+        self._queues[lane].append(waiter)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # The slot was granted just as the waiter was cancelled.
+                self._release()
+            elif waiter in self._queues[lane]:
+                self._queues[lane].remove(waiter)
+            raise
+
+        started = time.monotonic()
+        metrics.started += 1
+        metrics.wait.append(started - waiter.enqueued_at)
+        try:
+            yield
+        finally:
+            metrics.completed += 1
+            metrics.service.append(time.monotonic() - started)
+            self._release()
+
+    def stats(self) -> dict:
+        return {
+            'running': self.running,
+            'queued': self.queued,
+            'max_concurrency': self.max_concurrency,
+            'lanes': {
+                lane: {
+                    'weight': self.weights[lane],
+                    'queued': len(self._queues[lane]),
+                    **metrics.snapshot(),
+                }
+                for lane, metrics in self.metrics.items()
+            },
+        }
+
+    def _release(self):
+        self.running -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        while self.running < self.max_concurrency:
+            waiter = self._next_waiter()
+            if waiter is None:
+                return
+            self._queues[waiter.lane].popleft()
+            if waiter.future.done():
+                # Cancelled while queued.
+                continue
+            self._virtual_time = max(self._virtual_time, waiter.tag)
+            self.running += 1
+            waiter.future.set_result(None)
+
+    def _next_waiter(self) -> _Waiter | None:
+        heads = [q[0] for q in self._queues.values() if q]
+        if not heads:
+            return None
+        oldest = min(heads, key=lambda w: w.enqueued_at)
+        if time.monotonic() - oldest.enqueued_at > self.max_wait:
+            self.metrics[oldest.lane].aged += 1
+            return oldest
+        return min(heads, key=lambda w: w.tag)
@@ -1,15 +1,25 @@
 import json
 import logging
+import math
+import threading
+import time
 
-from collections.abc import AsyncIterable
+from collections.abc import AsyncIterable, Callable
 from typing import Any
 
 from pydantic import ValidationError
 from starlette.applications import Starlette
 from starlette.requests import Request
-from starlette.responses import JSONResponse, StreamingResponse
+from starlette.responses import (
+    JSONResponse,
+    PlainTextResponse,
+    StreamingResponse,
+)
+from starlette.types import Receive, Scope, Send
 
+from common.server.admission import AdmissionController, AdmissionRejected
 from common.server.task_manager import TaskManager
+from common.server.utils import new_blob_response
 from common.types import (
     A2ARequest,
     AgentCard,
@@ -22,13 +32,42 @@ from common.types import (
     JSONRPCResponse,
     SendTaskRequest,
     SendTaskStreamingRequest,
+    SendTaskStreamingResponse,
+    ServerBusyError,
     SetTaskPushNotificationRequest,
     TaskResubscriptionRequest,
 )
+from common.utils import telemetry
+from common.utils.blob_store import BlobStore
 
 
 logger = logging.getLogger(__name__)
 
+requests_total = telemetry.metrics.counter(
+    'a2a_requests_total',
+    'JSON-RPC requests received, by method and outcome.',
+    ('method', 'outcome'),
+)
+
+
+class ClosingStreamingResponse(StreamingResponse):
+    """A StreamingResponse that calls on_close however sending it ends.
+
+    A stream's generator is not started, so its finally blocks do not run,
+    if the client disconnects before the first chunk is sent; on_close runs
+    when the response's ASGI call returns, even then.
+    """
+
+    def __init__(self, *args, on_close: Callable[[], None], **kwargs):
+        super().__init__(*args, **kwargs)
+        self.on_close = on_close
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.on_close()
+
 
 class A2AServer:
     def __init__(
@@ -38,12 +77,19 @@ class A2AServer:
         endpoint='/',
         agent_card: AgentCard = None,
         task_manager: TaskManager = None,
+        admission_controller: AdmissionController | None = None,
+        blobs: BlobStore | None = None,
     ):
         self.host = host
         self.port = port
         self.endpoint = endpoint
         self.task_manager = task_manager
         self.agent_card = agent_card
+        self.admission_controller = (
+            admission_controller or AdmissionController.from_env()
+        )
+        # Artifact files too large to send inline are served from here.
+        self.blobs = blobs or BlobStore.from_env()
         self.app = Starlette()
         self.app.add_route(
             self.endpoint, self._process_request, methods=['POST']
@@ -51,16 +97,79 @@ class A2AServer:
         self.app.add_route(
             '/.well-known/agent.json', self._get_agent_card, methods=['GET']
         )
+        self.app.add_route('/metrics', self._get_metrics, methods=['GET'])
+        self.app.add_route(
+            '/metrics/admission', self._get_admission_stats, methods=['GET']
+        )
+        self.app.add_route(
+            '/metrics/scheduler', self._get_scheduler_stats, methods=['GET']
+        )
+        self.app.add_route('/health/live', self._get_liveness, methods=['GET'])
+        self.app.add_route(
+            '/health/ready', self._get_readiness, methods=['GET']
+        )
+        self.app.add_route(
+            '/artifacts/{digest}', self._get_artifact_blob, methods=['GET']
+        )
+        self._startup_tasks: dict[str, Callable[[], Any]] = {}
+        # name -> 'pending', 'running', 'done' or 'failed: <error>'
+        self._startup_status: dict[str, str] = {}
+        self._started_at = time.monotonic()
+        self._ready_at: float | None = None
+
+    def add_startup_task(self, name: str, func: Callable[[], Any]) -> None:
+        """Registers slow setup to run after the server starts listening.
+
+        Startup tasks run in order in a background thread, so liveness and
+        the agent card are served right away. The server reports ready, and
+        accepts new tasks, once every task has finished and a task manager is
+        set; a task may set task_manager itself. Other JSON-RPC methods are
+        served as soon as a task manager is set.
+        """
+        self._startup_tasks[name] = func
+        self._startup_status[name] = 'pending'
+
+    def run_startup_tasks(self) -> bool:
+        """Runs the startup tasks and returns whether all of them succeeded."""
+        for name, func in self._startup_tasks.items():
+            if self._startup_status[name] == 'done':
+                continue
+            self._startup_status[name] = 'running'
+            started = time.monotonic()
+            try:
+                func()
+            except Exception as e:
+                logger.error(f'Startup task {name} failed: {e}')
+                self._startup_status[name] = f'failed: {e}'
+                return False
+            self._startup_status[name] = 'done'
+            logger.info(
+                f'Startup task {name} finished in {time.monotonic() - started:.2f}s'
+            )
+        if self.ready:
+            self._ready_at = time.monotonic()
+        return self.ready
+
+    @property
+    def ready(self) -> bool:
+        return self.task_manager is not None and all(
+            status == 'done' for status in self._startup_status.values()
+        )
 
     def start(self):
         if self.agent_card is None:
             raise ValueError('agent_card is not defined')
 
-        if self.task_manager is None:
+        if self.task_manager is None and not self._startup_tasks:
             raise ValueError('request_handler is not defined')
 
         import uvicorn
 
+        if self._startup_tasks:
+            threading.Thread(
+                target=self.run_startup_tasks, name='a2a-startup', daemon=True
+            ).start()
+
         # Configure uvicorn with reduced logging
         uvicorn.run(
             self.app, 
@@ -73,46 +182,169 @@ class A2AServer:
     def _get_agent_card(self, request: Request) -> JSONResponse:
         return JSONResponse(self.agent_card.model_dump(exclude_none=True))
 
+    def _get_metrics(self, request: Request) -> PlainTextResponse:
+        return PlainTextResponse(
+            telemetry.metrics.render(),
+            media_type='text/plain; version=0.0.4; charset=utf-8',
+        )
+
+    def _get_admission_stats(self, request: Request) -> JSONResponse:
+        return JSONResponse(self.admission_controller.stats())
+
+    def _get_scheduler_stats(self, request: Request) -> JSONResponse:
+        scheduler = getattr(self.task_manager, 'scheduler', None)
+        return JSONResponse(scheduler.stats() if scheduler else {})
+
+    def _get_liveness(self, request: Request) -> JSONResponse:
+        return JSONResponse({'status': 'ok'})
+
+    def _get_readiness(self, request: Request) -> JSONResponse:
+        body = {'ready': self.ready, 'startup': dict(self._startup_status)}
+        if self._ready_at is not None:
+            body['startup_seconds'] = round(
+                self._ready_at - self._started_at, 3
+            )
+        return JSONResponse(body, status_code=200 if body['ready'] else 503)
+
+    def _get_artifact_blob(self, request: Request):
+        return new_blob_response(
+            self.blobs, request.path_params['digest'], request
+        )
+
     async def _process_request(self, request: Request):
+        method = 'unknown'
         try:
             body = await request.json()
             json_rpc_request = A2ARequest.validate_python(body)
-
-            if isinstance(json_rpc_request, GetTaskRequest):
-                result = await self.task_manager.on_get_task(json_rpc_request)
-            elif isinstance(json_rpc_request, SendTaskRequest):
-                result = await self.task_manager.on_send_task(json_rpc_request)
-            elif isinstance(json_rpc_request, SendTaskStreamingRequest):
-                result = await self.task_manager.on_send_task_subscribe(
-                    json_rpc_request
-                )
-            elif isinstance(json_rpc_request, CancelTaskRequest):
-                result = await self.task_manager.on_cancel_task(
-                    json_rpc_request
-                )
-            elif isinstance(json_rpc_request, SetTaskPushNotificationRequest):
-                result = await self.task_manager.on_set_task_push_notification(
-                    json_rpc_request
-                )
-            elif isinstance(json_rpc_request, GetTaskPushNotificationRequest):
-                result = await self.task_manager.on_get_task_push_notification(
-                    json_rpc_request
-                )
-            elif isinstance(json_rpc_request, TaskResubscriptionRequest):
-                result = await self.task_manager.on_resubscribe_to_task(
-                    json_rpc_request
-                )
-            else:
-                logger.warning(
-                    f'Unexpected request type: {type(json_rpc_request)}'
+            method = json_rpc_request.method
+            starts_work = isinstance(
+                json_rpc_request, (SendTaskRequest, SendTaskStreamingRequest)
+            )
+            # New tasks wait for startup; other methods only need a task
+            # manager to answer them.
+            if self.task_manager is None or (starts_work and not self.ready):
+                requests_total.inc(method=method, outcome='rejected')
+                return self._create_rejection(
+                    json_rpc_request, AdmissionRejected('not_ready', 1.0)
                 )
-                raise ValueError(f'Unexpected request type: {type(request)}')
 
-            return self._create_response(result)
+            release = None
+            if starts_work:
+                # Only requests that start agent work are admission controlled.
+                caller = self._get_caller(request, json_rpc_request)
+                try:
+                    release = await self.admission_controller.acquire(caller)
+                except AdmissionRejected as e:
+                    logger.debug(f'Shed request from {caller}: {e}')
+                    requests_total.inc(method=method, outcome='rejected')
+                    return self._create_rejection(json_rpc_request, e)
+
+            try:
+                # The host's span, if it sent one, is the parent.
+                with telemetry.span(
+                    'a2a.server.dispatch',
+                    context=self._get_trace_context(json_rpc_request),
+                    **{'rpc.method': method},
+                ) as dispatch_span:
+                    result = await self._dispatch(json_rpc_request)
+                    if isinstance(result, AsyncIterable):
+                        # A stream is sent in a span of its own, which
+                        # parents the work done to produce its events.
+                        result = telemetry.traced_aiter(
+                            'a2a.server.sse', result, **{'rpc.method': method}
+                        )
+                    error = getattr(result, 'error', None)
+                    if error is not None:
+                        dispatch_span.set_attribute(
+                            'rpc.jsonrpc.error_code', error.code
+                        )
+            except BaseException:
+                if release:
+                    release()
+                raise
+            requests_total.inc(
+                method=method, outcome='error' if error is not None else 'ok'
+            )
+            return self._create_response(result, on_close=release)
 
         except Exception as e:
+            requests_total.inc(method=method, outcome='error')
             return self._handle_exception(e)
 
+    async def _dispatch(self, json_rpc_request):
+        if isinstance(json_rpc_request, GetTaskRequest):
+            return await self.task_manager.on_get_task(json_rpc_request)
+        if isinstance(json_rpc_request, SendTaskRequest):
+            return await self.task_manager.on_send_task(json_rpc_request)
+        if isinstance(json_rpc_request, SendTaskStreamingRequest):
+            return await self.task_manager.on_send_task_subscribe(
+                json_rpc_request
+            )
+        if isinstance(json_rpc_request, CancelTaskRequest):
+            return await self.task_manager.on_cancel_task(json_rpc_request)
+        if isinstance(json_rpc_request, SetTaskPushNotificationRequest):
+            return await self.task_manager.on_set_task_push_notification(
+                json_rpc_request
+            )
+        if isinstance(json_rpc_request, GetTaskPushNotificationRequest):
+            return await self.task_manager.on_get_task_push_notification(
+                json_rpc_request
+            )
+        if isinstance(json_rpc_request, TaskResubscriptionRequest):
+            return await self.task_manager.on_resubscribe_to_task(
+                json_rpc_request
+            )
+        logger.warning(f'Unexpected request type: {type(json_rpc_request)}')
+        raise ValueError(f'Unexpected request type: {type(json_rpc_request)}')
+
+    def _get_trace_context(self, json_rpc_request):
+        message = getattr(json_rpc_request.params, 'message', None)
+        return telemetry.extract_trace(message.metadata if message else None)
+
+    def _get_caller(self, request: Request, json_rpc_request) -> str:
+        """Identifies the caller for per-caller rate limiting.
+
+        Uses the SUI address the host signs with, falling back to the client
+        IP. The address is not verified yet at this point, so the global limit
+        still bounds callers that rotate addresses.
+        """
+        metadata = json_rpc_request.params.message.metadata or {}
+        auth = metadata.get('auth')
+        if isinstance(auth, dict) and auth.get('address'):
+            return f'sui:{auth["address"]}'
+        return f'ip:{request.client.host if request.client else "unknown"}'
+
+    def _create_rejection(
+        self, json_rpc_request, rejection: AdmissionRejected
+    ) -> JSONResponse | StreamingResponse:
+        retry_after = max(rejection.retry_after, 0.001)
+        error = ServerBusyError(
+            data={
+                'reason': rejection.reason,
+                'retry_after': round(retry_after, 3),
+            }
+        )
+        headers = {'Retry-After': str(math.ceil(retry_after))}
+        if isinstance(json_rpc_request, SendTaskStreamingRequest):
+            # Streaming clients expect an event stream, so the error is sent
+            # as its only event.
+            response = SendTaskStreamingResponse(
+                id=json_rpc_request.id, error=error
+            )
+
+            async def rejection_stream():
+                yield f'data: {response.model_dump_json(exclude_none=True)}\n\n'
+
+            return StreamingResponse(
+                rejection_stream(),
+                media_type='text/event-stream',
+                headers=headers,
+            )
+        response = JSONRPCResponse(id=json_rpc_request.id, error=error)
+        return JSONResponse(
+            response.model_dump(exclude_none=True), headers=headers
+        )
+
     def _handle_exception(self, e: Exception) -> JSONResponse:
         if isinstance(e, json.decoder.JSONDecodeError):
             json_rpc_error = JSONParseError()
@@ -128,8 +360,13 @@ class A2AServer:
         )
 
     def _create_response(
-        self, result: Any
+        self, result: Any, on_close: Callable[[], None] | None = None
     ) -> JSONResponse | StreamingResponse:
+        """Wraps a task manager result in an HTTP response.
+
+        on_close, if given, is called once the response no longer needs the
+        task manager: right away for plain results, or when a stream ends.
+        """
         if isinstance(result, AsyncIterable):
 
             async def sse_stream_generator():
@@ -145,8 +382,9 @@ class A2AServer:
                     error_data = {"error": str(e)}
                     yield f"data: {json.dumps(error_data)}\n\n"
 
-            return StreamingResponse(
+            return ClosingStreamingResponse(
                 sse_stream_generator(),
+                on_close=on_close or (lambda: None),
                 media_type='text/event-stream',
                 headers={
                     'Cache-Control': 'no-cache',
@@ -155,6 +393,8 @@ class A2AServer:
                     'Access-Control-Allow-Headers': 'Cache-Control'
                 }
             )
+        if on_close:
+            on_close()
         if isinstance(result, JSONRPCResponse):
             return JSONResponse(result.model_dump(exclude_none=True))
         logger.error(f'Unexpected result type: {type(result)}')
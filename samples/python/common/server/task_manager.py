@@ -2,8 +2,11 @@ import asyncio
 import logging
 
 from abc import ABC, abstractmethod
-from collections.abc import AsyncIterable
+from collections.abc import AsyncIterable, Awaitable, Callable
 
+from common.server.artifact_stream import ArtifactStreamer
+from common.server.scheduler import PriorityScheduler
+from common.server.token_stream import DeltaCoalescer
 from common.server.utils import new_not_implemented_error
 from common.types import (
     Artifact,
@@ -35,6 +38,7 @@ from common.types import (
     TaskStatus,
     TaskStatusUpdateEvent,
 )
+from common.utils.idempotency import IdempotencyCache
 
 
 logger = logging.getLogger(__name__)
@@ -81,15 +85,24 @@ class TaskManager(ABC):
 
 
 class InMemoryTaskManager(TaskManager):
-    def __init__(self):
+    def __init__(
+        self, dedup_max_entries: int = 1024, dedup_ttl: float = 600.0
+    ):
         self.tasks: dict[str, Task] = {}
         self.push_notification_infos: dict[str, PushNotificationConfig] = {}
         self.lock = asyncio.Lock()
         self.task_sse_subscribers: dict[str, list[asyncio.Queue]] = {}
         self.subscriber_lock = asyncio.Lock()
+        self.send_dedup = IdempotencyCache(dedup_max_entries, dedup_ttl)
+        # Agent runs wait here for a slot; subclasses choose the lane.
+        self.scheduler = PriorityScheduler.from_env()
+        # Splits streamed artifacts into bounded chunks.
+        self.artifact_streamer = ArtifactStreamer.from_env()
+        # Caps the frame rate of token-level streaming.
+        self.delta_coalescer = DeltaCoalescer.from_env()
 
     async def on_get_task(self, request: GetTaskRequest) -> GetTaskResponse:
-        logger.info(f'Getting task {request.params.id}')
+        logger.info('Getting task %s', request.params.id)
         task_query_params: TaskQueryParams = request.params
 
         async with self.lock:
@@ -106,7 +119,7 @@ class InMemoryTaskManager(TaskManager):
     async def on_cancel_task(
         self, request: CancelTaskRequest
     ) -> CancelTaskResponse:
-        logger.info(f'Cancelling task {request.params.id}')
+        logger.info('Cancelling task %s', request.params.id)
         task_id_params: TaskIdParams = request.params
 
         async with self.lock:
@@ -157,7 +170,7 @@ class InMemoryTaskManager(TaskManager):
     async def on_set_task_push_notification(
         self, request: SetTaskPushNotificationRequest
     ) -> SetTaskPushNotificationResponse:
-        logger.info(f'Setting task push notification {request.params.id}')
+        logger.info('Setting task push notification %s', request.params.id)
         task_notification_params: TaskPushNotificationConfig = request.params
 
         try:
@@ -166,7 +179,7 @@ class InMemoryTaskManager(TaskManager):
                 task_notification_params.pushNotificationConfig,
             )
         except Exception as e:
-            logger.error(f'Error while setting push notification info: {e}')
+            logger.error('Error while setting push notification info: %s', e)
             return JSONRPCResponse(
                 id=request.id,
                 error=InternalError(
@@ -181,7 +194,7 @@ class InMemoryTaskManager(TaskManager):
     async def on_get_task_push_notification(
         self, request: GetTaskPushNotificationRequest
     ) -> GetTaskPushNotificationResponse:
-        logger.info(f'Getting task push notification {request.params.id}')
+        logger.info('Getting task push notification %s', request.params.id)
         task_params: TaskIdParams = request.params
 
         try:
@@ -189,7 +202,7 @@ class InMemoryTaskManager(TaskManager):
                 task_params.id
             )
         except Exception as e:
-            logger.error(f'Error while getting push notification info: {e}')
+            logger.error('Error while getting push notification info: %s', e)
             return GetTaskPushNotificationResponse(
                 id=request.id,
                 error=InternalError(
@@ -204,8 +217,45 @@ class InMemoryTaskManager(TaskManager):
             ),
         )
 
+    async def send_task_once(
+        self,
+        request: SendTaskRequest,
+        handler: Callable[[SendTaskRequest], Awaitable[SendTaskResponse]],
+    ) -> SendTaskResponse:
+        """Handles a tasks/send request at most once per message.
+
+        Requests are keyed on the task id and the `message_id` in the message
+        metadata. A retry that arrives while the original is still running
+        waits for it, and a retry that arrives later gets the cached response,
+        so the agent is not invoked (and an escrow is not consumed) twice.
+        Error responses are not cached, so a retry after a failure runs
+        again. Messages without a `message_id` are never de-duplicated.
+        """
+        key = self.send_dedup_key(request.params)
+        if key is None:
+            return await handler(request)
+
+        response = await self.send_dedup.run(
+            key,
+            lambda: handler(request),
+            should_cache=lambda r: r.error is None,
+        )
+        if response.id != request.id:
+            logger.info('Replaying response for duplicate send %s', key)
+            response = response.model_copy(update={'id': request.id})
+        return response
+
+    def send_dedup_key(
+        self, task_send_params: TaskSendParams
+    ) -> tuple[str, str] | None:
+        metadata = task_send_params.message.metadata or {}
+        message_id = metadata.get('message_id')
+        if not message_id:
+            return None
+        return task_send_params.id, message_id
+
     async def upsert_task(self, task_send_params: TaskSendParams) -> Task:
-        # logger.info(f'Upserting task {task_send_params.id}')
+        # logger.info('Upserting task %s', task_send_params.id)
         async with self.lock:
             task = self.tasks.get(task_send_params.id)
             if task is None:
@@ -234,7 +284,7 @@ class InMemoryTaskManager(TaskManager):
             try:
                 task = self.tasks[task_id]
             except KeyError:
-                logger.error(f'Task {task_id} not found for updating the task')
+                logger.error('Task %s not found for updating the task', task_id)
                 raise ValueError(f'Task {task_id} not found')
 
             task.status = status
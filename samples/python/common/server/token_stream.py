@@ -0,0 +1,161 @@
+"""Token-level streaming of agent responses.
+
+An agent's stream() yields {'is_task_complete': False, 'delta': text} for each
+piece of text the model generates. The task manager sends these deltas as
+appended chunks of one artifact (see artifact_stream), after coalescing them
+so that a fast model does not produce an SSE frame per token.
+"""
+
+import asyncio
+import math
+import os
+
+from collections.abc import AsyncIterable, AsyncIterator
+from typing import Any
+
+from common.server.artifact_stream import CONTINUATION_KEY
+from common.types import Artifact, TextPart
+
+
+class DeltaCoalescer:
+    """Merges text deltas so a stream sends at most one frame per interval.
+
+    The first delta is sent at once, so coalescing never delays the first
+    token. Later deltas are buffered until interval has passed since the
+    previous frame or max_chars are buffered. Any other item flushes the
+    buffer and is passed through unchanged, so items keep their order.
+
+    Args:
+        interval: Minimum time in seconds between two delta frames.
+        max_chars: Buffered text size that is sent without waiting.
+    """
+
+    def __init__(self, interval: float = 0.05, max_chars: int = 4096):
+        self.interval = interval
+        self.max_chars = max_chars
+
+    @classmethod
+    def from_env(cls) -> 'DeltaCoalescer':
+        return cls(
+            interval=float(
+                os.environ.get('A2A_STREAM_FRAME_INTERVAL_MS', '50')
+            )
+            / 1000,
+            max_chars=int(os.environ.get('A2A_STREAM_FRAME_MAX_CHARS', '4096')),
+        )
+
+    async def coalesce(
+        self, items: AsyncIterable[dict[str, Any]]
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yields items with consecutive deltas merged."""
+        loop = asyncio.get_running_loop()
+        iterator = aiter(items)
+        pending: list[str] = []
+        pending_chars = 0
+        last_frame = -math.inf
+        next_item = None
+
+        def frame() -> dict[str, Any]:
+            nonlocal pending_chars, last_frame
+            item = {'is_task_complete': False, 'delta': ''.join(pending)}
+            pending.clear()
+            pending_chars = 0
+            last_frame = loop.time()
+            return item
+
+        try:
+            while True:
+                if next_item is None:
+                    next_item = asyncio.ensure_future(anext(iterator))
+                timeout = None
+                if pending:
+                    timeout = max(last_frame + self.interval - loop.time(), 0)
+                done, _ = await asyncio.wait({next_item}, timeout=timeout)
+                if not done:
+                    # No item arrived before the buffered text was due.
+                    yield frame()
+                    continue
+                try:
+                    item = next_item.result()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    next_item = None
+                if 'delta' not in item:
+                    if pending:
+                        yield frame()
+                    yield item
+                    continue
+                pending.append(item['delta'])
+                pending_chars += len(item['delta'])
+                if (
+                    pending_chars >= self.max_chars
+                    or loop.time() - last_frame >= self.interval
+                ):
+                    yield frame()
+            if pending:
+                yield frame()
+        finally:
+            if next_item is not None:
+                next_item.cancel()
+
+
+class TextArtifactStream:
+    """Sends text as chunks of one artifact while it is generated.
+
+    Args:
+        index: Index of the artifact in its task.
+    """
+
+    def __init__(self, index: int = 0):
+        self.index = index
+        self._pieces: list[str] = []
+
+    @property
+    def started(self) -> bool:
+        return bool(self._pieces)
+
+    @property
+    def text(self) -> str:
+        return ''.join(self._pieces)
+
+    def add(self, delta: str) -> Artifact:
+        """Returns the chunk that sends delta."""
+        first = not self._pieces
+        self._pieces.append(delta)
+        return self._chunk(delta, append=not first, last=False)
+
+    def extends(self, text: str) -> bool:
+        """Whether text begins with everything streamed so far."""
+        return text.startswith(self.text)
+
+    def close(self, text: str | None = None) -> tuple[Artifact, Artifact]:
+        """Ends the stream.
+
+        Args:
+            text: The complete text, if extends(text). The part that was not
+              streamed yet is sent in the last chunk.
+
+        Returns:
+            The last chunk, and the artifact with the complete text.
+        """
+        streamed = self.text
+        tail = text[len(streamed) :] if text is not None else ''
+        artifact = Artifact(
+            parts=[TextPart(text=streamed + tail)], index=self.index
+        )
+        return self._chunk(tail, append=True, last=True), artifact
+
+    def _chunk(self, text: str, append: bool, last: bool) -> Artifact:
+        parts = []
+        if text:
+            parts.append(
+                TextPart(
+                    text=text,
+                    # Continues the text part of the first chunk.
+                    metadata={CONTINUATION_KEY: True} if append else None,
+                )
+            )
+        return Artifact(
+            parts=parts, index=self.index, append=append, lastChunk=last
+        )
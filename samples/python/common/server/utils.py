@@ -1,8 +1,12 @@
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+
 from common.types import (
     ContentTypeNotSupportedError,
     JSONRPCResponse,
     UnsupportedOperationError,
 )
+from common.utils.blob_store import BlobStore, parse_range
 
 
 def are_modalities_compatible(
@@ -26,3 +30,49 @@ def new_incompatible_types_error(request_id):
 
 def new_not_implemented_error(request_id):
     return JSONRPCResponse(id=request_id, error=UnsupportedOperationError())
+
+
+def new_blob_response(
+    blobs: BlobStore, digest: str, request: Request
+) -> Response:
+    """Serves a stored blob, honouring conditional and range requests.
+
+    The URL of a blob names its content, so responses are cacheable forever
+    and the digest doubles as a strong ETag.
+    """
+    blob = blobs.info(digest)
+    if not blob:
+        return Response(status_code=404)
+    etag = f'"{digest}"'
+    headers = {
+        'ETag': etag,
+        'Cache-Control': 'public, max-age=31536000, immutable',
+        'Accept-Ranges': 'bytes',
+    }
+    if_none_match = request.headers.get('if-none-match', '')
+    if etag in [t.strip() for t in if_none_match.split(',')]:
+        return Response(status_code=304, headers=headers)
+
+    start, end, status_code = 0, blob.size, 200
+    range_header = request.headers.get('range')
+    if range_header and request.headers.get('if-range', etag) == etag:
+        try:
+            byte_range = parse_range(range_header, blob.size)
+        except ValueError:
+            byte_range = (0, blob.size)
+        if byte_range is None:
+            return Response(
+                status_code=416,
+                headers={'Content-Range': f'bytes */{blob.size}'},
+            )
+        if byte_range != (0, blob.size):
+            start, end = byte_range
+            status_code = 206
+            headers['Content-Range'] = f'bytes {start}-{end - 1}/{blob.size}'
+    headers['Content-Length'] = str(end - start)
+    return StreamingResponse(
+        blobs.read(digest, start, end),
+        status_code=status_code,
+        media_type=blob.media_type,
+        headers=headers,
+    )
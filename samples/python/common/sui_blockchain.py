@@ -4,13 +4,17 @@
 """
 
 import logging
-import subprocess
-import tempfile
 import os
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import time
 
+from .chain_cache import chain_cache
+from .chain_indexer import TaskEventIndex
 from .sui_config import SUIConfig
+from .sui_node import sui_call, sui_call_sync
+from .sui_gas_pool import GAS_BUDGET, GasCoin, GasPoolExhausted, SUIGasPool
+from .sui_wallet import balances, keyring
+from .utils.telemetry import traced
 
 
 logger = logging.getLogger(__name__)
@@ -19,9 +23,17 @@ logger = logging.getLogger(__name__)
 class SUITaskManager:
     """SUI任务管理器区块链交互类"""
     
-    def __init__(self, config: SUIConfig):
+    def __init__(self, config: SUIConfig, gas_pool: Optional[SUIGasPool] = None,
+                 index: Optional[TaskEventIndex] = None):
         self.config = config
+        # 配置了gas币池时，每笔create_task租用独立的gas币，允许并发提交
+        self.gas_pool = gas_pool
+        # 配置了事件索引时，任务查询在本地完成
+        self.index = index
+        # 未配置事件索引时，按交易查询的任务只从交易回执中索引
+        self._tx_index = index if index is not None else TaskEventIndex()
         
+    @traced('sui.task_manager.create_task')
     async def create_task(self, task_id: str, service_agent: str, amount_sui: int, 
                    deadline_seconds: int, description: str) -> Dict[str, Any]:
         """创建任务并托管SUI
@@ -36,137 +48,88 @@ class SUITaskManager:
         Returns:
             包含交易结果的字典
         """
+        # 交易前检查本地余额，本地余额不足时先对账一次，避免因未记录的转入而误判
+        required = amount_sui + GAS_BUDGET
+        known = balances.peek(self.config.address)
+        if known is not None and known < required:
+            balance = await self.config.get_account_balance(refresh=True)
+            if balance < required:
+                return {
+                    'success': False,
+                    'error': f'Insufficient balance: {balance} MIST, {required} MIST required',
+                }
+        if self.gas_pool is None:
+            return await self._create_task(
+                task_id, service_agent, amount_sui, deadline_seconds, description
+            )
         try:
-            # 创建JavaScript脚本来执行create_task交易（使用CommonJS格式）
-            js_script = f'''
-            const {{ Ed25519Keypair }} = require("@mysten/sui/keypairs/ed25519");
-            const {{ Transaction }} = require("@mysten/sui/transactions");
-            const {{ SuiClient, getFullnodeUrl }} = require("@mysten/sui/client");
-            
-            async function createTask() {{
-                try {{
-                    const taskAgentKeyPair = Ed25519Keypair.fromSecretKey("{self.config.private_key}");
-                    const suiClient = new SuiClient({{ url: getFullnodeUrl("{self.config.network}") }});
-                    
-                    const tx = new Transaction();
-                    
-                    // 添加支付资金
-                    const [coin] = tx.splitCoins(tx.gas, [tx.pure.u64({amount_sui})]);
-                    
-                    // 调用create_task方法
-                    tx.moveCall({{
-                        target: `{self.config.task_manager_package_id}::task_manager::create_task`,
-                        arguments: [
-                            tx.pure.string("{task_id}"),
-                            tx.pure.address("{service_agent}"),
-                            coin,
-                            tx.pure.u64({deadline_seconds}),
-                            tx.pure.string("{description}"),
-                            tx.object("{self.config.task_manager_id}"),
-                            tx.object("0x6")
-                        ]
-                    }});
-                    
-                    tx.setGasBudget(20000000);
-                    
-                    const txResult = await suiClient.signAndExecuteTransaction({{
-                        transaction: tx,
-                        signer: taskAgentKeyPair,
-                        options: {{
-                            showEffects: true,
-                            showObjectChanges: true,
-                            showEvents: true
-                        }}
-                    }});
-                    
-                    console.log("SUCCESS");
-                    console.log(`TX_HASH:${{txResult.digest}}`);
-                    
-                    // 查找TaskCreatedEvent
-                    const createdEvent = txResult.events?.find(event =>
-                        event.type.includes("TaskCreatedEvent")
-                    );
-                    
-                    if (createdEvent && createdEvent.parsedJson) {{
-                        console.log(`TASK_OBJECT_ID:${{createdEvent.parsedJson.task_object_id}}`);
-                    }}
-                    
-                    // 查找创建的Task对象
-                    const taskObject = txResult.objectChanges?.find(change =>
-                        change.type === 'created' && 
-                        change.objectType && 
-                        change.objectType.includes('Task')
-                    );
-                    
-                    if (taskObject) {{
-                        console.log(`TASK_OBJECT_ID:${{taskObject.objectId}}`);
-                    }}
-                    
-                    process.exit(0);
-                }} catch (error) {{
-                    console.error("ERROR:", error.message);
-                    process.exit(1);
-                }}
-            }}
-            
-            createTask();
-            '''
-            
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.js', delete=False) as temp_file:
-                temp_file.write(js_script)
-                temp_file_path = temp_file.name
-            
-            try:
-                # 设置NODE_PATH环境变量，确保能找到demo/ui/node_modules
-                node_modules_path = "/Users/pis/workspace/PIN/pin-a2a/demo/ui/node_modules"
-                env = os.environ.copy()
-                env['NODE_PATH'] = node_modules_path
-                
-                result = subprocess.run(['node', temp_file_path], 
-                                      capture_output=True, text=True, timeout=120,
-                                      env=env)
-                os.unlink(temp_file_path)
-                
-                if result.returncode == 0:
-                    # 解析输出
-                    lines = result.stdout.strip().split('\n')
-                    tx_hash = None
-                    task_object_id = None
-                    
-                    for line in lines:
-                        if line.startswith('TX_HASH:'):
-                            tx_hash = line.split('TX_HASH:')[1]
-                        elif line.startswith('TASK_OBJECT_ID:'):
-                            task_object_id = line.split('TASK_OBJECT_ID:')[1]
-                    
-                    print(f"[SUI] Task created successfully: {task_id}, you can check the task on https://suiscan.xyz/{self.config.network}/tx/{tx_hash}")
-                    
-                    return {
-                        'success': True,
-                        'tx_hash': tx_hash,
-                        'task_object_id': task_object_id,
-                        'gas_used': 0,  # SUI计算gas的方式不同，这里简化
-                        'vm_status': 'Success'
-                    }
+            async with self.gas_pool.lease(amount_sui + GAS_BUDGET) as coin:
+                result = await self._create_task(
+                    task_id, service_agent, amount_sui, deadline_seconds,
+                    description, gas_coin=coin
+                )
+                gas_object = result.get('gas_object')
+                if result.get('success') and gas_object:
+                    coin.update(
+                        gas_object,
+                        coin.balance - amount_sui - result.get('gas_used', 0),
+                    )
                 else:
-                    error_msg = result.stderr or result.stdout
-                    logger.error(f"Error creating task on SUI: {error_msg}")
-                    return {'success': False, 'error': error_msg}
-                    
-            except subprocess.TimeoutExpired:
-                if os.path.exists(temp_file_path):
-                    os.unlink(temp_file_path)
-                return {'success': False, 'error': 'Transaction timeout (120 seconds)'}
-            except Exception as e:
-                if os.path.exists(temp_file_path):
-                    os.unlink(temp_file_path)
-                logger.error(f"Error executing create_task: {e}")
-                return {'success': False, 'error': str(e)}
-                
+                    coin.stale = True
+                return result
+        except GasPoolExhausted as e:
+            # 不能退回到由节点自动选择gas币：节点可能选中正被在途交易使用的
+            # 池中币，造成对象版本冲突，甚至锁住该币直到epoch结束
+            logger.warning(f"[SUI] {e}, not submitting create_task")
+            return {'success': False, 'error': f'Gas pool exhausted: {e}'}
+
+    async def _create_task(self, task_id: str, service_agent: str, amount_sui: int,
+                           deadline_seconds: int, description: str,
+                           gas_coin: Optional[GasCoin] = None) -> Dict[str, Any]:
+        """提交create_task交易，gas_coin不为空时用它支付gas并等待交易最终确认"""
+        try:
+            result = await sui_call('createTask', {
+                **self._transaction_args(self.config.private_key, gas_coin),
+                'taskId': task_id,
+                'serviceAgent': service_agent,
+                'amount': str(amount_sui),
+                'deadlineSeconds': str(deadline_seconds),
+                'description': description,
+            }, timeout=120)
+        except TimeoutError:
+            return {'success': False, 'error': 'Transaction timeout (120 seconds)'}
         except Exception as e:
             logger.error(f"Error creating task on SUI: {e}")
             return {'success': False, 'error': str(e)}
+
+        if not result['success']:
+            logger.error(f"Error creating task on SUI: {result['error']}")
+            balances.apply(self.config.address, -int(result['gasUsed']))
+            return {
+                'success': False,
+                'error': result['error'],
+                'tx_hash': result['digest'],
+                'gas_used': int(result['gasUsed']),
+                'gas_object': result['gasObject'],
+            }
+
+        tx_hash = result['digest']
+        balances.apply(self.config.address, -amount_sui - int(result['gasUsed']))
+        logger.info(
+            "[SUI] Task created successfully: %s, you can check the task on https://suiscan.xyz/%s/tx/%s",
+            task_id, self.config.network, tx_hash,
+        )
+        
+        return {
+            'success': True,
+            'tx_hash': tx_hash,
+            'task_object_id': result['taskObjectId'],
+            'gas_used': int(result['gasUsed']),
+            'gas_object': result['gasObject'],
+            'vm_status': 'Success'
+        }
     
+    @traced('sui.task_manager.complete_task')
     async def complete_task(self, task_object_id: str) -> Dict[str, Any]:
         """完成任务
         
@@ -176,142 +139,187 @@ class SUITaskManager:
         Returns:
             包含交易结果的字典
         """
+        # 获取服务代理私钥
+        service_agent_key = os.getenv('SERVICE_AGENT_PRIVATE_KEY')
+        if not service_agent_key:
+            return {'success': False, 'error': 'SERVICE_AGENT_PRIVATE_KEY not found'}
+
         try:
-            # 获取服务代理私钥
-            service_agent_key = os.getenv('SERVICE_AGENT_PRIVATE_KEY')
-            if not service_agent_key:
-                return {'success': False, 'error': 'SERVICE_AGENT_PRIVATE_KEY not found'}
-            
-            # 创建JavaScript脚本来执行complete_task交易（使用CommonJS格式）
-            js_script = f'''
-            const {{ Ed25519Keypair }} = require("@mysten/sui/keypairs/ed25519");
-            const {{ Transaction }} = require("@mysten/sui/transactions");
-            const {{ SuiClient, getFullnodeUrl }} = require("@mysten/sui/client");
-            
-            async function completeTask() {{
-                try {{
-                    const serviceAgentKeyPair = Ed25519Keypair.fromSecretKey("{service_agent_key}");
-                    const suiClient = new SuiClient({{ url: getFullnodeUrl("{self.config.network}") }});
-                    
-                    const tx = new Transaction();
-                    tx.moveCall({{
-                        target: `{self.config.task_manager_package_id}::task_manager::complete_task`,
-                        arguments: [
-                            tx.object("{task_object_id}"),
-                            tx.object("{self.config.task_manager_id}"),
-                            tx.object("0x6")
-                        ]
-                    }});
-                    
-                    tx.setGasBudget(20000000);
-                    
-                    const txResult = await suiClient.signAndExecuteTransaction({{
-                        transaction: tx,
-                        signer: serviceAgentKeyPair,
-                        options: {{
-                            showEffects: true,
-                            showObjectChanges: true,
-                            showEvents: true
-                        }}
-                    }});
-                    
-                    console.log("SUCCESS");
-                    console.log(`TX_HASH:${{txResult.digest}}`);
-                    
-                    // 检查完成事件
-                    const completedEvent = txResult.events?.find(event =>
-                        event.type.includes("TaskCompletedEvent")
-                    );
-                    
-                    if (completedEvent) {{
-                        console.log("TASK_COMPLETED");
-                    }}
-                    
-                    process.exit(0);
-                }} catch (error) {{
-                    console.error("ERROR:", error.message);
-                    process.exit(1);
-                }}
-            }}
-            
-            completeTask();
-            '''
-            
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.js', delete=False) as temp_file:
-                temp_file.write(js_script)
-                temp_file_path = temp_file.name
-            
-            try:
-                # 设置NODE_PATH环境变量，确保能找到demo/ui/node_modules
-                node_modules_path = "/Users/pis/workspace/PIN/pin-a2a/demo/ui/node_modules"
-                env = os.environ.copy()
-                env['NODE_PATH'] = node_modules_path
-                
-                result = subprocess.run(['node', temp_file_path], 
-                                      capture_output=True, text=True, timeout=60,
-                                      env=env)
-                os.unlink(temp_file_path)
-                
-                if result.returncode == 0:
-                    # 解析输出
-                    lines = result.stdout.strip().split('\n')
-                    tx_hash = None
-                    
-                    for line in lines:
-                        if line.startswith('TX_HASH:'):
-                            tx_hash = line.split('TX_HASH:')[1]
-                    
-                    logger.info(f"[SUI] Task completed ! check transaction on https://suiscan.xyz/{self.config.network}/tx/{tx_hash}")
-                    
-                    return {'success': True, 'tx_hash': tx_hash}
-                else:
-                    error_msg = result.stderr or result.stdout
-                    logger.error(f"Error completing task on SUI: {error_msg}")
-                    return {'success': False, 'error': error_msg}
-                    
-            except subprocess.TimeoutExpired:
-                if os.path.exists(temp_file_path):
-                    os.unlink(temp_file_path)
-                return {'success': False, 'error': 'Transaction timeout (60 seconds)'}
-            except Exception as e:
-                if os.path.exists(temp_file_path):
-                    os.unlink(temp_file_path)
-                logger.error(f"Error executing complete_task: {e}")
-                return {'success': False, 'error': str(e)}
-                
+            result = await sui_call('completeTask', {
+                **self._transaction_args(service_agent_key),
+                'taskObjectId': task_object_id,
+            }, timeout=60)
+        except TimeoutError:
+            return {'success': False, 'error': 'Transaction timeout (60 seconds)'}
         except Exception as e:
             logger.error(f"Error completing task on SUI: {e}")
             return {'success': False, 'error': str(e)}
+
+        tx_hash = result['digest']
+        # 收到的托管金额不在交易结果中，服务代理的余额在下次读取时对账
+        balances.invalidate(keyring.address(service_agent_key))
+        if not result['success']:
+            logger.error(f"Error completing task on SUI: {result['error']}")
+            return {'success': False, 'error': result['error'], 'tx_hash': tx_hash}
+
+        logger.info(f"[SUI] Task completed ! check transaction on https://suiscan.xyz/{self.config.network}/tx/{tx_hash}")
+        return {'success': True, 'tx_hash': tx_hash}
     
-    # Mock 方法实现
-    async def cancel_task(self, task_id: str) -> Dict[str, Any]:
-        """取消任务 - Mock实现
+    @traced('sui.task_manager.get_transaction')
+    async def get_transaction(self, digest: str) -> Optional[Dict[str, Any]]:
+        """查询交易回执（经共享缓存）
+
+        已进入checkpoint的交易是最终确认的，其回执会被永久缓存；查询不到的
+        交易只做短时负缓存。
+
+        Args:
+            digest: 交易摘要
+
+        Returns:
+            包含digest、success、checkpoint和events的字典，交易不存在时返回None
+        """
+        return await chain_cache.get_receipt(
+            ('sui', self.config.network, 'tx', digest),
+            lambda: self._fetch_transaction(digest),
+            is_final=lambda receipt: receipt.get('checkpoint') is not None,
+        )
+
+    async def _fetch_transaction(self, digest: str) -> Optional[Dict[str, Any]]:
+        return await sui_call(
+            'getTransaction', {'network': self.config.network, 'digest': digest}
+        )
+
+    @traced('sui.task_manager.get_task_by_tx')
+    async def get_task_by_tx(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        """按创建交易查询任务托管
+
+        优先查本地索引；索引尚未同步到该交易时，读取交易回执（经共享缓存）并
+        把其中的事件写入索引。
+
+        Returns:
+            索引中的任务记录，交易不存在或不是create_task交易时返回None
+        """
+        task = self._tx_index.get_task_by_tx(tx_hash)
+        if task is not None:
+            return task
+        receipt = await self.get_transaction(tx_hash)
+        if not receipt or not receipt.get('success'):
+            return None
+        self._tx_index.record_transaction(tx_hash, receipt.get('events', []))
+        return self._tx_index.get_task_by_tx(tx_hash)
+
+    async def cancel_task(self, task_object_id: str) -> Dict[str, Any]:
+        """取消任务并退回托管资金
         
         Args:
-            task_id: 任务ID字符串
+            task_object_id: 任务对象ID（SUI特有）
+            
+        Returns:
+            包含交易结果的字典
+        """
+        return await self.cancel_tasks([task_object_id])
+
+    @traced('sui.task_manager.cancel_tasks')
+    async def cancel_tasks(self, task_object_ids: List[str]) -> Dict[str, Any]:
+        """在一笔可编程交易中批量取消任务
+
+        任何一个任务取消失败都会使整笔交易失败，调用方可拆分后重试。
+
+        Args:
+            task_object_ids: 任务对象ID列表
             
         Returns:
-            包含Mock结果的字典
+            包含交易结果的字典，cancelled为已取消的任务对象ID，refunded为退回的
+            托管总额（MIST）
         """
-        logger.info(f"[SUI] Mock: cancel_task called for task_id: {task_id}")
+        if self.gas_pool is None:
+            return await self._cancel_tasks(task_object_ids)
+        try:
+            async with self.gas_pool.lease(GAS_BUDGET) as coin:
+                result = await self._cancel_tasks(task_object_ids, gas_coin=coin)
+                gas_object = result.get('gas_object')
+                if gas_object:
+                    coin.update(gas_object, coin.balance - result.get('gas_used', 0))
+                else:
+                    coin.stale = True
+                return result
+        except GasPoolExhausted as e:
+            logger.warning(f"[SUI] {e}, not submitting cancel_tasks")
+            return {
+                'success': False,
+                'error': f'Gas pool exhausted: {e}',
+                'cancelled': [],
+                'refunded': 0,
+            }
+
+    async def _cancel_tasks(self, task_object_ids: List[str],
+                            gas_coin: Optional[GasCoin] = None) -> Dict[str, Any]:
+        try:
+            result = await sui_call('cancelTasks', {
+                **self._transaction_args(self.config.private_key, gas_coin),
+                'taskObjectIds': task_object_ids,
+            }, timeout=120)
+        except Exception as e:
+            logger.error(f"Error cancelling tasks on SUI: {e}")
+            return {'success': False, 'error': str(e)}
+
+        refunded = int(result['refunded']) if result['success'] else 0
+        balances.apply(self.config.address, refunded - int(result['gasUsed']))
+        if not result['success']:
+            logger.error(f"Error cancelling tasks on SUI: {result['error']}")
+        else:
+            logger.info(f"[SUI] Cancelled {len(task_object_ids)} task(s), tx: {result['digest']}")
         return {
-            'success': True,
-            'mock': True,
-            'message': 'Cancel task functionality not implemented in POC',
-            'task_id': task_id,
-            'tx_hash': f'mock_cancel_tx_{int(time.time())}'
+            'success': result['success'],
+            'error': result['error'],
+            'tx_hash': result['digest'],
+            'cancelled': result['cancelled'],
+            'refunded': refunded,
+            'gas_used': int(result['gasUsed']),
+            'gas_object': result['gasObject'],
         }
-    
+
+    def _transaction_args(self, private_key: str,
+                          gas_coin: Optional[GasCoin] = None) -> Dict[str, Any]:
+        """交易类操作的公共参数；使用gas币池中的币时等待交易最终确认"""
+        return {
+            'network': self.config.network,
+            'privateKey': private_key,
+            'packageId': self.config.task_manager_package_id,
+            'taskManagerId': self.config.task_manager_id,
+            'gasBudget': str(GAS_BUDGET),
+            'gasCoin': gas_coin.to_ref() if gas_coin else None,
+            'waitForFinality': gas_coin is not None,
+        }
+
+    @traced('sui.task_manager.get_task_info')
     async def get_task_info(self, task_agent_address: str, task_id: str) -> Dict[str, Any]:
-        """查询任务信息 - Mock实现
-        
+        """查询任务信息
+
+        配置了事件索引时从索引读取，否则返回Mock数据。
+
         Args:
             task_agent_address: 任务创建者地址
             task_id: 任务ID字符串
             
         Returns:
-            包含Mock任务信息的字典
+            包含任务信息的字典
         """
+        if self.index is not None:
+            task = self.index.get_task(task_id, task_agent_address)
+            if task is None:
+                return {'error': f'Task {task_id} not found in event index'}
+            return {
+                'task_agent': task['task_agent'],
+                'service_agent': task['service_agent'],
+                'pay_amount': task['pay_amount'],
+                'created_at': task['created_at'],
+                'deadline': task['deadline'],
+                'is_completed': task['status'] == 'completed',
+                'is_cancelled': task['status'] == 'cancelled',
+                'description': task['description'],
+                'task_object_id': task['task_object_id'],
+            }
         logger.info(f"[SUI] Mock: get_task_info called for task_agent: {task_agent_address}, task_id: {task_id}")
         return {
             'mock': True,
@@ -326,15 +334,20 @@ class SUITaskManager:
             'description': f'Mock task info for {task_id}'
         }
     
+    @traced('sui.task_manager.get_task_stats')
     async def get_task_stats(self, task_agent_address: str) -> Dict[str, Any]:
-        """获取任务统计信息 - Mock实现
-        
+        """获取任务统计信息
+
+        配置了事件索引时从索引统计，否则返回Mock数据。
+
         Args:
             task_agent_address: 任务创建者地址
             
         Returns:
-            包含Mock统计信息的字典
+            包含统计信息的字典
         """
+        if self.index is not None:
+            return self.index.get_task_stats(task_agent_address)
         logger.info(f"[SUI] Mock: get_task_stats called for task_agent: {task_agent_address}")
         return {
             'mock': True,
@@ -344,16 +357,21 @@ class SUITaskManager:
             'cancelled_tasks': 1
         }
     
+    @traced('sui.task_manager.is_task_expired')
     async def is_task_expired(self, task_agent_address: str, task_id: str) -> bool:
-        """检查任务是否已过期 - Mock实现
-        
+        """检查任务是否已过期
+
+        配置了事件索引时按索引中的截止时间判断，否则总是返回False。
+
         Args:
             task_agent_address: 任务创建者地址
             task_id: 任务ID字符串
             
         Returns:
-            Mock结果，总是返回False
+            任务是否已过期
         """
+        if self.index is not None:
+            return self.index.is_task_expired(task_id, task_agent_address)
         logger.info(f"[SUI] Mock: is_task_expired called for task_agent: {task_agent_address}, task_id: {task_id}")
         return False  # Mock实现总是返回未过期
 
@@ -374,54 +392,13 @@ class SUISignatureManager:
             签名的十六进制字符串
         """
         try:
-            # 创建临时JavaScript脚本来签名（使用CommonJS格式）
-            js_script = f'''
-            const {{ Ed25519Keypair }} = require("@mysten/sui/keypairs/ed25519");
-            
-            try {{
-                const keypair = Ed25519Keypair.fromSecretKey("{self.config.private_key}");
-                const messageBytes = new TextEncoder().encode("{message}");
-                keypair.sign(messageBytes).then(signature => {{
-                    console.log(signature.signature);
-                    process.exit(0);
-                }}).catch(error => {{
-                    console.error("Error:", error.message);
-                    process.exit(1);
-                }});
-            }} catch (error) {{
-                console.error("Error:", error.message);
-                process.exit(1);
-            }}
-            '''
-            
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.js', delete=False) as temp_file:
-                temp_file.write(js_script)
-                temp_file_path = temp_file.name
-            
-            try:
-                # 设置NODE_PATH环境变量，确保能找到demo/ui/node_modules
-                node_modules_path = "/Users/pis/workspace/PIN/pin-a2a/demo/ui/node_modules"
-                env = os.environ.copy()
-                env['NODE_PATH'] = node_modules_path
-                
-                result = subprocess.run(['node', temp_file_path], 
-                                      capture_output=True, text=True, timeout=30,
-                                      env=env)
-                os.unlink(temp_file_path)
-                
-                if result.returncode == 0:
-                    return result.stdout.strip()
-                else:
-                    logger.error(f"Failed to sign message: {result.stderr}")
-                    return None
-            except Exception as e:
-                if os.path.exists(temp_file_path):
-                    os.unlink(temp_file_path)
-                logger.error(f"Error signing message: {e}")
-                return None
-                
+            result = sui_call_sync(
+                'signMessage',
+                {'privateKey': self.config.private_key, 'message': message},
+            )
+            return result['signature']
         except Exception as e:
-            logger.error(f"Error in sign_message: {e}")
+            logger.error(f"Failed to sign message: {e}")
             return None
     
     def verify_signature(self, message: str, signature: str, public_key: str) -> bool:
@@ -4,10 +4,11 @@
 """
 import logging
 import os
-import subprocess
-import tempfile
 from typing import Optional
 
+from .sui_node import sui_call
+from .sui_wallet import balances, keyring
+
 # Configure logging to reduce verbosity
 logging.basicConfig(level=logging.WARNING)
 logger = logging.getLogger(__name__)
@@ -51,54 +52,14 @@ class SUIConfig:
             self.task_manager_id = '0x' + self.task_manager_id
     
     def _get_address_from_private_key(self) -> str:
-        """从私钥获取SUI地址"""
+        """从私钥获取SUI地址（经进程内共享的keyring缓存）"""
         try:
-            # 创建临时JavaScript脚本来获取地址（使用CommonJS格式）
-            js_script = f'''
-            const {{ Ed25519Keypair }} = require("@mysten/sui/keypairs/ed25519");
-            
-            try {{
-                const keypair = Ed25519Keypair.fromSecretKey("{self.private_key}");
-                const address = keypair.toSuiAddress();
-                console.log(address);
-                process.exit(0);
-            }} catch (error) {{
-                console.error("Error:", error.message);
-                process.exit(1);
-            }}
-            '''
-            
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.js', delete=False) as temp_file:
-                temp_file.write(js_script)
-                temp_file_path = temp_file.name
-            
-            try:
-                # 设置NODE_PATH环境变量，确保能找到demo/ui/node_modules
-                node_modules_path = "/Users/pis/workspace/PIN/pin-a2a/demo/ui/node_modules"
-                env = os.environ.copy()
-                env['NODE_PATH'] = node_modules_path
-                
-                result = subprocess.run(['node', temp_file_path], 
-                                      capture_output=True, text=True, timeout=30,
-                                      env=env)
-                os.unlink(temp_file_path)
-                
-                if result.returncode == 0:
-                    address = result.stdout.strip()
-                    logger.info(f"Successfully got SUI address from private key: {address}")
-                    return address
-                else:
-                    logger.error(f"Failed to get address: {result.stderr}")
-                    # 如果JavaScript执行失败，返回一个基于私钥的确定性地址
-                    return self._get_deterministic_address()
-            except Exception as e:
-                if os.path.exists(temp_file_path):
-                    os.unlink(temp_file_path)
-                logger.error(f"Error getting address: {e}")
-                return self._get_deterministic_address()
-                
+            address = keyring.address(self.private_key)
+            logger.info(f"Successfully got SUI address from private key: {address}")
+            return address
         except Exception as e:
-            logger.error(f"Error in _get_address_from_private_key: {e}")
+            logger.error(f"Failed to get address: {e}")
+            # 如果JavaScript执行失败，返回一个基于私钥的确定性地址
             return self._get_deterministic_address()
     
     def _get_deterministic_address(self) -> str:
@@ -112,64 +73,28 @@ class SUIConfig:
         logger.warning(f"Using deterministic address based on private key: {address}")
         return address
     
-    async def get_account_balance(self, account_address=None) -> int:
-        """获取账户SUI余额（以MIST为单位，1 SUI = 10^9 MIST）"""
+    async def get_account_balance(self, account_address=None, refresh: bool = False) -> int:
+        """获取账户SUI余额（以MIST为单位，1 SUI = 10^9 MIST）
+
+        余额由本地余额跟踪器维护，未到对账时间时不请求节点；refresh为True时
+        强制从链上读取。
+        """
         if account_address is None:
             account_address = self.address
         
         if account_address is None:
             raise ValueError("No account address available")
         
+        async def fetch() -> int:
+            result = await sui_call(
+                'balance', {'network': self.network, 'owner': account_address}
+            )
+            return int(result['totalBalance'])
+
         try:
-            # 创建临时JavaScript脚本来获取余额（使用CommonJS格式）
-            js_script = f'''
-            const {{ SuiClient, getFullnodeUrl }} = require("@mysten/sui/client");
-            
-            async function getBalance() {{
-                try {{
-                    const suiClient = new SuiClient({{ url: getFullnodeUrl("{self.network}") }});
-                    const balance = await suiClient.getBalance({{
-                        owner: "{account_address}"
-                    }});
-                    console.log(balance.totalBalance);
-                    process.exit(0);
-                }} catch (error) {{
-                    console.error("Error:", error.message);
-                    process.exit(1);
-                }}
-            }}
-            
-            getBalance();
-            '''
-            
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.js', delete=False) as temp_file:
-                temp_file.write(js_script)
-                temp_file_path = temp_file.name
-            
-            try:
-                # 设置NODE_PATH环境变量，确保能找到demo/ui/node_modules
-                node_modules_path = "/Users/pis/workspace/PIN/pin-a2a/demo/ui/node_modules"
-                env = os.environ.copy()
-                env['NODE_PATH'] = node_modules_path
-                
-                result = subprocess.run(['node', temp_file_path], 
-                                      capture_output=True, text=True, timeout=30,
-                                      env=env)
-                os.unlink(temp_file_path)
-                
-                if result.returncode == 0:
-                    return int(result.stdout.strip())
-                else:
-                    logger.error(f"Failed to get balance: {result.stderr}")
-                    return 0
-            except Exception as e:
-                if os.path.exists(temp_file_path):
-                    os.unlink(temp_file_path)
-                logger.error(f"Error getting balance: {e}")
-                return 0
-                
+            return await balances.get(account_address, fetch, refresh=refresh)
         except Exception as e:
-            logger.error(f"Error in get_account_balance: {e}")
+            logger.error(f"Failed to get balance: {e}")
             return 0
     
     def get_module_function_name(self, function_name: str) -> str:
@@ -179,49 +104,10 @@ class SUIConfig:
     async def is_connected(self) -> bool:
         """检查是否连接到SUI网络"""
         try:
-            # 创建临时JavaScript脚本来检查连接（使用CommonJS格式）
-            js_script = f'''
-            const {{ SuiClient, getFullnodeUrl }} = require("@mysten/sui/client");
-            
-            async function checkConnection() {{
-                try {{
-                    const suiClient = new SuiClient({{ url: getFullnodeUrl("{self.network}") }});
-                    const chainId = await suiClient.getChainIdentifier();
-                    console.log("connected");
-                    process.exit(0);
-                }} catch (error) {{
-                    console.error("Error:", error.message);
-                    process.exit(1);
-                }}
-            }}
-            
-            checkConnection();
-            '''
-            
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.js', delete=False) as temp_file:
-                temp_file.write(js_script)
-                temp_file_path = temp_file.name
-            
-            try:
-                # 设置NODE_PATH环境变量，确保能找到demo/ui/node_modules
-                node_modules_path = "/Users/pis/workspace/PIN/pin-a2a/demo/ui/node_modules"
-                env = os.environ.copy()
-                env['NODE_PATH'] = node_modules_path
-                
-                result = subprocess.run(['node', temp_file_path], 
-                                      capture_output=True, text=True, timeout=30,
-                                      env=env)
-                os.unlink(temp_file_path)
-                
-                return result.returncode == 0
-            except Exception as e:
-                if os.path.exists(temp_file_path):
-                    os.unlink(temp_file_path)
-                logger.error(f"Connection check failed: {e}")
-                return False
-                
+            await sui_call('chainIdentifier', {'network': self.network})
+            return True
         except Exception as e:
-            logger.error(f"Error in is_connected: {e}")
+            logger.error(f"Connection check failed: {e}")
             return False
     
     def __str__(self) -> str:
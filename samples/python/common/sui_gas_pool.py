@@ -0,0 +1,292 @@
+"""SUI Gas币池模块
+
+同一钱包的所有交易默认都用同一个gas币对象支付，并发提交时会因对象版本冲突被
+拒绝或被串行化。本模块把钱包预先拆分成一组gas币对象，每笔交易租用其中一个，
+交易确认后用交易效果中的新版本号归还，从而允许同一钱包有多笔交易同时在途。
+后台任务会定期合并余额过小的币并补足池中的币数量。
+"""
+
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional
+
+from .sui_node import sui_call
+
+
+logger = logging.getLogger(__name__)
+
+# 与SUITaskManager中的setGasBudget保持一致
+GAS_BUDGET = 20000000
+
+
+class GasPoolExhausted(Exception):
+    """没有余额足够的gas币可租用"""
+
+
+@dataclass
+class GasCoin:
+    """本地跟踪的gas币对象引用"""
+
+    object_id: str
+    version: str
+    digest: str
+    balance: int
+    # 交易结果未知时置为True，归还时会丢弃该币并从链上重新读取
+    stale: bool = False
+
+    def to_ref(self) -> dict:
+        return {
+            'objectId': self.object_id,
+            'version': self.version,
+            'digest': self.digest,
+        }
+
+    def update(self, ref: dict, balance: int):
+        """用交易效果中的gasObject引用更新本地版本"""
+        self.version = str(ref['version'])
+        self.digest = ref['digest']
+        self.balance = balance
+
+
+class SUIGasPool:
+    """SUI gas币池
+
+    Args:
+        config: SUIConfig实例
+        pool_size: 池中目标gas币数量
+        coin_balance: 拆分出的每个gas币的余额（MIST）
+        dust_balance: 余额低于该值的空闲币会被合并
+        rebalance_interval: 后台整理间隔（秒）
+    """
+
+    def __init__(self, config, pool_size: int = 8,
+                 coin_balance: int = 200000000,
+                 dust_balance: int = 2 * GAS_BUDGET,
+                 rebalance_interval: float = 60.0):
+        self.config = config
+        self.pool_size = pool_size
+        self.coin_balance = coin_balance
+        self.dust_balance = dust_balance
+        self.rebalance_interval = rebalance_interval
+        self._free: dict[str, GasCoin] = {}
+        self._leased: dict[str, GasCoin] = {}
+        self._condition = asyncio.Condition()
+        self._needs_refresh = True
+        # 同时需要刷新的调用共用一次链上读取
+        self._refresh_lock = asyncio.Lock()
+        self._refreshes = 0
+        self._started = False
+        self._rebalance_task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls, config) -> Optional['SUIGasPool']:
+        """根据SUI_GAS_POOL_*环境变量创建币池，池大小为0时返回None"""
+        pool_size = int(os.getenv('SUI_GAS_POOL_SIZE', '0'))
+        if pool_size <= 0:
+            return None
+        return cls(
+            config,
+            pool_size=pool_size,
+            coin_balance=int(os.getenv('SUI_GAS_COIN_BALANCE', '200000000')),
+        )
+
+    @property
+    def free_coins(self) -> List[GasCoin]:
+        return list(self._free.values())
+
+    @property
+    def leased_coins(self) -> List[GasCoin]:
+        return list(self._leased.values())
+
+    async def start(self):
+        """读取链上币列表，补足币池并启动后台整理任务"""
+        if self._started:
+            return
+        self._started = True
+        await self.rebalance()
+        if self.rebalance_interval > 0:
+            self._rebalance_task = asyncio.create_task(self._rebalance_loop())
+
+    async def stop(self):
+        if self._rebalance_task is not None:
+            self._rebalance_task.cancel()
+            self._rebalance_task = None
+        self._started = False
+
+    @asynccontextmanager
+    async def lease(self, amount: int, timeout: float = 30.0) -> AsyncIterator[GasCoin]:
+        """租用一个余额不少于amount的gas币
+
+        代码块中成功执行交易后应调用coin.update()写入新版本；交易结果不确定时
+        应设置coin.stale = True。代码块抛出异常时同样视为结果不确定。
+
+        Raises:
+            GasPoolExhausted: 池中没有余额足够的币，或等待超时
+        """
+        if not self._started:
+            await self.start()
+        if self._needs_refresh:
+            await self.refresh()
+
+        async with self._condition:
+            if not any(
+                c.balance >= amount
+                for c in (*self._free.values(), *self._leased.values())
+            ):
+                raise GasPoolExhausted(f"No gas coin with balance >= {amount}")
+            try:
+                async with asyncio.timeout(timeout):
+                    await self._condition.wait_for(lambda: self._pick(amount))
+            except TimeoutError:
+                raise GasPoolExhausted(
+                    f"Timed out waiting for a gas coin with balance >= {amount}"
+                )
+            coin = self._pick(amount)
+            del self._free[coin.object_id]
+            self._leased[coin.object_id] = coin
+
+        ok = False
+        try:
+            yield coin
+            ok = not coin.stale
+        finally:
+            async with self._condition:
+                del self._leased[coin.object_id]
+                if ok:
+                    self._free[coin.object_id] = coin
+                else:
+                    # 版本未知，丢弃并在下次租用前从链上重新读取
+                    self._needs_refresh = True
+                self._condition.notify_all()
+
+    async def refresh(self):
+        """从链上重新读取空闲币（不影响正在租用的币）
+
+        等待期间有在本次调用之后开始的读取完成时，直接使用它的结果。
+        """
+        requested = self._refreshes
+        async with self._refresh_lock:
+            if self._refreshes > requested:
+                return
+            self._refreshes += 1
+            coins = await self._fetch_coins()
+            async with self._condition:
+                self._free = {
+                    c.object_id: c for c in coins
+                    if c.object_id not in self._leased
+                }
+                self._needs_refresh = False
+                self._condition.notify_all()
+
+    async def rebalance(self):
+        """合并余额过小的空闲币，并从最大的空闲币中拆分以补足币池"""
+        try:
+            await self.refresh()
+            free = sorted(self._free.values(), key=lambda c: c.balance, reverse=True)
+            dust = [c for c in free[1:] if c.balance < self.dust_balance]
+            if free and dust:
+                async with self._reserved([free[0], *dust]) as reserved:
+                    # 只使用确实预留到的币：refresh之后被租出的币正被在途交易使用
+                    primary = reserved.get(free[0].object_id)
+                    dust = [reserved[c.object_id] for c in dust if c.object_id in reserved]
+                    if primary is not None and dust:
+                        await self._merge_coins(primary, dust)
+                await self.refresh()
+                free = sorted(self._free.values(), key=lambda c: c.balance, reverse=True)
+
+            missing = self.pool_size - len(self._free) - len(self._leased)
+            if missing > 0 and free:
+                async with self._reserved([free[0]]) as reserved:
+                    largest = reserved.get(free[0].object_id)
+                    if largest is not None:
+                        # 拆分后最大的币仍需保留支付拆分交易的gas
+                        affordable = (largest.balance - 2 * GAS_BUDGET) // self.coin_balance
+                        count = min(missing, affordable)
+                        if count > 0:
+                            await self._split_coin(largest, [self.coin_balance] * count)
+                await self.refresh()
+        except Exception as e:
+            logger.error(f"[SUI] Gas pool rebalance failed: {e}")
+            self._needs_refresh = True
+
+    def stats(self) -> dict:
+        return {
+            'free': len(self._free),
+            'leased': len(self._leased),
+            'free_balance': sum(c.balance for c in self._free.values()),
+        }
+
+    @asynccontextmanager
+    async def _reserved(self, coins: List[GasCoin]) -> AsyncIterator[Dict[str, GasCoin]]:
+        """整理交易执行期间把相关的币标记为租用，避免被同时租出
+
+        Yields:
+            object_id -> 预留到的币（池中的当前版本）。已被租出的币不在其中，
+            不能在整理交易中使用
+        """
+        async with self._condition:
+            reserved = {}
+            for coin in coins:
+                current = self._free.pop(coin.object_id, None)
+                if current is not None:
+                    reserved[coin.object_id] = current
+                    self._leased[coin.object_id] = current
+            coins = list(reserved.values())
+        try:
+            yield reserved
+        finally:
+            async with self._condition:
+                for coin in coins:
+                    self._leased.pop(coin.object_id, None)
+                # 版本已变化，由随后的refresh重新读取
+                self._needs_refresh = True
+
+    def _pick(self, amount: int) -> Optional[GasCoin]:
+        # 选择满足金额的最小余额币，把大币留给大额交易
+        candidates = [c for c in self._free.values() if c.balance >= amount]
+        return min(candidates, key=lambda c: c.balance) if candidates else None
+
+    async def _rebalance_loop(self):
+        while True:
+            await asyncio.sleep(self.rebalance_interval)
+            await self.rebalance()
+
+    async def _fetch_coins(self) -> List[GasCoin]:
+        """读取钱包中所有SUI币对象"""
+        coins = await sui_call(
+            'listCoins',
+            {'network': self.config.network, 'owner': self.config.address},
+        )
+        return [
+            GasCoin(c['objectId'], str(c['version']), c['digest'], int(c['balance']))
+            for c in coins
+        ]
+
+    async def _split_coin(self, coin: GasCoin, amounts: List[int]):
+        """把coin拆分为若干个指定余额的新币，转回本钱包"""
+        await self._execute('splitCoins', coin, {
+            'amounts': [str(a) for a in amounts],
+            'recipient': self.config.address,
+        })
+
+    async def _merge_coins(self, primary: GasCoin, coins: List[GasCoin]):
+        """把coins合并进primary"""
+        await self._execute('mergeCoins', primary, {
+            'coins': [c.to_ref() for c in coins],
+        })
+
+    async def _execute(self, op: str, gas_coin: GasCoin, args: dict):
+        result = await sui_call(op, {
+            'network': self.config.network,
+            'privateKey': self.config.private_key,
+            'gasBudget': str(GAS_BUDGET),
+            'gasCoin': gas_coin.to_ref(),
+            'waitForFinality': True,
+            **args,
+        }, timeout=120)
+        if not result['success']:
+            raise RuntimeError(result['error'])
+        logger.info(f"[SUI] Gas pool transaction: {result['digest']}")
@@ -0,0 +1,221 @@
+"""SUI Node操作进程客户端
+
+@mysten/sui只有JavaScript SDK，SUI相关操作都交给一个常驻的Node进程
+（sui_scripts/sui_ops.js）执行：脚本只在进程启动时加载一次，之后每次调用只
+通过标准输入发送一行JSON参数。私钥等参数不会写入磁盘，参数以JSON传递，描述中
+的引号等字符不会破坏脚本。
+
+进程由读取线程处理响应，同一进程可以被多个线程和事件循环同时使用；进程退出后
+下次调用时自动重启。
+"""
+
+import asyncio
+import concurrent.futures
+import itertools
+import json
+import logging
+import os
+import subprocess
+import threading
+from typing import Any, Dict, Optional
+
+from .utils import telemetry
+
+
+logger = logging.getLogger(__name__)
+
+SCRIPT_PATH = os.path.join(os.path.dirname(__file__), 'sui_scripts', 'sui_ops.js')
+# 与sui_ops.js中的PROTOCOL_VERSION保持一致
+SCRIPT_VERSION = 1
+# 默认使用仓库中demo/ui安装的@mysten/sui
+DEFAULT_NODE_PATH = os.path.normpath(
+    os.path.join(os.path.dirname(__file__), '..', '..', '..', 'demo', 'ui', 'node_modules')
+)
+
+_worker: Optional['SUINodeWorker'] = None
+_worker_lock = threading.Lock()
+
+
+class SUINodeError(Exception):
+    """Node进程执行操作失败"""
+
+
+class SUINodeWorker:
+    """常驻的SUI操作进程
+
+    Args:
+        script: 操作脚本路径
+        node_path: 查找@mysten/sui的NODE_PATH
+        start_timeout: 等待进程就绪的时间（秒）
+    """
+
+    def __init__(self, script: str = SCRIPT_PATH, node_path: Optional[str] = None,
+                 start_timeout: float = 30.0):
+        self.script = script
+        self.node_path = node_path or os.getenv('SUI_NODE_PATH', DEFAULT_NODE_PATH)
+        self.start_timeout = start_timeout
+        self._lock = threading.Lock()
+        self._process: Optional[subprocess.Popen] = None
+        self._ready: Optional[concurrent.futures.Future] = None
+        # request id -> (future, 处理该请求的进程)
+        self._pending: Dict[int, tuple] = {}
+        self._ids = itertools.count(1)
+        self.calls = 0
+        self.restarts = 0
+
+    def call_sync(self, op: str, args: Dict[str, Any], timeout: float = 30.0) -> Any:
+        """执行操作并阻塞等待结果
+
+        Raises:
+            SUINodeError: 操作失败或进程异常退出
+            TimeoutError: 超时
+        """
+        request_id, future = self._submit(op, args)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            raise TimeoutError(f"SUI operation {op} timed out after {timeout}s")
+        finally:
+            with self._lock:
+                self._pending.pop(request_id, None)
+
+    async def call(self, op: str, args: Dict[str, Any], timeout: float = 30.0) -> Any:
+        """执行操作并等待结果，不阻塞事件循环"""
+        if self._process is None or self._process.poll() is not None:
+            # 启动进程需要等待就绪信号，放到线程中执行
+            await asyncio.to_thread(self._ensure_started)
+        request_id, future = self._submit(op, args)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"SUI operation {op} timed out after {timeout}s")
+        finally:
+            with self._lock:
+                self._pending.pop(request_id, None)
+
+    def close(self):
+        with self._lock:
+            process, self._process = self._process, None
+        if process is not None and process.poll() is None:
+            process.stdin.close()
+            try:
+                process.wait(5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'running': self._process is not None and self._process.poll() is None,
+                'pending': len(self._pending),
+                'calls': self.calls,
+                'restarts': self.restarts,
+            }
+
+    def _submit(self, op: str, args: Dict[str, Any]):
+        self._ensure_started()
+        request_id = next(self._ids)
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        line = json.dumps({'id': request_id, 'op': op, 'args': args}) + '\n'
+        with self._lock:
+            self._pending[request_id] = (future, self._process)
+            self.calls += 1
+            try:
+                self._process.stdin.write(line)
+                self._process.stdin.flush()
+            except (BrokenPipeError, OSError, AttributeError) as e:
+                del self._pending[request_id]
+                raise SUINodeError(f"SUI worker is not running: {e}")
+        return request_id, future
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._process is not None and self._process.poll() is None:
+                ready = self._ready
+            else:
+                if self._process is not None:
+                    self.restarts += 1
+                env = os.environ.copy()
+                env['NODE_PATH'] = self.node_path
+                self._process = subprocess.Popen(
+                    ['node', self.script],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    bufsize=1,
+                    env=env,
+                )
+                ready = self._ready = concurrent.futures.Future()
+                threading.Thread(
+                    target=self._read_stdout, args=(self._process, ready), daemon=True
+                ).start()
+                threading.Thread(
+                    target=self._read_stderr, args=(self._process,), daemon=True
+                ).start()
+        try:
+            version = ready.result(self.start_timeout)
+        except concurrent.futures.TimeoutError:
+            raise SUINodeError("SUI worker did not become ready")
+        if version != SCRIPT_VERSION:
+            raise SUINodeError(
+                f"SUI worker protocol version {version}, expected {SCRIPT_VERSION}"
+            )
+
+    def _read_stdout(self, process: subprocess.Popen,
+                     ready: concurrent.futures.Future):
+        for line in process.stdout:
+            try:
+                message = json.loads(line)
+            except json.JSONDecodeError:
+                logger.debug(f"[SUI] worker: {line.rstrip()}")
+                continue
+            if message.get('ready'):
+                ready.set_result(message.get('version'))
+                continue
+            with self._lock:
+                future, _ = self._pending.pop(message.get('id'), (None, None))
+            if future is None or future.done():
+                continue
+            if message.get('ok'):
+                future.set_result(message.get('result'))
+            else:
+                future.set_exception(SUINodeError(message.get('error')))
+
+        # 进程已退出，所有等待中的调用失败
+        process.wait()
+        error = SUINodeError(f"SUI worker exited with code {process.returncode}")
+        if not ready.done():
+            ready.set_exception(error)
+        with self._lock:
+            pending = [
+                request_id for request_id, (_, owner) in self._pending.items()
+                if owner is process
+            ]
+            futures = [self._pending.pop(request_id)[0] for request_id in pending]
+        for future in futures:
+            if not future.done():
+                future.set_exception(error)
+
+    def _read_stderr(self, process: subprocess.Popen):
+        for line in process.stderr:
+            logger.warning(f"[SUI] worker: {line.rstrip()}")
+
+
+def get_worker() -> SUINodeWorker:
+    """返回进程内共享的SUI操作进程"""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = SUINodeWorker()
+        return _worker
+
+
+async def sui_call(op: str, args: Dict[str, Any], timeout: float = 30.0) -> Any:
+    with telemetry.span(f'sui.node.{op}', **{'sui.network': args.get('network')}):
+        return await get_worker().call(op, args, timeout)
+
+
+def sui_call_sync(op: str, args: Dict[str, Any], timeout: float = 30.0) -> Any:
+    with telemetry.span(f'sui.node.{op}', **{'sui.network': args.get('network')}):
+        return get_worker().call_sync(op, args, timeout)
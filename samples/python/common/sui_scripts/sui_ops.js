@@ -0,0 +1,238 @@
+// SUI操作进程
+//
+// 由common/sui_node.py启动并常驻，模块只加载和编译一次。每行标准输入是一个
+// JSON请求 {"id", "op", "args"}，每行标准输出是一个JSON响应
+// {"id", "ok", "result"} 或 {"id", "ok": false, "error"}。私钥只通过标准输入
+// 传入，不写入文件或命令行。
+//
+// 修改操作的参数或返回格式时需要递增PROTOCOL_VERSION，并同步修改
+// sui_node.py中的SCRIPT_VERSION。
+
+const readline = require("readline");
+const { Ed25519Keypair } = require("@mysten/sui/keypairs/ed25519");
+const { Transaction } = require("@mysten/sui/transactions");
+const { SuiClient, getFullnodeUrl } = require("@mysten/sui/client");
+
+const PROTOCOL_VERSION = 1;
+
+const clients = new Map();
+const keypairs = new Map();
+
+function client(network) {
+    if (!clients.has(network)) {
+        clients.set(network, new SuiClient({ url: getFullnodeUrl(network) }));
+    }
+    return clients.get(network);
+}
+
+function keypair(privateKey) {
+    if (!keypairs.has(privateKey)) {
+        keypairs.set(privateKey, Ed25519Keypair.fromSecretKey(privateKey));
+    }
+    return keypairs.get(privateKey);
+}
+
+function gasUsed(effects) {
+    const gas = effects?.gasUsed;
+    if (!gas) {
+        return "0";
+    }
+    return (BigInt(gas.computationCost) + BigInt(gas.storageCost) - BigInt(gas.storageRebate)).toString();
+}
+
+// 构建、签名并执行一笔交易，build(tx)负责添加交易指令
+async function execute(args, build) {
+    const suiClient = client(args.network);
+    const tx = new Transaction();
+    if (args.gasCoin) {
+        tx.setGasPayment([args.gasCoin]);
+    }
+    build(tx);
+    tx.setGasBudget(BigInt(args.gasBudget));
+
+    const txResult = await suiClient.signAndExecuteTransaction({
+        transaction: tx,
+        signer: keypair(args.privateKey),
+        options: { showEffects: true, showEvents: true, showObjectChanges: true }
+    });
+    if (args.waitForFinality) {
+        await suiClient.waitForTransaction({ digest: txResult.digest });
+    }
+    const effects = txResult.effects;
+    return {
+        digest: txResult.digest,
+        success: effects?.status?.status === "success",
+        error: effects?.status?.error ?? null,
+        gasObject: effects?.gasObject?.reference ?? null,
+        gasUsed: gasUsed(effects),
+        events: (txResult.events || []).map(e => ({ type: e.type, parsedJson: e.parsedJson })),
+        objectChanges: txResult.objectChanges || []
+    };
+}
+
+function taskManagerCall(tx, args, fn, taskArguments) {
+    tx.moveCall({
+        target: `${args.packageId}::task_manager::${fn}`,
+        arguments: [
+            ...taskArguments,
+            tx.object(args.taskManagerId),
+            tx.object("0x6")
+        ]
+    });
+}
+
+const ops = {
+    async address({ privateKey }) {
+        return { address: keypair(privateKey).toSuiAddress() };
+    },
+
+    async signMessage({ privateKey, message }) {
+        const signature = await keypair(privateKey).sign(new TextEncoder().encode(message));
+        return { signature: Buffer.from(signature).toString("hex") };
+    },
+
+    async balance({ network, owner }) {
+        const balance = await client(network).getBalance({ owner });
+        return { totalBalance: balance.totalBalance };
+    },
+
+    async chainIdentifier({ network }) {
+        return { chainIdentifier: await client(network).getChainIdentifier() };
+    },
+
+    async getTransaction({ network, digest }) {
+        try {
+            const tx = await client(network).getTransactionBlock({
+                digest,
+                options: { showEffects: true, showEvents: true }
+            });
+            return {
+                digest: tx.digest,
+                success: tx.effects?.status?.status === "success",
+                error: tx.effects?.status?.error ?? null,
+                checkpoint: tx.checkpoint ?? null,
+                events: (tx.events || []).map(e => ({ type: e.type, parsedJson: e.parsedJson }))
+            };
+        } catch (error) {
+            if (/Could not find the referenced transaction/i.test(error.message)) {
+                return null;
+            }
+            throw error;
+        }
+    },
+
+    async listCoins({ network, owner }) {
+        const coins = [];
+        let cursor = null;
+        do {
+            const page = await client(network).getCoins({ owner, coinType: "0x2::sui::SUI", cursor });
+            coins.push(...page.data);
+            cursor = page.hasNextPage ? page.nextCursor : null;
+        } while (cursor);
+        return coins.map(c => ({
+            objectId: c.coinObjectId,
+            version: c.version,
+            digest: c.digest,
+            balance: c.balance
+        }));
+    },
+
+    async queryEvents({ network, packageId, module, cursor, limit }) {
+        const page = await client(network).queryEvents({
+            query: { MoveModule: { package: packageId, module } },
+            cursor,
+            limit,
+            order: "ascending"
+        });
+        return { data: page.data, nextCursor: page.nextCursor, hasNextPage: page.hasNextPage };
+    },
+
+    async createTask(args) {
+        const result = await execute(args, tx => {
+            const [coin] = tx.splitCoins(tx.gas, [tx.pure.u64(BigInt(args.amount))]);
+            tx.moveCall({
+                target: `${args.packageId}::task_manager::create_task`,
+                arguments: [
+                    tx.pure.string(args.taskId),
+                    tx.pure.address(args.serviceAgent),
+                    coin,
+                    tx.pure.u64(BigInt(args.deadlineSeconds)),
+                    tx.pure.string(args.description),
+                    tx.object(args.taskManagerId),
+                    tx.object("0x6")
+                ]
+            });
+        });
+        const createdEvent = result.events.find(e => e.type.includes("TaskCreatedEvent"));
+        const taskObject = result.objectChanges.find(change =>
+            change.type === "created" && change.objectType && change.objectType.includes("Task")
+        );
+        result.taskObjectId = taskObject?.objectId ?? createdEvent?.parsedJson?.task_object_id ?? null;
+        return result;
+    },
+
+    async completeTask(args) {
+        return execute(args, tx => {
+            taskManagerCall(tx, args, "complete_task", [tx.object(args.taskObjectId)]);
+        });
+    },
+
+    async cancelTasks(args) {
+        const result = await execute(args, tx => {
+            for (const taskObjectId of args.taskObjectIds) {
+                taskManagerCall(tx, args, "cancel_task", [tx.object(taskObjectId)]);
+            }
+        });
+        const cancelled = result.events.filter(e => e.type.includes("TaskCancelledEvent"));
+        result.cancelled = cancelled.map(e => e.parsedJson?.task_object_id).filter(Boolean);
+        result.refunded = cancelled.reduce(
+            (sum, e) => sum + BigInt(e.parsedJson?.pay_amount ?? e.parsedJson?.amount ?? 0), 0n
+        ).toString();
+        return result;
+    },
+
+    async splitCoins(args) {
+        return execute(args, tx => {
+            const coins = tx.splitCoins(tx.gas, args.amounts.map(a => tx.pure.u64(BigInt(a))));
+            tx.transferObjects(args.amounts.map((_, i) => coins[i]), tx.pure.address(args.recipient));
+        });
+    },
+
+    async mergeCoins(args) {
+        return execute(args, tx => {
+            tx.mergeCoins(tx.gas, args.coins.map(ref => tx.objectRef(ref)));
+        });
+    }
+};
+
+function reply(message) {
+    process.stdout.write(JSON.stringify(message) + "\n");
+}
+
+async function handle(line) {
+    let request;
+    try {
+        request = JSON.parse(line);
+    } catch (error) {
+        reply({ id: null, ok: false, error: `Invalid request: ${error.message}` });
+        return;
+    }
+    const op = ops[request.op];
+    if (!op) {
+        reply({ id: request.id, ok: false, error: `Unknown operation: ${request.op}` });
+        return;
+    }
+    try {
+        reply({ id: request.id, ok: true, result: await op(request.args || {}) });
+    } catch (error) {
+        reply({ id: request.id, ok: false, error: error.message });
+    }
+}
+
+reply({ ready: true, version: PROTOCOL_VERSION });
+// 请求并发处理，响应按完成顺序返回，由id对应
+readline.createInterface({ input: process.stdin }).on("line", line => {
+    if (line.trim()) {
+        handle(line);
+    }
+});
@@ -0,0 +1,276 @@
+"""SUI账户密钥与余额缓存模块
+
+SUIConfig每次构造都要从私钥推导地址，查询余额也都要请求节点。本模块提供两个
+进程内共享的对象：
+
+- keyring：按私钥指纹缓存地址。优先用PyNaCl在进程内推导，不可用时才交给Node
+  进程推导，并把结果按指纹写入磁盘缓存，之后的进程也不用再推导。磁盘上只保存
+  私钥的SHA-256指纹和公开地址，不保存私钥。
+- balances：本地维护的账户余额。由本进程发出的交易按交易效果在本地增减余额，
+  超过对账间隔或被标记为失效后，下次读取时再从链上重新查询。交易前的余额检查
+  因此通常不需要网络请求。
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .sui_node import sui_call_sync
+
+
+logger = logging.getLogger(__name__)
+
+# SUI地址 = BLAKE2b-256(签名方案标志 || 公钥)，Ed25519的标志为0x00
+ED25519_FLAG = 0
+PRIVATE_KEY_PREFIX = 'suiprivkey'
+BECH32_CHARSET = 'qpzry9x8gf2tvdw0s3jn54khce6mua7l'
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.expanduser('~'), '.cache', 'a2a-samples', 'sui_addresses.json'
+)
+# 本地余额超过该时间（秒）后，下次读取时与链上对账
+DEFAULT_RECONCILE_INTERVAL = 60.0
+
+
+def key_fingerprint(private_key: str) -> str:
+    """私钥指纹，用作缓存键"""
+    return hashlib.sha256(f'sui-keyring:{private_key}'.encode()).hexdigest()
+
+
+def _bech32_decode(value: str) -> tuple:
+    """解码bech32字符串，返回(hrp, 数据字节)；校验和错误时抛出ValueError"""
+    value = value.lower()
+    pos = value.rfind('1')
+    if pos < 1 or pos + 7 > len(value):
+        raise ValueError('Invalid bech32 string')
+    hrp = value[:pos]
+    try:
+        data = [BECH32_CHARSET.index(c) for c in value[pos + 1:]]
+    except ValueError:
+        raise ValueError('Invalid bech32 character')
+
+    checksum = 1
+    generator = [0x3b6a57b2, 0x26508e6d, 0x1ea119fa, 0x3d4233dd, 0x2a1462b3]
+    for v in [ord(c) >> 5 for c in hrp] + [0] + [ord(c) & 31 for c in hrp] + data:
+        top = checksum >> 25
+        checksum = (checksum & 0x1ffffff) << 5 ^ v
+        for i in range(5):
+            if (top >> i) & 1:
+                checksum ^= generator[i]
+    if checksum != 1:
+        raise ValueError('Invalid bech32 checksum')
+
+    # 5位分组转换为8位字节
+    acc, bits, result = 0, 0, bytearray()
+    for v in data[:-6]:
+        acc = (acc << 5) | v
+        bits += 5
+        if bits >= 8:
+            bits -= 8
+            result.append((acc >> bits) & 0xff)
+    return hrp, bytes(result)
+
+
+def _signing_key_class():
+    """延迟导入PyNaCl（导入约需0.1秒）；PyNaCl由aptos-sdk引入，缺少时返回None"""
+    try:
+        from nacl.signing import SigningKey
+    except ImportError:
+        return None
+    return SigningKey
+
+
+def derive_address(private_key: str) -> str:
+    """在进程内从Ed25519私钥推导SUI地址
+
+    支持suiprivkey格式和十六进制格式（32字节种子，或64字节种子+公钥）。
+
+    Raises:
+        ValueError: 私钥格式不支持
+        RuntimeError: PyNaCl不可用
+    """
+    signing_key = _signing_key_class()
+    if signing_key is None:
+        raise RuntimeError('PyNaCl is not installed')
+    if private_key.startswith(PRIVATE_KEY_PREFIX):
+        hrp, data = _bech32_decode(private_key)
+        if hrp != PRIVATE_KEY_PREFIX or len(data) != 33:
+            raise ValueError('Invalid SUI private key')
+        if data[0] != ED25519_FLAG:
+            raise ValueError(f'Unsupported signature scheme flag: {data[0]}')
+        seed = data[1:]
+    else:
+        seed = bytes.fromhex(private_key.removeprefix('0x'))[:32]
+        if len(seed) != 32:
+            raise ValueError('Invalid SUI private key')
+    public_key = bytes(signing_key(seed).verify_key)
+    digest = hashlib.blake2b(bytes([ED25519_FLAG]) + public_key, digest_size=32)
+    return '0x' + digest.hexdigest()
+
+
+class SUIKeyring:
+    """按私钥指纹缓存的地址表
+
+    Args:
+        cache_path: 磁盘缓存文件，为空时只在进程内缓存
+    """
+
+    def __init__(self, cache_path: Optional[str] = None):
+        self.cache_path = cache_path
+        self._lock = threading.Lock()
+        self._addresses: Dict[str, str] = {}
+        self._disk: Optional[Dict[str, str]] = None
+        self.derivations = 0
+
+    @classmethod
+    def from_env(cls) -> 'SUIKeyring':
+        """SUI_KEYRING_CACHE指定磁盘缓存文件，设为空字符串时不使用磁盘缓存"""
+        return cls(os.getenv('SUI_KEYRING_CACHE', DEFAULT_CACHE_PATH) or None)
+
+    def address(self, private_key: str) -> str:
+        """返回私钥对应的地址，同一私钥在进程内只推导一次
+
+        Raises:
+            Exception: 进程内推导和Node推导都失败
+        """
+        fingerprint = key_fingerprint(private_key)
+        with self._lock:
+            address = self._addresses.get(fingerprint)
+            if address is not None:
+                return address
+            address = self._derive(private_key, fingerprint)
+            self._addresses[fingerprint] = address
+            return address
+
+    def _derive(self, private_key: str, fingerprint: str) -> str:
+        try:
+            address = derive_address(private_key)
+            self.derivations += 1
+            return address
+        except (RuntimeError, ValueError) as e:
+            logger.debug(f"[SUI] In-process address derivation unavailable: {e}")
+
+        address = self._load_disk().get(fingerprint)
+        if address is not None:
+            return address
+        address = sui_call_sync('address', {'privateKey': private_key})['address']
+        self.derivations += 1
+        self._disk[fingerprint] = address
+        self._save_disk()
+        return address
+
+    def _load_disk(self) -> Dict[str, str]:
+        if self._disk is None:
+            self._disk = {}
+            if self.cache_path and os.path.exists(self.cache_path):
+                try:
+                    with open(self.cache_path) as f:
+                        self._disk = json.load(f)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"[SUI] Ignoring unreadable keyring cache {self.cache_path}: {e}")
+        return self._disk
+
+    def _save_disk(self):
+        if not self.cache_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+            tmp_path = f'{self.cache_path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(self._disk, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.warning(f"[SUI] Failed to write keyring cache {self.cache_path}: {e}")
+
+
+class BalanceTracker:
+    """本地维护的账户余额
+
+    余额在本进程的交易之后按交易效果调整；其他来源的转账只有在对账时才能
+    反映出来，因此余额超过reconcile_interval后会重新从链上读取。
+
+    Args:
+        reconcile_interval: 对账间隔（秒）
+        clock: 时间函数，测试时可替换
+    """
+
+    def __init__(self, reconcile_interval: float = DEFAULT_RECONCILE_INTERVAL,
+                 clock: Callable[[], float] = time.monotonic):
+        self.reconcile_interval = reconcile_interval
+        self.clock = clock
+        self._lock = threading.Lock()
+        # address -> [余额, 上次对账时间]
+        self._balances: Dict[str, list] = {}
+        self.hits = 0
+        self.reconciles = 0
+
+    @classmethod
+    def from_env(cls) -> 'BalanceTracker':
+        return cls(float(os.getenv(
+            'SUI_BALANCE_RECONCILE_SECONDS', DEFAULT_RECONCILE_INTERVAL
+        )))
+
+    async def get(self, address: str, fetch: Callable[[], Awaitable[int]],
+                  refresh: bool = False) -> int:
+        """返回账户余额，本地余额未过期时不请求链上
+
+        Args:
+            address: 账户地址
+            fetch: 从链上读取余额的协程函数
+            refresh: 为True时强制对账
+        """
+        with self._lock:
+            entry = self._balances.get(address)
+            if (not refresh and entry is not None
+                    and self.clock() - entry[1] < self.reconcile_interval):
+                self.hits += 1
+                return entry[0]
+        return await self.reconcile(address, fetch)
+
+    async def reconcile(self, address: str, fetch: Callable[[], Awaitable[int]]) -> int:
+        """从链上读取余额并替换本地余额"""
+        started = self.clock()
+        balance = await fetch()
+        with self._lock:
+            entry = self._balances.get(address)
+            # 并发对账时保留开始时间较晚的结果
+            if entry is None or entry[1] <= started:
+                self._balances[address] = [balance, started]
+            self.reconciles += 1
+        if entry is not None and entry[0] != balance:
+            logger.info(f"[SUI] Balance of {address} reconciled: {entry[0]} -> {balance}")
+        return balance
+
+    def peek(self, address: str) -> Optional[int]:
+        """返回本地余额，没有记录时返回None；不检查是否过期"""
+        with self._lock:
+            entry = self._balances.get(address)
+            return entry[0] if entry is not None else None
+
+    def apply(self, address: str, delta: int):
+        """按本进程交易的效果调整本地余额，没有记录的账户忽略"""
+        with self._lock:
+            entry = self._balances.get(address)
+            if entry is not None:
+                entry[0] += delta
+
+    def invalidate(self, address: str):
+        """标记余额失效，下次读取时对账"""
+        with self._lock:
+            self._balances.pop(address, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'accounts': len(self._balances),
+                'hits': self.hits,
+                'reconciles': self.reconciles,
+            }
+
+
+keyring = SUIKeyring.from_env()
+balances = BalanceTracker.from_env()
@@ -311,6 +311,12 @@ class ContentTypeNotSupportedError(JSONRPCError):
     data: None = None
 
 
+class ServerBusyError(JSONRPCError):
+    code: int = -32000
+    message: str = 'Server is busy, retry later'
+    data: dict[str, Any] | None = None
+
+
 class AgentProvider(BaseModel):
     organization: str
     url: str | None = None
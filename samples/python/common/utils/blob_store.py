@@ -0,0 +1,175 @@
+"""Content addressed blob storage."""
+
+import base64
+import binascii
+import dataclasses
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+
+from collections import OrderedDict
+from collections.abc import Iterator
+
+
+@dataclasses.dataclass
+class BlobInfo:
+    digest: str
+    media_type: str | None
+    size: int
+    # Set once the blob has been spilled to disk
+    path: str | None = None
+
+
+class BlobStore:
+    """Content addressed store for files attached to messages and artifacts.
+
+    Blobs are keyed by the SHA-256 of their decoded bytes, so the same image
+    sent in several messages is stored and served once, and its URL can be
+    cached by clients forever. Recently used blobs are kept in memory up
+    to memory_limit bytes; older ones are spilled to files in spill_dir and
+    streamed from there.
+
+    Args:
+        memory_limit: Maximum total size of the blobs kept in memory.
+        spill_dir: Directory for spilled blobs. A temporary directory, removed
+          by close(), is used if not set.
+    """
+
+    def __init__(
+        self, memory_limit: int = 64 * 1024 * 1024, spill_dir: str | None = None
+    ):
+        self.memory_limit = memory_limit
+        self._spill_dir = spill_dir
+        self._owns_spill_dir = spill_dir is None
+        self._lock = threading.Lock()
+        self._info: dict[str, BlobInfo] = {}
+        # digest -> bytes, least recently used first
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_bytes = 0
+
+    @classmethod
+    def from_env(cls) -> 'BlobStore':
+        return cls(
+            memory_limit=int(
+                os.environ.get('A2A_BLOB_MEMORY_BYTES', str(64 * 1024 * 1024))
+            ),
+            spill_dir=os.environ.get('A2A_BLOB_DIR') or None,
+        )
+
+    def put(self, data: bytes, media_type: str | None) -> str:
+        """Stores data, unless it is already stored, and returns its digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            if digest in self._info:
+                return digest
+            info = BlobInfo(digest, media_type, len(data))
+            self._info[digest] = info
+            if len(data) > self.memory_limit:
+                self._spill(info, data)
+                return digest
+            self._memory[digest] = data
+            self._memory_bytes += len(data)
+            while self._memory_bytes > self.memory_limit:
+                old_digest, old_data = self._memory.popitem(last=False)
+                self._memory_bytes -= len(old_data)
+                self._spill(self._info[old_digest], old_data)
+        return digest
+
+    def put_base64(self, encoded: str, media_type: str | None) -> str:
+        """Decodes FileContent.bytes once and stores the result."""
+        try:
+            data = base64.b64decode(encoded, validate=True)
+        except (binascii.Error, ValueError):
+            # Not base64 after all; keep the content as sent.
+            data = encoded.encode()
+        return self.put(data, media_type)
+
+    def info(self, digest: str) -> BlobInfo | None:
+        with self._lock:
+            return self._info.get(digest)
+
+    def read(
+        self,
+        digest: str,
+        start: int = 0,
+        end: int | None = None,
+        chunk_size: int = 64 * 1024,
+    ) -> Iterator[bytes]:
+        """Yields the bytes of blob[start:end] in chunks.
+
+        Raises:
+            KeyError: The blob is not stored.
+        """
+        with self._lock:
+            info = self._info[digest]
+            data = self._memory.get(digest)
+            if data is not None:
+                self._memory.move_to_end(digest)
+        end = info.size if end is None else end
+        if data is not None:
+            view = memoryview(data)
+            for offset in range(start, end, chunk_size):
+                yield bytes(view[offset : min(offset + chunk_size, end)])
+            return
+        with open(info.path, 'rb') as f:
+            f.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    return
+                remaining -= len(chunk)
+                yield chunk
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'blobs': len(self._info),
+                'memory_blobs': len(self._memory),
+                'memory_bytes': self._memory_bytes,
+            }
+
+    def close(self):
+        """Removes the spill directory if the store created it."""
+        with self._lock:
+            if self._owns_spill_dir and self._spill_dir:
+                shutil.rmtree(self._spill_dir, ignore_errors=True)
+                self._spill_dir = None
+
+    def _spill(self, info: BlobInfo, data: bytes):
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix='a2a-ui-blobs-')
+        os.makedirs(self._spill_dir, exist_ok=True)
+        path = os.path.join(self._spill_dir, info.digest)
+        with open(path, 'wb') as f:
+            f.write(data)
+        info.path = path
+
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """Parses a single byte range header into a [start, end) pair.
+
+    Returns:
+        The range, or None if it cannot be satisfied.
+
+    Raises:
+        ValueError: The header is not a single byte range, in which case it
+          should be ignored and the whole content served.
+    """
+    unit, _, spec = header.partition('=')
+    if unit.strip() != 'bytes' or ',' in spec:
+        raise ValueError(f'Unsupported range: {header}')
+    first, _, last = spec.strip().partition('-')
+    if not first:
+        # Suffix range: the last n bytes.
+        length = int(last)
+        if length <= 0 or size == 0:
+            return None
+        return max(size - length, 0), size
+    start = int(first)
+    end = int(last) + 1 if last else size
+    if start >= size or end <= start:
+        return None
+    return start, min(end, size)
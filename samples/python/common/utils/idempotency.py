@@ -0,0 +1,135 @@
+"""Request de-duplication utility."""
+
+import asyncio
+import time
+
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+
+class IdempotencyCache:
+    """Runs each keyed operation at most once within a time window.
+
+    While an operation is in flight, callers with the same key wait on the
+    same future instead of starting it again. Once it finishes, its result is
+    kept for `ttl` seconds and returned to later callers with that key. At
+    most `max_entries` results are kept; the least recently used is evicted
+    first.
+
+    Failed operations are not cached: every caller that joined the attempt
+    receives the exception, and the next caller runs the operation again. An
+    attempt cancelled with the caller that started it, e.g. because its
+    client disconnected, is not a failure: the callers that joined it run
+    the operation again, one of them starting it and the others joining.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, asyncio.Future]] = (
+            OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self._lookup(key) is not None
+
+    async def run(
+        self,
+        key: Hashable,
+        operation: Callable[[], Awaitable[Any]],
+        should_cache: Callable[[Any], bool] | None = None,
+    ) -> Any:
+        """Returns the result of operation, running it only if needed.
+
+        Args:
+            key: Identifies the operation. Calls with an equal key share one
+              execution.
+            operation: Starts the operation when no result is available.
+            should_cache: Optionally decides whether a successful result is
+              kept for later callers. Results it rejects are still returned to
+              the callers waiting on them.
+
+        Returns:
+            The result of the operation.
+        """
+        while True:
+            future = self._lookup(key)
+            if future is None:
+                return await self._run_first(key, operation, should_cache)
+            try:
+                # Shield so a cancelled duplicate does not cancel the original.
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # Retry if the original was cancelled, rather than this call.
+                if (
+                    future.cancelled()
+                    and not asyncio.current_task().cancelling()
+                ):
+                    continue
+                raise
+
+    async def _run_first(
+        self,
+        key: Hashable,
+        operation: Callable[[], Awaitable[Any]],
+        should_cache: Callable[[Any], bool] | None,
+    ) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        self._entries[key] = (time.monotonic() + self.ttl, future)
+        self._evict()
+        try:
+            result = await operation()
+        except asyncio.CancelledError:
+            self._discard(key, future)
+            future.cancel()
+            raise
+        except BaseException as e:
+            self._discard(key, future)
+            future.set_exception(e)
+            # Nobody else may be waiting; retrieve it to avoid a warning.
+            future.exception()
+            raise
+        future.set_result(result)
+        if should_cache is not None and not should_cache(result):
+            self._discard(key, future)
+        return result
+
+    def invalidate(self, key: Hashable):
+        """Forgets the result for key, if any."""
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def _lookup(self, key: Hashable) -> asyncio.Future | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, future = entry
+        if future.done() and time.monotonic() > expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return future
+
+    def _discard(self, key: Hashable, future: asyncio.Future):
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] is future:
+            del self._entries[key]
+
+    def _evict(self):
+        excess = len(self._entries) - self.max_entries
+        if excess <= 0:
+            return
+        # In-flight work is never evicted; it is removed when it settles.
+        stale = [
+            key
+            for key, (_, future) in self._entries.items()
+            if future.done()
+        ][:excess]
+        for key in stale:
+            del self._entries[key]
@@ -0,0 +1,294 @@
+"""Non-blocking, structured logging.
+
+LogPipeline routes every log record through a bounded queue to a background
+thread, which formats and writes it. Logging on a request path then costs a
+level check and a queue put: the message is only formatted on the background
+thread, and a full queue drops records instead of blocking on stdout.
+
+Pass values to log as arguments rather than formatting them into the message
+(logger.info('Task %s', task_id), not an f-string), so that formatting is
+deferred, and do not log objects that are changed right after.
+"""
+
+import atexit
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import signal
+import sys
+import threading
+
+from typing import TextIO
+
+
+DEFAULT_FORMAT = '%(asctime)s %(levelname)s %(name)s: %(message)s'
+
+# Attributes every LogRecord has; any others were passed in extra.
+_RECORD_ATTRIBUTES = frozenset(
+    logging.LogRecord('', 0, '', 0, '', None, None).__dict__
+) | {'message', 'asctime', 'taskName'}
+
+
+def parse_levels(spec: str) -> dict[str, int]:
+    """Parses 'INFO,common.server=DEBUG,httpx=ERROR' into logger levels.
+
+    A level without a logger name applies to the root logger, under the key
+    ''.
+    """
+    levels = {}
+    for item in spec.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, level = item.rpartition('=')
+        value = logging.getLevelName(level.strip().upper())
+        if not isinstance(value, int):
+            raise ValueError(f'Unknown log level in {item!r}')
+        levels[name.strip()] = value
+    return levels
+
+
+def parse_rates(spec: str) -> dict[str, float]:
+    """Parses 'service.server.task_updates=0.1,...' into sample rates."""
+    rates = {}
+    for item in spec.split(','):
+        name, _, rate = item.strip().partition('=')
+        if name:
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+def set_levels(levels: dict[str, int]):
+    """Sets the level of each named logger; '' is the root logger."""
+    for name, level in levels.items():
+        logging.getLogger(name or None).setLevel(level)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of the records of high-volume loggers.
+
+    The first record of each sampled logger is kept, then one in every
+    round(1 / rate). Records at WARNING or above are always kept.
+
+    Args:
+        rates: Logger name -> fraction of its records kept. A rate applies
+          to the logger's children too, unless they have their own.
+    """
+
+    def __init__(self, rates: dict[str, float] | None = None):
+        super().__init__()
+        self.rates = rates or {}
+        # Logger name -> keep every nth record, or None to keep all
+        self._every: dict[str, int | None] = {}
+        self._counts: dict[str, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        every = self._every.get(record.name, 0)
+        if every == 0:
+            every = self._every[record.name] = self._every_for(record.name)
+        if every is None:
+            return True
+        count = self._counts.get(record.name, 0)
+        self._counts[record.name] = count + 1
+        return count % every == 0
+
+    def _every_for(self, name: str) -> int | None:
+        while True:
+            if name in self.rates:
+                rate = self.rates[name]
+                if rate >= 1:
+                    return None
+                return max(round(1 / rate), 1) if rate > 0 else sys.maxsize
+            if '.' not in name:
+                return None
+            name = name.rpartition('.')[0]
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line.
+
+    Values passed in extra are included as fields.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.datetime.fromtimestamp(
+                record.created, datetime.UTC
+            ).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Enqueues records as they are, and drops them if the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The listener formats the record, off the caller's thread.
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            if self.dropped:
+                self.queue.put_nowait(
+                    logging.makeLogRecord(
+                        {
+                            'name': __name__,
+                            'levelno': logging.WARNING,
+                            'levelname': 'WARNING',
+                            'msg': 'Dropped %d log records: queue full',
+                            'args': (self.dropped,),
+                        }
+                    )
+                )
+                self.dropped = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogPipeline:
+    """Writes the root logger's records from a background thread.
+
+    start() replaces the root logger's handlers. Logger levels can be
+    changed while running with set_levels(), or, if levels_file is set, by
+    editing the file and sending the process SIGHUP.
+
+    Args:
+        level: Level of the root logger.
+        levels: Levels of individual loggers, e.g. {'common.server': DEBUG}.
+        sample_rates: Fraction of the records kept per logger; see
+          SamplingFilter.
+        json_output: Write JSON lines instead of text.
+        queue_size: Maximum number of records waiting to be written.
+        stream: Stream written to; stderr by default.
+        levels_file: File with a level spec (see parse_levels) re-read on
+          SIGHUP.
+    """
+
+    def __init__(
+        self,
+        level: int = logging.INFO,
+        levels: dict[str, int] | None = None,
+        sample_rates: dict[str, float] | None = None,
+        json_output: bool = False,
+        queue_size: int = 10000,
+        stream: TextIO | None = None,
+        levels_file: str | None = None,
+    ):
+        self.level = level
+        self.levels = levels or {}
+        self.levels_file = levels_file
+        self.queue: queue.Queue = queue.Queue(queue_size)
+        self.handler = _QueueHandler(self.queue)
+        self.handler.addFilter(SamplingFilter(sample_rates))
+        output = logging.StreamHandler(stream or sys.stderr)
+        output.setFormatter(
+            JsonFormatter() if json_output else logging.Formatter(DEFAULT_FORMAT)
+        )
+        self._listener = logging.handlers.QueueListener(self.queue, output)
+        self._started = False
+
+    @classmethod
+    def from_env(
+        cls, level: int = logging.INFO, levels: dict[str, int] | None = None
+    ) -> 'LogPipeline':
+        """Creates a pipeline configured by A2A_LOG_* environment variables.
+
+        A2A_LOG_LEVELS is a level spec such as 'INFO,common.server=DEBUG',
+        which overrides level and levels. A2A_LOG_SAMPLE is a rate spec such
+        as 'service.server.task_updates=0.1', and A2A_LOG_JSON=1 selects JSON
+        output.
+        """
+        levels = {
+            **(levels or {}),
+            **parse_levels(os.environ.get('A2A_LOG_LEVELS', '')),
+        }
+        return cls(
+            level=levels.pop('', level),
+            levels=levels,
+            sample_rates=parse_rates(os.environ.get('A2A_LOG_SAMPLE', '')),
+            json_output=os.environ.get('A2A_LOG_JSON', '').lower()
+            in ('1', 'true'),
+            queue_size=int(os.environ.get('A2A_LOG_QUEUE_SIZE', '10000')),
+            levels_file=os.environ.get('A2A_LOG_LEVELS_FILE') or None,
+        )
+
+    @property
+    def dropped(self) -> int:
+        """Number of records dropped since the last one written."""
+        return self.handler.dropped
+
+    def start(self) -> 'LogPipeline':
+        global _active
+        if _active is not None:
+            _active.stop()
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(self.handler)
+        root.setLevel(self.level)
+        set_levels(self.levels)
+        self._listener.start()
+        self._started = True
+        _active = self
+        if (
+            self.levels_file
+            and hasattr(signal, 'SIGHUP')
+            and threading.current_thread() is threading.main_thread()
+        ):
+            signal.signal(signal.SIGHUP, lambda *_: self.reload_levels())
+            self.reload_levels()
+        return self
+
+    def reload_levels(self):
+        """Applies the levels in levels_file."""
+        try:
+            with open(self.levels_file) as f:
+                set_levels(parse_levels(f.read().replace('\n', ',')))
+        except (OSError, ValueError) as e:
+            logging.getLogger(__name__).warning(
+                'Could not load log levels from %s: %s', self.levels_file, e
+            )
+
+    def stop(self):
+        """Writes the records still queued and stops the thread."""
+        global _active
+        if self._started:
+            self._started = False
+            logging.getLogger().removeHandler(self.handler)
+            self._listener.stop()
+        if _active is self:
+            _active = None
+
+
+# The pipeline the root logger writes to
+_active: LogPipeline | None = None
+
+
+def configure_logging(
+    level: int = logging.INFO, levels: dict[str, int] | None = None
+) -> LogPipeline:
+    """Starts a LogPipeline configured from the environment.
+
+    The pipeline is stopped at exit, after writing what is queued.
+    """
+    pipeline = LogPipeline.from_env(level, levels).start()
+    atexit.register(pipeline.stop)
+    return pipeline
@@ -0,0 +1,450 @@
+"""Tracing and metrics for A2A servers, clients and chain operations.
+
+Spans are created with the OpenTelemetry API and exported by whichever tracer
+provider the process sets up; configure_tracing() sets one up from the
+environment. Without a provider a span costs little more than a function
+call. The API is slow to import, so it is imported with the first span rather
+than at agent startup.
+
+Every span also records its duration in the span duration histogram of the
+metrics registry. A2AServer serves that registry at /metrics in the
+Prometheus text format, so the latency breakdown of a task is available
+without a tracing backend.
+
+Trace context travels from the host to a service agent in
+Message.metadata['trace'], as W3C traceparent and tracestate values.
+"""
+
+import abc
+import bisect
+import contextlib
+import functools
+import inspect
+import logging
+import os
+import threading
+import time
+
+from collections.abc import AsyncIterable, AsyncIterator, Callable, Iterator
+from typing import TYPE_CHECKING, Any
+
+
+if TYPE_CHECKING:
+    from opentelemetry.context import Context
+    from opentelemetry.trace import Span
+
+
+logger = logging.getLogger(__name__)
+
+TRACE_METADATA_KEY = 'trace'
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+
+class _Metric(abc.ABC):
+    type = ''
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: tuple[str, ...] = ()
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        if labels.keys() != set(self.labelnames):
+            raise ValueError(
+                f'{self.name} takes labels {self.labelnames}, got {tuple(labels)}'
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: tuple[str, ...], **extra: str) -> str:
+        pairs = [*zip(self.labelnames, key), *extra.items()]
+        if not pairs:
+            return ''
+        return '{%s}' % ','.join(
+            f'{name}="{_escape(value)}"' for name, value in pairs
+        )
+
+    def render(self) -> list[str]:
+        return [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.type}',
+        ]
+
+    @abc.abstractmethod
+    def clear(self):
+        """Forgets the values recorded."""
+
+
+class Counter(_Metric):
+    """A count that only goes up, per combination of label values."""
+
+    type = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{self._labels(key)} {value}')
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(_Metric):
+    """Observed values counted into buckets, per combination of label values.
+
+    Args:
+        buckets: Upper bounds of the buckets, increasing. Values above the
+          last one are counted in the +Inf bucket.
+    """
+
+    type = 'histogram'
+
+    def __init__(self, *args, buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+                 **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(buckets)
+        # key -> [count per bucket (not cumulative; the last is +Inf), sum]
+        self._values: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: Any):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def get(self, **labels: Any) -> tuple[int, float]:
+        """Returns the number and the sum of the values observed."""
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            return (sum(entry[0]), entry[1]) if entry else (0, 0.0)
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        with self._lock:
+            for key, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip((*self.buckets, '+Inf'), counts):
+                    cumulative += count
+                    le = bound if isinstance(bound, str) else repr(float(bound))
+                    lines.append(
+                        f'{self.name}_bucket{self._labels(key, le=le)} '
+                        f'{cumulative}'
+                    )
+                lines.append(f'{self.name}_sum{self._labels(key)} {total}')
+                lines.append(f'{self.name}_count{self._labels(key)} {cumulative}')
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class MetricsRegistry:
+    """Named counters and histograms, rendered in the Prometheus format.
+
+    counter() and histogram() return the metric registered under a name,
+    creating it on first use, so modules can declare the metrics they
+    update at import time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: dict[str, _Metric] = {}
+
+    def counter(
+        self, name: str, documentation: str, labelnames: tuple[str, ...] = ()
+    ) -> Counter:
+        return self._get(Counter, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get(
+            Histogram, name, documentation, labelnames, buckets=buckets
+        )
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+        lines = []
+        for _, metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def clear(self):
+        """Resets every metric, keeping the registrations."""
+        with self._lock:
+            for metric in self._metrics.values():
+                metric.clear()
+
+    def _get(self, cls, name, documentation, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(
+                    name, documentation, labelnames, **kwargs
+                )
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(
+                labelnames
+            ):
+                raise ValueError(f'Metric {name} is already registered')
+            return metric
+
+
+def _escape(value: str) -> str:
+    return (
+        value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+    )
+
+
+# Shared by every server, client and task manager in the process
+metrics = MetricsRegistry()
+
+span_duration = metrics.histogram(
+    'a2a_span_duration_seconds', 'Duration of traced operations.', ('span',)
+)
+span_errors = metrics.counter(
+    'a2a_span_errors_total', 'Traced operations that raised.', ('span',)
+)
+span_items = metrics.counter(
+    'a2a_span_items_total',
+    'Items produced by traced iterators, such as server-sent events.',
+    ('span',),
+)
+
+
+@functools.cache
+def _tracer():
+    from opentelemetry import trace
+
+    return trace.get_tracer(__name__)
+
+
+def _attributes(attributes: dict[str, Any]) -> dict[str, Any] | None:
+    # OpenTelemetry rejects None attribute values.
+    return {k: v for k, v in attributes.items() if v is not None} or None
+
+
+@contextlib.contextmanager
+def span(
+    name: str, context: 'Context | None' = None, **attributes: Any
+) -> Iterator['Span']:
+    """Runs the body in a span, and records its duration and errors.
+
+    Args:
+        name: Span name, also the span label of the metrics.
+        context: Parent context, e.g. from extract_trace(); the current
+          context by default.
+        **attributes: Span attributes. Use a dict for dotted names.
+    """
+    start = time.perf_counter()
+    with _tracer().start_as_current_span(
+        name, context=context, attributes=_attributes(attributes)
+    ) as current:
+        try:
+            yield current
+        except Exception:
+            span_errors.inc(span=name)
+            raise
+        finally:
+            span_duration.observe(time.perf_counter() - start, span=name)
+
+
+def traced_aiter(
+    name: str,
+    iterable: AsyncIterable,
+    context: 'Context | None' = None,
+    **attributes: Any,
+) -> AsyncIterator:
+    """Iterates over iterable in a span that lasts until it is exhausted.
+
+    The span is current only while the iterable produces an item, not while
+    the caller handles it, so it parents the operations of the iterable
+    alone, even if the caller stops part way. Its parent is context, or the
+    context current when traced_aiter is called, not when iteration starts.
+    """
+    from opentelemetry import context as otel_context
+
+    if context is None:
+        context = otel_context.get_current()
+    return _traced_aiter(name, iterable, context, attributes)
+
+
+async def _traced_aiter(name, iterable, context, attributes) -> AsyncIterator:
+    from opentelemetry import trace
+
+    start = time.perf_counter()
+    current = _tracer().start_span(
+        name, context=context, attributes=_attributes(attributes)
+    )
+    iterator = aiter(iterable)
+    items = 0
+    try:
+        while True:
+            with trace.use_span(current):
+                try:
+                    item = await anext(iterator)
+                except StopAsyncIteration:
+                    break
+            items += 1
+            span_items.inc(span=name)
+            yield item
+    except Exception:
+        span_errors.inc(span=name)
+        raise
+    finally:
+        current.set_attribute('a2a.items', items)
+        current.end()
+        span_duration.observe(time.perf_counter() - start, span=name)
+        if hasattr(iterator, 'aclose'):
+            await iterator.aclose()
+
+
+def traced(name: str) -> Callable[[Callable], Callable]:
+    """Decorates a function to run in a span named name.
+
+    Works on functions, coroutine functions and async generator functions;
+    the span of an async generator lasts until it is exhausted.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        if inspect.isasyncgenfunction(func):
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                return traced_aiter(name, func(*args, **kwargs))
+
+        elif inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+
+        else:
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with span(name):
+                    return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def inject_trace(metadata: dict[str, Any] | None) -> dict[str, Any] | None:
+    """Returns metadata with the current trace context added.
+
+    metadata is returned as is when no span is being recorded.
+    """
+    from opentelemetry import propagate
+
+    carrier: dict[str, str] = {}
+    propagate.inject(carrier)
+    if not carrier:
+        return metadata
+    return {**(metadata or {}), TRACE_METADATA_KEY: carrier}
+
+
+def extract_trace(metadata: dict[str, Any] | None) -> 'Context | None':
+    """Returns the trace context sent in message metadata, if any."""
+    carrier = (metadata or {}).get(TRACE_METADATA_KEY)
+    if not isinstance(carrier, dict):
+        return None
+    from opentelemetry import propagate
+
+    return propagate.extract(carrier)
+
+
+def _sdk_tracer_provider():
+    from opentelemetry import trace
+    from opentelemetry.sdk.trace import TracerProvider
+
+    provider = trace.get_tracer_provider()
+    if not isinstance(provider, TracerProvider):
+        provider = TracerProvider()
+        trace.set_tracer_provider(provider)
+    return provider
+
+
+def configure_tracing(exporter: str | None = None):
+    """Exports spans through the OpenTelemetry SDK.
+
+    Args:
+        exporter: 'console' to write spans to stdout, or 'otlp' to send them
+          to OTEL_EXPORTER_OTLP_ENDPOINT (needs
+          opentelemetry-exporter-otlp-proto-http). Defaults to
+          A2A_TRACE_EXPORTER; if neither is set, spans are not recorded.
+    """
+    exporter = exporter or os.environ.get('A2A_TRACE_EXPORTER')
+    if not exporter:
+        return
+    from opentelemetry.sdk.trace.export import (
+        BatchSpanProcessor,
+        ConsoleSpanExporter,
+    )
+
+    if exporter == 'console':
+        span_exporter = ConsoleSpanExporter()
+    elif exporter == 'otlp':
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+                OTLPSpanExporter,
+            )
+        except ImportError:
+            logger.warning(
+                'A2A_TRACE_EXPORTER=otlp needs '
+                'opentelemetry-exporter-otlp-proto-http; spans are not exported'
+            )
+            return
+        span_exporter = OTLPSpanExporter()
+    else:
+        raise ValueError(f'Unknown trace exporter {exporter!r}')
+    _sdk_tracer_provider().add_span_processor(BatchSpanProcessor(span_exporter))
+
+
+def in_memory_tracing():
+    """Records finished spans in memory, for tests.
+
+    Returns:
+        An InMemorySpanExporter; get_finished_spans() lists the spans ended
+        so far and clear() forgets them.
+    """
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+        InMemorySpanExporter,
+    )
+
+    exporter = InMemorySpanExporter()
+    _sdk_tracer_provider().add_span_processor(SimpleSpanProcessor(exporter))
+    return exporter
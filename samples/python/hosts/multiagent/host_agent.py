@@ -1,11 +1,14 @@
+import asyncio
 import base64
 import json
 import logging
 import os
+import time
 import uuid
 from datetime import datetime
 
 from common.client import A2ACardResolver
+from common.escrow_backend import EscrowBackend, SUIEscrowBackend
 from common.types import (
     AgentCard,
     DataPart,
@@ -16,87 +19,20 @@ from common.types import (
     TaskState,
     TextPart,
 )
+from common.utils.idempotency import IdempotencyCache
 from google.adk import Agent
 from google.adk.agents.callback_context import CallbackContext
 from google.adk.agents.readonly_context import ReadonlyContext
 from google.adk.tools.tool_context import ToolContext
 from google.genai import types
-# Import SUI related libraries
-from common.sui_config import SUIConfig
-from common.sui_blockchain import SUITaskManager, SUISignatureManager
 
 from .remote_agent_connection import RemoteAgentConnections, TaskUpdateCallback
+from .skill_router import SkillRouter
 
 
 logger = logging.getLogger(__name__)
 
-
-class HostAgent:
-    """The host agent.
-
-    This is the agent responsible for choosing which remote agents to send
-    tasks to and coordinate their work.
-    """
-
-    def __init__(
-        self,
-        remote_agent_addresses: list[str],
-        task_callback: TaskUpdateCallback | None = None,
-        private_key: str = None,  # Add private key parameter
-    ):
-        self.task_callback = task_callback
-        self.remote_agent_connections: dict[str, RemoteAgentConnections] = {}
-        self.cards: dict[str, AgentCard] = {}
-        
-        # Initialize SUI configuration
-        self.sui_config = SUIConfig(private_key)
-        self.sui_task_manager = SUITaskManager(self.sui_config)
-        self.sui_signature_manager = SUISignatureManager(self.sui_config)
-        
-        # Set SUI address for backward compatibility
-        self.sui_address = self.sui_config.address
-                
-        for address in remote_agent_addresses:
-            card_resolver = A2ACardResolver(address)
-            card = card_resolver.get_agent_card()
-            remote_connection = RemoteAgentConnections(card)
-            self.remote_agent_connections[card.name] = remote_connection
-            self.cards[card.name] = card
-        agent_info = []
-        for ra in self.list_remote_agents():
-            agent_info.append(json.dumps(ra))
-        self.agents = '\n'.join(agent_info)
-
-    def register_agent_card(self, card: AgentCard):
-        remote_connection = RemoteAgentConnections(card)
-        self.remote_agent_connections[card.name] = remote_connection
-        self.cards[card.name] = card
-        agent_info = []
-        for ra in self.list_remote_agents():
-            agent_info.append(json.dumps(ra))
-        self.agents = '\n'.join(agent_info)
-
-    def create_agent(self) -> Agent:
-        return Agent(
-            model='gemini-2.0-flash-001',
-            name='host_agent',
-            instruction=self.root_instruction,
-            before_model_callback=self.before_model_callback,
-            description=(
-                'This agent orchestrates the decomposition of the user request into'
-                ' tasks that can be performed by the child agents.'
-            ),
-            tools=[
-                self.list_remote_agents,
-                self.send_task,
-                self.confirm_task,
-                self.get_user_context,
-            ],
-        )
-
-    def root_instruction(self, context: ReadonlyContext) -> str:
-        current_agent = self.check_state(context)
-        return f"""You are an expert delegator that can delegate the user request to the
+ROOT_INSTRUCTION = """You are an expert delegator that can delegate the user request to the
 appropriate remote agents.
 
 Discovery:
@@ -124,6 +60,14 @@ Execution:
   like "order food", "book a table", or "make a reservation", use `confirm_task` 
   to ensure the task is properly verified on the blockchain.
 
+- When a request needs independent work from several agents (for example a
+  trip that needs a ride, a hotel and a dinner reservation), use
+  `fan_out_tasks` to delegate all of the sub-tasks in one call instead of
+  calling `send_task` or `confirm_task` once per agent. Set `confirm` to true
+  when the sub-tasks are actionable requests that need blockchain
+  confirmation. Report the result of every agent, including any that failed
+  or timed out.
+
 - Be sure to include the remote agent name when you respond to the user.
 
 - When the request is related to food or dining, first check the user context with
@@ -147,12 +91,132 @@ Focus on the most recent parts of the conversation primarily.
 
 If there is an active agent, send the request to that agent with the update task tool.
 
-Agents:
-{self.agents}
-
-Current agent: {current_agent['active_agent']}
+Agents (most relevant to this request; `list_remote_agents` lists all):
 """
 
+# Bound on cached routed instructions, one per distinct user turn.
+INSTRUCTION_CACHE_SIZE = 256
+
+
+class HostAgent:
+    """The host agent.
+
+    This is the agent responsible for choosing which remote agents to send
+    tasks to and coordinate their work.
+    """
+
+    def __init__(
+        self,
+        remote_agent_addresses: list[str],
+        task_callback: TaskUpdateCallback | None = None,
+        private_key: str = None,  # Add private key parameter
+        escrow_backend: EscrowBackend | None = None,
+    ):
+        self.task_callback = task_callback
+        self.remote_agent_connections: dict[str, RemoteAgentConnections] = {}
+        self.cards: dict[str, AgentCard] = {}
+        # Only the agents most relevant to the current user turn are listed in
+        # the instruction once more than routing_top_k agents are registered.
+        self.skill_router = SkillRouter()
+        self.routing_top_k = int(os.environ.get('HOST_AGENT_ROUTING_TOP_K', '5'))
+        self._agent_info: dict[str, dict] = {}
+        self._agent_lines: dict[str, str] = {}
+        self._agents_text: str | None = None
+        self._instruction_cache: dict[tuple[str, str] | None, str] = {}
+        # Escrows already created for a (session, message, agent), so a
+        # retried confirm_task call does not lock the bounty twice.
+        self._escrow_dedup = IdempotencyCache()
+
+        # Escrows and signatures go through this backend; tests and
+        # benchmarks pass a common.fake_chain backend to run without a
+        # network. The SUI backend connects on first use, so a host without
+        # a private key still starts and sends tasks without escrows.
+        self.escrow_backend = escrow_backend or SUIEscrowBackend(
+            private_key=private_key
+        )
+
+        for address in remote_agent_addresses:
+            card_resolver = A2ACardResolver(address)
+            self.register_agent_card(card_resolver.get_agent_card())
+
+    def register_agent_card(self, card: AgentCard):
+        remote_connection = RemoteAgentConnections(card)
+        self.remote_agent_connections[card.name] = remote_connection
+        self.cards[card.name] = card
+        self.skill_router.add_card(card)
+        # Only the new card is encoded; the others keep their cached lines.
+        info = {'name': card.name, 'description': card.description}
+        self._agent_info[card.name] = info
+        self._agent_lines[card.name] = json.dumps(info)
+        self._agents_text = None
+        self._instruction_cache.clear()
+
+    @property
+    def agents(self) -> str:
+        """The JSON line listing of every registered agent."""
+        if self._agents_text is None:
+            self._agents_text = '\n'.join(self._agent_lines.values())
+        return self._agents_text
+
+    def create_agent(self) -> Agent:
+        return Agent(
+            model='gemini-2.0-flash-001',
+            name='host_agent',
+            instruction=self.root_instruction,
+            before_model_callback=self.before_model_callback,
+            description=(
+                'This agent orchestrates the decomposition of the user request into'
+                ' tasks that can be performed by the child agents.'
+            ),
+            tools=[
+                self.list_remote_agents,
+                self.send_task,
+                self.confirm_task,
+                self.fan_out_tasks,
+                self.get_user_context,
+            ],
+        )
+
+    def root_instruction(self, context: ReadonlyContext) -> str:
+        current_agent = self.check_state(context)
+        active_agent = current_agent['active_agent']
+        # Only the tail depends on the session; everything before it is
+        # cached until the registered agents change.
+        instruction = self._instruction_body(
+            get_user_query(context), active_agent
+        )
+        return f'{instruction}\n\nCurrent agent: {active_agent}\n'
+
+    def _instruction_body(self, query: str, active_agent: str) -> str:
+        """Returns the instruction up to and including the agent listing."""
+        routed = len(self.cards) > self.routing_top_k and query
+        key = (query, active_agent) if routed else None
+        instruction = self._instruction_cache.get(key)
+        if instruction is None:
+            if len(self._instruction_cache) >= INSTRUCTION_CACHE_SIZE:
+                self._instruction_cache.clear()
+            instruction = ROOT_INSTRUCTION + self.route_agents(
+                query, active_agent
+            )
+            self._instruction_cache[key] = instruction
+        return instruction
+
+    def route_agents(self, query: str, active_agent: str | None = None) -> str:
+        """Returns the agent listing for the instruction.
+
+        With more than routing_top_k agents registered, only the agents whose
+        skills best match the query are listed, plus the active agent. The
+        full listing is used when nothing in the index matches the query.
+        """
+        if len(self.cards) <= self.routing_top_k or not query:
+            return self.agents
+        names = self.skill_router.top_k(query, self.routing_top_k)
+        if not names:
+            return self.agents
+        if active_agent in self.cards and active_agent not in names:
+            names.append(active_agent)
+        return '\n'.join(self._agent_lines[name] for name in names)
+
     def check_state(self, context: ReadonlyContext):
         state = context.state
         if (
@@ -178,12 +242,7 @@ Current agent: {current_agent['active_agent']}
         if not self.remote_agent_connections:
             return []
 
-        remote_agent_info = []
-        for card in self.cards.values():
-            remote_agent_info.append(
-                {'name': card.name, 'description': card.description}
-            )
-        return remote_agent_info
+        return list(self._agent_info.values())
 
     def get_user_context(self):
         """Get the current user context information to help understand user needs better."""
@@ -206,8 +265,13 @@ Current agent: {current_agent['active_agent']}
         
         return user_context
 
+    @property
+    def sui_address(self) -> str | None:
+        """The address the host signs and creates escrows with."""
+        return self.escrow_backend.address
+
     def sign_message(self, message: str) -> str:
-        """Sign a message using the host agent's SUI private key.
+        """Sign a message using the host agent's private key.
         
         Args:
             message: The message to sign.
@@ -215,11 +279,8 @@ Current agent: {current_agent['active_agent']}
         Returns:
             The hex string of the signature if successful, or None if failed.
         """
-        if not self.sui_signature_manager:
-            return None
-            
         try:
-            signature = self.sui_signature_manager.sign_message(message)
+            signature = self.escrow_backend.sign(message)
             if signature:
                 logger.debug(f"[SUI NETWORK] Host Agent: signed message with Ed25519, address: {self.sui_address}")
             return signature
@@ -227,6 +288,86 @@ Current agent: {current_agent['active_agent']}
             logger.error(f"Error signing message with Ed25519: {e}")
             return None
 
+    def _auth_metadata(self, session_id: str) -> dict | None:
+        """Returns the auth metadata that proves a task comes from this host."""
+        address = self.sui_address
+        if not address:
+            return None
+        signature = self.sign_message(f'{address}{session_id}')
+        if not signature:
+            return None
+        return {'address': address, 'signature': signature}
+
+    def _outgoing_metadata(self, state) -> dict:
+        """Returns the metadata of the user's message for a message to an agent.
+
+        Agents de-duplicate sends on the task id and `message_id`, and a task
+        can be sent several messages in one user turn, so each send needs its
+        own `message_id`. The id of the user's message is kept as
+        `parent_message_id`.
+        """
+        metadata = dict(state.get('input_message_metadata') or {})
+        if 'message_id' in metadata:
+            metadata['parent_message_id'] = metadata.pop('message_id')
+        return metadata
+
+    def _remote_agent_address(self, card: AgentCard) -> str | None:
+        """Returns the on-chain address a remote agent is paid at."""
+        remote_agent_address = None
+        if hasattr(card, 'metadata') and card.metadata:
+            remote_agent_address = card.metadata.get('sui_address') or card.metadata.get('aptos_address') or card.metadata.get('ethereum_address')
+            
+        # If not found in card metadata, try environment variables
+        if not remote_agent_address:
+            remote_agent_address = os.environ.get('REMOTE_AGENT_SUI_ADDRESS') or os.environ.get('REMOTE_AGENT_APTOS_ADDRESS', "0x69029bc61f9828ed712a9238f70b4fe629b35144cd638a50f60bd278916b33c5")
+        return remote_agent_address
+
+    async def _create_escrow(
+        self, escrow_task_id: str, remote_agent_address: str, message: str
+    ) -> dict:
+        """Creates the escrow for a task and returns the transaction result.
+
+        Raises:
+          Exception: If the transaction was not successful.
+        """
+        # Default bounty: 0.01 SUI (in MIST)
+        bounty = int(os.environ.get('SUI_TASK_BOUNTY', "10000000"))  # 0.01 SUI = 10,000,000 MIST
+        deadline_seconds = int(os.environ.get('SUI_TASK_DEADLINE', "7200"))  # 2 hours default
+        task_description = f"A2A Task: {message[:100]}..."  # Truncate for description
+        
+        logger.debug(
+            '[%s] Creating task %s for service agent %s: amount=%s '
+            'deadline_seconds=%s host=%s description=%r',
+            self.escrow_backend.chain.upper(),
+            escrow_task_id,
+            remote_agent_address,
+            bounty,
+            deadline_seconds,
+            self.sui_address,
+            task_description,
+        )
+
+        result = await self.escrow_backend.create(
+            task_id=escrow_task_id,
+            service_agent=remote_agent_address,
+            amount=bounty,
+            deadline_seconds=deadline_seconds,
+            description=task_description
+        )
+        
+        chain = self.escrow_backend.chain
+        if not result.get('success'):
+            raise Exception(
+                f"Failed to create the {chain} escrow: {result.get('error')}"
+            )
+
+        logger.info(
+            '[%s] Host Agent: escrow created, tx: %s',
+            chain.upper(),
+            result.get('tx_hash'),
+        )
+        return result
+
     async def confirm_task(
         self, agent_name: str, message: str, tool_context: ToolContext
     ):
@@ -261,98 +402,65 @@ Current agent: {current_agent['active_agent']}
         sessionId = state['session_id']
         
         # Get remote agent's SUI address
-        remote_agent_address = None
-        if hasattr(card, 'metadata') and card.metadata:
-            remote_agent_address = card.metadata.get('sui_address') or card.metadata.get('aptos_address') or card.metadata.get('ethereum_address')
-            
-        # If not found in card metadata, try environment variables
-        if not remote_agent_address:
-            remote_agent_address = os.environ.get('REMOTE_AGENT_SUI_ADDRESS') or os.environ.get('REMOTE_AGENT_APTOS_ADDRESS', "0x69029bc61f9828ed712a9238f70b4fe629b35144cd638a50f60bd278916b33c5")
-            
+        remote_agent_address = self._remote_agent_address(card)
         if not remote_agent_address:
             raise ValueError(f"Could not determine SUI address for remote agent {agent_name}")
             
-        # Check SUI connection
+        # Check that escrows can be created (key configured, chain reachable)
         try:
-            if not await self.sui_config.is_connected():
-                raise ConnectionError("Unable to connect to SUI network")
+            if not await self.escrow_backend.available():
+                raise ConnectionError(
+                    f'{self.escrow_backend.chain} escrow backend is not available'
+                )
         except Exception as e:
-            logger.warning(f"SUI connection error: {e}")
+            logger.warning(
+                f"{self.escrow_backend.chain} escrow backend error: {e}"
+            )
             logger.info(f"Falling back to regular send_task without blockchain confirmation")
             # Fallback to regular send_task when blockchain is not available
             return await self.send_task(agent_name, message, tool_context)
             
-        # Cannot proceed without private key
-        if not self.sui_config.private_key:
-            raise ValueError("Host Agent has no SUI private key configured, cannot perform blockchain confirmation")
-            
-        # Default bounty: 0.01 SUI (in MIST)
-        bounty = int(os.environ.get('SUI_TASK_BOUNTY', "10000000"))  # 0.01 SUI = 10,000,000 MIST
-        deadline_seconds = int(os.environ.get('SUI_TASK_DEADLINE', "7200"))  # 2 hours default
-        
+        # Prepare message metadata
+        metadata = self._outgoing_metadata(state)
+        messageId = str(uuid.uuid4())
+
         try:
-            # Create task on SUI blockchain using sessionId as task_id
-            task_description = f"A2A Task: {message[:100]}..."  # Truncate for description
-            
-            # Add detailed logging for debugging
-            print(f"[SUI DEBUG] Creating task with parameters:")
-            print(f"  task_id: {sessionId}")
-            print(f"  service_agent: {remote_agent_address}")
-            print(f"  amount_sui: {bounty}")
-            print(f"  deadline_seconds: {deadline_seconds}")
-            print(f"  description: {task_description}")
-            print(f"  host_address: {self.sui_config.address}")
-            print(f"  package_id: {self.sui_config.task_manager_package_id}")
-
-            result = await self.sui_task_manager.create_task(
-                task_id=sessionId,  # Use sessionId as task_id for consistency
-                service_agent=remote_agent_address,
-                amount_sui=bounty,
-                deadline_seconds=deadline_seconds,
-                description=task_description
+            # Create task on SUI blockchain using sessionId as task_id. A
+            # retry of the same message in the same user turn reuses the
+            # escrow created first.
+            result = await self._escrow_dedup.run(
+                (
+                    sessionId,
+                    metadata.get('parent_message_id', messageId),
+                    agent_name,
+                    message,
+                ),
+                lambda: self._create_escrow(
+                    sessionId, remote_agent_address, message
+                ),
             )
-            
-            if not result.get('success'):
-                raise Exception(f"Failed to create task on SUI: {result.get('error')}")
-                
             tx_hash = result.get('tx_hash')
-            logger.info(f"[SUI NETWORK] Host Agent: task created successfully! tx: {tx_hash}")
-            
         except Exception as e:
-            logger.warning(f"SUI transaction error: {e}")
+            logger.warning(
+                f"{self.escrow_backend.chain} escrow transaction error: {e}"
+            )
             logger.info(f"Falling back to regular send_task without blockchain confirmation")
             # Fallback to regular send_task when blockchain transaction fails
             return await self.send_task(agent_name, message, tool_context)
-        
-        # Prepare message metadata
-        messageId = ''
-        metadata = {}
-        if 'input_message_metadata' in state:
-            metadata.update(**state['input_message_metadata'])
-            if 'message_id' in state['input_message_metadata']:
-                messageId = state['input_message_metadata']['message_id']
-        if not messageId:
-            messageId = str(uuid.uuid4())
             
         # Add basic metadata
         metadata.update(conversation_id=sessionId, message_id=messageId)
         
         # Add signature information to metadata
-        signature = None
-        if self.sui_address:
-            message_to_sign = f"{self.sui_address}{sessionId}"
-            signature = self.sign_message(message_to_sign)
-            if signature:
-                metadata["auth"] = {
-                    "address": self.sui_address,
-                    "signature": signature
-                }
+        auth = self._auth_metadata(sessionId)
+        if auth:
+            metadata["auth"] = auth
         
         # Add blockchain confirmation information to metadata
         metadata["blockchain"] = {
             "createTask": {
                 "tx_hash": tx_hash,
-                "package_id": self.sui_config.task_manager_package_id
+                "package_id": result.get('package_id')
             }
         }
         
@@ -415,7 +523,7 @@ Current agent: {current_agent['active_agent']}
             "blockchain_confirmation": {
                 "createTask": {
                     "transaction_hash": tx_hash,
-                    "package_id": self.sui_config.task_manager_package_id,
+                    "package_id": result.get('package_id'),
                     "task_id": sessionId,
                     "task_object_id": result.get('task_object_id'),
                     "gas_used": result.get('gas_used', 0)
@@ -455,33 +563,18 @@ Current agent: {current_agent['active_agent']}
         sessionId = state['session_id']
         
         # Generate Ed25519 signature for authentication
-        signature = None
-        if self.sui_signature_manager and self.sui_address:
-            # Sign message combining agent address and session ID
-            message_to_sign = f"{self.sui_address}{sessionId}"
-            signature = self.sign_message(message_to_sign)
+        auth = self._auth_metadata(sessionId)
         
         task: Task
-        messageId = ''
-        metadata = {}
-        if 'input_message_metadata' in state:
-            metadata.update(**state['input_message_metadata'])
-            if 'message_id' in state['input_message_metadata']:
-                messageId = state['input_message_metadata']['message_id']
-        if not messageId:
-            messageId = str(uuid.uuid4())
+        metadata = self._outgoing_metadata(state)
+        messageId = str(uuid.uuid4())
             
         # Add basic metadata
         metadata.update(conversation_id=sessionId, message_id=messageId)
         
         # Add signature information to metadata if available
-        if signature and self.sui_address:
-            metadata.update({
-                "auth": {
-                    "address": self.sui_address,
-                    "signature": signature
-                }
-            })
+        if auth:
+            metadata["auth"] = auth
         
         request: TaskSendParams = TaskSendParams(
             id=taskId,
@@ -536,6 +629,219 @@ Current agent: {current_agent['active_agent']}
                     response.extend(convert_parts(artifact.parts, tool_context))
         return response
 
+    async def fan_out_tasks(
+        self,
+        tasks: list[dict],
+        tool_context: ToolContext,
+        timeout_seconds: float = 60.0,
+        confirm: bool = False,
+    ):
+        """Sends independent sub-tasks to several remote agents at once.
+
+        Use this instead of calling `send_task` or `confirm_task` once per
+        agent when a request needs work from more than one agent, for example
+        a trip that needs a flight, a hotel and a ride. All agents are
+        contacted concurrently, so the wait is that of the slowest agent.
+
+        Args:
+          tasks: A list of sub-tasks. Each entry is an object with the
+            `agent_name` to delegate to and the `message` to send it, and may
+            set its own `timeout_seconds`.
+          tool_context: The tool context this method runs in.
+          timeout_seconds: How long to wait for each agent to respond.
+          confirm: Whether to create a blockchain escrow for every sub-task,
+            as `confirm_task` does, before sending it.
+
+        Returns:
+          A list with one entry per sub-task holding the agent name, the final
+          task state and the response. Agents that fail or time out are
+          reported in their entry and do not affect the other results: their
+          state is failed, with a `reason` of 'timeout' or 'escrow_failed'
+          when they timed out or their escrow could not be created. With
+          `confirm`, a sub-task whose escrow fails is not sent.
+        """
+        state = tool_context.state
+        session_id = state['session_id']
+
+        metadata = self._outgoing_metadata(state)
+        metadata.update(conversation_id=session_id)
+
+        # Every sub-task is signed over the same payload, so sign only once.
+        auth = self._auth_metadata(session_id)
+        if auth:
+            metadata['auth'] = auth
+
+        if confirm:
+            try:
+                if not await self.escrow_backend.available():
+                    raise ConnectionError(
+                        f'{self.escrow_backend.chain} escrow backend is not '
+                        'available'
+                    )
+            except Exception as e:
+                logger.warning(
+                    f'{self.escrow_backend.chain} escrow backend error: {e}'
+                )
+                logger.info(
+                    'Falling back to fan-out without blockchain confirmation'
+                )
+                confirm = False
+
+        started = time.monotonic()
+        results = await asyncio.gather(
+            *[
+                self._run_sub_task(
+                    sub_task.get('agent_name', ''),
+                    sub_task.get('message', ''),
+                    session_id,
+                    metadata,
+                    float(sub_task.get('timeout_seconds', timeout_seconds)),
+                    confirm,
+                    tool_context,
+                )
+                for sub_task in tasks
+            ]
+        )
+        logger.info(
+            f'Fan-out to {len(results)} agents finished in '
+            f'{time.monotonic() - started:.2f}s'
+        )
+
+        # Hand the conversation to the first agent that still needs input.
+        waiting = [r for r in results if r['state'] == TaskState.INPUT_REQUIRED]
+        state['session_active'] = bool(waiting)
+        if waiting:
+            state['agent'] = waiting[0]['agent_name']
+            state['task_id'] = waiting[0]['task_id']
+            tool_context.actions.skip_summarization = True
+            tool_context.actions.escalate = True
+        return results
+
+    async def _run_sub_task(
+        self,
+        agent_name: str,
+        message: str,
+        session_id: str,
+        metadata: dict,
+        timeout_seconds: float,
+        confirm: bool,
+        tool_context: ToolContext,
+    ) -> dict:
+        started = time.monotonic()
+        task_id = str(uuid.uuid4())
+        result = {'agent_name': agent_name, 'task_id': task_id}
+        client = self.remote_agent_connections.get(agent_name)
+        if not client:
+            result.update(
+                state=TaskState.FAILED, error=f'Agent {agent_name} not found'
+            )
+            return result
+
+        metadata = {**metadata, 'message_id': str(uuid.uuid4())}
+        if confirm:
+            remote_agent_address = self._remote_agent_address(
+                self.cards[agent_name]
+            )
+            try:
+                # The session id is shared by every sub-task, so escrows are
+                # keyed by the sub-task id to keep them distinct on chain.
+                escrow = await self._create_escrow(
+                    task_id, remote_agent_address, message
+                )
+                metadata['blockchain'] = {
+                    'createTask': {
+                        'tx_hash': escrow.get('tx_hash'),
+                        'package_id': escrow.get('package_id'),
+                        'task_id': task_id,
+                    }
+                }
+                result['blockchain_confirmation'] = {
+                    'createTask': {
+                        'transaction_hash': escrow.get('tx_hash'),
+                        'package_id': escrow.get('package_id'),
+                        'task_id': task_id,
+                        'task_object_id': escrow.get('task_object_id'),
+                        'gas_used': escrow.get('gas_used', 0),
+                    }
+                }
+            except Exception as e:
+                # Without its escrow the agent would work unpaid, so the
+                # sub-task is not sent and the failure is reported instead.
+                logger.warning(
+                    f'{self.escrow_backend.chain} escrow transaction error '
+                    f'for {agent_name}: {e}'
+                )
+                result.update(
+                    state=TaskState.FAILED,
+                    reason='escrow_failed',
+                    error=f'Could not create the escrow for {agent_name}: {e}',
+                    elapsed_seconds=round(time.monotonic() - started, 3),
+                )
+                return result
+
+        request = TaskSendParams(
+            id=task_id,
+            sessionId=session_id,
+            message=Message(
+                role='user',
+                parts=[TextPart(text=message)],
+                metadata=metadata,
+            ),
+            acceptedOutputModes=['text', 'text/plain', 'image/png'],
+            metadata={'conversation_id': session_id},
+        )
+        try:
+            task = await asyncio.wait_for(
+                client.send_task(request, self.task_callback),
+                timeout=timeout_seconds,
+            )
+        except TimeoutError:
+            result.update(
+                state=TaskState.FAILED,
+                reason='timeout',
+                error=f'No response from {agent_name} after '
+                f'{timeout_seconds}s',
+            )
+            return result
+        except Exception as e:
+            logger.error(f'Error sending fan-out task to {agent_name}: {e}')
+            result.update(state=TaskState.FAILED, error=str(e))
+            return result
+        finally:
+            result['elapsed_seconds'] = round(time.monotonic() - started, 3)
+
+        if not task or not task.status:
+            result.update(
+                state=TaskState.FAILED,
+                error=f'Agent {agent_name} returned no task result',
+            )
+            return result
+
+        result['state'] = task.status.state
+        response = []
+        if task.status.message:
+            response.extend(
+                convert_parts(task.status.message.parts, tool_context)
+            )
+        if task.artifacts:
+            for artifact in task.artifacts:
+                if artifact and artifact.parts:
+                    response.extend(convert_parts(artifact.parts, tool_context))
+        result['response'] = response
+        if task.status.state in [TaskState.CANCELED, TaskState.FAILED]:
+            result['error'] = (
+                f'Agent {agent_name} task {task.id} {task.status.state.value}'
+            )
+        return result
+
+
+def get_user_query(context: ReadonlyContext) -> str:
+    """Returns the text of the user turn that started the invocation."""
+    content = getattr(context, 'user_content', None)
+    if not content or not content.parts:
+        return ''
+    return '\n'.join(p.text for p in content.parts if p.text)
+
 
 def convert_parts(parts: list[Part], tool_context: ToolContext):
     rval = []
@@ -69,8 +69,13 @@ class RemoteAgentConnections:
                     m = response.result.status.message
                     if not m.metadata:
                         m.metadata = {}
-                    if 'message_id' in m.metadata:
-                        m.metadata['last_message_id'] = m.metadata['message_id']
+                    # Each send has its own message_id; the reply follows on from
+                    # the user's message that the host sent as parent_message_id.
+                    last_message_id = m.metadata.get(
+                        'parent_message_id', m.metadata.get('message_id')
+                    )
+                    if last_message_id:
+                        m.metadata['last_message_id'] = last_message_id
                     m.metadata['message_id'] = str(uuid.uuid4())
                 if task_callback:
                     task = task_callback(response.result, self.card)
@@ -133,8 +138,13 @@ class RemoteAgentConnections:
                 m = response.result.status.message
                 if not m.metadata:
                     m.metadata = {}
-                if 'message_id' in m.metadata:
-                    m.metadata['last_message_id'] = m.metadata['message_id']
+                # Each send has its own message_id; the reply follows on from
+                # the user's message that the host sent as parent_message_id.
+                last_message_id = m.metadata.get(
+                    'parent_message_id', m.metadata.get('message_id')
+                )
+                if last_message_id:
+                    m.metadata['last_message_id'] = last_message_id
                 m.metadata['message_id'] = str(uuid.uuid4())
 
             if task_callback:
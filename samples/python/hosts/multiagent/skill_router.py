@@ -0,0 +1,127 @@
+"""Local skill routing for the host agent.
+
+Ranks registered remote agents against a user turn with BM25 over the text
+of their agent cards (name, description and the name, description, tags and
+examples of every skill). The host uses the shortlist to keep the agent
+section of its instruction small as more agents are registered.
+"""
+
+import math
+import re
+
+from collections import Counter, defaultdict
+
+from common.types import AgentCard
+
+
+_WORD_RE = re.compile(r'[a-z0-9]+')
+_CJK_RE = re.compile(
+    r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]+'
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Splits text into lowercase word tokens.
+
+    Runs of CJK characters have no word boundaries, so they are indexed as
+    overlapping character bigrams (and single characters for runs of one).
+    """
+    if not text:
+        return []
+    text = text.lower()
+    tokens = _WORD_RE.findall(text)
+    for run in _CJK_RE.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i : i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def card_text(card: AgentCard) -> str:
+    """Returns the searchable text of an agent card."""
+    fields = [card.name, card.description or '']
+    for skill in card.skills or []:
+        fields.append(skill.name)
+        fields.append(skill.description or '')
+        fields.extend(skill.tags or [])
+        fields.extend(skill.examples or [])
+    return '\n'.join(fields)
+
+
+class SkillRouter:
+    """An incremental BM25 index over agent cards.
+
+    Cards can be added, replaced or removed one at a time; only the postings
+    of the affected card are touched.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._doc_terms: dict[str, Counter] = {}
+        self._doc_lengths: dict[str, int] = {}
+        self._postings: dict[str, dict[str, int]] = defaultdict(dict)
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._doc_terms
+
+    def add_card(self, card: AgentCard):
+        """Indexes a card, replacing any card previously indexed by name."""
+        self.remove(card.name)
+        terms = Counter(tokenize(card_text(card)))
+        length = sum(terms.values())
+        self._doc_terms[card.name] = terms
+        self._doc_lengths[card.name] = length
+        self._total_length += length
+        for term, count in terms.items():
+            self._postings[term][card.name] = count
+
+    def remove(self, name: str):
+        terms = self._doc_terms.pop(name, None)
+        if terms is None:
+            return
+        self._total_length -= self._doc_lengths.pop(name)
+        for term in terms:
+            postings = self._postings[term]
+            del postings[name]
+            if not postings:
+                del self._postings[term]
+
+    def score(self, query: str) -> dict[str, float]:
+        """Returns the BM25 score of every card that matches the query."""
+        if not self._doc_terms:
+            return {}
+        doc_count = len(self._doc_terms)
+        average_length = self._total_length / doc_count or 1.0
+        scores: dict[str, float] = defaultdict(float)
+        for term, query_count in Counter(tokenize(query)).items():
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(
+                1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5)
+            )
+            for name, count in postings.items():
+                norm = self.k1 * (
+                    1
+                    - self.b
+                    + self.b * self._doc_lengths[name] / average_length
+                )
+                scores[name] += (
+                    query_count * idf * count * (self.k1 + 1) / (count + norm)
+                )
+        return scores
+
+    def top_k(self, query: str, k: int) -> list[str]:
+        """Returns the names of the k best matching cards, best first.
+
+        Ties are broken by name so the shortlist is stable between calls.
+        """
+        scores = self.score(query)
+        ranked = sorted(scores.items(), key=lambda x: (-x[1], x[0]))
+        return [name for name, _ in ranked[:k]]
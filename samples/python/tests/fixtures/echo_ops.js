@@ -0,0 +1,26 @@
+// Stand-in for common/sui_scripts/sui_ops.js that speaks the same protocol
+// without needing @mysten/sui.
+const readline = require("readline");
+
+const version = Number(process.env.ECHO_OPS_VERSION || 1);
+const ops = {
+    echo: async args => args,
+    fail: async ({ message }) => { throw new Error(message); },
+    sleep: ({ ms }) => new Promise(resolve => setTimeout(() => resolve({ slept: ms }), ms)),
+    crash: async () => process.exit(3),
+    pid: async () => ({ pid: process.pid })
+};
+
+function reply(message) {
+    process.stdout.write(JSON.stringify(message) + "\n");
+}
+
+reply({ ready: true, version });
+readline.createInterface({ input: process.stdin }).on("line", async line => {
+    const request = JSON.parse(line);
+    try {
+        reply({ id: request.id, ok: true, result: await ops[request.op](request.args) });
+    } catch (error) {
+        reply({ id: request.id, ok: false, error: error.message });
+    }
+});
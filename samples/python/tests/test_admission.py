@@ -0,0 +1,218 @@
+import asyncio
+import contextlib
+import unittest
+
+from starlette.testclient import TestClient
+
+from common.server import A2AServer, InMemoryTaskManager
+from common.server.admission import (
+    AdmissionController,
+    AdmissionRejected,
+    TokenBucket,
+)
+from common.server.server import ClosingStreamingResponse
+from common.types import (
+    AgentCapabilities,
+    AgentCard,
+    SendTaskRequest,
+    SendTaskResponse,
+)
+
+
+class EchoTaskManager(InMemoryTaskManager):
+    async def on_send_task(self, request: SendTaskRequest) -> SendTaskResponse:
+        task = await self.upsert_task(request.params)
+        return SendTaskResponse(id=request.id, result=task)
+
+    async def on_send_task_subscribe(self, request):
+        raise NotImplementedError
+
+
+def send_payload(request_id: int, address: str) -> dict:
+    return {
+        'jsonrpc': '2.0',
+        'id': request_id,
+        'method': 'tasks/send',
+        'params': {
+            'id': f'task-{request_id}',
+            'message': {
+                'role': 'user',
+                'parts': [{'type': 'text', 'text': 'hi'}],
+                'metadata': {'auth': {'address': address}},
+            },
+        },
+    }
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_refills_at_rate(self) -> None:
+        bucket = TokenBucket(rate=2, burst=2)
+        now = bucket.updated
+        self.assertEqual(bucket.try_acquire(now), 0)
+        self.assertEqual(bucket.try_acquire(now), 0)
+        self.assertAlmostEqual(bucket.try_acquire(now), 0.5)
+        self.assertEqual(bucket.try_acquire(now + 0.5), 0)
+
+
+class AdmissionControllerTest(unittest.IsolatedAsyncioTestCase):
+    """Tests for rate limiting and bounded queuing."""
+
+    async def test_caller_rate_is_per_caller(self) -> None:
+        controller = AdmissionController(
+            global_rate=0, caller_rate=1, caller_burst=2, max_concurrency=0
+        )
+        for _ in range(2):
+            (await controller.acquire('a'))()
+        with self.assertRaises(AdmissionRejected) as cm:
+            await controller.acquire('a')
+        self.assertEqual(cm.exception.reason, 'caller_rate')
+        self.assertGreater(cm.exception.retry_after, 0)
+        (await controller.acquire('b'))()
+        self.assertEqual(controller.stats()['rejected'], {'caller_rate': 1})
+
+    async def test_global_rate_refunds_caller_token(self) -> None:
+        controller = AdmissionController(
+            global_rate=1,
+            global_burst=1,
+            caller_rate=1,
+            caller_burst=1,
+            max_concurrency=0,
+        )
+        (await controller.acquire('a'))()
+        with self.assertRaises(AdmissionRejected) as cm:
+            await controller.acquire('b')
+        self.assertEqual(cm.exception.reason, 'global_rate')
+        self.assertEqual(controller._caller_buckets['b'].tokens, 1)
+
+    async def test_bounded_queue(self) -> None:
+        controller = AdmissionController(
+            global_rate=0,
+            caller_rate=0,
+            max_concurrency=1,
+            max_queue=1,
+            queue_timeout=5,
+        )
+        release = await controller.acquire('a')
+        waiter = asyncio.create_task(controller.acquire('b'))
+        await asyncio.sleep(0)
+        self.assertEqual(controller.queued, 1)
+        with self.assertRaises(AdmissionRejected) as cm:
+            await controller.acquire('c')
+        self.assertEqual(cm.exception.reason, 'queue_full')
+
+        release()
+        release()  # Releasing twice must not free a second slot.
+        (await waiter)()
+        self.assertEqual(controller.in_flight, 0)
+        self.assertEqual(controller.stats()['peak_queued'], 1)
+
+    async def test_queue_timeout(self) -> None:
+        controller = AdmissionController(
+            global_rate=0,
+            caller_rate=0,
+            max_concurrency=1,
+            max_queue=1,
+            queue_timeout=0.01,
+        )
+        await controller.acquire('a')
+        with self.assertRaises(AdmissionRejected) as cm:
+            await controller.acquire('b')
+        self.assertEqual(cm.exception.reason, 'queue_timeout')
+        self.assertEqual(controller.queued, 0)
+
+    async def test_queue_rejections_refund_rate_tokens(self) -> None:
+        controller = AdmissionController(
+            global_rate=0.001,
+            global_burst=4,
+            caller_rate=0.001,
+            caller_burst=1,
+            max_concurrency=1,
+            max_queue=1,
+            queue_timeout=0.01,
+        )
+        await controller.acquire('a')
+        with self.assertRaises(AdmissionRejected) as cm:
+            await controller.acquire('b')
+        self.assertEqual(cm.exception.reason, 'queue_timeout')
+        waiter = asyncio.create_task(controller.acquire('c'))
+        await asyncio.sleep(0)
+        with self.assertRaises(AdmissionRejected) as cm:
+            await controller.acquire('d')
+        self.assertEqual(cm.exception.reason, 'queue_full')
+        waiter.cancel()
+
+        # 'b' and 'd' keep no tokens: each can be admitted once more.
+        self.assertGreaterEqual(controller._caller_buckets['b'].tokens, 1)
+        self.assertGreaterEqual(controller._caller_buckets['d'].tokens, 1)
+        self.assertGreaterEqual(controller.global_bucket.tokens, 1)
+
+
+class A2AServerAdmissionTest(unittest.TestCase):
+    """Tests that the server sheds load with a JSON-RPC error."""
+
+    def test_rejects_with_retry_after(self) -> None:
+        card = AgentCard(
+            name='Echo',
+            url='http://localhost/',
+            version='1.0.0',
+            capabilities=AgentCapabilities(),
+            skills=[],
+        )
+        server = A2AServer(
+            agent_card=card,
+            task_manager=EchoTaskManager(),
+            admission_controller=AdmissionController(
+                global_rate=0, caller_rate=1, caller_burst=1
+            ),
+        )
+        client = TestClient(server.app)
+
+        ok = client.post('/', json=send_payload(1, '0xabc')).json()
+        self.assertEqual(ok['result']['id'], 'task-1')
+
+        response = client.post('/', json=send_payload(2, '0xabc'))
+        body = response.json()
+        self.assertEqual(body['id'], 2)
+        self.assertEqual(body['error']['code'], -32000)
+        self.assertEqual(body['error']['data']['reason'], 'caller_rate')
+        self.assertEqual(response.headers['Retry-After'], '1')
+
+        other = client.post('/', json=send_payload(3, '0xdef')).json()
+        self.assertNotIn('error', other)
+
+        stats = client.get('/metrics/admission').json()
+        self.assertEqual(stats['admitted'], 2)
+        self.assertEqual(stats['rejected_total'], 1)
+        self.assertEqual(stats['in_flight'], 0)
+
+
+class ClosingStreamingResponseTest(unittest.IsolatedAsyncioTestCase):
+    """Tests that a stream's admission slot is released."""
+
+    async def test_released_if_client_leaves_before_first_chunk(self) -> None:
+        started = []
+        released = []
+
+        async def stream():
+            started.append(True)
+            yield 'data: {}\n\n'
+
+        response = ClosingStreamingResponse(
+            stream(), on_close=lambda: released.append(True)
+        )
+
+        async def receive():
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            raise OSError('client went away')
+
+        scope = {'type': 'http', 'asgi': {'spec_version': '2.4'}}
+        with contextlib.suppress(Exception):
+            await response(scope, receive, send)
+        self.assertEqual(started, [])
+        self.assertEqual(released, [True])
+
+
+if __name__ == '__main__':
+    unittest.main()
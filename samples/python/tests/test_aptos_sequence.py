@@ -0,0 +1,128 @@
+import asyncio
+import threading
+import unittest
+
+from types import SimpleNamespace
+
+from aptos_sdk.account import Account
+
+from common.aptos_sequence import AptosSequenceManager, TransactionFailed
+
+
+class FakeAptosClient:
+    """Commits submitted transactions in sequence order, like a node."""
+
+    def __init__(self, committed: int = 0):
+        self.client_config = SimpleNamespace(expiration_ttl=600)
+        self.sequence_number = committed
+        self.mempool = {}
+        self.committed = []
+        self.failing_submits = 0
+        self.fail_sequences = set()
+        self.sequence_reads = 0
+        self.account_reads = 0
+        self.lock = threading.Lock()
+
+    async def account_sequence_number(self, address):
+        self.sequence_reads += 1
+        return self.sequence_number
+
+    async def create_bcs_signed_transaction(
+        self, account, payload, sequence_number=None
+    ):
+        return SimpleNamespace(sequence_number=sequence_number, payload=payload)
+
+    async def submit_bcs_transaction(self, signed):
+        if self.failing_submits:
+            self.failing_submits -= 1
+            raise RuntimeError('mempool is full')
+        with self.lock:
+            tx_hash = f'0x{signed.sequence_number:04x}{signed.payload}'
+            self.mempool[signed.sequence_number] = tx_hash
+            # Commit every transaction whose predecessors are committed.
+            while self.sequence_number in self.mempool:
+                seq = self.sequence_number
+                self.committed.append(
+                    {
+                        'sequence_number': str(seq),
+                        'hash': self.mempool.pop(seq),
+                        'success': seq not in self.fail_sequences,
+                        'vm_status': 'Executed successfully',
+                        'gas_used': '10',
+                    }
+                )
+                self.sequence_number += 1
+        return tx_hash
+
+    async def transactions_by_account(self, address, limit=None, start=None):
+        self.account_reads += 1
+        with self.lock:
+            return [
+                t for t in self.committed if int(t['sequence_number']) >= start
+            ][:limit]
+
+
+class AptosSequenceManagerTest(unittest.IsolatedAsyncioTestCase):
+    """Tests for local sequence allocation and batched confirmation."""
+
+    def setUp(self) -> None:
+        self.client = FakeAptosClient(committed=5)
+        self.manager = AptosSequenceManager(
+            Account.generate(), poll_interval=0.01
+        )
+
+    async def test_concurrent_submissions_use_distinct_sequences(self) -> None:
+        txns = await asyncio.gather(
+            *(
+                self.manager.submit_and_wait(self.client, f'p{i}')
+                for i in range(20)
+            )
+        )
+        sequences = sorted(int(t['sequence_number']) for t in txns)
+        self.assertEqual(sequences, list(range(5, 25)))
+        self.assertEqual(self.client.sequence_reads, 1)
+        # Confirmations are batched rather than polled per transaction.
+        self.assertLess(self.client.account_reads, 5)
+        self.assertEqual(self.manager.in_flight, 0)
+
+    async def test_failed_submit_resyncs_from_chain(self) -> None:
+        await self.manager.submit_and_wait(self.client, 'a')
+        self.client.failing_submits = 1
+        with self.assertRaises(RuntimeError):
+            await self.manager.submit(self.client, 'b')
+        txn = await self.manager.submit_and_wait(self.client, 'c')
+        # Sequence 6 was never used, so it is allocated again.
+        self.assertEqual(txn['sequence_number'], '6')
+        self.assertEqual(self.manager.stats()['resyncs'], 1)
+
+    async def test_failed_execution_raises_without_resync(self) -> None:
+        self.client.fail_sequences.add(5)
+        with self.assertRaises(TransactionFailed):
+            await self.manager.submit_and_wait(self.client, 'a')
+        txn = await self.manager.submit_and_wait(self.client, 'b')
+        self.assertEqual(txn['sequence_number'], '6')
+        self.assertEqual(self.manager.stats()['resyncs'], 0)
+
+
+class AptosSequenceManagerThreadsTest(unittest.TestCase):
+    def test_event_loops_in_threads_share_the_allocator(self) -> None:
+        client = FakeAptosClient()
+        manager = AptosSequenceManager(Account.generate(), poll_interval=0.01)
+        results = []
+
+        def worker(name):
+            txn = asyncio.run(manager.submit_and_wait(client, name))
+            results.append(int(txn['sequence_number']))
+
+        threads = [
+            threading.Thread(target=worker, args=(f't{i}',)) for i in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(results), list(range(8)))
+
+
+if __name__ == '__main__':
+    unittest.main()
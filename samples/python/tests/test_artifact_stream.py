@@ -0,0 +1,160 @@
+import base64
+import unittest
+
+from starlette.testclient import TestClient
+
+from common.server import A2AServer
+from common.server.artifact_stream import (
+    ArtifactAssembler,
+    ArtifactStreamer,
+    split_text,
+)
+from common.types import (
+    AgentCapabilities,
+    AgentCard,
+    Artifact,
+    DataPart,
+    FileContent,
+    FilePart,
+    TextPart,
+)
+from common.utils.blob_store import BlobStore
+
+
+def file_part(data: bytes) -> FilePart:
+    return FilePart(
+        file=FileContent(
+            name='out.bin',
+            mimeType='application/octet-stream',
+            bytes=base64.b64encode(data).decode(),
+        )
+    )
+
+
+class ArtifactStreamTest(unittest.TestCase):
+    """Tests for chunked artifact streaming and reassembly."""
+
+    def setUp(self) -> None:
+        self.streamer = ArtifactStreamer(chunk_size=10)
+        self.assembler = ArtifactAssembler()
+
+    def reassemble(self, task_id: str, artifact: Artifact) -> list[Artifact]:
+        completed = []
+        for chunk in self.streamer.chunks(artifact):
+            completed.extend(self.assembler.add(task_id, chunk))
+        return [a for _, a in completed]
+
+    def test_round_trip(self) -> None:
+        data = bytes(range(40))
+        artifact = Artifact(
+            name='result',
+            metadata={'kind': 'answer'},
+            parts=[
+                TextPart(text='héllo wörld, ' * 5),
+                DataPart(data={'total': 3}),
+                file_part(data),
+            ],
+        )
+        chunks = list(self.streamer.chunks(artifact))
+        self.assertGreater(len(chunks), 5)
+        self.assertEqual(
+            [(c.append, c.lastChunk) for c in chunks[:2]],
+            [(False, False), (True, False)],
+        )
+        self.assertTrue(chunks[-1].lastChunk)
+
+        [rebuilt] = self.reassemble('t1', artifact)
+        self.assertEqual(
+            [p.type for p in rebuilt.parts], ['text', 'data', 'file']
+        )
+        self.assertEqual(rebuilt.parts[0].text, artifact.parts[0].text)
+        self.assertEqual(base64.b64decode(rebuilt.parts[2].file.bytes), data)
+        self.assertEqual(rebuilt.metadata, {'kind': 'answer'})
+        self.assertIsNone(rebuilt.lastChunk)
+        self.assertEqual(len(self.assembler), 0)
+
+    def test_small_artifact_is_sent_whole(self) -> None:
+        artifact = Artifact(parts=[TextPart(text='short')])
+        self.assertEqual(list(self.streamer.chunks(artifact)), [artifact])
+        self.assertEqual(self.reassemble('t1', artifact), [artifact])
+
+    def test_split_text_keeps_characters_whole(self) -> None:
+        text = '你好世界' * 3
+        pieces = split_text(text, 7)
+        self.assertEqual(''.join(pieces), text)
+        self.assertTrue(all(len(p.encode()) <= 7 for p in pieces))
+
+    def test_missing_first_chunk_is_kept_as_incomplete(self) -> None:
+        chunks = list(
+            self.streamer.chunks(Artifact(parts=[TextPart(text='x' * 30)]))
+        )
+        completed = []
+        for chunk in chunks[1:]:
+            completed.extend(self.assembler.add('t1', chunk))
+        [(task_id, artifact)] = completed
+        self.assertEqual(task_id, 't1')
+        self.assertEqual(artifact.parts[0].text, 'x' * 20)
+        self.assertTrue(artifact.metadata['incomplete'])
+
+    def test_buffer_is_bounded(self) -> None:
+        assembler = ArtifactAssembler(max_open=2, max_bytes=15)
+        chunks = list(
+            self.streamer.chunks(Artifact(parts=[TextPart(text='y' * 30)]))
+        )
+        self.assertEqual(assembler.add('t1', chunks[0]), [])
+        self.assertEqual(assembler.add('t2', chunks[0]), [])
+        [(task_id, evicted)] = assembler.add('t3', chunks[0])
+        self.assertEqual(task_id, 't1')
+        self.assertTrue(evicted.metadata['incomplete'])
+        self.assertEqual(len(assembler), 2)
+
+        completed = []
+        for chunk in chunks[1:]:
+            completed.extend(assembler.add('t2', chunk))
+        [(_, truncated)] = completed
+        self.assertEqual(truncated.parts[0].text, 'y' * 10)
+        self.assertTrue(truncated.metadata['truncated'])
+
+        [flushed] = assembler.flush('t3')
+        self.assertTrue(flushed.metadata['incomplete'])
+        self.assertEqual(assembler.flush('t3'), [])
+
+    def test_large_files_are_served_by_uri(self) -> None:
+        server = A2AServer(
+            agent_card=AgentCard(
+                name='test',
+                url='http://localhost:10000/',
+                version='1.0.0',
+                capabilities=AgentCapabilities(),
+                skills=[],
+            ),
+            blobs=BlobStore(),
+        )
+        self.addCleanup(server.blobs.close)
+        streamer = ArtifactStreamer(
+            uri_threshold=16, blobs=server.blobs, base_url=server.agent_card.url
+        )
+        data = bytes(range(100))
+        artifact = streamer.externalize(
+            Artifact(parts=[file_part(data), file_part(b'small')])
+        )
+        large, small = artifact.parts
+        self.assertIsNone(large.file.bytes)
+        self.assertTrue(
+            large.file.uri.startswith('http://localhost:10000/artifacts/')
+        )
+        self.assertEqual(large.file.name, 'out.bin')
+        self.assertIsNotNone(small.file.bytes)
+
+        client = TestClient(server.app)
+        path = large.file.uri.removeprefix('http://localhost:10000')
+        response = client.get(path)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, data)
+        response = client.get(path, headers={'Range': 'bytes=90-'})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.content, data[90:])
+
+
+if __name__ == '__main__':
+    unittest.main()
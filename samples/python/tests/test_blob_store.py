@@ -0,0 +1,71 @@
+import base64
+import os
+import tempfile
+import unittest
+
+from common.utils.blob_store import BlobStore, parse_range
+
+
+class BlobStoreTest(unittest.TestCase):
+    """Tests for the content addressed file store."""
+
+    def setUp(self) -> None:
+        self.store = BlobStore(memory_limit=10)
+        self.addCleanup(self.store.close)
+
+    def read(self, digest: str, *args) -> bytes:
+        return b''.join(self.store.read(digest, *args, chunk_size=3))
+
+    def test_identical_content_is_stored_once(self) -> None:
+        encoded = base64.b64encode(b'image').decode()
+        first = self.store.put_base64(encoded, 'image/png')
+        second = self.store.put_base64(encoded, 'image/png')
+        self.assertEqual(first, second)
+        self.assertEqual(self.store.stats()['blobs'], 1)
+        self.assertEqual(self.read(first), b'image')
+        # Content that is not base64 is kept as sent.
+        plain = self.store.put_base64('not base64!', 'text/plain')
+        self.assertEqual(self.read(plain), b'not base64!')
+
+    def test_spills_least_recently_used_to_disk(self) -> None:
+        a = self.store.put(b'aaaa', 'text/plain')
+        b = self.store.put(b'bbbb', 'text/plain')
+        self.read(a)
+        c = self.store.put(b'cccc', 'text/plain')
+        big = self.store.put(b'x' * 20, 'text/plain')
+
+        self.assertIsNone(self.store.info(a).path)
+        self.assertTrue(os.path.exists(self.store.info(b).path))
+        self.assertIsNone(self.store.info(c).path)
+        self.assertIsNotNone(self.store.info(big).path)
+        self.assertEqual(self.store.stats()['memory_bytes'], 8)
+        self.assertEqual(self.read(b), b'bbbb')
+        self.assertEqual(self.read(big, 5, 12), b'x' * 7)
+        self.assertEqual(self.read(a, 1, 3), b'aa')
+
+        spill_dir = os.path.dirname(self.store.info(b).path)
+        self.store.close()
+        self.assertFalse(os.path.exists(spill_dir))
+
+    def test_given_spill_dir_is_kept(self) -> None:
+        with tempfile.TemporaryDirectory() as spill_dir:
+            store = BlobStore(memory_limit=0, spill_dir=spill_dir)
+            digest = store.put(b'data', None)
+            store.close()
+            self.assertEqual(os.listdir(spill_dir), [digest])
+
+    def test_parse_range(self) -> None:
+        self.assertEqual(parse_range('bytes=0-3', 10), (0, 4))
+        self.assertEqual(parse_range('bytes=4-', 10), (4, 10))
+        self.assertEqual(parse_range('bytes=-3', 10), (7, 10))
+        self.assertEqual(parse_range('bytes=5-100', 10), (5, 10))
+        self.assertIsNone(parse_range('bytes=10-', 10))
+        self.assertIsNone(parse_range('bytes=4-2', 10))
+        with self.assertRaises(ValueError):
+            parse_range('bytes=0-1,4-5', 10)
+        with self.assertRaises(ValueError):
+            parse_range('items=0-1', 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
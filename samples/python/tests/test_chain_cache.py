@@ -0,0 +1,93 @@
+import asyncio
+import unittest
+
+from common.chain_cache import ChainReadCache
+
+
+class CountingFetch:
+    def __init__(self, *values, delay: float = 0):
+        self.values = list(values)
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        value = self.values.pop(0)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+
+class ChainReadCacheTest(unittest.IsolatedAsyncioTestCase):
+    """Tests for cached receipt and view lookups."""
+
+    def setUp(self) -> None:
+        self.cache = ChainReadCache(negative_ttl=0.05)
+
+    async def test_final_receipt_is_cached(self) -> None:
+        fetch = CountingFetch({'checkpoint': 1})
+        for _ in range(3):
+            receipt = await self.cache.get_receipt(
+                'tx', fetch, is_final=lambda r: r['checkpoint'] is not None
+            )
+        self.assertEqual(receipt, {'checkpoint': 1})
+        self.assertEqual(fetch.calls, 1)
+        self.assertEqual(self.cache.stats()['hits'], 2)
+
+    async def test_pending_receipt_is_not_cached(self) -> None:
+        fetch = CountingFetch({'checkpoint': None}, {'checkpoint': 2})
+        is_final = lambda r: r['checkpoint'] is not None
+        await self.cache.get_receipt('tx', fetch, is_final)
+        receipt = await self.cache.get_receipt('tx', fetch, is_final)
+        self.assertEqual(receipt, {'checkpoint': 2})
+        self.assertEqual(fetch.calls, 2)
+
+    async def test_concurrent_lookups_share_one_fetch(self) -> None:
+        fetch = CountingFetch({'ok': True}, delay=0.01)
+        results = await asyncio.gather(
+            *(self.cache.get_view('view', fetch, ttl=5) for _ in range(10))
+        )
+        self.assertEqual(results, [{'ok': True}] * 10)
+        self.assertEqual(fetch.calls, 1)
+        self.assertEqual(self.cache.stats()['joined'], 9)
+
+    async def test_cancelled_leader_hands_fetch_to_joiner(self) -> None:
+        fetch = CountingFetch({'ok': True}, delay=0.01)
+        leader = asyncio.create_task(self.cache.get_view('view', fetch, ttl=5))
+        await asyncio.sleep(0)
+        joiner = asyncio.create_task(self.cache.get_view('view', fetch, ttl=5))
+        await asyncio.sleep(0)
+        leader.cancel()
+        self.assertEqual(await joiner, {'ok': True})
+        self.assertTrue(leader.cancelled())
+        self.assertEqual(fetch.calls, 2)
+
+    async def test_missing_result_expires_quickly(self) -> None:
+        fetch = CountingFetch(None, {'found': True})
+        self.assertIsNone(await self.cache.get_view('tx', fetch, ttl=60))
+        self.assertIsNone(await self.cache.get_view('tx', fetch, ttl=60))
+        await asyncio.sleep(0.06)
+        self.assertEqual(
+            await self.cache.get_view('tx', fetch, ttl=60), {'found': True}
+        )
+        self.assertEqual(fetch.calls, 2)
+
+    async def test_errors_are_not_cached(self) -> None:
+        fetch = CountingFetch(RuntimeError('node down'), {'ok': True})
+        with self.assertRaises(RuntimeError):
+            await self.cache.get_view('view', fetch, ttl=60)
+        self.assertEqual(
+            await self.cache.get_view('view', fetch, ttl=60), {'ok': True}
+        )
+
+    async def test_invalidate_drops_view(self) -> None:
+        fetch = CountingFetch(1, 2)
+        await self.cache.get_view('view', fetch, ttl=60)
+        self.cache.invalidate('view')
+        self.assertEqual(await self.cache.get_view('view', fetch, ttl=60), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+
+from common.chain_indexer import (
+    ChainEventIndexer,
+    ReplayEventSource,
+    TaskEventIndex,
+)
+
+
+FIXTURES = os.path.join(
+    os.path.dirname(__file__), 'fixtures', 'sui_task_events.jsonl'
+)
+
+
+class ChainEventIndexerTest(unittest.IsolatedAsyncioTestCase):
+    """Tests for indexing recorded task_manager events."""
+
+    async def asyncSetUp(self) -> None:
+        self.index = TaskEventIndex()
+        self.indexer = ChainEventIndexer(
+            self.index, ReplayEventSource(FIXTURES), page_size=2
+        )
+        self.assertEqual(await self.indexer.sync(), 5)
+
+    async def test_task_lifecycle(self) -> None:
+        completed = self.index.get_task('session-1', '0xhost')
+        self.assertEqual(completed['status'], 'completed')
+        self.assertEqual(completed['closed_tx'], 'Dx4')
+        self.assertEqual(completed['deadline'], 1750007200)
+
+        task = self.index.get_task_by_tx('Dx2')
+        self.assertEqual(task['service_agent'], '0xtravel')
+        self.assertEqual(task['status'], 'open')
+
+    async def test_cancel_seen_before_create(self) -> None:
+        task = self.index.get_task('session-3')
+        self.assertEqual(task['status'], 'cancelled')
+        self.assertEqual(task['service_agent'], '0xfood')
+        self.assertEqual(task['created_tx'], 'Dx6')
+
+    async def test_stats_and_expiry(self) -> None:
+        self.assertEqual(
+            self.index.get_task_stats('0xhost'),
+            {'total_tasks': 3, 'completed_tasks': 1, 'cancelled_tasks': 1},
+        )
+        self.assertFalse(self.index.is_task_expired('session-2', now=1750000000))
+        self.assertTrue(self.index.is_task_expired('session-2', now=1750007301))
+        # Closed escrows never expire.
+        self.assertFalse(self.index.is_task_expired('session-1', now=1750009999))
+
+    async def test_replay_is_idempotent(self) -> None:
+        before = self.index.tasks_for_service_agent('0xuber')
+        self.index.apply(ReplayEventSource(FIXTURES).events)
+        self.assertEqual(self.index.tasks_for_service_agent('0xuber'), before)
+        # The cursor is at the end, so a second sync reads nothing.
+        self.assertEqual(await self.indexer.sync(), 0)
+
+    async def test_cursor_survives_restart(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'index.db')
+            events = ReplayEventSource(FIXTURES).events
+            first = ChainEventIndexer(
+                TaskEventIndex(path), ReplayEventSource(events[:4])
+            )
+            await first.sync()
+            first.index.close()
+
+            second = ChainEventIndexer(
+                TaskEventIndex(path), ReplayEventSource(events)
+            )
+            self.assertEqual(await second.sync(), 2)
+            self.assertEqual(second.index.get_task_stats('0xhost')['total_tasks'], 3)
+            second.index.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+
+from common.chain_indexer import TaskEventIndex
+from common.escrow_reaper import EscrowReaper
+
+
+class FakeTaskManager:
+    """Cancels escrows in one transaction; any bad id aborts the batch."""
+
+    def __init__(self, amounts: dict[str, int], bad: set[str] = frozenset()):
+        self.amounts = amounts
+        self.bad = set(bad)
+        self.batches = []
+
+    async def cancel_tasks(self, task_object_ids):
+        self.batches.append(list(task_object_ids))
+        if self.bad & set(task_object_ids):
+            return {'success': False, 'error': 'MoveAbort'}
+        return {
+            'success': True,
+            'tx_hash': f'tx{len(self.batches)}',
+            'cancelled': list(task_object_ids),
+            'refunded': sum(self.amounts[i] for i in task_object_ids),
+        }
+
+
+def created_event(task_object_id, deadline, task_agent='0xhost'):
+    return {
+        'type': '0xpkg::task_manager::TaskCreatedEvent',
+        'id': {'txDigest': f'create-{task_object_id}'},
+        'parsedJson': {
+            'task_id': task_object_id,
+            'task_object_id': task_object_id,
+            'task_agent': task_agent,
+            'service_agent': '0xagent',
+            'pay_amount': '100',
+            'deadline': str(deadline),
+        },
+    }
+
+
+class EscrowReaperTest(unittest.IsolatedAsyncioTestCase):
+    """Tests for batched cancellation of overdue escrows."""
+
+    async def test_only_overdue_escrows_are_cancelled_in_batches(self) -> None:
+        amounts = {f'0x{i}': 10 for i in range(5)}
+        manager = FakeTaskManager(amounts)
+        reaper = EscrowReaper(manager, batch_size=2, grace=0)
+        for i in range(5):
+            reaper.track(f'0x{i}', deadline=100 + i, amount=10)
+
+        report = await reaper.reap(now=103)
+        self.assertEqual(report.cancelled, ['0x0', '0x1', '0x2', '0x3'])
+        self.assertEqual(manager.batches, [['0x0', '0x1'], ['0x2', '0x3']])
+        self.assertEqual(report.reclaimed, 40)
+        self.assertEqual(len(reaper), 1)
+        self.assertEqual(reaper.stats()['next_due'], 104)
+
+    async def test_failing_escrow_is_isolated_and_retried(self) -> None:
+        manager = FakeTaskManager({f'0x{i}': 10 for i in range(4)}, bad={'0x2'})
+        reaper = EscrowReaper(
+            manager, batch_size=4, grace=0, max_attempts=2, retry_delay=10
+        )
+        for i in range(4):
+            reaper.track(f'0x{i}', deadline=100, amount=10)
+
+        report = await reaper.reap(now=100)
+        self.assertEqual(sorted(report.cancelled), ['0x0', '0x1', '0x3'])
+        self.assertEqual(report.failed, [])
+        # Retried after the delay, then given up.
+        self.assertEqual((await reaper.reap(now=105)).cancelled, [])
+        report = await reaper.reap(now=110)
+        self.assertEqual(report.failed, ['0x2'])
+        self.assertEqual(len(reaper), 0)
+        reaper.track('0x2', deadline=100)
+        self.assertEqual(len(reaper), 0)
+
+    async def test_escrows_closed_on_chain_are_skipped(self) -> None:
+        index = TaskEventIndex()
+        index.apply([created_event('0xa', 100), created_event('0xb', 100)])
+        index.apply([{
+            'type': '0xpkg::task_manager::TaskCompletedEvent',
+            'parsedJson': {'task_object_id': '0xa'},
+        }])
+        manager = FakeTaskManager({'0xb': 100})
+        reaper = EscrowReaper(manager, owner='0xhost', index=index, grace=0)
+        self.assertEqual(reaper.load_from_index(), 1)
+        reaper.track('0xa', deadline=100)
+
+        report = await reaper.reap(now=200)
+        self.assertEqual(report.cancelled, ['0xb'])
+        self.assertEqual(report.reclaimed, 100)
+        self.assertEqual(manager.batches, [['0xb']])
+
+    async def test_forget_removes_escrow(self) -> None:
+        manager = FakeTaskManager({})
+        reaper = EscrowReaper(manager, grace=0)
+        reaper.track('0x1', deadline=100)
+        reaper.forget('0x1')
+        await reaper.reap(now=200)
+        self.assertEqual(manager.batches, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import asyncio
+import unittest
+
+from types import SimpleNamespace
+
+from common.chain_indexer import ChainEventIndexer, TaskEventIndex
+from common.escrow_backend import EscrowBackend, SUIEscrowBackend
+from common.fake_chain import FakeChain
+
+
+class FakeChainTest(unittest.IsolatedAsyncioTestCase):
+    """Tests for the in-memory escrow chain."""
+
+    def setUp(self) -> None:
+        self.chain = FakeChain(seed=1)
+        self.chain.fund('0xhost', 1000)
+        self.host = self.chain.backend('0xhost')
+        self.agent = self.chain.backend('0xagent')
+
+    async def test_escrow_lifecycle_moves_funds(self) -> None:
+        created = await self.host.create('t1', '0xagent', 300, 60, 'ride')
+        self.assertTrue(created['success'])
+        self.assertEqual(self.chain.balances['0xhost'], 700)
+
+        info = await self.agent.get_info('0xhost', 't1')
+        self.assertEqual(info['pay_amount'], 300)
+        self.assertFalse(info['is_completed'])
+
+        # Only the service agent can complete the escrow.
+        self.assertFalse((await self.host.complete('0xhost', created['task_ref']))['success'])
+        self.assertTrue((await self.agent.complete('0xhost', created['task_ref']))['success'])
+        self.assertEqual(self.chain.balances['0xagent'], 300)
+        self.assertFalse((await self.host.cancel(created['task_ref']))['success'])
+
+    async def test_cancel_refunds_host(self) -> None:
+        created = await self.host.create('t1', '0xagent', 300, 60, 'ride')
+        self.assertTrue((await self.host.cancel(created['task_ref']))['success'])
+        self.assertEqual(self.chain.balances['0xhost'], 1000)
+
+    async def test_failures_are_deterministic(self) -> None:
+        async def outcomes(seed):
+            chain = FakeChain(failure_rate=0.5, seed=seed)
+            chain.fund('0xhost', 100)
+            backend = chain.backend('0xhost')
+            return [
+                (await backend.create(f't{i}', '0xagent', 1, 60, ''))['success']
+                for i in range(20)
+            ]
+
+        first = await outcomes(7)
+        self.assertEqual(first, await outcomes(7))
+        self.assertIn(True, first)
+        self.assertIn(False, first)
+
+    async def test_finality_latency_overlaps(self) -> None:
+        chain = FakeChain(finality_latency=0.05)
+        chain.fund('0xhost', 100)
+        backend = chain.backend('0xhost')
+        started = asyncio.get_running_loop().time()
+        await asyncio.gather(
+            *(backend.create(f't{i}', '0xagent', 1, 60, '') for i in range(10))
+        )
+        self.assertLess(asyncio.get_running_loop().time() - started, 0.2)
+
+    async def test_events_feed_the_indexer(self) -> None:
+        created = await self.host.create('t1', '0xagent', 300, 60, 'ride')
+        await self.agent.complete('0xhost', created['task_ref'])
+        indexer = ChainEventIndexer(TaskEventIndex(), self.chain.event_source())
+        self.assertEqual(await indexer.sync(), 2)
+        task = indexer.index.get_task_by_tx(created['tx_hash'])
+        self.assertEqual(task['status'], 'completed')
+
+    async def test_get_task_by_tx_follows_the_chain(self) -> None:
+        self.assertTrue(await self.agent.available())
+        created = await self.host.create('t1', '0xagent', 300, 60, 'ride')
+        receipt = await self.agent.get_transaction(created['tx_hash'])
+        self.assertTrue(receipt['success'])
+        task = await self.agent.get_task_by_tx(created['tx_hash'])
+        self.assertEqual(task['status'], 'open')
+
+        await self.agent.complete('0xhost', created['task_ref'])
+        task = await self.agent.get_task_by_tx(created['tx_hash'])
+        self.assertEqual(task['status'], 'completed')
+        self.assertIsNone(await self.agent.get_task_by_tx('0xmissing'))
+
+    def test_signatures(self) -> None:
+        signature = self.host.sign('hello')
+        self.assertTrue(self.agent.verify('hello', signature, '0xhost'))
+        self.assertFalse(self.agent.verify('hello', signature, '0xagent'))
+
+    def test_backends_implement_protocol(self) -> None:
+        self.assertIsInstance(self.host, EscrowBackend)
+        task_manager = SimpleNamespace(config=SimpleNamespace(address='0x1'))
+        self.assertIsInstance(
+            SUIEscrowBackend(task_manager, None), EscrowBackend
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
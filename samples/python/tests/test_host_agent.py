@@ -0,0 +1,208 @@
+import asyncio
+import os
+import unittest
+
+from types import SimpleNamespace
+from unittest import mock
+
+from common.escrow_backend import SUIEscrowBackend
+from common.fake_chain import FakeChain, FakeChainBackend
+from common.server import InMemoryTaskManager
+from common.types import (
+    AgentCapabilities,
+    AgentCard,
+    Message,
+    SendTaskRequest,
+    SendTaskResponse,
+    Task,
+    TaskState,
+    TaskStatus,
+)
+from hosts.multiagent.host_agent import HostAgent
+
+
+HOST = '0xhost'
+AGENT = '0xagent'
+
+
+class StubConnection:
+    """A remote agent that completes every task, after an optional delay."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.requests = []
+
+    async def send_task(self, request, task_callback):
+        self.requests.append(request)
+        await asyncio.sleep(self.delay)
+        return Task(
+            id=request.id,
+            sessionId=request.sessionId,
+            status=TaskStatus(state=TaskState.COMPLETED),
+        )
+
+
+class EchoTaskManager(InMemoryTaskManager):
+    """Replies with the text it was sent, de-duplicating sends."""
+
+    async def on_send_task(self, request: SendTaskRequest) -> SendTaskResponse:
+        return await self.send_task_once(request, self._send_task)
+
+    async def _send_task(self, request: SendTaskRequest) -> SendTaskResponse:
+        await self.upsert_task(request.params)
+        reply = Message(role='agent', parts=request.params.message.parts)
+        task = await self.update_store(
+            request.params.id,
+            TaskStatus(state=TaskState.COMPLETED, message=reply),
+            [],
+        )
+        return SendTaskResponse(id=request.id, result=task)
+
+    async def on_send_task_subscribe(self, request):
+        raise NotImplementedError
+
+
+class TaskManagerConnection(StubConnection):
+    """Sends tasks to a task manager in the same process."""
+
+    def __init__(self, task_manager: InMemoryTaskManager):
+        super().__init__()
+        self.task_manager = task_manager
+
+    async def send_task(self, request, task_callback):
+        self.requests.append(request)
+        response = await self.task_manager.on_send_task(
+            SendTaskRequest(params=request)
+        )
+        return response.result
+
+
+class UnavailableBackend(FakeChainBackend):
+    async def available(self) -> bool:
+        return False
+
+
+def tool_context(session_id: str = 'session-1') -> SimpleNamespace:
+    return SimpleNamespace(
+        state={'session_id': session_id},
+        actions=SimpleNamespace(skip_summarization=False, escalate=False),
+    )
+
+
+class HostAgentEscrowTest(unittest.IsolatedAsyncioTestCase):
+    """Tests for escrows and signatures going through the EscrowBackend."""
+
+    def setUp(self) -> None:
+        self.chain = FakeChain()
+        self.chain.fund(HOST, 10**9)
+
+    def make_host(self, backend=None, **agents) -> HostAgent:
+        host = HostAgent([], escrow_backend=backend or self.chain.backend(HOST))
+        for name, connection in agents.items():
+            host.register_agent_card(
+                AgentCard(
+                    name=name,
+                    url='http://agent/',
+                    version='1',
+                    capabilities=AgentCapabilities(),
+                    skills=[],
+                    metadata={'sui_address': AGENT},
+                )
+            )
+            host.remote_agent_connections[name] = connection
+        return host
+
+    async def test_confirm_task_creates_escrow_and_signs(self) -> None:
+        agent = StubConnection()
+        host = self.make_host(agent=agent)
+        response = await host.confirm_task('agent', 'book a ride', tool_context())
+
+        [task] = self.chain.tasks.values()
+        self.assertEqual(task.task_id, 'session-1')
+        self.assertEqual(task.service_agent, AGENT)
+        [request] = agent.requests
+        metadata = request.message.metadata
+        self.assertEqual(
+            metadata['blockchain']['createTask']['tx_hash'],
+            response[-1]['blockchain_confirmation']['createTask'][
+                'transaction_hash'
+            ],
+        )
+        self.assertEqual(metadata['auth']['address'], HOST)
+        self.assertTrue(
+            self.chain.backend(AGENT).verify(
+                f'{HOST}session-1', metadata['auth']['signature'], HOST
+            )
+        )
+
+    async def test_confirm_task_without_backend_sends_plain_task(self) -> None:
+        agent = StubConnection()
+        host = self.make_host(UnavailableBackend(self.chain, HOST), agent=agent)
+        response = await host.confirm_task('agent', 'book a ride', tool_context())
+
+        self.assertEqual(self.chain.tasks, {})
+        self.assertNotIn('blockchain', agent.requests[0].message.metadata)
+        self.assertFalse(
+            any('blockchain_confirmation' in part for part in response)
+        )
+
+    async def test_fan_out_skips_agents_whose_escrow_fails(self) -> None:
+        self.chain.failure_rate = 1.0
+        agent = StubConnection()
+        host = self.make_host(agent=agent)
+        [result] = await host.fan_out_tasks(
+            [{'agent_name': 'agent', 'message': 'book a ride'}],
+            tool_context(),
+            confirm=True,
+        )
+        self.assertEqual(result['state'], TaskState.FAILED)
+        self.assertEqual(result['reason'], 'escrow_failed')
+        self.assertEqual(agent.requests, [])
+
+    async def test_fan_out_reports_timeouts_as_failed(self) -> None:
+        host = self.make_host(slow=StubConnection(delay=1), fast=StubConnection())
+        slow, fast = await host.fan_out_tasks(
+            [
+                {'agent_name': 'slow', 'message': 'a', 'timeout_seconds': 0.01},
+                {'agent_name': 'fast', 'message': 'b'},
+            ],
+            tool_context(),
+            confirm=True,
+        )
+        self.assertEqual(slow['state'], TaskState.FAILED)
+        self.assertEqual(slow['reason'], 'timeout')
+        self.assertEqual(fast['state'], TaskState.COMPLETED)
+        self.assertEqual(len(self.chain.tasks), 2)
+
+    async def test_sends_in_one_turn_are_not_deduplicated(self) -> None:
+        agent = TaskManagerConnection(EchoTaskManager())
+        host = self.make_host(UnavailableBackend(self.chain, HOST), agent=agent)
+        context = tool_context()
+        context.state.update(
+            task_id='task-1', input_message_metadata={'message_id': 'turn-1'}
+        )
+        first = await host.send_task('agent', 'first', context)
+        second = await host.confirm_task('agent', 'second', context)
+
+        self.assertEqual(first, ['first'])
+        self.assertEqual(second, ['second'])
+        first_metadata, second_metadata = (
+            r.message.metadata for r in agent.requests
+        )
+        self.assertNotEqual(
+            first_metadata['message_id'], second_metadata['message_id']
+        )
+        self.assertEqual(first_metadata['parent_message_id'], 'turn-1')
+        self.assertEqual(second_metadata['parent_message_id'], 'turn-1')
+
+    async def test_default_backend_without_key_is_unavailable(self) -> None:
+        with mock.patch.dict(os.environ, {'TASK_AGENT_PRIVATE_KEY': ''}):
+            host = HostAgent([])
+            self.assertIsInstance(host.escrow_backend, SUIEscrowBackend)
+            self.assertIsNone(host.sui_address)
+            self.assertFalse(await host.escrow_backend.available())
+            self.assertIsNone(host.sign_message('hello'))
+
+
+if __name__ == '__main__':
+    unittest.main()
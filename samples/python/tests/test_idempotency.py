@@ -0,0 +1,197 @@
+import asyncio
+import unittest
+
+from unittest import mock
+
+from common.server.task_manager import InMemoryTaskManager
+from common.types import (
+    InternalError,
+    Message,
+    SendTaskRequest,
+    SendTaskResponse,
+    TaskSendParams,
+    TextPart,
+)
+from common.utils.idempotency import IdempotencyCache
+
+
+class SendOnceTaskManager(InMemoryTaskManager):
+    """Counts how often the wrapped send handler actually runs."""
+
+    def __init__(self):
+        super().__init__(dedup_max_entries=8, dedup_ttl=60)
+        self.calls = 0
+        self.fail = False
+        self.release = asyncio.Event()
+
+    async def on_send_task(self, request: SendTaskRequest) -> SendTaskResponse:
+        return await self.send_task_once(request, self._send_task)
+
+    async def _send_task(self, request: SendTaskRequest) -> SendTaskResponse:
+        self.calls += 1
+        await self.release.wait()
+        if self.fail:
+            return SendTaskResponse(id=request.id, error=InternalError())
+        task = await self.upsert_task(request.params)
+        return SendTaskResponse(id=request.id, result=task)
+
+    async def on_send_task_subscribe(self, request):
+        raise NotImplementedError
+
+
+def make_request(request_id: int, message_id: str | None) -> SendTaskRequest:
+    metadata = {'message_id': message_id} if message_id else None
+    return SendTaskRequest(
+        id=request_id,
+        params=TaskSendParams(
+            id='task-1',
+            sessionId='session-1',
+            message=Message(
+                role='user', parts=[TextPart(text='hi')], metadata=metadata
+            ),
+        ),
+    )
+
+
+class IdempotencyCacheTest(unittest.IsolatedAsyncioTestCase):
+    """Tests for the keyed single-flight result cache."""
+
+    async def test_concurrent_callers_share_one_run(self) -> None:
+        cache = IdempotencyCache()
+        calls = 0
+        release = asyncio.Event()
+
+        async def operation():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return 'done'
+
+        callers = [
+            asyncio.create_task(cache.run('key', operation)) for _ in range(5)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        self.assertEqual(await asyncio.gather(*callers), ['done'] * 5)
+        self.assertEqual(calls, 1)
+        self.assertEqual(await cache.run('key', operation), 'done')
+        self.assertEqual(calls, 1)
+
+    async def test_failures_are_not_cached(self) -> None:
+        cache = IdempotencyCache()
+        attempts = []
+
+        async def operation():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RuntimeError('boom')
+            return 'ok'
+
+        with self.assertRaises(RuntimeError):
+            await cache.run('key', operation)
+        self.assertNotIn('key', cache)
+        self.assertEqual(await cache.run('key', operation), 'ok')
+        self.assertEqual(len(attempts), 2)
+
+    async def test_cancelled_run_is_retried_by_joined_callers(self) -> None:
+        cache = IdempotencyCache()
+        calls = 0
+        release = asyncio.Event()
+
+        async def operation():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return calls
+
+        first = asyncio.create_task(cache.run('key', operation))
+        await asyncio.sleep(0)
+        joined = [
+            asyncio.create_task(cache.run('key', operation)) for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        self.assertEqual(await asyncio.gather(*joined), [2, 2, 2])
+        self.assertTrue(first.cancelled())
+        self.assertEqual(calls, 2)
+
+    async def test_cancelled_joined_caller_does_not_retry(self) -> None:
+        cache = IdempotencyCache()
+        release = asyncio.Event()
+
+        async def operation():
+            await release.wait()
+            return 'done'
+
+        first = asyncio.create_task(cache.run('key', operation))
+        await asyncio.sleep(0)
+        joined = asyncio.create_task(cache.run('key', operation))
+        await asyncio.sleep(0)
+        joined.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await joined
+        release.set()
+        self.assertEqual(await first, 'done')
+
+    async def test_ttl_and_size_bound(self) -> None:
+        cache = IdempotencyCache(max_entries=2, ttl=10)
+
+        async def value(v):
+            return v
+
+        with mock.patch('time.monotonic', return_value=100.0):
+            for key in 'abc':
+                await cache.run(key, lambda k=key: value(k))
+            self.assertEqual(len(cache), 2)
+            self.assertNotIn('a', cache)
+        with mock.patch('time.monotonic', return_value=200.0):
+            self.assertNotIn('b', cache)
+            self.assertEqual(await cache.run('b', lambda: value('new')), 'new')
+
+
+class SendTaskOnceTest(unittest.IsolatedAsyncioTestCase):
+    """Tests for tasks/send de-duplication in InMemoryTaskManager."""
+
+    async def asyncSetUp(self) -> None:
+        self.manager = SendOnceTaskManager()
+
+    async def test_duplicate_send_reuses_response(self) -> None:
+        first = asyncio.create_task(
+            self.manager.on_send_task(make_request(1, 'm-1'))
+        )
+        second = asyncio.create_task(
+            self.manager.on_send_task(make_request(2, 'm-1'))
+        )
+        await asyncio.sleep(0)
+        self.manager.release.set()
+        first, second = await asyncio.gather(first, second)
+        third = await self.manager.on_send_task(make_request(3, 'm-1'))
+
+        self.assertEqual(self.manager.calls, 1)
+        self.assertEqual([first.id, second.id, third.id], [1, 2, 3])
+        self.assertEqual(third.result.id, 'task-1')
+        self.assertEqual(len(self.manager.tasks['task-1'].history), 1)
+
+    async def test_new_message_or_no_message_id_runs_again(self) -> None:
+        self.manager.release.set()
+        await self.manager.on_send_task(make_request(1, 'm-1'))
+        await self.manager.on_send_task(make_request(2, 'm-2'))
+        await self.manager.on_send_task(make_request(3, None))
+        await self.manager.on_send_task(make_request(4, None))
+        self.assertEqual(self.manager.calls, 4)
+
+    async def test_error_response_is_retried(self) -> None:
+        self.manager.release.set()
+        self.manager.fail = True
+        response = await self.manager.on_send_task(make_request(1, 'm-1'))
+        self.assertIsNotNone(response.error)
+        self.manager.fail = False
+        response = await self.manager.on_send_task(make_request(2, 'm-1'))
+        self.assertIsNone(response.error)
+        self.assertEqual(self.manager.calls, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+import io
+import json
+import logging
+import os
+import tempfile
+import threading
+import unittest
+
+from common.utils.log_pipeline import (
+    LogPipeline,
+    SamplingFilter,
+    parse_levels,
+    parse_rates,
+    set_levels,
+)
+
+
+class LogPipelineTest(unittest.TestCase):
+    """Tests for logging through a background queue."""
+
+    def setUp(self) -> None:
+        root = logging.getLogger()
+        self.saved_handlers = list(root.handlers)
+        self.saved_level = root.level
+        self.stream = io.StringIO()
+        self.logger = logging.getLogger('test_log_pipeline')
+        self.logger.setLevel(logging.NOTSET)
+
+    def tearDown(self) -> None:
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        for handler in self.saved_handlers:
+            root.addHandler(handler)
+        root.setLevel(self.saved_level)
+        self.logger.setLevel(logging.NOTSET)
+
+    def start(self, **kwargs) -> LogPipeline:
+        pipeline = LogPipeline(stream=self.stream, **kwargs).start()
+        self.addCleanup(pipeline.stop)
+        return pipeline
+
+    def test_records_are_written_by_the_listener(self) -> None:
+        pipeline = self.start()
+        self.logger.info('Task %s done', 't1')
+        self.logger.debug('Not shown')
+        pipeline.stop()
+        output = self.stream.getvalue()
+        self.assertIn('INFO test_log_pipeline: Task t1 done', output)
+        self.assertNotIn('Not shown', output)
+        self.assertEqual(logging.getLogger().handlers, [])
+
+    def test_arguments_are_formatted_off_the_calling_thread(self) -> None:
+        formatted_on = []
+
+        class Value:
+            def __str__(self):
+                formatted_on.append(threading.current_thread())
+                return 'value'
+
+        pipeline = self.start()
+        self.logger.info('Got %s', Value())
+        pipeline.stop()
+        self.assertEqual(len(formatted_on), 1)
+        self.assertIsNot(formatted_on[0], threading.current_thread())
+        self.assertIn('Got value', self.stream.getvalue())
+
+    def test_json_output_includes_extra(self) -> None:
+        pipeline = self.start(json_output=True)
+        self.logger.warning('Task update', extra={'task_id': 't1'})
+        pipeline.stop()
+        entry = json.loads(self.stream.getvalue())
+        self.assertEqual(entry['level'], 'WARNING')
+        self.assertEqual(entry['logger'], 'test_log_pipeline')
+        self.assertEqual(entry['message'], 'Task update')
+        self.assertEqual(entry['task_id'], 't1')
+
+    def test_full_queue_drops_records_and_reports_them(self) -> None:
+        pipeline = LogPipeline(stream=self.stream, queue_size=2)
+        # Not started, so nothing drains the queue.
+        for i in range(5):
+            pipeline.handler.handle(
+                self.logger.makeRecord(
+                    self.logger.name, logging.INFO, '', 0, 'r%d', (i,), None
+                )
+            )
+        self.assertEqual(pipeline.dropped, 3)
+        pipeline.queue.get_nowait()
+        pipeline.queue.get_nowait()
+        pipeline.handler.handle(
+            self.logger.makeRecord(
+                self.logger.name, logging.INFO, '', 0, 'r5', (), None
+            )
+        )
+        warning = pipeline.queue.get_nowait()
+        self.assertEqual(warning.getMessage(), 'Dropped 3 log records: queue full')
+        self.assertEqual(pipeline.queue.get_nowait().getMessage(), 'r5')
+        self.assertEqual(pipeline.dropped, 0)
+
+    def test_levels_are_reloaded_from_file(self) -> None:
+        with tempfile.NamedTemporaryFile('w', delete=False) as f:
+            f.write('test_log_pipeline=DEBUG\n')
+        self.addCleanup(os.remove, f.name)
+        pipeline = self.start(levels={'test_log_pipeline': logging.ERROR})
+        self.assertEqual(self.logger.level, logging.ERROR)
+        pipeline.levels_file = f.name
+        pipeline.reload_levels()
+        self.assertEqual(self.logger.level, logging.DEBUG)
+
+
+class LevelsTest(unittest.TestCase):
+    """Tests for level and rate specs."""
+
+    def tearDown(self) -> None:
+        logging.getLogger('test_log_pipeline').setLevel(logging.NOTSET)
+
+    def test_parse_levels(self) -> None:
+        self.assertEqual(
+            parse_levels('info, common.server=DEBUG,httpx=ERROR'),
+            {'': logging.INFO, 'common.server': logging.DEBUG, 'httpx': 40},
+        )
+        with self.assertRaises(ValueError):
+            parse_levels('httpx=LOUD')
+
+    def test_set_levels(self) -> None:
+        set_levels({'test_log_pipeline': logging.WARNING})
+        self.assertEqual(
+            logging.getLogger('test_log_pipeline').level, logging.WARNING
+        )
+
+    def test_parse_rates(self) -> None:
+        self.assertEqual(parse_rates('a.b=0.1, c=1'), {'a.b': 0.1, 'c': 1.0})
+
+
+class SamplingFilterTest(unittest.TestCase):
+    """Tests for sampling high-volume loggers."""
+
+    def record(self, name: str, level: int = logging.INFO) -> logging.LogRecord:
+        return logging.LogRecord(name, level, '', 0, 'msg', None, None)
+
+    def test_keeps_one_in_n_of_sampled_loggers_and_children(self) -> None:
+        sampler = SamplingFilter({'host.task_updates': 0.25})
+        kept = [
+            sampler.filter(self.record('host.task_updates.t1'))
+            for _ in range(8)
+        ]
+        self.assertEqual(kept, [True, False, False, False] * 2)
+        self.assertTrue(
+            all(sampler.filter(self.record('host')) for _ in range(4))
+        )
+
+    def test_warnings_are_always_kept(self) -> None:
+        sampler = SamplingFilter({'host': 0})
+        self.assertTrue(sampler.filter(self.record('host')))
+        self.assertFalse(sampler.filter(self.record('host')))
+        self.assertTrue(sampler.filter(self.record('host', logging.ERROR)))
+
+
+if __name__ == '__main__':
+    unittest.main()
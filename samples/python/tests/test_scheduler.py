@@ -0,0 +1,84 @@
+import asyncio
+import unittest
+
+from common.server.scheduler import PriorityScheduler, classify_task
+from common.types import Task, TaskState, TaskStatus
+
+
+class ClassifyTaskTest(unittest.TestCase):
+    def test_lanes(self) -> None:
+        waiting = Task(
+            id='task-1', status=TaskStatus(state=TaskState.INPUT_REQUIRED)
+        )
+        done = Task(id='task-1', status=TaskStatus(state=TaskState.COMPLETED))
+
+        self.assertEqual(classify_task(), 'free')
+        self.assertEqual(classify_task(escrow_verified=True), 'paid')
+        self.assertEqual(classify_task(waiting), 'follow_up')
+        self.assertEqual(classify_task(waiting, True), 'follow_up')
+        self.assertEqual(classify_task(done, True), 'paid')
+        self.assertEqual(classify_task(done), 'free')
+
+
+class PrioritySchedulerTest(unittest.IsolatedAsyncioTestCase):
+    """Tests for weighted fair slot allocation."""
+
+    async def run_backlog(
+        self, scheduler: PriorityScheduler, lanes: list[str]
+    ) -> list[str]:
+        order = []
+        gate = asyncio.Event()
+
+        async def job(lane: str):
+            async with scheduler.slot(lane):
+                await gate.wait()
+                order.append(lane)
+
+        # Occupy the only slot so every job below queues up first.
+        blocker = asyncio.create_task(job('free'))
+        await asyncio.sleep(0)
+        jobs = [asyncio.create_task(job(lane)) for lane in lanes]
+        await asyncio.sleep(0)
+        gate.set()
+        await asyncio.gather(blocker, *jobs)
+        return order[1:]
+
+    async def test_weighted_share(self) -> None:
+        scheduler = PriorityScheduler({'paid': 3, 'free': 1}, max_concurrency=1)
+        order = await self.run_backlog(scheduler, ['free'] * 4 + ['paid'] * 6)
+        # While both lanes are backlogged, paid gets three slots per free one.
+        self.assertEqual(order[:4].count('paid'), 3)
+        self.assertEqual(order[:8].count('paid'), 6)
+        stats = scheduler.stats()
+        self.assertEqual(stats['lanes']['paid']['completed'], 6)
+        self.assertEqual(stats['running'], 0)
+        self.assertGreater(stats['lanes']['free']['wait_max'], 0)
+
+    async def test_starving_lane_is_aged(self) -> None:
+        scheduler = PriorityScheduler(
+            {'paid': 100, 'free': 1}, max_concurrency=1, max_wait=0
+        )
+        order = await self.run_backlog(scheduler, ['free'] + ['paid'] * 3)
+        # With no wait allowed, jobs run in arrival order.
+        self.assertEqual(order, ['free', 'paid', 'paid', 'paid'])
+        self.assertGreater(scheduler.stats()['lanes']['free']['aged'], 0)
+
+    async def test_cancelled_waiter_frees_its_place(self) -> None:
+        scheduler = PriorityScheduler(max_concurrency=1)
+        async with scheduler.slot('paid'):
+            waiter = asyncio.create_task(
+                scheduler.slot('free').__aenter__()
+            )
+            await asyncio.sleep(0)
+            self.assertEqual(scheduler.queued, 1)
+            waiter.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await waiter
+            self.assertEqual(scheduler.queued, 0)
+        self.assertEqual(scheduler.running, 0)
+        async with scheduler.slot('free'):
+            self.assertEqual(scheduler.running, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+
+from starlette.testclient import TestClient
+
+from common.server import A2AServer, InMemoryTaskManager
+from common.types import (
+    AgentCapabilities,
+    AgentCard,
+    SendTaskRequest,
+    SendTaskResponse,
+    TaskNotFoundError,
+)
+
+
+class EchoTaskManager(InMemoryTaskManager):
+    async def on_send_task(self, request: SendTaskRequest) -> SendTaskResponse:
+        task = await self.upsert_task(request.params)
+        return SendTaskResponse(id=request.id, result=task)
+
+    async def on_send_task_subscribe(self, request):
+        raise NotImplementedError
+
+
+def send_payload(request_id: int) -> dict:
+    return {
+        'jsonrpc': '2.0',
+        'id': request_id,
+        'method': 'tasks/send',
+        'params': {
+            'id': f'task-{request_id}',
+            'message': {'role': 'user', 'parts': [{'type': 'text', 'text': 'hi'}]},
+        },
+    }
+
+
+def make_server() -> A2AServer:
+    card = AgentCard(
+        name='echo',
+        url='http://localhost/',
+        version='1.0.0',
+        capabilities=AgentCapabilities(),
+        skills=[],
+    )
+    return A2AServer(agent_card=card)
+
+
+class StartupTaskTest(unittest.TestCase):
+    """Tests for deferred startup and the health endpoints."""
+
+    def test_ready_after_startup_tasks(self) -> None:
+        server = make_server()
+        server.add_startup_task(
+            'agent', lambda: setattr(server, 'task_manager', EchoTaskManager())
+        )
+        client = TestClient(server.app)
+
+        self.assertEqual(client.get('/health/live').status_code, 200)
+        self.assertEqual(client.get('/health/ready').status_code, 503)
+        response = client.post('/', json=send_payload(1))
+        self.assertEqual(response.json()['error']['data']['reason'], 'not_ready')
+        self.assertEqual(response.headers['Retry-After'], '1')
+
+        self.assertTrue(server.run_startup_tasks())
+        ready = client.get('/health/ready')
+        self.assertEqual(ready.status_code, 200)
+        self.assertEqual(ready.json()['startup'], {'agent': 'done'})
+        response = client.post('/', json=send_payload(2))
+        self.assertEqual(response.json()['result']['id'], 'task-2')
+
+    def test_only_new_tasks_wait_for_startup(self) -> None:
+        server = make_server()
+        server.task_manager = EchoTaskManager()
+        server.add_startup_task('chain', lambda: None)
+        client = TestClient(server.app)
+
+        response = client.post('/', json=send_payload(1))
+        self.assertEqual(response.json()['error']['data']['reason'], 'not_ready')
+        response = client.post(
+            '/',
+            json={
+                'jsonrpc': '2.0',
+                'id': 2,
+                'method': 'tasks/get',
+                'params': {'id': 'task-1'},
+            },
+        )
+        # Answered by the task manager rather than rejected
+        self.assertEqual(
+            response.json()['error']['code'], TaskNotFoundError().code
+        )
+
+    def test_failed_startup_task_is_reported(self) -> None:
+        server = make_server()
+
+        def fail():
+            raise RuntimeError('no key')
+
+        server.add_startup_task('chain', fail)
+        self.assertFalse(server.run_startup_tasks())
+        ready = TestClient(server.app).get('/health/ready')
+        self.assertEqual(ready.status_code, 503)
+        self.assertEqual(ready.json()['startup'], {'chain': 'failed: no key'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+
+from common.types import AgentCapabilities, AgentCard, AgentSkill
+from hosts.multiagent.skill_router import SkillRouter, tokenize
+
+
+def make_card(name: str, description: str, tags: list[str]) -> AgentCard:
+    return AgentCard(
+        name=name,
+        description=description,
+        url='http://localhost:10000/',
+        version='1.0.0',
+        capabilities=AgentCapabilities(),
+        skills=[
+            AgentSkill(
+                id=name.lower().replace(' ', '_'),
+                name=f'{name} Tool',
+                description=description,
+                tags=tags,
+            )
+        ],
+    )
+
+
+class SkillRouterTest(unittest.TestCase):
+    """Tests for the BM25 skill routing index."""
+
+    def setUp(self) -> None:
+        self.router = SkillRouter()
+        self.router.add_card(
+            make_card(
+                'Food Ordering Agent',
+                'Order food delivery and book restaurant reservations.',
+                ['restaurant', 'delivery', 'pizza'],
+            )
+        )
+        self.router.add_card(
+            make_card(
+                'Uber Agent',
+                'Request rides, estimate fares and find nearby drivers.',
+                ['ride', 'driver', 'fare'],
+            )
+        )
+        self.router.add_card(
+            make_card(
+                'Hotel Agent',
+                'Search and book hotel rooms.',
+                ['hotel', 'room', 'booking'],
+            )
+        )
+
+    def test_top_k_ranks_matching_agent_first(self) -> None:
+        """The agent whose skills match the query should rank first."""
+        self.assertEqual(
+            self.router.top_k('I need a ride to the airport', 1),
+            ['Uber Agent'],
+        )
+        self.assertEqual(
+            self.router.top_k('order a pizza for delivery', 1),
+            ['Food Ordering Agent'],
+        )
+
+    def test_top_k_without_match_is_empty(self) -> None:
+        """A query sharing no terms with any card should match nothing."""
+        self.assertEqual(self.router.top_k('quantum chromodynamics', 3), [])
+
+    def test_add_card_replaces_existing_card(self) -> None:
+        """Re-registering a card should replace its previous postings."""
+        self.router.add_card(
+            make_card('Uber Agent', 'Deliver parcels.', ['parcel'])
+        )
+        self.assertEqual(len(self.router), 3)
+        self.assertEqual(self.router.top_k('ride with a driver', 3), [])
+        self.assertEqual(self.router.top_k('parcel', 3), ['Uber Agent'])
+
+    def test_remove(self) -> None:
+        """Removed cards should no longer be returned."""
+        self.router.remove('Hotel Agent')
+        self.assertNotIn('Hotel Agent', self.router)
+        self.assertEqual(self.router.top_k('hotel room', 3), [])
+
+    def test_tokenize_cjk_bigrams(self) -> None:
+        """CJK text should be split into character bigrams."""
+        self.assertEqual(tokenize('订餐 pizza'), ['pizza', '订餐'])
+        self.assertEqual(tokenize('我想订餐'), ['我想', '想订', '订餐'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import asyncio
+import itertools
+import unittest
+
+from types import SimpleNamespace
+from unittest import mock
+
+from common.sui_blockchain import SUITaskManager
+from common.sui_gas_pool import (
+    GAS_BUDGET,
+    GasCoin,
+    GasPoolExhausted,
+    SUIGasPool,
+)
+
+
+class InMemoryGasPool(SUIGasPool):
+    """A gas pool whose wallet lives in memory instead of on chain."""
+
+    def __init__(self, balances: list[int], **kwargs):
+        config = SimpleNamespace(address='0x1', network='testnet', private_key='')
+        super().__init__(config, rebalance_interval=0, **kwargs)
+        self._ids = itertools.count()
+        self.chain = {}
+        self.fetches = 0
+        for balance in balances:
+            self._mint(balance)
+
+    def _mint(self, balance: int):
+        object_id = f'0x{next(self._ids)}'
+        self.chain[object_id] = GasCoin(object_id, '1', 'd', balance)
+
+    async def _fetch_coins(self):
+        self.fetches += 1
+        await asyncio.sleep(0)
+        return [
+            GasCoin(c.object_id, c.version, c.digest, c.balance)
+            for c in self.chain.values()
+        ]
+
+    async def _split_coin(self, coin, amounts):
+        self.chain[coin.object_id].balance -= sum(amounts) + GAS_BUDGET
+        for amount in amounts:
+            self._mint(amount)
+
+    async def _merge_coins(self, primary, coins):
+        for coin in coins:
+            self.chain[primary.object_id].balance += (
+                self.chain.pop(coin.object_id).balance
+            )
+        self.chain[primary.object_id].balance -= GAS_BUDGET
+
+
+class SUIGasPoolTest(unittest.IsolatedAsyncioTestCase):
+    """Tests for gas coin leasing and pool maintenance."""
+
+    async def test_start_splits_wallet_into_pool(self) -> None:
+        pool = InMemoryGasPool([10 * 10**9], pool_size=4, coin_balance=10**9)
+        await pool.start()
+        self.assertEqual(len(pool.free_coins), 4)
+        self.assertEqual(
+            sorted(c.balance for c in pool.free_coins)[:3], [10**9] * 3
+        )
+
+    async def test_concurrent_leases_get_distinct_coins(self) -> None:
+        pool = InMemoryGasPool([10**9] * 3, pool_size=3)
+        await pool.start()
+        leased = []
+        release = asyncio.Event()
+
+        async def use():
+            async with pool.lease(10**8) as coin:
+                leased.append(coin.object_id)
+                await release.wait()
+
+        users = [asyncio.create_task(use()) for _ in range(4)]
+        await asyncio.sleep(0.01)
+        # Three coins are in flight; the fourth user waits for a return.
+        self.assertEqual(len(set(leased)), 3)
+        self.assertEqual(pool.stats()['leased'], 3)
+        release.set()
+        await asyncio.gather(*users)
+        self.assertEqual(len(leased), 4)
+        self.assertEqual(pool.stats()['free'], 3)
+
+    async def test_lease_tracks_version_locally(self) -> None:
+        pool = InMemoryGasPool([10**9], pool_size=1)
+        async with pool.lease(10**8) as coin:
+            coin.update({'version': '7', 'digest': 'x'}, coin.balance - 10**8)
+        (free,) = pool.free_coins
+        self.assertEqual((free.version, free.balance), ('7', 9 * 10**8))
+
+    async def test_stale_coin_is_reloaded_from_chain(self) -> None:
+        pool = InMemoryGasPool([10**9], pool_size=1)
+        async with pool.lease(10**8) as coin:
+            coin.stale = True
+        self.assertEqual(pool.free_coins, [])
+        async with pool.lease(10**8) as coin:
+            self.assertEqual(coin.version, '1')
+
+    async def test_rebalance_merges_dust(self) -> None:
+        pool = InMemoryGasPool([10**9, GAS_BUDGET, GAS_BUDGET], pool_size=1)
+        await pool.rebalance()
+        (coin,) = pool.free_coins
+        self.assertEqual(coin.balance, 10**9 + GAS_BUDGET)
+
+    async def test_reserved_skips_coins_leased_meanwhile(self) -> None:
+        pool = InMemoryGasPool([10**9, 10**9], pool_size=2)
+        await pool.refresh()
+        coins = pool.free_coins
+        async with pool.lease(10**8) as leased:
+            async with pool._reserved(coins) as reserved:
+                self.assertNotIn(leased.object_id, reserved)
+                self.assertEqual(len(reserved), 1)
+            self.assertEqual(pool.stats()['leased'], 1)
+
+    async def test_rebalance_does_not_merge_into_leased_coin(self) -> None:
+        pool = InMemoryGasPool([10**9, GAS_BUDGET, GAS_BUDGET], pool_size=1)
+        reserve = pool._reserved
+
+        def lease_then_reserve(coins):
+            # A transaction takes the primary coin between refresh and merge
+            primary = coins[0]
+            pool._leased[primary.object_id] = pool._free.pop(primary.object_id)
+            return reserve(coins)
+
+        with mock.patch.object(pool, '_reserved', lease_then_reserve):
+            with mock.patch.object(pool, '_merge_coins') as merge:
+                await pool.rebalance()
+        merge.assert_not_called()
+
+    async def test_no_coin_large_enough(self) -> None:
+        pool = InMemoryGasPool([10**8], pool_size=1)
+        with self.assertRaises(GasPoolExhausted):
+            async with pool.lease(10**9):
+                pass
+
+    async def test_concurrent_refreshes_share_one_fetch(self) -> None:
+        pool = InMemoryGasPool([10**9], pool_size=1)
+        await asyncio.gather(*(pool.refresh() for _ in range(5)))
+        # The first fetch and one shared by the four that waited for it
+        self.assertEqual(pool.fetches, 2)
+
+    async def test_exhausted_pool_does_not_submit(self) -> None:
+        pool = InMemoryGasPool([10**8], pool_size=1)
+        task_manager = SUITaskManager(pool.config, gas_pool=pool)
+        with mock.patch('common.sui_blockchain.sui_call') as sui_call:
+            created = await task_manager.create_task('t1', '0x2', 10**9, 60, '')
+            cancelled = await task_manager.cancel_tasks(['0x3'] * 10)
+        self.assertFalse(created['success'])
+        self.assertIn('Gas pool exhausted', created['error'])
+        self.assertFalse(cancelled['success'])
+        sui_call.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
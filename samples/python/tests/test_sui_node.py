@@ -0,0 +1,62 @@
+import asyncio
+import os
+import shutil
+import unittest
+
+from unittest import mock
+
+from common.sui_node import SUINodeError, SUINodeWorker
+
+
+SCRIPT = os.path.join(os.path.dirname(__file__), 'fixtures', 'echo_ops.js')
+
+
+@unittest.skipUnless(shutil.which('node'), 'node is not installed')
+class SUINodeWorkerTest(unittest.IsolatedAsyncioTestCase):
+    """Tests for the long-running Node operation worker."""
+
+    def setUp(self) -> None:
+        self.worker = SUINodeWorker(script=SCRIPT)
+        self.addCleanup(self.worker.close)
+
+    async def test_arguments_are_passed_as_data(self) -> None:
+        args = {'description': 'say "hi" `${process.exit(1)}`\n', 'amount': '1'}
+        self.assertEqual(await self.worker.call('echo', args), args)
+
+    async def test_one_process_serves_concurrent_calls(self) -> None:
+        results = await asyncio.gather(
+            self.worker.call('sleep', {'ms': 50}),
+            self.worker.call('echo', {'n': 1}),
+            *(self.worker.call('pid', {}) for _ in range(5)),
+        )
+        self.assertEqual(results[:2], [{'slept': 50}, {'n': 1}])
+        self.assertEqual(len({r['pid'] for r in results[2:]}), 1)
+        self.assertEqual(self.worker.stats()['pending'], 0)
+
+    async def test_errors_and_timeouts(self) -> None:
+        with self.assertRaisesRegex(SUINodeError, 'boom'):
+            await self.worker.call('fail', {'message': 'boom'})
+        with self.assertRaises(TimeoutError):
+            await self.worker.call('sleep', {'ms': 500}, timeout=0.05)
+
+    async def test_worker_restarts_after_exit(self) -> None:
+        first = await self.worker.call('pid', {})
+        with self.assertRaises(SUINodeError):
+            await self.worker.call('crash', {})
+        second = await self.worker.call('pid', {})
+        self.assertNotEqual(first, second)
+        self.assertEqual(self.worker.stats()['restarts'], 1)
+
+    def test_sync_call(self) -> None:
+        self.assertEqual(self.worker.call_sync('echo', {'a': 1}), {'a': 1})
+
+    def test_protocol_version_mismatch(self) -> None:
+        with mock.patch.dict(os.environ, {'ECHO_OPS_VERSION': '2'}):
+            worker = SUINodeWorker(script=SCRIPT)
+            with self.assertRaisesRegex(SUINodeError, 'version'):
+                worker.call_sync('echo', {})
+            worker.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import json
+import os
+import tempfile
+import unittest
+
+from unittest import mock
+
+from common import sui_wallet
+from common.sui_wallet import BalanceTracker, SUIKeyring, derive_address, key_fingerprint
+
+
+# Test vector from the @mysten/sui Ed25519 keypair tests.
+PRIVATE_KEY = 'suiprivkey1qrwsjvr6gwaxmsvxk4cfun99ra8uwxg3c9pl0nhle7xxpe4s80y05ctazer'
+ADDRESS = '0xa2d14fad60c56049ecf75246a481934691214ce413e6a8ae2fe6834c173a6133'
+
+
+class SUIKeyringTest(unittest.TestCase):
+    """Tests for address derivation and caching."""
+
+    def test_derives_address_in_process(self) -> None:
+        self.assertEqual(derive_address(PRIVATE_KEY), ADDRESS)
+        with self.assertRaises(ValueError):
+            derive_address(PRIVATE_KEY[:-1] + 'q')
+
+    def test_address_is_derived_once(self) -> None:
+        keyring = SUIKeyring()
+        self.assertEqual(keyring.address(PRIVATE_KEY), ADDRESS)
+        self.assertEqual(keyring.address(PRIVATE_KEY), ADDRESS)
+        self.assertEqual(keyring.derivations, 1)
+
+    def test_node_fallback_is_cached_on_disk(self) -> None:
+        path = os.path.join(tempfile.mkdtemp(), 'keyring.json')
+        node = mock.Mock(return_value={'address': '0xabc'})
+        with mock.patch.object(sui_wallet, '_signing_key_class', return_value=None), \
+                mock.patch.object(sui_wallet, 'sui_call_sync', node):
+            self.assertEqual(SUIKeyring(path).address('key'), '0xabc')
+            self.assertEqual(SUIKeyring(path).address('key'), '0xabc')
+        node.assert_called_once()
+
+        # Only the fingerprint and the public address are written.
+        with open(path) as f:
+            self.assertEqual(json.load(f), {key_fingerprint('key'): '0xabc'})
+
+
+class BalanceTrackerTest(unittest.IsolatedAsyncioTestCase):
+    """Tests for the local balance tracker."""
+
+    async def asyncSetUp(self) -> None:
+        self.now = 0.0
+        self.chain_balance = 1000
+        self.fetches = 0
+        self.tracker = BalanceTracker(reconcile_interval=60, clock=lambda: self.now)
+
+    async def fetch(self) -> int:
+        self.fetches += 1
+        return self.chain_balance
+
+    async def test_reads_are_local_until_reconcile(self) -> None:
+        self.assertEqual(await self.tracker.get('0x1', self.fetch), 1000)
+        self.tracker.apply('0x1', -300)
+        self.assertEqual(await self.tracker.get('0x1', self.fetch), 700)
+        self.assertEqual(self.fetches, 1)
+
+        # An external deposit shows up at the next reconcile.
+        self.chain_balance = 900
+        self.now = 61
+        self.assertEqual(await self.tracker.get('0x1', self.fetch), 900)
+        self.assertEqual(self.fetches, 2)
+
+    async def test_refresh_and_invalidate(self) -> None:
+        await self.tracker.get('0x1', self.fetch)
+        await self.tracker.get('0x1', self.fetch, refresh=True)
+        self.tracker.invalidate('0x1')
+        self.assertIsNone(self.tracker.peek('0x1'))
+        await self.tracker.get('0x1', self.fetch)
+        self.assertEqual(self.fetches, 3)
+
+    def test_apply_ignores_unknown_accounts(self) -> None:
+        self.tracker.apply('0x2', -5)
+        self.assertIsNone(self.tracker.peek('0x2'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,212 @@
+import asyncio
+import unittest
+
+from opentelemetry import trace
+from starlette.testclient import TestClient
+
+from common.server import A2AServer, InMemoryTaskManager
+from common.types import (
+    AgentCapabilities,
+    AgentCard,
+    SendTaskRequest,
+    SendTaskResponse,
+)
+from common.utils import telemetry
+
+
+exporter = None
+
+
+def setUpModule() -> None:
+    global exporter
+    exporter = telemetry.in_memory_tracing()
+
+
+def spans(name: str) -> list:
+    return [s for s in exporter.get_finished_spans() if s.name == name]
+
+
+class EchoTaskManager(InMemoryTaskManager):
+    async def on_send_task(self, request: SendTaskRequest) -> SendTaskResponse:
+        with telemetry.span('test.agent'):
+            task = await self.upsert_task(request.params)
+        return SendTaskResponse(id=request.id, result=task)
+
+    async def on_send_task_subscribe(self, request):
+        raise NotImplementedError
+
+
+class MetricsRegistryTest(unittest.TestCase):
+    """Tests for the Prometheus text rendering of metrics."""
+
+    def test_counter_and_histogram_render(self) -> None:
+        registry = telemetry.MetricsRegistry()
+        counter = registry.counter('requests_total', 'Requests.', ('method',))
+        counter.inc(method='tasks/send')
+        counter.inc(2, method='say "hi"')
+        histogram = registry.histogram(
+            'latency_seconds', 'Latency.', buckets=(0.1, 1.0)
+        )
+        for value in (0.05, 0.5, 5):
+            histogram.observe(value)
+
+        self.assertEqual(counter.value(method='tasks/send'), 1)
+        self.assertEqual(histogram.get(), (3, 5.55))
+        self.assertEqual(
+            registry.render().splitlines(),
+            [
+                '# HELP latency_seconds Latency.',
+                '# TYPE latency_seconds histogram',
+                'latency_seconds_bucket{le="0.1"} 1',
+                'latency_seconds_bucket{le="1.0"} 2',
+                'latency_seconds_bucket{le="+Inf"} 3',
+                'latency_seconds_sum 5.55',
+                'latency_seconds_count 3',
+                '# HELP requests_total Requests.',
+                '# TYPE requests_total counter',
+                'requests_total{method="say \\"hi\\""} 2.0',
+                'requests_total{method="tasks/send"} 1.0',
+            ],
+        )
+
+    def test_labels_must_match(self) -> None:
+        registry = telemetry.MetricsRegistry()
+        counter = registry.counter('requests_total', 'Requests.', ('method',))
+        self.assertIs(
+            registry.counter('requests_total', 'Requests.', ('method',)),
+            counter,
+        )
+        with self.assertRaises(ValueError):
+            counter.inc(outcome='ok')
+        with self.assertRaises(ValueError):
+            registry.histogram('requests_total', 'Requests.')
+
+
+class TracingTest(unittest.IsolatedAsyncioTestCase):
+    """Tests for spans and their duration metrics."""
+
+    def setUp(self) -> None:
+        exporter.clear()
+
+    async def test_traced_records_spans_and_errors(self) -> None:
+        @telemetry.traced('test.fail')
+        async def fail():
+            raise RuntimeError('boom')
+
+        errors = telemetry.span_errors.value(span='test.fail')
+        count, _ = telemetry.span_duration.get(span='test.fail')
+        with self.assertRaises(RuntimeError):
+            await fail()
+
+        [span] = spans('test.fail')
+        self.assertEqual(span.status.status_code, trace.StatusCode.ERROR)
+        self.assertEqual(
+            telemetry.span_errors.value(span='test.fail'), errors + 1
+        )
+        self.assertEqual(
+            telemetry.span_duration.get(span='test.fail')[0], count + 1
+        )
+
+    async def test_traced_generator_parents_only_its_own_work(self) -> None:
+        @telemetry.traced('test.stream')
+        async def stream():
+            for i in range(3):
+                with telemetry.span('test.produce'):
+                    await asyncio.sleep(0)
+                yield i
+
+        with telemetry.span('test.caller'):
+            async for _ in stream():
+                with telemetry.span('test.consume'):
+                    pass
+
+        [caller] = spans('test.caller')
+        [stream_span] = spans('test.stream')
+        self.assertEqual(stream_span.parent.span_id, caller.context.span_id)
+        self.assertEqual(stream_span.attributes['a2a.items'], 3)
+        for produce in spans('test.produce'):
+            self.assertEqual(
+                produce.parent.span_id, stream_span.context.span_id
+            )
+        for consume in spans('test.consume'):
+            self.assertEqual(consume.parent.span_id, caller.context.span_id)
+
+    async def test_trace_context_round_trips_through_metadata(self) -> None:
+        self.assertEqual(telemetry.inject_trace({'a': 1}), {'a': 1})
+        self.assertIsNone(telemetry.extract_trace({'a': 1}))
+        with telemetry.span('test.host'):
+            metadata = telemetry.inject_trace({'a': 1})
+        self.assertEqual(metadata['a'], 1)
+        self.assertIn('traceparent', metadata['trace'])
+
+        with telemetry.span(
+            'test.agent', context=telemetry.extract_trace(metadata)
+        ):
+            pass
+        [host] = spans('test.host')
+        [agent] = spans('test.agent')
+        self.assertEqual(agent.context.trace_id, host.context.trace_id)
+        self.assertEqual(agent.parent.span_id, host.context.span_id)
+
+
+class ServerTelemetryTest(unittest.TestCase):
+    """Tests for tracing and metrics in A2AServer."""
+
+    def setUp(self) -> None:
+        exporter.clear()
+        card = AgentCard(
+            name='test',
+            url='http://localhost',
+            version='1',
+            capabilities=AgentCapabilities(),
+            skills=[],
+        )
+        server = A2AServer(agent_card=card, task_manager=EchoTaskManager())
+        self.client = TestClient(server.app)
+
+    def test_dispatch_continues_the_callers_trace(self) -> None:
+        with telemetry.span('test.host'):
+            metadata = telemetry.inject_trace({})
+        ok = telemetry.metrics.counter(
+            'a2a_requests_total', '', ('method', 'outcome')
+        ).value(method='tasks/send', outcome='ok')
+        response = self.client.post(
+            '/',
+            json={
+                'jsonrpc': '2.0',
+                'id': 1,
+                'method': 'tasks/send',
+                'params': {
+                    'id': 'task-1',
+                    'message': {
+                        'role': 'user',
+                        'parts': [{'type': 'text', 'text': 'hi'}],
+                        'metadata': metadata,
+                    },
+                },
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+
+        [host] = spans('test.host')
+        [dispatch] = spans('a2a.server.dispatch')
+        [agent] = spans('test.agent')
+        self.assertEqual(dispatch.parent.span_id, host.context.span_id)
+        self.assertEqual(dispatch.attributes['rpc.method'], 'tasks/send')
+        self.assertEqual(agent.parent.span_id, dispatch.context.span_id)
+
+        metrics = self.client.get('/metrics')
+        self.assertEqual(metrics.status_code, 200)
+        self.assertIn(
+            'a2a_requests_total{method="tasks/send",outcome="ok"} '
+            f'{ok + 1}',
+            metrics.text,
+        )
+        self.assertIn(
+            'a2a_span_duration_seconds_count{span="a2a.server.dispatch"}',
+            metrics.text,
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import asyncio
+import unittest
+
+from common.server.artifact_stream import ArtifactAssembler
+from common.server.token_stream import DeltaCoalescer, TextArtifactStream
+
+
+def delta(text: str) -> dict:
+    return {'is_task_complete': False, 'delta': text}
+
+
+async def paced(items: list, delay: float = 0.0):
+    for item in items:
+        if delay:
+            await asyncio.sleep(delay)
+        yield item
+
+
+async def collect(coalescer: DeltaCoalescer, source) -> list:
+    return [item async for item in coalescer.coalesce(source)]
+
+
+class DeltaCoalescerTest(unittest.TestCase):
+    """Tests for merging token deltas into frames."""
+
+    def test_first_delta_is_not_delayed(self) -> None:
+        items = [delta(t) for t in ['Hel', 'lo', ' wor', 'ld']]
+        frames = asyncio.run(collect(DeltaCoalescer(interval=60), paced(items)))
+        self.assertEqual(frames, [delta('Hel'), delta('lo world')])
+
+    def test_other_items_flush_and_keep_order(self) -> None:
+        update = {'is_task_complete': False, 'updates': 'Working...'}
+        final = {'is_task_complete': True, 'content': 'done'}
+        items = [delta('a'), delta('b'), update, delta('c'), delta('d'), final]
+        frames = asyncio.run(collect(DeltaCoalescer(interval=60), paced(items)))
+        self.assertEqual(
+            frames, [delta('a'), delta('b'), update, delta('cd'), final]
+        )
+
+    def test_buffered_text_is_sent_after_the_interval(self) -> None:
+        async def source():
+            yield delta('a')
+            yield delta('b')
+            # The model stalls, e.g. before a tool call.
+            await asyncio.sleep(0.2)
+            yield {'is_task_complete': True, 'content': 'ab'}
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            received = []
+            async for item in DeltaCoalescer(interval=0.02).coalesce(
+                source()
+            ):
+                received.append((item, loop.time() - start))
+            return received
+
+        received = asyncio.run(run())
+        self.assertEqual(
+            [item for item, _ in received],
+            [delta('a'), delta('b'), {'is_task_complete': True, 'content': 'ab'}],
+        )
+        # 'b' was sent when its interval ended, not with the final response.
+        self.assertLess(received[1][1], 0.15)
+
+    def test_max_chars_sends_at_once(self) -> None:
+        items = [delta('x' * 3) for _ in range(5)]
+        frames = asyncio.run(
+            collect(DeltaCoalescer(interval=60, max_chars=6), paced(items))
+        )
+        self.assertEqual(
+            [f['delta'] for f in frames], ['xxx', 'xxxxxx', 'xxxxxx']
+        )
+
+
+class TextArtifactStreamTest(unittest.TestCase):
+    """Tests for streaming text as artifact chunks."""
+
+    def test_chunks_reassemble_on_the_host(self) -> None:
+        stream = TextArtifactStream()
+        chunks = [stream.add(t) for t in ['Your ride ', 'is booked']]
+        self.assertTrue(stream.extends('Your ride is booked.'))
+        self.assertFalse(stream.extends('Something else'))
+        last, artifact = stream.close('Your ride is booked.')
+        chunks.append(last)
+        self.assertEqual(
+            [(c.append, c.lastChunk) for c in chunks],
+            [(False, False), (True, False), (True, True)],
+        )
+        self.assertEqual(artifact.parts[0].text, 'Your ride is booked.')
+
+        assembler = ArtifactAssembler()
+        completed = []
+        for chunk in chunks:
+            completed.extend(assembler.add('t1', chunk))
+        [(_, rebuilt)] = completed
+        self.assertEqual(rebuilt.parts, artifact.parts)
+
+    def test_close_without_text_ends_with_an_empty_chunk(self) -> None:
+        stream = TextArtifactStream(index=2)
+        stream.add('Let me check.')
+        last, artifact = stream.close()
+        self.assertEqual(last.parts, [])
+        self.assertEqual(last.index, 2)
+        self.assertEqual(artifact.parts[0].text, 'Let me check.')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Benchmark and guard the import cost of the service agent entry points.
+
+Loads each agent's __main__ module (without running it) under
+`python -X importtime` and reports the total import time, the slowest
+top-level imports, and any deferred module that was imported eagerly. Google
+ADK and the chain SDKs are imported by the agent's startup task after the
+server is listening, so importing them here is a regression.
+
+Exits non-zero if a deferred module is imported or an agent exceeds the
+import budget, so it can run in CI.
+
+Usage:
+    python scripts/bench_agent_startup.py [--agents uber_services ...]
+        [--budget-ms 500] [--runs 3] [--top 10]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+
+SAMPLES = os.path.normpath(
+    os.path.join(os.path.dirname(__file__), '../samples/python')
+)
+AGENTS = ['uber_services', 'travel_services', 'food_ordering_services']
+
+# Modules that must only be imported by deferred startup tasks.
+DEFERRED_MODULES = [
+    'google.adk',
+    'google.genai',
+    'aptos_sdk',
+    'nacl',
+    'opentelemetry',
+    'agent',
+    'task_manager',
+]
+
+LOADER = (
+    'import runpy, sys; '
+    'sys.path[:0] = [sys.argv[1], sys.argv[2]]; '
+    "runpy.run_path(sys.argv[3], run_name='startup_benchmark')"
+)
+
+
+def measure(agent: str) -> dict:
+    """Imports one agent entry point in a fresh interpreter."""
+    agent_dir = os.path.join(SAMPLES, 'agents', agent)
+    result = subprocess.run(
+        [
+            sys.executable, '-X', 'importtime', '-c', LOADER,
+            agent_dir, SAMPLES, os.path.join(agent_dir, '__main__.py'),
+        ],
+        capture_output=True,
+        text=True,
+        cwd=agent_dir,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f'{agent} failed to import:\n{result.stderr}')
+
+    top_level = []
+    modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative_us, name = line.split('|')
+        indent = len(name) - len(name.lstrip())
+        name = name.strip()
+        modules.add(name)
+        if indent == 1:
+            top_level.append((int(cumulative_us), name))
+    return {
+        'total_ms': sum(us for us, _ in top_level) / 1000,
+        'top_level': sorted(top_level, reverse=True),
+        'deferred': sorted(
+            name for name in modules
+            if any(name == m or name.startswith(m + '.') for m in DEFERRED_MODULES)
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--agents', nargs='+', default=AGENTS)
+    parser.add_argument('--budget-ms', type=float, default=500,
+                        help='maximum median import time per agent')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--top', type=int, default=10,
+                        help='number of slowest top-level imports to show')
+    args = parser.parse_args()
+
+    failed = False
+    for agent in args.agents:
+        runs = [measure(agent) for _ in range(args.runs)]
+        median_ms = statistics.median(run['total_ms'] for run in runs)
+        last = runs[-1]
+        print(f'{agent}: {median_ms:.1f} ms median over {args.runs} runs '
+              f'(budget {args.budget_ms:.0f} ms)')
+        for cumulative_us, name in last['top_level'][:args.top]:
+            print(f'  {cumulative_us / 1000:8.1f} ms  {name}')
+        if last['deferred']:
+            failed = True
+            print(f'  FAIL: deferred modules imported at startup: '
+                  f'{", ".join(last["deferred"][:10])}')
+        if median_ms > args.budget_ms:
+            failed = True
+            print('  FAIL: over budget')
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
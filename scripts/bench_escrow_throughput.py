@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""Benchmark confirmed-task throughput from host to agent on a fake chain.
+
+Each task goes through the whole confirmation flow without network access:
+HostAgent.confirm_task locks an escrow and sends tasks/send to the uber
+agent's AgentTaskManager, served by an A2AServer over an in-process ASGI
+transport. The agent validates the escrow from the transaction receipt, does
+the work and completes the escrow to get paid. Only the LLM is replaced, by
+an agent that waits --work seconds. The chain is a common.fake_chain.FakeChain
+with configurable finality latency and failure rate, so runs are repeatable.
+
+Usage:
+    python scripts/bench_escrow_throughput.py [--tasks 200]
+        [--concurrency 1 8 32] [--latency 0.05] [--failure-rate 0.01]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+import uuid
+
+from types import SimpleNamespace
+
+
+# Add project path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../samples/python'))
+
+import httpx
+
+from agents.uber_services.task_manager import (
+    AgentTaskManager,
+    AgentWithTaskManager,
+)
+from common.client import A2AClient
+from common.fake_chain import FakeChain
+from common.server import A2AServer
+from common.server.admission import AdmissionController
+from common.types import AgentCapabilities, AgentCard
+from hosts.multiagent.host_agent import HostAgent
+
+
+HOST = '0xhost'
+AGENT = '0xagent'
+# HostAgent's default SUI_TASK_BOUNTY
+BOUNTY = 10_000_000
+
+
+class BenchAgent(AgentWithTaskManager):
+    """Stands in for the LLM: works for a while, then claims the escrow."""
+
+    SUPPORTED_CONTENT_TYPES = ['text', 'text/plain']
+
+    def __init__(self, chain: FakeChain, work_time: float):
+        self.backend = chain.backend(AGENT)
+        self.work_time = work_time
+
+    def get_processing_message(self) -> str:
+        return 'Working...'
+
+    async def invoke(self, query, session_id) -> str:
+        await asyncio.sleep(self.work_time)
+        # confirm_task uses the session id as the escrow's task id
+        escrow = await self.backend.get_info(HOST, session_id)
+        if 'error' in escrow:
+            return 'done without an escrow'
+        result = await self.backend.complete(HOST, escrow['task_object_id'])
+        if not result['success']:
+            raise RuntimeError(result['error'])
+        return 'done'
+
+
+async def run_host_task(host: HostAgent, agent_name: str) -> tuple[str, float]:
+    started = time.perf_counter()
+    tool_context = SimpleNamespace(
+        state={'session_id': uuid.uuid4().hex},
+        actions=SimpleNamespace(skip_summarization=False, escalate=False),
+    )
+    try:
+        response = await host.confirm_task(
+            agent_name, 'book a ride', tool_context
+        )
+    except Exception:
+        return 'agent_failed', time.perf_counter() - started
+    if not any('blockchain_confirmation' in part for part in response
+               if isinstance(part, dict)):
+        # confirm_task fell back to sending the task without an escrow
+        return 'create_failed', time.perf_counter() - started
+    return 'confirmed', time.perf_counter() - started
+
+
+async def run(args, concurrency: int) -> dict:
+    chain = FakeChain(
+        finality_latency=args.latency,
+        latency_jitter=args.jitter,
+        failure_rate=args.failure_rate,
+        seed=args.seed,
+    )
+    chain.fund(HOST, BOUNTY * args.tasks)
+    task_manager = AgentTaskManager(
+        BenchAgent(chain, args.work),
+        # The uber agent checks for Ed25519 signatures, which the fake chain
+        # does not make.
+        verify_signatures=False,
+        escrow_backend=chain.backend(AGENT),
+    )
+    task_manager.agent_address = AGENT
+    task_manager.scheduler.max_concurrency = max(concurrency, 1)
+    card = AgentCard(
+        name='bench', url='http://agent/', version='1',
+        capabilities=AgentCapabilities(), skills=[],
+        metadata={'sui_address': AGENT},
+    )
+    server = A2AServer(
+        agent_card=card,
+        task_manager=task_manager,
+        admission_controller=AdmissionController(
+            global_rate=1e9, global_burst=1e9, caller_rate=1e9,
+            caller_burst=1e9, max_concurrency=concurrency,
+            max_queue=args.tasks,
+        ),
+    )
+    host = HostAgent([], escrow_backend=chain.backend(HOST))
+    host.register_agent_card(card)
+    host.remote_agent_connections[card.name].agent_client = A2AClient(
+        card, timeout=None, transport=httpx.ASGITransport(app=server.app)
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            return await run_host_task(host, card.name)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(one() for _ in range(args.tasks)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(t for outcome, t in results if outcome == 'confirmed')
+    outcomes = {}
+    for outcome, _ in results:
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    return {
+        'concurrency': concurrency,
+        'confirmed': outcomes.get('confirmed', 0),
+        'failed': args.tasks - outcomes.get('confirmed', 0),
+        'throughput': outcomes.get('confirmed', 0) / elapsed,
+        'p50': statistics.median(latencies) if latencies else 0.0,
+        'p95': latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0,
+        'agent_balance': chain.balances.get(AGENT, 0),
+        'transactions': len(chain.transactions),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--latency', type=float, default=0.05,
+                        help='mean finality latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0.02)
+    parser.add_argument('--failure-rate', type=float, default=0.01)
+    parser.add_argument('--work', type=float, default=0.01,
+                        help='agent work time per task in seconds')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    # Failed tasks are counted in the table rather than logged.
+    logging.disable(logging.ERROR)
+
+    print(
+        f"{'concurrency':>11} {'confirmed':>9} {'failed':>6} {'tasks/s':>8} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'txs':>5}"
+    )
+    for concurrency in args.concurrency:
+        r = asyncio.run(run(args, concurrency))
+        print(
+            f"{r['concurrency']:>11} {r['confirmed']:>9} {r['failed']:>6} "
+            f"{r['throughput']:>8.1f} {r['p50'] * 1000:>8.1f} "
+            f"{r['p95'] * 1000:>8.1f} {r['transactions']:>5}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Benchmark the host agent skill router.
+
+Registers a synthetic catalog of agents and reports, for each catalog size,
+how large the agent section of the host instruction is with and without
+routing, how often the expected agent is shortlisted, and the lookup time.
+
+Usage:
+    python scripts/bench_skill_router.py [--agents 10 100 500] [--top-k 5]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+
+# Add project path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../samples/python'))
+
+from common.types import AgentCapabilities, AgentCard, AgentSkill
+from hosts.multiagent.skill_router import SkillRouter
+
+
+DOMAINS = {
+    'food': ['pizza', 'sushi', 'delivery', 'restaurant', 'menu', 'takeout'],
+    'ride': ['ride', 'driver', 'pickup', 'fare', 'airport', 'car'],
+    'hotel': ['hotel', 'room', 'checkin', 'suite', 'stay', 'resort'],
+    'flight': ['flight', 'airline', 'boarding', 'layover', 'seat', 'ticket'],
+    'weather': ['weather', 'forecast', 'rain', 'temperature', 'wind', 'storm'],
+    'finance': ['stock', 'portfolio', 'dividend', 'invest', 'market', 'fund'],
+    'health': ['doctor', 'appointment', 'clinic', 'symptom', 'pharmacy'],
+    'shopping': ['buy', 'cart', 'discount', 'shipping', 'return', 'order'],
+    'music': ['song', 'playlist', 'album', 'artist', 'concert', 'lyrics'],
+    'movies': ['movie', 'cinema', 'showtime', 'trailer', 'actor', 'film'],
+    'fitness': ['workout', 'gym', 'run', 'yoga', 'calories', 'trainer'],
+    'legal': ['contract', 'lawyer', 'lease', 'clause', 'dispute', 'court'],
+    'pets': ['dog', 'cat', 'vet', 'grooming', 'walker', 'pet'],
+    'events': ['wedding', 'venue', 'party', 'catering', 'guest', 'invite'],
+    'education': ['tutor', 'course', 'exam', 'homework', 'lesson', 'study'],
+    'realestate': ['house', 'apartment', 'rent', 'mortgage', 'listing'],
+}
+FILLER = ['help', 'find', 'book', 'plan', 'check', 'get', 'the', 'for', 'me']
+
+
+def make_catalog(size: int, rng: random.Random):
+    """Returns agent cards and one held-out query per agent."""
+    cards = []
+    queries = []
+    domains = list(DOMAINS)
+    for i in range(size):
+        domain = domains[i % len(domains)]
+        words = DOMAINS[domain]
+        # Agents in the same domain specialize on a distinct keyword pair.
+        focus = rng.sample(words, 2) + [f'{domain}{i}']
+        skills = [
+            AgentSkill(
+                id=f'{domain}_{i}_{j}',
+                name=f'{domain.title()} {focus[j % len(focus)]} tool',
+                description=' '.join(rng.sample(words, 3) + focus),
+                tags=[domain, *focus],
+                examples=[
+                    ' '.join(rng.sample(FILLER, 3) + rng.sample(words, 2))
+                ],
+            )
+            for j in range(3)
+        ]
+        cards.append(
+            AgentCard(
+                name=f'{domain.title()} Agent {i}',
+                description=f'Handles {domain} requests: {" ".join(focus)}',
+                url=f'http://localhost:{20000 + i}/',
+                version='1.0.0',
+                capabilities=AgentCapabilities(),
+                skills=skills,
+            )
+        )
+        queries.append(
+            (
+                # The query names the agent's specialty but not its id token.
+                ' '.join(rng.sample(FILLER, 3) + focus[:2]),
+                cards[-1].name,
+            )
+        )
+    return cards, queries
+
+
+def run(size: int, top_k: int, seed: int):
+    rng = random.Random(seed)
+    cards, queries = make_catalog(size, rng)
+    router = SkillRouter()
+
+    start = time.perf_counter()
+    for card in cards:
+        router.add_card(card)
+    index_ms = (time.perf_counter() - start) * 1000
+
+    lines = {
+        c.name: json.dumps({'name': c.name, 'description': c.description})
+        for c in cards
+    }
+    full_prompt = len('\n'.join(lines.values()))
+
+    top1 = topk = 0
+    routed_prompt = 0
+    start = time.perf_counter()
+    for query, expected in queries:
+        names = router.top_k(query, top_k)
+        top1 += bool(names) and names[0] == expected
+        topk += expected in names
+        routed_prompt += len('\n'.join(lines[n] for n in names))
+    lookup_us = (time.perf_counter() - start) * 1e6 / len(queries)
+
+    print(
+        f'{size:>6} agents | prompt {full_prompt:>8} -> '
+        f'{routed_prompt // len(queries):>6} chars | '
+        f'top-1 {top1 / len(queries):6.1%} | '
+        f'top-{top_k} {topk / len(queries):6.1%} | '
+        f'index {index_ms:8.1f} ms | lookup {lookup_us:8.1f} us'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--agents', type=int, nargs='+', default=[10, 100, 500])
+    parser.add_argument('--top-k', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    for size in args.agents:
+        run(size, args.top_k, args.seed)
+
+
+if __name__ == '__main__':
+    main()
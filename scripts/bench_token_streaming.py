@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""Benchmark time to first token of a streamed service agent response.
+
+Runs AgentTaskManager.on_send_task_subscribe of the uber agent against a stub
+ADK runner that generates a response token by token after a fixed latency,
+and reports, per frame interval:
+
+  - time to first token (TTFT): when the first text chunk reaches the client;
+  - time to the complete response, which is what the client saw first before
+    token-level streaming;
+  - the number of SSE frames sent and the frame rate.
+
+The stub runner replaces the model, so no credentials are needed. Frames are
+only counted, not sent over HTTP.
+
+Usage:
+    python scripts/bench_token_streaming.py [--tokens 300] [--tokens-per-s 100]
+        [--latency-ms 300] [--intervals-ms 0 20 50 100] [--runs 3]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+
+# Add project paths
+ROOT = os.path.dirname(__file__)
+sys.path.insert(0, os.path.join(ROOT, '../samples/python'))
+sys.path.insert(0, os.path.join(ROOT, '../samples/python/agents/uber_services'))
+
+from common.server.token_stream import DeltaCoalescer
+from common.types import (
+    Message,
+    SendTaskStreamingRequest,
+    TaskArtifactUpdateEvent,
+    TaskSendParams,
+    TextPart,
+)
+from google.adk.agents.run_config import StreamingMode
+from google.adk.events import Event
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+from task_manager import AgentTaskManager, AgentWithTaskManager
+
+
+class StubRunner:
+    """Generates a response token by token, like a model in SSE mode."""
+
+    def __init__(self, tokens: int, tokens_per_s: float, latency: float):
+        self.session_service = InMemorySessionService()
+        self.tokens = [f'token{i} ' for i in range(tokens)]
+        self.token_delay = 1 / tokens_per_s
+        self.latency = latency
+
+    async def run_async(self, user_id, session_id, new_message, run_config=None):
+        streaming = (
+            run_config is not None
+            and run_config.streaming_mode == StreamingMode.SSE
+        )
+        await asyncio.sleep(self.latency)
+        for token in self.tokens:
+            await asyncio.sleep(self.token_delay)
+            if streaming:
+                yield Event(
+                    author='bench',
+                    partial=True,
+                    content=types.Content(
+                        role='model', parts=[types.Part.from_text(text=token)]
+                    ),
+                )
+        yield Event(
+            author='bench',
+            content=types.Content(
+                role='model',
+                parts=[types.Part.from_text(text=''.join(self.tokens))],
+            ),
+        )
+
+
+class BenchAgent(AgentWithTaskManager):
+    SUPPORTED_CONTENT_TYPES = ['text', 'text/plain']
+
+    def __init__(self, runner: StubRunner):
+        self._agent = type('StubAgent', (), {'name': 'bench'})()
+        self._user_id = 'bench'
+        self._runner = runner
+
+    def get_processing_message(self) -> str:
+        return 'Processing...'
+
+
+async def measure(args, interval: float) -> dict:
+    """Streams one response and times the frames the client receives."""
+    runner = StubRunner(args.tokens, args.tokens_per_s, args.latency_ms / 1000)
+    manager = AgentTaskManager(
+        BenchAgent(runner), verify_signatures=False, verify_blockchain=False
+    )
+    manager.delta_coalescer = DeltaCoalescer(interval=interval)
+    request = SendTaskStreamingRequest(
+        id=1,
+        params=TaskSendParams(
+            id='bench-task',
+            sessionId='bench-session',
+            message=Message(role='user', parts=[TextPart(text='Book a ride')]),
+            acceptedOutputModes=['text'],
+        ),
+    )
+    start = time.perf_counter()
+    first_token = None
+    frames = 0
+    async for response in manager.on_send_task_subscribe(request):
+        if response.error:
+            raise RuntimeError(response.error.message)
+        frames += 1
+        event = response.result
+        if (
+            first_token is None
+            and isinstance(event, TaskArtifactUpdateEvent)
+            and any(p.type == 'text' and p.text for p in event.artifact.parts)
+        ):
+            first_token = time.perf_counter() - start
+    total = time.perf_counter() - start
+    return {'ttft': first_token, 'total': total, 'frames': frames}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tokens', type=int, default=300)
+    parser.add_argument('--tokens-per-s', type=float, default=100)
+    parser.add_argument('--latency-ms', type=float, default=300,
+                        help='model latency before the first token')
+    parser.add_argument('--intervals-ms', type=float, nargs='+',
+                        default=[0, 20, 50, 100],
+                        help='frame intervals of the delta coalescer')
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f'{args.tokens} tokens at {args.tokens_per_s:.0f}/s after '
+          f'{args.latency_ms:.0f} ms, median of {args.runs} runs')
+    print(f'{"interval":>10} {"TTFT":>10} {"complete":>10} {"frames":>8} '
+          f'{"frames/s":>9}')
+    for interval_ms in args.intervals_ms:
+        runs = [
+            asyncio.run(measure(args, interval_ms / 1000))
+            for _ in range(args.runs)
+        ]
+        ttft = statistics.median(run['ttft'] for run in runs)
+        total = statistics.median(run['total'] for run in runs)
+        frames = statistics.median(run['frames'] for run in runs)
+        print(f'{interval_ms:8.0f}ms {ttft * 1000:8.1f}ms {total * 1000:8.1f}ms '
+              f'{frames:8.0f} {frames / total:9.1f}')
+
+
+if __name__ == '__main__':
+    main()
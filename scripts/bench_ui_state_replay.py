@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Benchmark replaying remote agent task events into the UI host manager.
+
+Feeds a synthetic stream of task, status and artifact events through
+ADKHostManager.task_callback, the path every streamed update from a remote
+agent takes, and reports the throughput of each slice of the replay. With
+indexed state the per-event cost should not grow as history accumulates, so
+the last slice should run about as fast as the first.
+
+The host agent and ADK runner are replaced with stubs so no remote agents or
+model credentials are needed.
+
+Usage:
+    python scripts/bench_ui_state_replay.py [--events 100000] [--conversations 50]
+        [--updates-per-task 8] [--slices 10]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+import uuid
+
+from unittest import mock
+
+
+# Add project paths
+ROOT = os.path.dirname(__file__)
+sys.path.insert(0, os.path.join(ROOT, '../samples/python'))
+sys.path.insert(0, os.path.join(ROOT, '../demo/ui'))
+
+from common.types import (
+    AgentCapabilities,
+    AgentCard,
+    Artifact,
+    Message,
+    Task,
+    TaskArtifactUpdateEvent,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
+from service.server import adk_host_manager
+from service.server.adk_host_manager import ADKHostManager
+
+
+def make_manager() -> ADKHostManager:
+    with mock.patch.object(adk_host_manager, 'HostAgent'), \
+            mock.patch.object(adk_host_manager, 'Runner'):
+        return ADKHostManager(api_key='unused')
+
+
+def make_events(total: int, conversations: int, updates_per_task: int):
+    """Yields task lifecycles: a task, status updates, an artifact, completion."""
+    conversation_ids = [str(uuid.uuid4()) for _ in range(conversations)]
+    produced = 0
+    task_number = 0
+    while produced < total:
+        task_id = str(uuid.uuid4())
+        metadata = {
+            'conversation_id': conversation_ids[task_number % conversations]
+        }
+        task_number += 1
+        yield Task(
+            id=task_id,
+            status=TaskStatus(state=TaskState.SUBMITTED),
+            metadata=metadata,
+        )
+        for i in range(updates_per_task):
+            message = Message(
+                role='agent',
+                parts=[TextPart(text=f'step {i}')],
+                metadata={**metadata, 'message_id': str(uuid.uuid4())},
+            )
+            yield TaskStatusUpdateEvent(
+                id=task_id,
+                status=TaskStatus(state=TaskState.WORKING, message=message),
+                metadata=metadata,
+            )
+        yield TaskArtifactUpdateEvent(
+            id=task_id,
+            artifact=Artifact(parts=[TextPart(text='done')]),
+            metadata=metadata,
+        )
+        yield TaskStatusUpdateEvent(
+            id=task_id,
+            status=TaskStatus(state=TaskState.COMPLETED),
+            final=True,
+            metadata=metadata,
+        )
+        produced += updates_per_task + 3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--events', type=int, default=100_000)
+    parser.add_argument('--conversations', type=int, default=50)
+    parser.add_argument('--updates-per-task', type=int, default=8)
+    parser.add_argument('--slices', type=int, default=10)
+    args = parser.parse_args()
+
+    manager = make_manager()
+    card = AgentCard(
+        name='bench',
+        url='http://localhost/',
+        version='1.0.0',
+        capabilities=AgentCapabilities(),
+        skills=[],
+    )
+    events = list(
+        make_events(args.events, args.conversations, args.updates_per_task)
+    )
+    bounds = [len(events) * i // args.slices for i in range(args.slices + 1)]
+
+    rates = []
+    started = time.perf_counter()
+    # task_callback prints every update to the terminal.
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        for start, end in zip(bounds, bounds[1:]):
+            slice_started = time.perf_counter()
+            for event in events[start:end]:
+                manager.task_callback(event, card)
+            rates.append((end - start) / (time.perf_counter() - slice_started))
+            out.seek(0)
+            out.truncate()
+    elapsed = time.perf_counter() - started
+
+    print(f'Replayed {len(events)} events into {len(manager.tasks)} tasks '
+          f'in {elapsed:.2f}s ({len(events) / elapsed:,.0f} events/s)')
+    for i, rate in enumerate(rates):
+        print(f'  slice {i + 1:2d}: {rate:10,.0f} events/s')
+    print(f'Last/first slice throughput: {rates[-1] / rates[0]:.2f}')
+
+    list_started = time.perf_counter()
+    listed = len(manager.events)
+    print(f'Listing {listed} events took '
+          f'{(time.perf_counter() - list_started) * 1000:.1f} ms')
+    stats = manager.archive.stats()
+    print(f'Archived {stats["segments"]} segments in {stats["streams"]} '
+          f'streams, {stats["bytes"] / 1024:.0f} KiB compressed')
+    manager.archive.close()
+
+
+if __name__ == '__main__':
+    main()